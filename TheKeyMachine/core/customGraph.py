@@ -58,6 +58,9 @@ import TheKeyMachine.mods.keyToolsMod as keyTools
 import TheKeyMachine.mods.selSetsMod as selSets
 import TheKeyMachine.mods.mediaMod as media
 import TheKeyMachine.mods.styleMod as style
+import TheKeyMachine.mods.tickSchedulerMod as tickScheduler
+import TheKeyMachine.mods.curveFilterMod as curveFilter
+import TheKeyMachine.mods.curveToolsMod as curveTools
 
 mods = [general,
         ui,
@@ -87,7 +90,7 @@ customGraphWin = None
 
 curve_mode_slider = None
 is_dragging = False
-original_keyframes = {}
+filter_session = None
 
 
 
@@ -207,9 +210,14 @@ def createCustomGraph():
 
     static_button = cmds.button(l='Static', c=lambda x: keyTools.deleteStaticCurves(), h=20, w=40)
     static_button_widget = wrapInstance(int(mui.MQtUtil.findControl(static_button)), QtWidgets.QPushButton)
-    static_button_widget.setToolTip("Remove all statics curves")
+    static_button_widget.setToolTip("Remove all statics curves<br><br> Right-click to also remove redundant keys.")
     apply_base_stylesheet(static_button_widget)
 
+    static_popup_menu = cmds.popupMenu(parent=static_button)
+    cmds.menuItem(label='Remove Static Curves', command=lambda x: keyTools.deleteStaticCurves(), parent=static_popup_menu)
+    cmds.menuItem(label='Remove Static Curves and Redundant Keys', command=lambda x: keyTools.deleteStaticCurves(redundant=True), parent=static_popup_menu)
+    cmds.menuItem(label='Clean Up Whole Scene', command=lambda x: keyTools.deleteStaticCurves(redundant=True, scene=True), parent=static_popup_menu)
+
 
     share_button = cmds.button(l='Share', c=lambda x: keyTools.shareKeys(), h=20, w=40)
     share_button_widget = wrapInstance(int(mui.MQtUtil.findControl(share_button)), QtWidgets.QPushButton)
@@ -235,10 +243,15 @@ def createCustomGraph():
         "Performs a cleanup and repositioning of the keys that are in a sub-frame "
         "to the nearest frame.<br><br>This tool doesn't just perform a simple snap, but "
         "it ensures to clean up and prevent multiple keyframes in the same frame.<br><br> "
-        "Ideal for after scaling an animation."
+        "Ideal for after scaling an animation.<br><br> Right-click to choose what to do when two keys land on the same frame."
     )
     apply_base_stylesheet(clean_button_widget)
 
+    snap_popup_menu = cmds.popupMenu(parent=clean_button)
+    cmds.menuItem(label='Keep Nearest Key', command=lambda x: keyTools.snapKeyframes("nearest"), parent=snap_popup_menu)
+    cmds.menuItem(label='Average Colliding Keys', command=lambda x: keyTools.snapKeyframes("average"), parent=snap_popup_menu)
+    cmds.menuItem(label='Keep Original Keys', command=lambda x: keyTools.snapKeyframes("original"), parent=snap_popup_menu)
+
     
     overlap_button = cmds.button(l='Overlap', c=keyTools.mod_overlap_animation, h=20, w=50)
     overlap_button_widget = wrapInstance(int(mui.MQtUtil.findControl(overlap_button)), QtWidgets.QPushButton)
@@ -260,10 +273,31 @@ def createCustomGraph():
     apply_base_stylesheet(reblock_button_widget)
 
 
+    reduce_button = cmds.button(l='Reduce', c=lambda x: reduce_keys(), h=20, w=48)
+    reduce_button_widget = wrapInstance(int(mui.MQtUtil.findControl(reduce_button)), QtWidgets.QPushButton)
+    reduce_button_widget.setToolTip(
+        "Removes the keys that are not needed to keep the shape of the curve, within a small tolerance.<br><br>"
+        "Works on the selected keys range, or on the whole curves of the selected objects.<br><br>"
+        "Ideal after baking or pasting worldspace animation.<br><br> Right-click to choose the tolerance."
+    )
+    apply_base_stylesheet(reduce_button_widget)
+
+    def reduce_keys(tolerance=0.01):
+        summary = curveTools.reduce_curves(tolerance=tolerance)
+        print(curveTools.reduction_message(summary))
+
+    reduce_popup_menu = cmds.popupMenu(parent=reduce_button)
+    cmds.menuItem(label='Fine (0.001)', command=lambda x: reduce_keys(0.001), parent=reduce_popup_menu)
+    cmds.menuItem(label='Medium (0.01)', command=lambda x: reduce_keys(0.01), parent=reduce_popup_menu)
+    cmds.menuItem(label='Coarse (0.05)', command=lambda x: reduce_keys(0.05), parent=reduce_popup_menu)
+
+
     flip_popup_menu = cmds.popupMenu(parent=flip_button)
     cmds.menuItem(label='Flip Curves', command=lambda x: keyTools.flipCurves(), parent=flip_popup_menu)
     cmds.menuItem(label='Flip from Selected Keyframe', command=lambda x: keyTools.flipFromKeyframe(), parent=flip_popup_menu)
     cmds.menuItem(label='Flip Selected Group', command=lambda x: keyTools.flipKeyGroup(), parent=flip_popup_menu)
+    cmds.menuItem(label='Flip around Default Value', command=lambda x: keyTools.flipCurves("default"), parent=flip_popup_menu)
+    cmds.menuItem(label='Flip around Zero', command=lambda x: keyTools.flipCurves("zero"), parent=flip_popup_menu)
 
     separator = cmds.separator(style='none', width=7)
 
@@ -273,6 +307,7 @@ def createCustomGraph():
 
     extra_popup_menu = cmds.popupMenu(parent=extra_button, button=1, ctl=False, alt=False)
     cmds.menuItem(label="Select object from selected curve", parent=extra_popup_menu, c=lambda x: keyTools.select_objects_from_selected_curves())
+    cmds.menuItem(label="Euler filter selected curves", parent=extra_popup_menu, c=lambda x: curveTools.euler_filter())
 
 
     separator = cmds.separator(style='none', width=10)
@@ -369,9 +404,13 @@ def createCustomGraph():
 
 
     def curve_mode_changed(*args):
+        # Un valor pendiente del modo anterior no debe aplicarse con el modo nuevo
+        curve_mode_scheduler.cancel()
         mode = cmds.optionMenu(curves_option_menu, query=True, value=True)
         if mode == "Smooth":
             cmds.floatSlider(curve_mode_slider, edit=True, min=0.0, max=0.5, value=0)
+        elif mode == "Gaussian":
+            cmds.floatSlider(curve_mode_slider, edit=True, min=0.0, max=curveFilter.GAUSSIAN_MAX_WIDTH, value=0)
         elif mode == "Wave":
             cmds.floatSlider(curve_mode_slider, edit=True, min=-1, max=1, value=0)
         elif mode == "Scale":
@@ -390,26 +429,18 @@ def createCustomGraph():
             cmds.floatSlider(curve_mode_slider, edit=True, min=0.0, max=0.5, value=0)
         sliderReset()
 
-    def curve_mode_slider_change(value):
+    def apply_curve_mode(value):
         mode = cmds.optionMenu(curves_option_menu, query=True, value=True)
-        if mode == "Smooth":
-            apply_curves_smooth_function(value)
-        elif mode == "Wave":
-            apply_curves_wave_function(value)
-        elif mode == "Scale":
-            apply_curves_scale_function(value)
-        elif mode == "Scale Sel":
-            scale_curves_from_point(value)
-        elif mode == "Lineal":
-            apply_curves_linear_function(value)
-        elif mode == "Flat":
-            apply_curves_flat_function(value)
-        elif mode == "Ease in/out":
-            apply_curves_ease_function(value)
-        elif mode == "Noise":
-            apply_curves_noise_function(value)
-        elif mode == "Add":
+        if mode == "Add":
             add_random_keyframes_to_curve(value)
+        elif mode in curveFilter.MODES:
+            apply_curve_filter(mode, value)
+
+    # El slider de curvas pasa por un TickScheduler para no acumular eventos en curvas densas
+    curve_mode_scheduler = tickScheduler.TickScheduler("curve_mode", apply_curve_mode)
+
+    def curve_mode_slider_change(value):
+        curve_mode_scheduler.submit(value)
 
 
 
@@ -460,366 +491,38 @@ def createCustomGraph():
 
 
 
-    # _____________ SCALE Selection
-
-    def scale_curves_from_point(factor):
-        global original_keyframes, is_dragging
-
-        curves = cmds.keyframe(query=True, name=True, sl=True)
-
-        if curves:
-            for curve in curves:
-                keyframes = cmds.keyframe(curve, query=True, timeChange=True, valueChange=True)
-                selected_keyframes = cmds.keyframe(curve, query=True, selected=True, timeChange=True, valueChange=True)
-                if keyframes and len(keyframes) % 2 == 0:
-                    if curve not in original_keyframes:
-                        # Store the original keyframes if they haven't been stored for this curve yet
-                        original_keyframes[curve] = keyframes.copy()
-                    if not is_dragging:
-                        # Open an undo chunk only if is_dragging is False
-                        cmds.undoInfo(openChunk=True)
-                        is_dragging = True
-
-                    if selected_keyframes and len(selected_keyframes) % 2 == 0:
-                        # Use the mean of the selected keyframes
-                        reference_keyframes = selected_keyframes
-                    else:
-                        # Use the mean of all keyframes
-                        reference_keyframes = original_keyframes[curve]
-
-                    mean_value = sum(reference_keyframes[i+1] for i in range(0, len(reference_keyframes), 2)) / (len(reference_keyframes) / 2)
-
-                    for i in range(0, len(keyframes), 2):
-                        time = keyframes[i]
-                        initial_value = original_keyframes[curve][i + 1]
-                        new_value = mean_value + (initial_value - mean_value) * factor
-                        cmds.keyframe(curve, edit=True, time=(time, time), valueChange=new_value)
-        else:
-            print("Please select at least one animation curve in the Graph Editor.")
-
-
-
-    # _____________ SCALE
-
-    def apply_curves_scale_function(factor):
-        global original_keyframes, is_dragging
-
-        curves = cmds.selectionConnection('graphEditor1FromOutliner', query=True, object=True)
-        if curves:
-            for curve in curves:
-                keyframes = cmds.keyframe(curve, query=True, selected=True, timeChange=True, valueChange=True)
-                if keyframes and len(keyframes) % 2 == 0:
-                    if curve not in original_keyframes:
-                        # Store the original keyframes if they haven't been stored for this curve yet
-                        original_keyframes[curve] = keyframes.copy()
-                    if not is_dragging:
-                        # Open an undo chunk only if is_dragging is False
-                        cmds.undoInfo(openChunk=True)
-                        is_dragging = True
-                    mean_value = sum(original_keyframes[curve][i+1] for i in range(0, len(original_keyframes[curve]), 2)) / (len(original_keyframes[curve]) / 2)
-                    for i in range(0, len(keyframes), 2):
-                        time = keyframes[i]
-                        initial_value = original_keyframes[curve][i + 1]
-                        new_value = mean_value + (initial_value - mean_value) * factor
-                        cmds.keyframe(curve, edit=True, time=(time, time), valueChange=new_value)
-
-        else:
-            print("Please select at least one animation curve in the Graph Editor.")
-
-
-
-    # ______________ SMOOTH
-
-    def apply_curves_smooth_function(factor):
-        global is_dragging, original_keyframes
-
-        curves = cmds.selectionConnection('graphEditor1FromOutliner', query=True, object=True)
-        if curves:
-            for curve in curves:
-                keyframes = cmds.keyframe(curve, query=True, selected=True, valueChange=True)
-                if not keyframes:
-                    continue
-
-                if curve not in original_keyframes:
-                    original_keyframes[curve] = keyframes.copy()
-
-                if not is_dragging:
-                    cmds.undoInfo(openChunk=True)
-                    is_dragging = True
-                
-                curves_smooth(curve, factor)
-        else:
-            print("Please select at least one animation curve in the Graph Editor.")
-
-
-
-    def curves_smooth(selection, power=0.1):
-        keys = cmds.keyframe(selection, query=True, selected=True)
-        if not keys:
-            return
-
-        for key in keys:
-            time = cmds.keyframe(selection, query=True, time=(key, key))
-            value = cmds.keyframe(selection, query=True, time=(key, key), valueChange=True)
-            
-            prev_time = cmds.findKeyframe(selection, time=(time[0],), which='previous')
-            prev_value = cmds.keyframe(selection, query=True, time=(prev_time, prev_time), valueChange=True) if prev_time else value
-            
-            next_time = cmds.findKeyframe(selection, time=(time[0],), which='next')
-            next_value = cmds.keyframe(selection, query=True, time=(next_time, next_time), valueChange=True) if next_time else value
-            
-            # Asegurarse de que no estamos dividiendo por cero
-            if prev_time and prev_time != time[0]:
-                prev_diff = abs(time[0] - prev_time)
-                weight_prev = 1.0 / prev_diff
-            else:
-                prev_diff = 0
-                weight_prev = 0
-
-            if next_time and next_time != time[0]:
-                next_diff = abs(next_time - time[0])
-                weight_next = 1.0 / next_diff
-            else:
-                next_diff = 0
-                weight_next = 0
-            
-            # Ensure that at least one weight is non-zero to avoid division by zero
-            if weight_prev + weight_next > 0:
-                avg = (prev_value[0] * weight_prev + next_value[0] * weight_next) / (weight_prev + weight_next)
-                smoothed_value = value[0] + (avg - value[0]) * power
-                cmds.keyframe(selection, edit=True, time=(time[0], time[0]), valueChange=smoothed_value)
-
-
-
-
-
-    # ______________NOISE
-
-    import random
-
-    # Diccionario para almacenar el ruido inicial de cada clave
-    initial_noise_values = {}
-
-    def apply_curves_noise_function(value):
-        global original_keyframes, is_dragging
-
-        curves = cmds.selectionConnection('graphEditor1FromOutliner', query=True, object=True)
-        if curves:
-            for curve in curves:
-                keyframes = cmds.keyframe(curve, query=True, selected=True, timeChange=True, valueChange=True)
-                if keyframes and len(keyframes) % 2 == 0:
-                    if curve not in original_keyframes:
-                        original_keyframes[curve] = keyframes.copy()
-                        # Inicializa el ruido inicial para cada clave
-                        initial_noise_values[curve] = [random.uniform(-1, 1) for _ in range(len(keyframes) // 2)]
-                        
-                    if not is_dragging:
-                        cmds.undoInfo(openChunk=True)
-                        is_dragging = True
-                    
-                    for i in range(0, len(keyframes), 2):
-                        time = keyframes[i]
-                        initial_value = original_keyframes[curve][i + 1]
-                        
-                        # Escala el valor de ruido inicial con el slider
-                        noise = initial_noise_values[curve][i // 2] * value
-                        new_value = initial_value + noise
-                        
-                        cmds.keyframe(curve, edit=True, time=(time, time), valueChange=new_value)
-                else:
-                    print("")
-        else:
-            print("Please select at least one animation curve in the Graph Editor.")
-
-
-
-
-    # ______________WAVE
-
-    def apply_curves_wave_function(value):
-        global original_keyframes, is_dragging
-
-        curves = cmds.selectionConnection('graphEditor1FromOutliner', query=True, object=True)
-        if curves:
-            for curve in curves:
-                keyframes = cmds.keyframe(curve, query=True, selected=True, timeChange=True, valueChange=True)
-                if keyframes and len(keyframes) % 2 == 0:
-                    if curve not in original_keyframes:
-                        # Store the original keyframes if they haven't been stored for this curve yet
-                        original_keyframes[curve] = keyframes.copy()
-                    if not is_dragging:
-                        # Open an undo chunk only if is_dragging is False
-                        cmds.undoInfo(openChunk=True)
-                        is_dragging = True
-                    for i in range(0, len(keyframes), 2):
-                        time = keyframes[i]
-                        initial_value = original_keyframes[curve][i + 1]
-                        direction = 1 if (i // 2) % 2 == 0 else -1
-                        new_value = initial_value + direction * value
-                        cmds.keyframe(curve, edit=True, time=(time, time), valueChange=new_value)
-                else:
-                    print("")
-        else:
-            print("Please select at least one animation curve in the Graph Editor.")
-
-
-
-
-
-    # __________ LINEAR
-
-
-    def curves_linear_interpolation(curve, blend_factor=1.0):
-        global original_keyframes, is_dragging
-
-        keyframes = cmds.keyframe(curve, query=True, selected=True, timeChange=True, valueChange=True)
-
-        if not keyframes or len(keyframes) % 2 != 0:
-            print(f"Please select at least one keyframe on curve {curve}.")
-            return
-
-        # Store original keyframes for undo
-        if curve not in original_keyframes:
-            original_keyframes[curve] = keyframes.copy()
-
-        # First and last keyframes remain unchanged
-        min_time, min_value = keyframes[0], keyframes[1]
-        max_time, max_value = keyframes[-2], keyframes[-1]
-
-        for i in range(2, len(keyframes) - 2, 2):
-            time = keyframes[i]
-            original_value = original_keyframes[curve][i + 1]
-            t = (time - min_time) / (max_time - min_time)
-            new_value = min_value + t * (max_value - min_value)
-            blended_value = original_value + blend_factor * (new_value - original_value)
-            cmds.keyframe(curve, edit=True, time=(time, time), valueChange=blended_value)
+    # _____________ Filtros: Scale, Scale Sel, Smooth, Noise, Wave, Lineal, Ease in/out, Flat
 
+    def apply_curve_filter(mode, value):
+        global filter_session, is_dragging
 
-    def apply_curves_linear_function(blend_factor=1.0):
-        global is_dragging
-
-        if not is_dragging:
-            cmds.undoInfo(openChunk=True)
-            is_dragging = True
-
-        curves = cmds.selectionConnection('graphEditor1FromOutliner', query=True, object=True)
-        if curves:
-            for curve in curves:
-                curves_linear_interpolation(curve, blend_factor)
-        else:
+        # Todas las curvas se leen una vez al empezar el drag; cada tick escribe una vez por curva
+        if filter_session is None:
+            filter_session = curveTools.FilterSession()
+        if not filter_session:
             print("Please select at least one animation curve in the Graph Editor.")
-
-
-
-    # _______________ EASE IN/OUT
-
-    def lerp(a, b, t):
-        """Linear interpolation."""
-        return a + (b - a) * t
-
-    def ease_in(t, power=3):
-        return pow(t, power)
-
-    def ease_out(t, power=3):
-        return 1 - pow(1 - t, power)
-
-    def apply_curves_ease_function(factor):
-        global original_keyframes, is_dragging
-
-        curves = cmds.selectionConnection('graphEditor1FromOutliner', query=True, object=True)
-        if curves:
-            for curve in curves:
-                if curve not in original_keyframes:
-                    # Almacena los keyframes originales
-                    original_keyframes[curve] = cmds.keyframe(curve, query=True, valueChange=True, selected=True)
-                
-                if not is_dragging:
-                    cmds.undoInfo(openChunk=True)
-                    is_dragging = True
-
-                if factor < 0.5:
-                    ease_curves(curve, 1 - (factor * 2), ease_in)  # Cambio de ease_out a ease_in
-                else:
-                    ease_curves(curve, (factor - 0.5) * 2, ease_out) 
-                    
-        else:
-            print("Please select at least one animation curve in the Graph Editor.")
-
-
-    def ease_curves(curve, factor, ease_func):
-        keys = cmds.keyframe(curve, query=True, selected=True)
-        if not keys:
-            return
-
-        first_key = keys[0]
-        last_key = keys[-1]
-        total_time = last_key - first_key
-
-        for i, key in enumerate(keys):
-            elapsed_time = key - first_key
-            time_position = elapsed_time / total_time
-
-            eased_position = ease_func(time_position, power=factor*3+1)
-            
-            new_value = lerp(original_keyframes[curve][i], lerp(original_keyframes[curve][0], original_keyframes[curve][-1], eased_position), factor)
-            
-            cmds.keyframe(curve, edit=True, time=(key, key), valueChange=new_value)
-
-
-
-
-    # __________________ FLAT
-
-
-    def curves_flat_interpolation(curve, blend_factor=1.0):
-        global original_keyframes, is_dragging
-
-        keyframes = cmds.keyframe(curve, query=True, selected=True, timeChange=True, valueChange=True)
-
-        if not keyframes or len(keyframes) % 2 != 0:
-            print(f"Please select at least one keyframe on curve {curve}.")
             return
 
-        # Store original keyframes for undo
-        if curve not in original_keyframes:
-            original_keyframes[curve] = keyframes.copy()
-
-        # Calculate average value
-        total_value = 0
-        for i in range(1, len(keyframes), 2):
-            total_value += keyframes[i]
-        average_value = total_value / (len(keyframes) / 2)
-
-        # Set all keys to average value
-        for i in range(0, len(keyframes), 2):
-            time = keyframes[i]
-            original_value = original_keyframes[curve][i + 1]
-            blended_value = original_value + blend_factor * (average_value - original_value)
-            cmds.keyframe(curve, edit=True, time=(time, time), valueChange=blended_value)
-
-    def apply_curves_flat_function(blend_factor=1.0):
-        global is_dragging
-
         if not is_dragging:
             cmds.undoInfo(openChunk=True)
             is_dragging = True
 
-        curves = cmds.selectionConnection('graphEditor1FromOutliner', query=True, object=True)
-        if curves:
-            for curve in curves:
-                curves_flat_interpolation(curve, blend_factor)
-        else:
-            print("Please select at least one animation curve in the Graph Editor.")
+        filter_session.apply(mode, value)
 
 
 
 
 
     def sliderReset(*args):
-        global is_dragging, original_keyframes
-        original_keyframes = {}
+        global is_dragging, filter_session
+        curve_mode_scheduler.flush()
         generated_keyframe_positions.clear()
 
+        # El resultado final del filtro tiene que entrar en el chunk antes de cerrarlo
+        if filter_session is not None:
+            filter_session.release()
+            filter_session = None
+
         if is_dragging:
             cmds.undoInfo(closeChunk=True)
             is_dragging = False
@@ -833,6 +536,8 @@ def createCustomGraph():
             reset_value = 0.5
         if current_option == "Flat":
             reset_value = 0
+        if current_option == "Gaussian":
+            reset_value = 0
         if current_option == "Lineal":
             reset_value = 0
         if current_option == "Noise":
@@ -904,6 +609,7 @@ def createCustomGraph():
     cmds.menuItem(label='Add')
     cmds.menuItem(label='Ease in/out')
     cmds.menuItem(label='Flat')
+    cmds.menuItem(label='Gaussian')
     cmds.menuItem(label='Lineal')
     cmds.menuItem(label='Noise')
     cmds.menuItem(label='Scale')
@@ -1227,9 +933,17 @@ def createCustomGraph():
     bouncy_curve_button = cmds.iconTextButton(l="", w=22, h=24, image=media.bouncy_curve_image, c=keyTools.bouncy_tangets)
     bouncy_curve_button_widget = wrapInstance(int(mui.MQtUtil.findControl(bouncy_curve_button)), QtWidgets.QPushButton)
     bouncy_curve_button_widget.setToolTip(
-        "Set bouncy tangents."
+        "Set bouncy tangents.<br><br> Right-click to see more tangent modes."
     )
 
+    bouncy_popup_menu = cmds.popupMenu(parent=bouncy_curve_button)
+    cmds.menuItem(label='Bouncy', command=lambda x: keyTools.bouncy_tangets(), parent=bouncy_popup_menu)
+    cmds.menuItem(label='Auto Clamped', command=lambda x: keyTools.set_tangent_mode("Auto Clamped"), parent=bouncy_popup_menu)
+    cmds.menuItem(label='Flat Extremes', command=lambda x: keyTools.set_tangent_mode("Flat Extremes"), parent=bouncy_popup_menu)
+    cmds.menuItem(divider=True, parent=bouncy_popup_menu)
+    cmds.menuItem(label='Overshoot', command=lambda x: keyTools.set_tangent_mode("Overshoot", 1.5), parent=bouncy_popup_menu)
+    cmds.menuItem(label='Soften', command=lambda x: keyTools.set_tangent_mode("Overshoot", 0.5), parent=bouncy_popup_menu)
+
     bouncy_curve_button_widget.setStyleSheet('''
         QPushButton {
 
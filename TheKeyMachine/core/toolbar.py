@@ -70,6 +70,7 @@ import TheKeyMachine.mods.mediaMod as media
 import TheKeyMachine.mods.styleMod as style
 import TheKeyMachine.mods.barMod as bar
 import TheKeyMachine.mods.hotkeysMod as hotkeys
+import TheKeyMachine.mods.tickSchedulerMod as tickScheduler
 import TheKeyMachine.core.customGraph as cg
 
 
@@ -2931,77 +2932,58 @@ class toolbar(object):
             rounded_value = abs(round(value * 2))
             cmds.text('barBlendSliderLabelText', edit=True, label=str(rounded_value))
 
+        # Los wrappers solo entregan el valor a su TickScheduler, que aplica el ultimo valor en el siguiente idle
+
         # Wrapper para el modo Pull/Push
-        def pull_push_wrapper(value):
+        def apply_pull_push(value):
             keyTools.blend_pull_and_push(value / 10.0)  # Ajusta el valor antes de pasarlo
             update_blend_label_with_slider_value(value)
 
-        def blend_to_frame_wrapper(value):
+        def apply_blend_to_frame(value):
             blend_to_frame_with_button_values(value)
             update_blend_label_with_slider_value(value)
 
+        pull_push_scheduler = tickScheduler.TickScheduler("pull_push", apply_pull_push)
+        blend_to_frame_scheduler = tickScheduler.TickScheduler("blend_to_frame", apply_blend_to_frame)
 
+        def pull_push_wrapper(value):
+            pull_push_scheduler.submit(value)
 
+        def blend_to_frame_wrapper(value):
+            blend_to_frame_scheduler.submit(value)
 
 
 
-        def blend_to_default_wrapper(value):
-
-            selected_objects = cmds.ls(selection=True, long=True)
-            if not selected_objects:
-                return
-
-            json_file_path = keyTools.general.get_set_default_data_file()
-
-            # Leer datos guardados si existen
-            if os.path.exists(json_file_path):
-                with open(json_file_path, 'r') as file:
-                    data = json.load(file)
-            else:
-                data = {}
-
-            for obj in selected_objects:
-                attrs = cmds.listAttr(obj, keyable=True)
-                if not attrs:
-                    continue
 
-                for attr in attrs:
-                    try:
-                        attr_full = f"{obj}.{attr}"
-                        namespace = obj.split(':')[0] if ':' in obj else 'default'
 
-                        # Obtener valor actual
-                        current_value = cmds.getAttr(attr_full)
 
-                        # Obtener valor por defecto desde JSON o Maya
-                        if namespace in data and attr_full in data[namespace]:
-                            default_value = data[namespace][attr_full]
-                        else:
-                            default_query = cmds.attributeQuery(attr, node=obj, listDefault=True)
-                            default_value = default_query[0] if default_query else current_value
+        def apply_blend_to_default(value):
+            keyTools.blend_to_default(value)
+            update_blend_label_with_slider_value(value)
 
-                        # Interpolar entre el valor actual y el valor por defecto
-                        new_value = (1 - value) * current_value + value * default_value
+        blend_to_default_scheduler = tickScheduler.TickScheduler("blend_to_default", apply_blend_to_default)
 
-                        # Aplicar nuevo valor suavizado
-                        cmds.setAttr(attr_full, new_value)
+        def blend_to_default_wrapper(value):
+            blend_to_default_scheduler.submit(value)
 
-                    except Exception as e:
-                        print(f"Error blending {attr} on {obj}: {str(e)}")
 
-            update_blend_label_with_slider_value(value)
 
 
 
+        def apply_blend_to_key(value):
+            keyTools.blend_to_key(value)  # Llama a la función tween original
+            update_blend_label_with_slider_value(value) 
 
+        blend_scheduler = tickScheduler.TickScheduler("blend", apply_blend_to_key)
 
         def blend_slider_wrapper(value):
-            keyTools.handle_autokey_start()
-            keyTools.blend_to_key(value)  # Llama a la función tween original
-            update_blend_label_with_slider_value(value) 
+            blend_scheduler.submit(value)
 
         def reset_blend_slider_label_after_drag(value):
             global current_blend_slider_mode
+            # Aplica el ultimo valor pendiente antes de cerrar la sesion del drag
+            for scheduler in (pull_push_scheduler, blend_to_frame_scheduler, blend_to_default_scheduler, blend_scheduler):
+                scheduler.flush()
             # Restablece la etiqueta a "0"
             label = "BL"
             if current_blend_slider_mode == 'pull_push':
@@ -3012,7 +2994,6 @@ class toolbar(object):
                 label = "BD"
             cmds.text('barBlendSliderLabelText', edit=True, label=label)
             # Llama a la función tweenSliderReset
-            keyTools.handle_autokey_end()
             keyTools.blendSliderReset(barBlendSlider)
 
 
@@ -3264,13 +3245,17 @@ class toolbar(object):
 
 
 
-        def tween_wrapper(value):
-            keyTools.handle_autokey_start()
+        def apply_tween(value):
             keyTools.tween(value)  # Llama a la función tween original
             update_label_with_slider_value(value)
 
+        tween_scheduler = tickScheduler.TickScheduler("tween", apply_tween)
+
+        def tween_wrapper(value):
+            tween_scheduler.submit(value)
+
         def reset_label_after_drag(value):
-            keyTools.handle_autokey_end()
+            tween_scheduler.flush()
             cmds.text('barTweenSliderLabelText', edit=True, label="T")
             keyTools.tweenSliderReset(barTweenSlider)
 
@@ -3727,6 +3712,9 @@ class toolbar(object):
         cmds.menuItem(l="Copy Pose", c=keyTools.copy_pose, image=media.copy_pose_image, p=copy_paste_animation_popup_menu)
         cmds.menuItem(l="Paste Pose", c=keyTools.paste_pose, image=media.paste_pose_image, p=copy_paste_animation_popup_menu)
         cmds.menuItem(divider=True, parent=copy_paste_animation_popup_menu)
+        cmds.menuItem(l="Export Animation as JSON", c=partial(keyTools.export_copy_data, "animation"), image=media.copy_paste_animation_image, p=copy_paste_animation_popup_menu)
+        cmds.menuItem(l="Export Pose as JSON", c=partial(keyTools.export_copy_data, "pose"), image=media.copy_pose_image, p=copy_paste_animation_popup_menu)
+        cmds.menuItem(divider=True, parent=copy_paste_animation_popup_menu)
 
         cmds.menuItem(l="Help", image=media.help_menu_image, c=lambda x: general.open_url("https://thekeymachine.gitbook.io/base/the-toolbar/animation-tools/copy-paste-animation"), p=copy_paste_animation_popup_menu)
 
@@ -3897,6 +3885,8 @@ class toolbar(object):
         cmds.menuItem(l="Copy Worldspace - Current Frame", image=media.copy_worldspace_frame_animation_image, c=bar.copy_worldspace_single_frame, p=copy_worldspace_button_popup_menu)
         cmds.menuItem(l="Paste Worldspace", image=media.paste_worldspace_frame_animation_image, c=bar.paste_worldspace_single_frame, p=copy_worldspace_button_popup_menu) 
         cmds.menuItem(divider=True, parent=copy_worldspace_button_popup_menu)
+        cmds.menuItem(l="Export Worldspace as JSON", image=media.copy_worldspace_animation_image, c=partial(keyTools.export_copy_data, "worldspace"), p=copy_worldspace_button_popup_menu)
+        cmds.menuItem(divider=True, parent=copy_worldspace_button_popup_menu)
         cmds.menuItem(l="Help",  c=lambda x: general.open_url("https://thekeymachine.gitbook.io/base/the-toolbar/animation-tools/copy-worldspace"), image=media.help_menu_image, parent=copy_worldspace_button_popup_menu)
 
         copy_worldspace_menu_style_widget = wrapInstance(int(mui.MQtUtil.findControl(copy_worldspace_button_popup_menu )), QtWidgets.QWidget)
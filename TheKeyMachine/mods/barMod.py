@@ -52,6 +52,10 @@ import functools
 
 import TheKeyMachine.mods.keyToolsMod as keyTools
 import TheKeyMachine.mods.generalMod as general
+import TheKeyMachine.mods.curveToolsMod as curveTools
+import TheKeyMachine.mods.worldspaceMod as worldspace
+import TheKeyMachine.mods.clipStoreMod as clipStore
+import TheKeyMachine.mods.jobRunnerMod as jobRunner
 
 
 python_version = f"{sys.version_info.major}{sys.version_info.minor}"
@@ -305,12 +309,8 @@ def get_graph_editor_selected_keyframes():
 
 def setTangent(tangent_type):
     
-    selectedKeyframes = get_graph_editor_selected_keyframes()
-
-    if selectedKeyframes:
-        for curve, frame in selectedKeyframes:
-            cmds.keyTangent(curve, time=(frame,), itt=tangent_type, ott=tangent_type)
-    else:
+    # Con keys seleccionadas en el graph editor, un keyTangent por curva
+    if not curveTools.set_tangent_type(tangent_type):
         # Si no hay curvas seleccionadas, ejecutar el comando MEL
         mel_command = 'timeSliderSetTangent {}'.format(tangent_type)
         mel.eval(mel_command)
@@ -333,50 +333,38 @@ def align_selected_objects(*args, pos=True, rot=True, scl=False):
     # Obtener el tiempo actual
     current_time = cmds.currentTime(query=True)
 
-    # Suspender la actualización de la vista
-    cmds.refresh(suspend=True)
-
-    try:
-        # Obtener el rango de tiempo seleccionado
-        time_range = keyTools.get_time_range_selected()
+    # Obtener el rango de tiempo seleccionado
+    time_range = keyTools.get_time_range_selected()
 
-        # Crear una barra de progreso
-        gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-        cmds.progressBar(gMainProgressBar, edit=True, beginProgress=True, isInterruptable=True, status='Alineando objetos...', maxValue=100)
+    # Si hay un rango de tiempo seleccionado y no es igual al tiempo actual
+    if time_range and time_range[0] != current_time:
+        start_frame, end_frame = time_range[0], time_range[1]
 
-        try:
-            # Si hay un rango de tiempo seleccionado y no es igual al tiempo actual
-            if time_range and time_range[0] != current_time:
-                start_frame, end_frame = time_range[0], time_range[1]
+        # Calcular el número total de frames en el rango
+        total_frames = int(end_frame - start_frame + 1)
 
-                # Calcular el número total de frames en el rango
-                total_frames = int(end_frame - start_frame + 1)
+        # Un frame por paso; el job reparte los frames en la cola idle y deshace todo si se cancela
+        def steps():
+            for frame in range(int(start_frame), int(end_frame) + 1):
+                # Mover el tiempo actual al frame
+                cmds.currentTime(frame)
 
-                # Iterar sobre cada frame en el rango y alinear los objetos
-                for frame in range(int(start_frame), int(end_frame) + 1):
-                    # Mover el tiempo actual al frame
-                    cmds.currentTime(frame)
+                # Alinear los objetos fuente con el objeto destino en este frame
+                for source_obj in source_objs:
+                    cmds.matchTransform(source_obj, target_obj, pos=pos, rot=rot, scl=scl)
 
-                    # Alinear los objetos fuente con el objeto destino en este frame
-                    for source_obj in source_objs:
-                        cmds.matchTransform(source_obj, target_obj, pos=pos, rot=rot, scl=scl)
+                    # Definir un keyframe para el objeto fuente en este punto en el tiempo
+                    cmds.setKeyframe(source_obj)
 
-                        # Definir un keyframe para el objeto fuente en este punto en el tiempo
-                        cmds.setKeyframe(source_obj)
+                if (yield 1):
+                    return
 
-                    # Actualizar la barra de progreso
-                    cmds.progressBar(gMainProgressBar, edit=True, progress=int((frame - start_frame) / total_frames * 100))
+        jobRunner.Job("Align objects", steps(), total_frames, status='Alineando objetos...').start()
 
-            else:
-                # Si no hay un rango de tiempo seleccionado o es igual al tiempo actual, alinear en el tiempo actual
-                for source_obj in source_objs:
-                    cmds.matchTransform(source_obj, target_obj, pos=pos, rot=rot, scl=scl)
-        finally:
-            # Terminar la barra de progreso
-            cmds.progressBar(gMainProgressBar, edit=True, endProgress=True)
-    finally:
-        # Reanudar la actualización de la vista
-        cmds.refresh(suspend=False)
+    else:
+        # Si no hay un rango de tiempo seleccionado o es igual al tiempo actual, alinear en el tiempo actual
+        for source_obj in source_objs:
+            cmds.matchTransform(source_obj, target_obj, pos=pos, rot=rot, scl=scl)
 
 
 
@@ -884,60 +872,7 @@ def copy_worldspace_animation(*args):
         cmds.warning("Selected objects do not have any animation.")
         return
 
-    animation_data = {}
-
-    # Guardar el tiempo actual antes de realizar cambios
-    original_time = cmds.currentTime(query=True)
-
-    # Suspender la actualización de la vista
-    cmds.refresh(suspend=True)
-
-    # Crear una barra de progreso
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-    total_frames = len(set(cmds.keyframe(selected_objects, query=True)))
-    cmds.progressBar(gMainProgressBar, edit=True, beginProgress=True, isInterruptable=True, status='Copying worldspace animation...', maxValue=total_frames)
-
-    try:
-        all_keyframes = sorted(list(set(cmds.keyframe(selected_objects, query=True))))
-        for frame in all_keyframes:
-            # Verificar si el proceso fue interrumpido por el usuario
-            if cmds.progressBar(gMainProgressBar, query=True, isCancelled=True):
-                break
-
-            cmds.currentTime(frame)
-
-            for source_obj in selected_objects:
-                # Asegurarse de que el objeto tiene claves en este frame
-                if cmds.keyframe(source_obj, query=True, time=(frame, frame)):
-                    worldspace_values = cmds.xform(source_obj, query=True, translation=True, worldSpace=True) + \
-                                        cmds.xform(source_obj, query=True, rotation=True, worldSpace=True)
-                    if source_obj not in animation_data:
-                        animation_data[source_obj] = {}
-
-                    animation_data[source_obj][int(frame)] = worldspace_values
-
-            # Actualizar la barra de progreso
-            cmds.progressBar(gMainProgressBar, edit=True, step=1)
-
-        # Save to JSON
-
-
-        worldspace_anim_data_file = general.get_copy_worldspace_data_file()
-        worldspace_anim_data_folder = general.get_copy_worldspace_data_folder()
-
-        if not os.path.exists(worldspace_anim_data_folder):
-            os.makedirs(worldspace_anim_data_folder)
-
-        with open(worldspace_anim_data_file, 'w') as json_file:
-            json.dump(animation_data, json_file)
-
-    finally:
-        # Restaurar la actualización de la vista y cerrar la barra de progreso
-        cmds.refresh(suspend=False)
-        cmds.progressBar(gMainProgressBar, edit=True, endProgress=True)
-        # Restaurar el tiempo actual a su estado original
-        cmds.currentTime(original_time)
-        cmds.warning("Worldspace animation copied")
+    save_worldspace_animation(selected_objects)
 
 
 
@@ -957,64 +892,36 @@ def copy_range_worldspace_animation(*args):
         return
 
     time_range = keyTools.get_selected_time_range()
-    print(time_range)
     if time_range is None:
         cmds.warning("No time range selected on the timeslider.")
         return
 
-    animation_data = {}
-
-    # Guardar el tiempo actual antes de realizar cambios
-    original_time = cmds.currentTime(query=True)
-
-    # Suspender la actualización de la vista
-    cmds.refresh(suspend=True)
-
-    # Crear una barra de progreso
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-    all_keyframes = sorted(list(set(cmds.keyframe(selected_objects, query=True, time=(time_range[0], time_range[1])))))
-    total_frames = len(all_keyframes)
-    cmds.progressBar(gMainProgressBar, edit=True, beginProgress=True, isInterruptable=True, status='Copying worldspace animation...', maxValue=total_frames)
-
     try:
-        for frame in all_keyframes:
-            # Verificar si el proceso fue interrumpido por el usuario
-            if cmds.progressBar(gMainProgressBar, query=True, isCancelled=True):
-                break
-
-            cmds.currentTime(frame)
-
-            for source_obj in selected_objects:
-                # Asegurarse de que el objeto tiene claves en este frame
-                if cmds.keyframe(source_obj, query=True, time=(frame, frame)):
-                    worldspace_values = cmds.xform(source_obj, query=True, translation=True, worldSpace=True) + \
-                                        cmds.xform(source_obj, query=True, rotation=True, worldSpace=True)
-                    if source_obj not in animation_data:
-                        animation_data[source_obj] = {}
+        save_worldspace_animation(selected_objects, time_range)
+    finally:
+        keyTools.clear_timeslider_selection()
 
-                    animation_data[source_obj][int(frame)] = worldspace_values
 
-            # Actualizar la barra de progreso
-            cmds.progressBar(gMainProgressBar, edit=True, step=1)
 
-        # Save to JSON
-        worldspace_anim_data_file = general.get_copy_worldspace_data_file()
-        worldspace_anim_data_folder = general.get_copy_worldspace_data_folder()
+def save_worldspace_animation(selected_objects, time_range=None):
+    # Las worldMatrix se leen en cada frame sin mover el tiempo (worldspaceMod), en trozos en la cola idle de Maya
+    # (jobRunnerMod) con la barra de progreso viva. Los objetos sin cambios desde la ultima copia salen de la cache
+    if time_range is None:
+        all_keyframes = set(cmds.keyframe(selected_objects, query=True) or [])
+    else:
+        all_keyframes = set(cmds.keyframe(selected_objects, query=True, time=(time_range[0], time_range[1])) or [])
 
-        if not os.path.exists(worldspace_anim_data_folder):
-            os.makedirs(worldspace_anim_data_folder)
+    worldspace.sample_cache.configure(general.config["WORLDSPACE_CACHE_SIZE"], general.config["WORLDSPACE_CACHE_AGE"])
+    steps = worldspace.copy_worldspace_steps(selected_objects, time_range, cache=worldspace.sample_cache)
 
-        with open(worldspace_anim_data_file, 'w') as json_file:
-            json.dump(animation_data, json_file)
+    def finish(job):
+        # Si se cancela se guarda lo copiado hasta ese frame
+        if job.state in ("done", "cancelled"):
+            clipStore.save_data(general.get_copy_worldspace_data_file(), "worldspace", job.result)
+            cmds.warning("Worldspace animation copied")
 
-    finally:
-        # Restaurar la actualización de la vista y cerrar la barra de progreso
-        cmds.refresh(suspend=False)
-        cmds.progressBar(gMainProgressBar, edit=True, endProgress=True)
-        # Restaurar el tiempo actual a su estado original
-        keyTools.clear_timeslider_selection()
-        cmds.currentTime(original_time)
-        cmds.warning("Worldspace animation copied")
+    jobRunner.Job("Copy worldspace animation", steps, len(all_keyframes), on_finish=finish, undo=False,
+                  status='Copying worldspace animation...').start()
 
 
 
@@ -1079,59 +986,39 @@ def paste_worldspace_single_frame(*args):
 
 
 def paste_worldspace_animation(*args):
-    original_time = cmds.currentTime(query=True)
 
     # Rutas
     worldspace_anim_data_file = general.get_copy_worldspace_data_file()
 
-    if not os.path.exists(worldspace_anim_data_file):
+    if not clipStore.data_exists(worldspace_anim_data_file):
         print("No worldspace animation data found.")
         return
 
-    with open(worldspace_anim_data_file, 'r') as json_file:
-        animation_data = json.load(json_file)
-
-    # Filtrar solo objetos existentes en la escena
-    existing_objects = {obj: data for obj, data in animation_data.items() if cmds.objExists(obj)}
+    # Filtrar solo objetos existentes en la escena; del contenedor solo se leen esos
+    with clipStore.open_data(worldspace_anim_data_file, "worldspace") as animation_data:
+        existing_objects = {obj: animation_data[obj] for obj in animation_data if cmds.objExists(obj)}
 
     if not existing_objects:
         cmds.warning("No valid objects found in the scene. Animation paste aborted.")
         return
 
-    # Eliminar animación previa de los objetos existentes
-    for obj in existing_objects.keys():
-        cmds.cutKey(obj, attribute=['tx', 'ty', 'tz', 'rx', 'ry', 'rz'])
-
-    # Obtener todos los frames únicos donde hay animación
-    all_frames = sorted(set(frame for obj_data in existing_objects.values() for frame in obj_data.keys()), key=int)
+    # Un paso por frame en cada nivel de la jerarquia (los hijos se resuelven despues que sus padres)
+    total_steps = worldspace.paste_step_count(existing_objects)
 
-    # Suspender la actualización de la vista
-    cmds.refresh(suspend=True)
+    # Las keys locales se resuelven fuera de linea y cada canal se escribe de una vez (worldspaceMod). El job
+    # deja todo, filtro euler incluido, en un solo chunk de undo y lo deshace si se cancela
+    def steps():
+        summary = yield from worldspace.paste_worldspace_steps(existing_objects)
+        if not summary["cancelled"]:
+            curveTools.euler_filter(nodes=list(existing_objects.keys()))  # Filtrar solo los objetos válidos
+        return summary
 
-    # Crear barra de progreso
-    gMainProgressBar = mel.eval('$tmp = $gMainProgressBar')
-    cmds.progressBar(gMainProgressBar, edit=True, beginProgress=True, isInterruptable=True, status='Pasting worldspace animation...', maxValue=len(all_frames))
+    def finish(job):
+        if job.state == "done":
+            cmds.warning("Worldspace animation restored successfully")
 
-    try:
-        for frame in all_frames:
-            cmds.progressBar(gMainProgressBar, edit=True, step=1)
-            if cmds.progressBar(gMainProgressBar, query=True, isCancelled=True):
-                break
-
-            cmds.currentTime(frame)
-            for obj, obj_data in existing_objects.items():
-                if frame in obj_data:
-                    values = obj_data[frame]
-                    cmds.xform(obj, translation=values[:3], worldSpace=True)
-                    cmds.xform(obj, rotation=values[3:], worldSpace=True)
-                    cmds.setKeyframe(obj)
-
-    finally:
-        cmds.filterCurve(list(existing_objects.keys()))  # Filtrar solo los objetos válidos
-        cmds.refresh(suspend=False)
-        cmds.progressBar(gMainProgressBar, edit=True, endProgress=True)
-        cmds.currentTime(original_time)
-        cmds.warning("Worldspace animation restored successfully")
+    jobRunner.Job("Paste worldspace animation", steps(), total_steps, on_finish=finish,
+                  status='Pasting worldspace animation...').start()
 
 
 
@@ -1877,37 +1764,49 @@ def convert_rotation_order(rot_order='zxy'):
         else:
             unkeyed_data_objs.append(obj)
 
-    with UndoSetup():
-        if keyed_data_objs:
-
-            key_data = list(set(key_data))
-            key_data.sort()
+    key_data = list(set(key_data))
+    key_data.sort()
+    reset_auto_key = cmds.autoKeyframe(query=True, state=True)
 
-            with StopRefresh():
-                for frame in key_data:
-                    cmds.currentTime(frame, edit=True)
-                    for obj in keyed_data_objs:
-                        if frame in key_times[obj]:
-                            cmds.setKeyframe(obj, attribute='rotate')
-
-                for frame in key_data:
-                    cmds.currentTime(frame, edit=True)
-                    for obj in keyed_data_objs:
-                        if frame in key_times[obj]:
+    # Un frame por paso en cada pasada; el job lo deja todo en un chunk de undo y lo deshace si se cancela
+    def steps():
+        cmds.autoKeyframe(state=False)
 
-                            cmds.xform(obj, preserve=True, rotateOrder=rot_order)
-                            cmds.setKeyframe(obj, attribute='rotate')
-                            cmds.xform(obj, preserve=False, rotateOrder=prevrot_order[obj])
+        for frame in key_data:
+            cmds.currentTime(frame, edit=True)
+            for obj in keyed_data_objs:
+                if frame in key_times[obj]:
+                    cmds.setKeyframe(obj, attribute='rotate')
+            if (yield 1):
+                return
+
+        for frame in key_data:
+            cmds.currentTime(frame, edit=True)
+            for obj in keyed_data_objs:
+                if frame in key_times[obj]:
+
+                    cmds.xform(obj, preserve=True, rotateOrder=rot_order)
+                    cmds.setKeyframe(obj, attribute='rotate')
+                    cmds.xform(obj, preserve=False, rotateOrder=prevrot_order[obj])
+            if (yield 1):
+                return
+
+        cmds.currentTime(time, edit=True)
+
+        for each in keyed_data_objs:
+            cmds.xform(each, preserve=False, rotateOrder=rot_order)
+        if keyed_data_objs:
+            curveTools.euler_filter(nodes=keyed_data_objs)
 
-                cmds.currentTime(time, edit=True)
+        for obj in unkeyed_data_objs:
+            cmds.xform(obj, preserve=True, rotateOrder=rot_order)
 
-                for each in keyed_data_objs:
-                    cmds.xform(each, preserve=False, rotateOrder=rot_order)
-                    cmds.filterCurve(each)
+    def finish(job):
+        cmds.autoKeyframe(state=reset_auto_key)
+        cmds.currentTime(time, edit=True)
 
-        if unkeyed_data_objs:
-            for obj in unkeyed_data_objs:
-                cmds.xform(obj, preserve=True, rotateOrder=rot_order)
+    jobRunner.Job("Convert rotation order", steps(), len(key_data) * 2, on_finish=finish,
+                  status='Converting rotation order...').start()
 
 def gimbal_fixer_build():
 
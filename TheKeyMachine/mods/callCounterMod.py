@@ -0,0 +1,296 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import sys
+import time
+from collections import Counter, OrderedDict
+from functools import wraps
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                 Maya call counter (opt-in)                                                  #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# La mayor parte del tiempo de las herramientas se va en el numero de llamadas a cmds, no en Python. enable()
+# sustituye en los modulos de TheKeyMachine las referencias a maya.cmds, maya.mel y OpenMaya (API 1.0 y 2.0) por
+# proxies que cuentan llamadas y tiempo por comando, y envuelve sus funciones para que cada invocacion de primer
+# nivel (la que dispara la UI) tenga su propio registro. disable() lo deja todo como estaba.
+#
+#   import TheKeyMachine.mods.callCounterMod as callCounter
+#   callCounter.enable()
+#   ... usar las herramientas ...
+#   callCounter.print_report()
+#   callCounter.disable()
+
+
+# Cada modulo que llama a Maya o que respalda una herramienta tiene que estar aqui; si no, sus llamadas no se cuentan
+DEFAULT_MODULES = [
+    "TheKeyMachine.mods.keyToolsMod",
+    "TheKeyMachine.mods.barMod",
+    "TheKeyMachine.core.customGraph",
+    "TheKeyMachine.core.toolbar",
+    "TheKeyMachine.mods.sliderMod",
+    "TheKeyMachine.mods.plugWriterMod",
+    "TheKeyMachine.mods.keyIndexMod",
+    "TheKeyMachine.mods.tickSchedulerMod",
+    "TheKeyMachine.mods.sceneBackendMod",
+    "TheKeyMachine.mods.defaultsStoreMod",
+    "TheKeyMachine.mods.curveToolsMod",
+    "TheKeyMachine.mods.tangentEngineMod",
+    "TheKeyMachine.mods.keySnapMod",
+    "TheKeyMachine.mods.keyTimesMod",
+    "TheKeyMachine.mods.clipStoreMod",
+    "TheKeyMachine.mods.worldspaceMod",
+    "TheKeyMachine.mods.jobRunnerMod",
+]
+
+# Prefijo con el que se reporta cada modulo de Maya
+MAYA_MODULES = OrderedDict([
+    ("maya.cmds", "cmds"),
+    ("maya.mel", "mel"),
+    ("maya.OpenMaya", "om1"),
+    ("maya.api.OpenMaya", "om2"),
+])
+
+# Tipos de valor de OpenMaya: se construyen en Python sin ir al DG, no se cuentan
+VALUE_CLASSES = ("MAngle", "MDistance", "MTime", "MVector", "MPoint", "MMatrix", "MTransformationMatrix",
+                 "MQuaternion", "MEulerRotation", "MDoubleArray", "MTimeArray", "MIntArray", "MPointArray",
+                 "MVectorArray")
+
+
+class ToolStats(object):
+    # Llamadas y tiempo por comando de una herramienta, acumulado sobre todas sus invocaciones
+    def __init__(self, name):
+        self.name = name
+        self.invocations = 0
+        self.total_time = 0.0
+        self.calls = Counter()
+        self.times = Counter()
+        self.last_calls = Counter()
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def calls_per_invocation(self):
+        return self.total_calls / float(self.invocations or 1)
+
+
+class CallCounter(object):
+    def __init__(self):
+        self.tools = OrderedDict()
+        self.active = None          # ToolStats de la invocacion de primer nivel en curso
+        self.current = None         # Counter de la invocacion en curso
+        self.untracked = ToolStats("<untracked>")
+
+    def reset(self):
+        self.tools = OrderedDict()
+        self.untracked = ToolStats("<untracked>")
+
+    def stats(self, name):
+        stats = self.tools.get(name)
+        if stats is None:
+            stats = self.tools[name] = ToolStats(name)
+        return stats
+
+    def record(self, command, elapsed):
+        stats = self.active or self.untracked
+        stats.calls[command] += 1
+        stats.times[command] += elapsed
+        if self.current is not None:
+            self.current[command] += 1
+
+    def begin(self, name):
+        # Devuelve False si ya hay una herramienta en curso (la llamada anidada cuenta para la de fuera)
+        if self.active is not None:
+            return False
+        self.active = self.stats(name)
+        self.current = Counter()
+        return True
+
+    def end(self, elapsed):
+        stats = self.active
+        stats.invocations += 1
+        stats.total_time += elapsed
+        stats.last_calls = self.current
+        self.active = None
+        self.current = None
+        return stats
+
+    def measure(self, name):
+        return Measure(self, name)
+
+
+class Measure(object):
+    # with counter.measure("tween"): ... -> una invocacion de primer nivel
+    def __init__(self, counter, name):
+        self.counter = counter
+        self.name = name
+        self.outer = False
+        self.started = 0.0
+        self.stats = None
+
+    def __enter__(self):
+        self.outer = self.counter.begin(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.outer:
+            self.stats = self.counter.end(time.perf_counter() - self.started)
+        return False
+
+
+class MayaProxy(object):
+    # Sustituye a un modulo de Maya; cada funcion o clase que se pide se devuelve envuelta
+    def __init__(self, target, prefix, counter):
+        self._target = target
+        self._prefix = prefix
+        self._counter = counter
+        self._wrappers = {}
+
+    def __getattr__(self, name):
+        wrapper = self._wrappers.get(name)
+        if wrapper is not None:
+            return wrapper
+
+        value = getattr(self._target, name)
+        if not callable(value):
+            return value
+
+        command = "{}.{}".format(self._prefix, name)
+        if isinstance(value, type):
+            wrapper = value if name in VALUE_CLASSES else ClassProxy(value, command, self._counter)
+        else:
+            wrapper = counted(value, command, self._counter)
+
+        self._wrappers[name] = wrapper
+        return wrapper
+
+
+class ClassProxy(object):
+    # Clases de OpenMaya: se cuentan las construcciones y los metodos estaticos (MGlobal...).
+    # isinstance(x, om.MPlug) sigue funcionando a traves de __instancecheck__.
+    def __init__(self, cls, command, counter):
+        self._cls = cls
+        self._command = command
+        self._counter = counter
+        self._wrappers = {}
+
+    def __call__(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return self._cls(*args, **kwargs)
+        finally:
+            self._counter.record(self._command, time.perf_counter() - started)
+
+    def __getattr__(self, name):
+        wrapper = self._wrappers.get(name)
+        if wrapper is not None:
+            return wrapper
+
+        value = getattr(self._cls, name)
+        if callable(value) and not isinstance(value, type):
+            value = counted(value, "{}.{}".format(self._command, name), self._counter)
+        self._wrappers[name] = value
+        return value
+
+    def __instancecheck__(self, instance):
+        return isinstance(instance, self._cls)
+
+
+def counted(func, command, counter):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counter.record(command, time.perf_counter() - started)
+    return wrapper
+
+
+# ____ Instalacion ____
+
+counter = CallCounter()
+_patched = []       # (modulo, nombre, valor original)
+
+
+def track(name, func):
+    @wraps(func)
+    def tracked(*args, **kwargs):
+        with counter.measure(name):
+            return func(*args, **kwargs)
+    tracked._tkm_tracked = func
+    return tracked
+
+
+def enable(module_names=None, track_functions=True):
+    if _patched:
+        return counter
+
+    proxies = {}
+    for maya_name, prefix in MAYA_MODULES.items():
+        maya_module = sys.modules.get(maya_name)
+        if maya_module is not None:
+            proxies[id(maya_module)] = MayaProxy(maya_module, prefix, counter)
+
+    for module_name in module_names or DEFAULT_MODULES:
+        module = sys.modules.get(module_name)
+        if module is None:
+            continue
+        short_module = module_name.rsplit(".", 1)[-1]
+
+        for name, value in list(vars(module).items()):
+            proxy = proxies.get(id(value))
+            if proxy is not None:
+                _patched.append((module, name, value))
+                setattr(module, name, proxy)
+            elif track_functions and callable(value) and getattr(value, "__module__", None) == module_name \
+                    and not isinstance(value, type) and not name.startswith("_"):
+                _patched.append((module, name, value))
+                setattr(module, name, track("{}.{}".format(short_module, name), value))
+
+    return counter
+
+
+def disable():
+    while _patched:
+        module, name, value = _patched.pop()
+        setattr(module, name, value)
+
+
+def is_enabled():
+    return bool(_patched)
+
+
+def report(top=8):
+    lines = []
+    for stats in sorted(counter.tools.values(), key=lambda s: s.total_calls, reverse=True):
+        commands = ", ".join("{} {}".format(command, number) for command, number in stats.calls.most_common(top))
+        lines.append("{}: {} invocations, {:.0f} calls/invocation, {:.1f} ms total ({})".format(
+            stats.name, stats.invocations, stats.calls_per_invocation(), stats.total_time * 1000.0, commands))
+    if counter.untracked.total_calls:
+        lines.append("<untracked>: {} calls".format(counter.untracked.total_calls))
+    return "\n".join(lines)
+
+
+def print_report(top=8):
+    print(report(top))
@@ -0,0 +1,296 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import contextlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+# NumPy viene con Maya 2023+. Con NumPy los canales se leen como vistas del mmap, sin copiar; sin NumPy se copia
+# solo el canal pedido
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                     Clip store                                                              #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Contenedor binario para lo que copian copy animation, copy pose y copy worldspace. Cada archivo .tkmc tiene:
+#
+#   cabecera fija   MAGIC, version, reservado, tamaño del indice, inicio de los datos   (struct "<4sHHII")
+#   indice          JSON compacto: {"kind", "meta", "index": {objeto: {canal: [offset, filas, columnas]}}}
+#   datos           float64 little-endian; cada canal es un bloque de columnas seguidas (offset en floats)
+#
+# Se abre con mmap y el indice permite leer solo los objetos y canales que se necesitan. Los datos se entregan en
+# el mismo formato que tenian los JSON de antes (ClipView), asi que las herramientas no cambian su forma de usarlos.
+# Los JSON antiguos se siguen leyendo y export_json escribe ese formato para intercambio (menus Export ... as JSON).
+
+
+MAGIC = b"TKMC"
+VERSION = 1
+EXTENSION = ".tkmc"
+HEADER = struct.Struct("<4sHHII")
+ALIGN = 8
+
+KINDS = ("animation", "worldspace", "pose")
+
+# Columnas del canal "world" de worldspace: frame y los seis valores de mundo
+WORLD_CHANNEL = "world"
+
+
+def clip_path(json_path):
+    # Cada herramienta mantiene su ruta .json; el contenedor va al lado
+    return os.path.splitext(json_path)[0] + EXTENSION
+
+
+def check_kind(kind):
+    if kind not in KINDS:
+        raise ValueError("Unknown clip kind: {}".format(kind))
+
+
+# ____ Conversion desde / hacia el formato de los JSON ____
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def encode(kind, data):
+    # Formato JSON -> ({objeto: {canal: [columnas]}}, meta). Lo que no es numerico (strings de una pose...) va en meta
+    check_kind(kind)
+    channels, literals = {}, {}
+    for obj, obj_data in data.items():
+        obj_channels = channels.setdefault(obj, {})
+        if kind == "animation":
+            for channel, keys in obj_data.items():
+                obj_channels[channel] = [keys.get("keyframes") or [], keys.get("values") or []]
+        elif kind == "worldspace":
+            frames = sorted(obj_data, key=float)
+            rows = [obj_data[frame] for frame in frames]
+            obj_channels[WORLD_CHANNEL] = [[float(frame) for frame in frames]] + [list(column) for column in zip(*rows)]
+        else:
+            for attr, value in obj_data.items():
+                if is_number(value):
+                    obj_channels[attr] = [[value]]
+                else:
+                    literals.setdefault(obj, {})[attr] = value
+    return channels, {"literals": literals} if literals else {}
+
+
+def decode(kind, clip, obj):
+    # Un objeto del contenedor -> su entrada en el formato JSON
+    if kind == "animation":
+        result = {}
+        for channel in clip.channels(obj):
+            keyframes, values = clip.columns(obj, channel)
+            result[channel] = {"keyframes": as_list(keyframes), "values": as_list(values)}
+        return result
+    if kind == "worldspace":
+        columns = clip.columns(obj, WORLD_CHANNEL)
+        rows = zip(*[as_list(column) for column in columns[1:]])
+        return {int(frame): list(row) for frame, row in zip(as_list(columns[0]), rows)}
+
+    result = {channel: as_list(clip.columns(obj, channel)[0])[0] for channel in clip.channels(obj)}
+    result.update(clip.meta.get("literals", {}).get(obj, {}))
+    return result
+
+
+def as_list(column):
+    return column.tolist()
+
+
+# ____ Escritura ____
+
+def write_clip(path, kind, channels, meta=None):
+    # channels: {objeto: {canal: [columnas del mismo largo]}}. Escritura atomica (archivo temporal + os.replace)
+    check_kind(kind)
+    payload = array("d")
+    index = {}
+    for obj, obj_channels in channels.items():
+        obj_index = index.setdefault(obj, {})
+        for channel, columns in obj_channels.items():
+            rows = len(columns[0]) if columns else 0
+            if any(len(column) != rows for column in columns):
+                raise ValueError("Columns of {}.{} have different lengths".format(obj, channel))
+            obj_index[channel] = [len(payload), rows, len(columns)]
+            for column in columns:
+                payload.extend(float(value) for value in column)
+
+    header = json.dumps({"kind": kind, "meta": meta or {}, "index": index}, separators=(",", ":")).encode("utf-8")
+    data_offset = -(-(HEADER.size + len(header)) // ALIGN) * ALIGN
+    if sys.byteorder != "little":
+        payload.byteswap()
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, len(header), data_offset))
+        file.write(header)
+        file.write(b"\0" * (data_offset - HEADER.size - len(header)))
+        payload.tofile(file)
+    os.replace(temp_path, path)
+    return path
+
+
+def save_data(json_path, kind, data):
+    # Guarda datos en formato JSON de una herramienta como contenedor binario junto a su ruta .json
+    channels, meta = encode(kind, data)
+    return write_clip(clip_path(json_path), kind, channels, meta)
+
+
+# ____ Lectura ____
+
+class ClipFile(object):
+    # Contenedor abierto con mmap. Usar como context manager: en Windows un archivo mapeado no se puede sustituir
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self.file.close()
+            raise ValueError("Not a clip file: {}".format(path))
+
+        magic, version, _, header_size, self.data_offset = HEADER.unpack_from(self.buffer, 0) \
+            if len(self.buffer) >= HEADER.size else (None, 0, 0, 0, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("Not a clip file: {}".format(path))
+        if version > VERSION:
+            self.close()
+            raise ValueError("Clip file version {} is newer than this version of TheKeyMachine".format(version))
+
+        header = json.loads(self.buffer[HEADER.size:HEADER.size + header_size].decode("utf-8"))
+        self.kind = header["kind"]
+        self.meta = header.get("meta", {})
+        self.index = header["index"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        # Si alguien guarda una columna de columns() (vista de NumPy) el mmap no se puede cerrar: se suelta y se
+        # cierra solo cuando desaparece la ultima vista
+        if self.buffer is not None:
+            try:
+                self.buffer.close()
+            except BufferError:
+                pass
+            self.buffer = None
+        self.file.close()
+
+    def objects(self):
+        return list(self.index)
+
+    def channels(self, obj):
+        return list(self.index.get(obj, {}))
+
+    def columns(self, obj, channel):
+        # Columnas de un canal: vistas de NumPy sobre el mmap de solo lectura o arrays. decode() y ClipView las
+        # convierten en listas, asi que fuera de este modulo solo se ven copias
+        offset, rows, count = self.index[obj][channel]
+        start = self.data_offset + offset * 8
+        if np is not None:
+            block = np.frombuffer(self.buffer, dtype="<f8", count=rows * count, offset=start)
+            return list(block.reshape(count, rows)) if count else []
+        values = array("d", self.buffer[start:start + rows * count * 8])
+        if sys.byteorder != "little":
+            values.byteswap()
+        return [values[column * rows:(column + 1) * rows] for column in range(count)]
+
+
+class ClipView(object):
+    # Vista de solo lectura con la forma del JSON antiguo: cada objeto se decodifica al pedirlo
+    def __init__(self, clip):
+        self.clip = clip
+
+    def __contains__(self, obj):
+        return obj in self.clip.index
+
+    def __getitem__(self, obj):
+        if obj not in self.clip.index:
+            raise KeyError(obj)
+        return decode(self.clip.kind, self.clip, obj)
+
+    def __iter__(self):
+        return iter(self.clip.index)
+
+    def __len__(self):
+        return len(self.clip.index)
+
+    def get(self, obj, default=None):
+        return self[obj] if obj in self else default
+
+    def keys(self):
+        return self.clip.objects()
+
+    def items(self):
+        return [(obj, self[obj]) for obj in self.clip.index]
+
+    def values(self):
+        return [self[obj] for obj in self.clip.index]
+
+
+def open_clip(path):
+    return ClipFile(path)
+
+
+def data_exists(json_path):
+    return os.path.exists(clip_path(json_path)) or os.path.exists(json_path)
+
+
+@contextlib.contextmanager
+def open_data(json_path, kind):
+    # Datos de una herramienta en formato JSON: del contenedor binario o, si es mas reciente o el unico que hay,
+    # del JSON (copias antiguas o importadas). None si no hay ninguno
+    check_kind(kind)
+    path = clip_path(json_path)
+    if os.path.exists(path) and (not os.path.exists(json_path) or
+                                 os.path.getmtime(path) >= os.path.getmtime(json_path)):
+        with open_clip(path) as clip:
+            if clip.kind != kind:
+                raise ValueError("{} holds {} data, not {}".format(path, clip.kind, kind))
+            yield ClipView(clip)
+    elif os.path.exists(json_path):
+        with open(json_path, "r") as json_file:
+            yield json.load(json_file)
+    else:
+        yield None
+
+
+def export_json(json_path, kind, target, indent=4):
+    # Escribe los datos en el formato JSON de siempre (para intercambio). target no debe ser json_path: un JSON
+    # mas reciente que el contenedor es el que se leeria al pegar
+    with open_data(json_path, kind) as data:
+        if data is None:
+            return None
+        plain = {obj: data[obj] for obj in data}
+    with open(target, "w") as json_file:
+        json.dump(plain, json_file, indent=indent)
+    return target
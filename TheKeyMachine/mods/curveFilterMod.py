@@ -0,0 +1,389 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+import random
+from array import array
+
+# NumPy viene con Maya 2023+. En versiones sin NumPy se usan los mismos kernels sobre array('d')
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                   Curve filter kernels                                                      #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Los modos del slider de curvas del graph editor (Smooth, Wave, Noise, Scale...) como funciones puras sobre las
+# columnas de una curva: tiempos, valores originales (los del inicio del drag) y la mascara de keys seleccionadas.
+# Cada kernel devuelve la columna de valores completa; las keys no seleccionadas salen con su valor original.
+# Como siempre se parte de los originales, el resultado solo depende del valor del slider y no de los ticks
+# anteriores. Este modulo no depende de Maya.
+
+
+def _column(values):
+    if np is not None:
+        return np.array(values, dtype=np.float64)
+    return array("d", values)
+
+
+def _indices(mask):
+    if np is not None:
+        return np.flatnonzero(np.asarray(mask, dtype=bool))
+    return [index for index, flag in enumerate(mask) if flag]
+
+
+def _mean(values, indices):
+    if not len(indices):
+        return 0.0
+    if np is not None:
+        return float(np.asarray(values)[indices].mean())
+    return sum(values[index] for index in indices) / len(indices)
+
+
+def _replace(values, indices, new_values):
+    # Copia de values con new_values en indices
+    result = _column(values)
+    if np is not None:
+        result[indices] = new_values
+        return result
+    for index, value in zip(indices, new_values):
+        result[index] = value
+    return result
+
+
+
+# Scale: escala los valores alrededor de la media. scale_from_point escala todas las keys de la curva
+# alrededor de la media de las seleccionadas (modo "Scale Sel")
+
+def scale(values, mask, factor):
+    indices = _indices(mask)
+    pivot = _mean(values, indices)
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        return _replace(values, indices, pivot + (values[indices] - pivot) * factor)
+    return _replace(values, indices, [pivot + (values[index] - pivot) * factor for index in indices])
+
+
+def scale_from_point(values, mask, factor):
+    indices = _indices(mask)
+    pivot = _mean(values, indices) if len(indices) else _mean(values, range(len(values)))
+    if np is not None:
+        return pivot + (np.asarray(values, dtype=np.float64) - pivot) * factor
+    return _column([pivot + (value - pivot) * factor for value in values])
+
+
+
+# Smooth: mueve cada key seleccionada hacia la media de sus vecinas ponderada por la distancia en tiempo.
+# Las vecinas son las keys anteriores y posteriores de la curva, esten seleccionadas o no; la primera y la
+# ultima key de la curva solo tienen una vecina. Cada pasada usa los valores de la anterior.
+
+def smooth(times, values, mask, strength, passes=1):
+    indices = _indices(mask)
+    count = len(values)
+    if count < 2 or not len(indices):
+        return _column(values)
+
+    if np is not None:
+        times = np.asarray(times, dtype=np.float64)
+        result = np.array(values, dtype=np.float64)
+        weight_prev = np.zeros(count)
+        weight_next = np.zeros(count)
+        weight_prev[1:] = 1.0 / np.maximum(times[1:] - times[:-1], 1e-9)
+        weight_next[:-1] = weight_prev[1:]
+        total = weight_prev + weight_next
+        for _ in range(passes):
+            previous = np.concatenate((result[:1], result[:-1]))
+            following = np.concatenate((result[1:], result[-1:]))
+            average = (previous * weight_prev + following * weight_next) / total
+            result[indices] += (average[indices] - result[indices]) * strength
+        return result
+
+    result = _column(values)
+    for _ in range(passes):
+        current = list(result)
+        for index in indices:
+            weight_prev = 1.0 / max(times[index] - times[index - 1], 1e-9) if index > 0 else 0.0
+            weight_next = 1.0 / max(times[index + 1] - times[index], 1e-9) if index < count - 1 else 0.0
+            previous = current[index - 1] if index > 0 else 0.0
+            following = current[index + 1] if index < count - 1 else 0.0
+            average = (previous * weight_prev + following * weight_next) / (weight_prev + weight_next)
+            result[index] = current[index] + (average - current[index]) * strength
+    return result
+
+
+
+# Gaussian: filtro paso bajo de fase cero para curvas densas (bakes, mocap). Convoluciona cada tramo continuo de
+# keys seleccionadas con un kernel gaussiano de width keys de sigma (las keys de un bake estan equiespaciadas).
+# Los tramos se amplian en los bordes por reflexion impar, asi que las rectas y las pendientes de los extremos se
+# conservan, y la primera y la ultima key de cada tramo no se mueven para no abrir saltos con las no
+# seleccionadas. El resultado se mezcla con el original segun strength.
+
+def selected_runs(mask):
+    # [(inicio, fin)] de cada tramo de keys seleccionadas consecutivas
+    if np is not None:
+        flags = np.concatenate(([False], np.asarray(mask, dtype=bool), [False])).astype(np.int8)
+        edges = np.flatnonzero(np.diff(flags))
+        return list(zip(edges[0::2].tolist(), (edges[1::2] - 1).tolist()))
+
+    runs = []
+    start = None
+    for index, flag in enumerate(mask):
+        if flag and start is None:
+            start = index
+        elif not flag and start is not None:
+            runs.append((start, index - 1))
+            start = None
+    if start is not None:
+        runs.append((start, len(mask) - 1))
+    return runs
+
+
+def gaussian_kernel(width, limit=None):
+    # Pesos normalizados de -radius a +radius, con radius = 3 sigma (recortado a limit)
+    radius = max(1, int(math.ceil(width * 3.0)))
+    if limit is not None:
+        radius = min(radius, limit)
+    weights = [math.exp(-0.5 * (offset / float(width)) ** 2) for offset in range(-radius, radius + 1)]
+    total = sum(weights)
+    return [weight / total for weight in weights]
+
+
+def gaussian_smooth(values, mask, width, strength=1.0):
+    result = _column(values)
+    if width <= 0:
+        return result
+
+    for start, end in selected_runs(mask):
+        count = end - start + 1
+        if count < 3:
+            continue
+        kernel = gaussian_kernel(width, limit=count - 1)
+        radius = len(kernel) // 2
+
+        if np is not None:
+            segment = np.asarray(values[start:end + 1], dtype=np.float64)
+            padded = np.concatenate((2.0 * segment[0] - segment[radius:0:-1], segment,
+                                     2.0 * segment[-1] - segment[-2:-radius - 2:-1]))
+            smoothed = np.convolve(padded, np.asarray(kernel), mode="valid")
+            smoothed[0], smoothed[-1] = segment[0], segment[-1]
+            result[start:end + 1] = segment + (smoothed - segment) * strength
+            continue
+
+        segment = list(values[start:end + 1])
+        padded = ([2.0 * segment[0] - segment[offset] for offset in range(radius, 0, -1)] + segment +
+                  [2.0 * segment[-1] - segment[-1 - offset] for offset in range(1, radius + 1)])
+        for offset in range(1, count - 1):
+            smoothed = sum(weight * padded[offset + k] for k, weight in enumerate(kernel))
+            result[start + offset] = segment[offset] + (smoothed - segment[offset]) * strength
+    return result
+
+
+
+# Noise: suma a cada key seleccionada un ruido fijo en [-1, 1] (generado al empezar el drag) por el slider
+
+def noise_seeds(count, rng=random):
+    return _column([rng.uniform(-1.0, 1.0) for _ in range(count)])
+
+
+def noise(values, mask, amount, seeds):
+    indices = _indices(mask)
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        return _replace(values, indices, values[indices] + np.asarray(seeds)[:len(indices)] * amount)
+    return _replace(values, indices, [values[index] + seed * amount for index, seed in zip(indices, seeds)])
+
+
+
+# Wave: alterna +amount / -amount entre keys seleccionadas consecutivas
+
+def wave(values, mask, amount):
+    indices = _indices(mask)
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        signs = np.where(np.arange(len(indices)) % 2 == 0, 1.0, -1.0)
+        return _replace(values, indices, values[indices] + signs * amount)
+    return _replace(values, indices, [values[index] + (amount if n % 2 == 0 else -amount)
+                                      for n, index in enumerate(indices)])
+
+
+
+# Lineal / Ease in/out: mezcla las keys seleccionadas con una linea (o una curva de ease) entre la primera y
+# la ultima key seleccionada, que no se mueven
+
+def _span(times, indices):
+    first, last = indices[0], indices[-1]
+    duration = times[last] - times[first]
+    return first, last, duration
+
+
+def linear(times, values, mask, blend):
+    return ease(times, values, mask, blend, None)
+
+
+def ease(times, values, mask, blend, ease_func, power=3.0):
+    indices = _indices(mask)
+    if len(indices) < 3:
+        return _column(values)
+    first, last, duration = _span(times, indices)
+    if duration <= 0:
+        return _column(values)
+    inner = indices[1:-1]
+    start, end = values[first], values[last]
+
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        position = (np.asarray(times, dtype=np.float64)[inner] - times[first]) / duration
+        if ease_func is not None:
+            position = ease_func(position, power)
+        target = start + (end - start) * position
+        return _replace(values, inner, values[inner] + (target - values[inner]) * blend)
+
+    new_values = []
+    for index in inner:
+        position = (times[index] - times[first]) / duration
+        if ease_func is not None:
+            position = ease_func(position, power)
+        target = start + (end - start) * position
+        new_values.append(values[index] + (target - values[index]) * blend)
+    return _replace(values, inner, new_values)
+
+
+def ease_in(position, power=3.0):
+    return position ** power
+
+
+def ease_out(position, power=3.0):
+    return 1.0 - (1.0 - position) ** power
+
+
+
+# Flat: mezcla las keys seleccionadas con su media
+
+def flat(values, mask, blend):
+    indices = _indices(mask)
+    average = _mean(values, indices)
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        return _replace(values, indices, values[indices] + (average - values[indices]) * blend)
+    return _replace(values, indices, [values[index] + (average - values[index]) * blend for index in indices])
+
+
+
+# Flip: refleja las keys de mask alrededor de un pivote: el punto medio entre su minimo y su maximo ("midrange"),
+# el valor de la primera key seleccionada ("selected"), el valor por defecto del atributo ("default") o cero.
+# Las tangentes de esas keys tambien se reflejan: sus angulos cambian de signo
+
+FLIP_PIVOTS = ("midrange", "selected", "default", "zero")
+
+
+def flip_pivot(values, mask, pivot="midrange", selected=None, default=0.0):
+    if pivot == "zero":
+        return 0.0
+    if pivot == "default":
+        return float(default)
+    indices = _indices(mask)
+    if pivot == "selected":
+        picked = _indices(selected) if selected is not None else indices
+        if len(picked):
+            return float(values[picked[0]])
+    if not len(indices):
+        return 0.0
+    if np is not None:
+        chosen = np.asarray(values, dtype=np.float64)[indices]
+        return float(chosen.min() + chosen.max()) / 2.0
+    chosen = [values[index] for index in indices]
+    return (min(chosen) + max(chosen)) / 2.0
+
+
+def flip(values, mask, pivot):
+    indices = _indices(mask)
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        return _replace(values, indices, 2.0 * pivot - values[indices])
+    return _replace(values, indices, [2.0 * pivot - values[index] for index in indices])
+
+
+def negate(angles, mask):
+    indices = _indices(mask)
+    if np is not None:
+        return _replace(angles, indices, -np.asarray(angles, dtype=np.float64)[indices])
+    return _replace(angles, indices, [-angles[index] for index in indices])
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                     Slider modes                                                            #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Cada modo del option menu de curvas traduce el valor del slider a los parametros de su kernel.
+# state es un dict por curva que vive lo que dura el drag (las semillas del ruido).
+
+# Smooth: el slider va de 0 a 0.5. Antes cada tick suavizaba otra vez el resultado anterior; ahora el valor
+# decide la fuerza y el numero de pasadas sobre los originales
+SMOOTH_PASSES = 10
+
+
+def smooth_mode(times, values, mask, value, state):
+    strength = min(max(value * 2.0, 0.0), 1.0)
+    return smooth(times, values, mask, strength, passes=1 + int(value * SMOOTH_PASSES))
+
+
+# Gaussian: el slider es el ancho del kernel (sigma en keys)
+GAUSSIAN_MAX_WIDTH = 10.0
+
+
+def gaussian_mode(times, values, mask, value, state):
+    return gaussian_smooth(values, mask, min(max(value, 0.0), GAUSSIAN_MAX_WIDTH))
+
+
+def noise_mode(times, values, mask, value, state):
+    if "seeds" not in state:
+        state["seeds"] = noise_seeds(len(_indices(mask)))
+    return noise(values, mask, value, state["seeds"])
+
+
+def ease_mode(times, values, mask, value, state):
+    # 0.5 es neutro; hacia 0 ease in, hacia 1 ease out
+    if value < 0.5:
+        blend = 1.0 - value * 2.0
+        return ease(times, values, mask, blend, ease_in, power=blend * 3.0 + 1.0)
+    blend = (value - 0.5) * 2.0
+    return ease(times, values, mask, blend, ease_out, power=blend * 3.0 + 1.0)
+
+
+MODES = {
+    "Smooth": smooth_mode,
+    "Gaussian": gaussian_mode,
+    "Wave": lambda times, values, mask, value, state: wave(values, mask, value),
+    "Scale": lambda times, values, mask, value, state: scale(values, mask, value),
+    "Scale Sel": lambda times, values, mask, value, state: scale_from_point(values, mask, value),
+    "Lineal": lambda times, values, mask, value, state: linear(times, values, mask, value),
+    "Flat": lambda times, values, mask, value, state: flat(values, mask, value),
+    "Ease in/out": ease_mode,
+    "Noise": noise_mode,
+}
+
+
+def apply_mode(mode, times, values, mask, value, state=None):
+    return MODES[mode](times, values, mask, value, {} if state is None else state)
@@ -0,0 +1,201 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+from array import array
+
+# NumPy viene con Maya 2023+. Sin NumPy las columnas son array('d') / array('b')
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                   Curve snapshots                                                           #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Foto en columnas de una curva de animacion: tiempos, valores, tipos de tangente, angulos, pesos y la mascara
+# de keys seleccionadas, cada uno en un array contiguo. El backend de escena la llena con una sola pasada por la
+# curva (MFnAnimCurve en el backend de OpenMaya, unas pocas consultas de keyframe/keyTangent en el de cmds) y la
+# escribe de vuelta con una llamada por curva (SceneBackend.write_curve / commit_curve).
+#
+# Las herramientas trabajan sobre las columnas (NumPy si esta disponible) en lugar de pedir a Maya key por key.
+# Tiempos en unidades de UI, valores en unidades de UI, angulos en grados. Este modulo no depende de Maya.
+
+
+# Los tipos de tangente se guardan como codigos pequeños para que tambien sean una columna
+TANGENT_TYPES = ("global", "fixed", "linear", "flat", "spline", "step", "slow", "fast", "clamped", "plateau",
+                 "stepnext", "auto")
+TANGENT_CODES = {name: code for code, name in enumerate(TANGENT_TYPES)}
+
+
+def tangent_code(name):
+    return TANGENT_CODES.get(name, TANGENT_CODES["auto"])
+
+
+def tangent_name(code):
+    return TANGENT_TYPES[int(code)]
+
+
+def float_column(values):
+    if np is not None:
+        return np.array(values, dtype=np.float64)
+    return array("d", values)
+
+
+def code_column(names):
+    codes = [tangent_code(name) for name in names]
+    if np is not None:
+        return np.array(codes, dtype=np.int8)
+    return array("b", codes)
+
+
+def mask_column(count, indices=()):
+    if np is not None:
+        mask = np.zeros(count, dtype=bool)
+        mask[list(indices)] = True
+        return mask
+    mask = array("b", bytes(count))
+    for index in indices:
+        mask[index] = 1
+    return mask
+
+
+def default(column, value, count):
+    return [value] * count if column is None else column
+
+
+def copy_column(column):
+    if np is not None and isinstance(column, np.ndarray):
+        return column.copy()
+    return array(column.typecode, column)
+
+
+class CurveSnapshot(object):
+    __slots__ = ("curve", "driven", "times", "values", "in_types", "out_types", "in_angles", "out_angles",
+                 "in_weights", "out_weights", "selected", "weighted", "original_times", "original_values",
+                 "written_times", "written_values")
+
+    def __init__(self, curve, times, values, in_types=None, out_types=None, in_angles=None, out_angles=None,
+                 in_weights=None, out_weights=None, selected_indices=(), weighted=False, driven=None):
+        count = len(times)
+        self.curve = curve
+        self.driven = driven                # "nodo.attr" que mueve la curva, si se conoce
+        self.times = float_column(times)
+        self.values = float_column(values)
+        self.in_types = code_column(default(in_types, "auto", count))
+        self.out_types = code_column(default(out_types, "auto", count))
+        self.in_angles = float_column(default(in_angles, 0.0, count))
+        self.out_angles = float_column(default(out_angles, 0.0, count))
+        self.in_weights = float_column(default(in_weights, 1.0, count))
+        self.out_weights = float_column(default(out_weights, 1.0, count))
+        self.selected = mask_column(count, selected_indices)
+        self.weighted = weighted
+
+        # original_*: la escena al leerla (o tras el ultimo commit), para restaurar antes de dejar el estado final
+        # en el undo. written_*: lo que tiene la escena ahora mismo, para escribir solo lo que ha cambiado.
+        self.original_times = copy_column(self.times)
+        self.original_values = copy_column(self.values)
+        self.written_times = copy_column(self.times)
+        self.written_values = copy_column(self.values)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __repr__(self):
+        return "CurveSnapshot({!r}, {} keys, {} selected)".format(self.curve, len(self), len(self.selected_indices()))
+
+    def selected_indices(self):
+        if np is not None and isinstance(self.selected, np.ndarray):
+            return np.flatnonzero(self.selected).tolist()
+        return [index for index, flag in enumerate(self.selected) if flag]
+
+    def has_selection(self):
+        return any(self.selected)
+
+    def set_values(self, values, indices=None):
+        # Reemplaza la columna de valores entera o solo las keys indicadas
+        if indices is None:
+            self.values = float_column(values)
+            return
+        for index, value in zip(indices, values):
+            self.values[index] = value
+
+    def changed_range(self):
+        # (primer, ultimo) indice cuyo tiempo o valor difiere de lo que tiene la escena, o None si no hay cambios
+        if np is not None and isinstance(self.values, np.ndarray):
+            changed = np.flatnonzero((self.values != self.written_values) | (self.times != self.written_times))
+            if not len(changed):
+                return None
+            return int(changed[0]), int(changed[-1])
+
+        changed = [index for index in range(len(self))
+                   if self.values[index] != self.written_values[index] or self.times[index] != self.written_times[index]]
+        if not changed:
+            return None
+        return changed[0], changed[-1]
+
+    def drop_keys(self, indices):
+        # Quita esas keys de todas las columnas, despues de borrarlas de la escena con cutKey
+        drop = set(indices)
+        if not drop:
+            return
+        keep = [index for index in range(len(self)) if index not in drop]
+        for slot in self.__slots__:
+            column = getattr(self, slot)
+            if np is not None and isinstance(column, np.ndarray):
+                setattr(self, slot, column[keep])
+            elif isinstance(column, array):
+                setattr(self, slot, array(column.typecode, [column[index] for index in keep]))
+
+    def mark_written(self):
+        # La escena ya tiene las columnas actuales
+        self.written_times = copy_column(self.times)
+        self.written_values = copy_column(self.values)
+
+    def mark_committed(self):
+        # El estado actual ya esta en el undo: pasa a ser el original
+        self.mark_written()
+        self.original_times = copy_column(self.times)
+        self.original_values = copy_column(self.values)
+
+    def is_modified(self):
+        if np is not None and isinstance(self.values, np.ndarray):
+            return bool(np.any(self.values != self.original_values) or np.any(self.times != self.original_times))
+        return list(self.values) != list(self.original_values) or list(self.times) != list(self.original_times)
+
+    def in_type(self, index):
+        return tangent_name(self.in_types[index])
+
+    def out_type(self, index):
+        return tangent_name(self.out_types[index])
+
+    def key_time_values(self, start=0, end=None):
+        # Lista plana t0, v0, t1, v1... como la espera setAttr .keyTimeValue
+        end = len(self) - 1 if end is None else end
+        if np is not None and isinstance(self.values, np.ndarray):
+            return np.column_stack((self.times[start:end + 1], self.values[start:end + 1])).ravel().tolist()
+
+        flat = []
+        for index in range(start, end + 1):
+            flat.append(float(self.times[index]))
+            flat.append(float(self.values[index]))
+        return flat
@@ -0,0 +1,477 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import maya.cmds as cmds
+
+import TheKeyMachine.mods.curveFilterMod as curveFilter
+import TheKeyMachine.mods.curveSnapshotMod as curveSnapshot
+import TheKeyMachine.mods.eulerFilterMod as eulerFilter
+import TheKeyMachine.mods.keyCleanupMod as keyCleanup
+import TheKeyMachine.mods.keyReduceMod as keyReduce
+import TheKeyMachine.mods.keySnapMod as keySnap
+import TheKeyMachine.mods.keyTimesMod as keyTimes
+import TheKeyMachine.mods.sceneBackendMod as sceneBackend
+import TheKeyMachine.mods.tangentEngineMod as tangentEngine
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                   Curve filter sessions                                                     #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Un FilterSession se construye cuando el usuario empieza a arrastrar el slider de curvas del graph editor.
+# Lee de una vez todas las curvas con keys seleccionadas (CurveSnapshot) y en cada tick aplica el kernel del
+# modo sobre los valores originales y escribe cada curva con una sola llamada. commit() deja el resultado final
+# en el undo; se llama al soltar el slider, antes de cerrar el chunk.
+
+
+class FilterSession(object):
+    def __init__(self, backend=None):
+        self.backend = backend or sceneBackend.get_backend()
+        self.backend.clear()
+        self.snapshots = [snapshot for snapshot in self.backend.read_selected_curves() if snapshot.has_selection()]
+        self.states = {snapshot.curve: {} for snapshot in self.snapshots}
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def apply(self, mode, value):
+        for snapshot in self.snapshots:
+            values = curveFilter.apply_mode(mode, snapshot.original_times, snapshot.original_values,
+                                            snapshot.selected, value, self.states[snapshot.curve])
+            snapshot.set_values(values)
+            self.backend.write_curve(snapshot)
+
+    def commit(self):
+        for snapshot in self.snapshots:
+            self.backend.commit_curve(snapshot)
+
+    def release(self):
+        self.commit()
+        self.snapshots = []
+        self.states = {}
+        self.backend.clear()
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                          Flip                                                               #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Flip de curvas enteras o de las keys seleccionadas sobre las snapshots: pivote y valores reflejados en columnas,
+# una escritura de tiempos/valores por curva y las tangentes fixed reflejadas en bloque. Las tangentes auto,
+# spline, linear... se reflejan solas al cambiar los valores. Todo va en un solo chunk de undo.
+
+def flip_curves(pivot="midrange", selected_only=False, backend=None):
+    # Curvas con keys seleccionadas en el graph editor. Devuelve el numero de curvas cambiadas
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+    snapshots = backend.read_selected_curves()
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        for snapshot in snapshots:
+            indices = snapshot.selected_indices() if selected_only else range(len(snapshot))
+            mask = curveSnapshot.mask_column(len(snapshot), indices)
+            default = backend.default_value(snapshot.driven) if pivot == "default" and snapshot.driven else 0.0
+            value = curveFilter.flip_pivot(snapshot.values, mask, pivot, snapshot.selected, default)
+            snapshot.set_values(curveFilter.flip(snapshot.values, mask, value))
+            backend.commit_curve(snapshot)
+
+            fixed = [index for index in indices
+                     if "fixed" in (snapshot.in_type(index), snapshot.out_type(index))]
+            if fixed:
+                in_angles = curveFilter.negate(snapshot.in_angles, mask)
+                out_angles = curveFilter.negate(snapshot.out_angles, mask)
+                backend.write_tangents(snapshot, fixed, [in_angles[index] for index in fixed],
+                                       [out_angles[index] for index in fixed])
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return len(snapshots)
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                      Key reduction                                                          #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Deja las curvas densas (bakes, pastes en worldspace, align) con las keys minimas que las reproducen dentro de
+# la tolerancia. Si hay keys seleccionadas en el graph editor se reduce solo el rango seleccionado de esas
+# curvas; si no, las curvas enteras de los objetos seleccionados.
+
+
+def read_target_curves(backend, curves=None):
+    if curves is not None:
+        return backend.read_curves(curves)
+    snapshots = backend.read_selected_curves()
+    if snapshots:
+        return snapshots
+    return backend.read_curves(backend.animated_curves(), selection=False)
+
+
+def key_range(snapshot):
+    selected = snapshot.selected_indices()
+    if selected:
+        return selected[0], selected[-1]
+    return 0, len(snapshot) - 1
+
+
+def reduce_curves(curves=None, tolerance=0.01, angle_tolerance=None, workers=1, backend=None):
+    # Devuelve {"curves": {curva: Reduction}, "keys_before", "keys_after", "max_error", "max_angle_error"}
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+    snapshots = read_target_curves(backend, curves)
+    fps = backend.frames_per_second()
+
+    # El error se mide con tangentes Hermite sin weights: las curvas con weighted tangents no se tocan
+    weighted = [snapshot.curve for snapshot in snapshots if snapshot.weighted]
+    snapshots = [snapshot for snapshot in snapshots if not snapshot.weighted]
+
+    jobs = [(snapshot.times, snapshot.values) + key_range(snapshot) for snapshot in snapshots]
+    reductions = keyReduce.reduce_many(jobs, tolerance, angle_tolerance, fps, workers)
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        for snapshot, reduction in zip(snapshots, reductions):
+            if not reduction.remove:
+                continue
+            backend.remove_keys(snapshot.curve, reduction.remove)
+
+            # Tras borrar, las keys que quedan se renumeran. La tangente que mira fuera del rango conserva su
+            # angulo; todas se escriben en bloque (un keyTangent y un setAttr por componente)
+            new_index = {old: new for new, old in enumerate(reduction.keep)}
+            indices, in_angles, out_angles = [], [], []
+            for index, in_slope, out_slope in reduction.tangents:
+                indices.append(new_index[index])
+                in_angles.append(snapshot.in_angles[index] if in_slope is None
+                                 else keyReduce.slope_to_angle(in_slope, fps))
+                out_angles.append(snapshot.out_angles[index] if out_slope is None
+                                  else keyReduce.slope_to_angle(out_slope, fps))
+            backend.write_tangents(snapshot, indices, in_angles, out_angles)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return {
+        "curves": {snapshot.curve: reduction for snapshot, reduction in zip(snapshots, reductions)},
+        "weighted_curves": weighted,
+        "keys_before": sum(reduction.keys_before for reduction in reductions),
+        "keys_after": sum(reduction.keys_after for reduction in reductions),
+        "max_error": max([reduction.max_error for reduction in reductions] or [0.0]),
+        "max_angle_error": max([reduction.max_angle_error for reduction in reductions] or [0.0]),
+    }
+
+
+def reduction_message(summary):
+    return "Reduced {} curves: {} -> {} keys (max error {:.4g}, max angle error {:.3g} deg)".format(
+        len(summary["curves"]), summary["keys_before"], summary["keys_after"], summary["max_error"],
+        summary["max_angle_error"]) + weighted_message(summary)
+
+
+def weighted_message(summary):
+    if not summary["weighted_curves"]:
+        return ""
+    return " ({} weighted curves skipped)".format(len(summary["weighted_curves"]))
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                       Euler filter                                                          #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Filtro Euler sobre las curvas de rotacion (en grados) sin pasar por cmds.filterCurve: las tres curvas de un
+# rotate se leen en columnas, se filtran juntas con el rotateOrder del nodo y cada curva se escribe con una sola
+# llamada. Si las curvas de un nodo no comparten los tiempos de key (o falta alguna) solo se desenrollan los
+# saltos de 360 de cada curva.
+
+ROTATE_ATTRS = ("rotateX", "rotateY", "rotateZ")
+
+
+def rotate_plugs(nodes):
+    return ["{}.{}".format(node, attr) for node in nodes for attr in ROTATE_ATTRS]
+
+
+def rotate_channels(snapshots):
+    # {nodo: {atributo: snapshot}} de las curvas que mueven un rotate
+    groups = {}
+    for snapshot in snapshots:
+        if not snapshot.driven:
+            continue
+        node, _, attr = snapshot.driven.rpartition(".")
+        if attr in ROTATE_ATTRS:
+            groups.setdefault(node, {})[attr] = snapshot
+    return groups
+
+
+def euler_filter(curves=None, nodes=None, backend=None):
+    # Filtra las curvas de rotacion de nodes, o las curvas indicadas / seleccionadas junto con las otras curvas de
+    # rotacion de sus nodos. Devuelve {"curves": curvas revisadas, "changed": curvas modificadas}
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+
+    if nodes is not None:
+        snapshots = backend.read_curves(backend.animated_curves(rotate_plugs(nodes)), selection=False)
+    else:
+        snapshots = read_target_curves(backend, curves)
+        known = set(snapshot.curve for snapshot in snapshots)
+        siblings = [curve for curve in backend.animated_curves(rotate_plugs(rotate_channels(snapshots)))
+                    if curve not in known]
+        if siblings:
+            snapshots += backend.read_curves(siblings, selection=False)
+
+    groups = rotate_channels(snapshots)
+    for node, channels in groups.items():
+        triplet = [channels.get(attr) for attr in ROTATE_ATTRS]
+        if None not in triplet and all(list(snapshot.times) == list(triplet[0].times) for snapshot in triplet[1:]):
+            order = eulerFilter.ROTATE_ORDERS[int(backend.get_value(node + ".rotateOrder"))]
+            filtered = eulerFilter.euler_filter(*[snapshot.values for snapshot in triplet], order=order)
+            for snapshot, values in zip(triplet, filtered):
+                snapshot.set_values(values)
+        else:
+            for snapshot in channels.values():
+                snapshot.set_values(eulerFilter.unwrap(snapshot.values))
+
+    filtered_curves = [snapshot for channels in groups.values() for snapshot in channels.values()]
+    changed = [snapshot for snapshot in filtered_curves if snapshot.is_modified()]
+    if changed:
+        cmds.undoInfo(openChunk=True)
+        try:
+            for snapshot in changed:
+                backend.commit_curve(snapshot)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    return {"curves": [snapshot.curve for snapshot in filtered_curves], "changed": [snapshot.curve for snapshot in changed]}
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                      Key cleanup                                                            #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Limpieza en una pasada de curvas estaticas y keys que sobran, con tolerancia. Todas las curvas se leen en bloque;
+# las estaticas se borran con un solo delete y las keys que sobran con un cutKey por curva. Las keys que quedan
+# junto a una borrada y tienen tangentes calculadas (auto, spline, linear...) se fijan con su angulo actual para que
+# la curva no cambie. En curvas con tangentes weighted solo se buscan curvas estaticas.
+
+def cleanup_keys(nodes=None, scene=False, tolerance=1e-4, static=True, redundant=True, backend=None):
+    # Limpia las curvas de nodes, de toda la escena (scene=True) o de la seleccion.
+    # Devuelve {"curves", "static_curves", "keys_before", "keys_after"}
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+
+    if scene:
+        curves = backend.scene_curves()
+    else:
+        curves = backend.animated_curves(nodes)
+    snapshots = backend.read_curves(curves, selection=False)
+    fps = backend.frames_per_second()
+
+    static_curves = []
+    removals = []
+    keys_before = keys_removed = 0
+    for snapshot in snapshots:
+        keys_before += len(snapshot)
+        if static and keyCleanup.is_static(snapshot.values, tolerance):
+            static_curves.append(snapshot.curve)
+            keys_removed += len(snapshot)
+            continue
+        if not redundant or snapshot.weighted or len(snapshot) < 3:
+            continue
+        in_slopes = [keyCleanup.angle_to_slope(angle, fps) for angle in snapshot.in_angles]
+        out_slopes = [keyCleanup.angle_to_slope(angle, fps) for angle in snapshot.out_angles]
+        out_types = [snapshot.out_type(index) for index in range(len(snapshot))]
+        remove = keyCleanup.redundant_keys(snapshot.times, snapshot.values, in_slopes, out_slopes, out_types, tolerance)
+        if remove:
+            removals.append((snapshot, remove))
+            keys_removed += len(remove)
+
+    if static_curves or removals:
+        cmds.undoInfo(openChunk=True)
+        try:
+            backend.delete_curves(static_curves)
+            for snapshot, remove in removals:
+                in_types = [snapshot.in_type(index) for index in range(len(snapshot))]
+                out_types = [snapshot.out_type(index) for index in range(len(snapshot))]
+                pinned = keyCleanup.pinned_neighbours(len(snapshot), remove, in_types, out_types)
+                backend.remove_keys(snapshot.curve, remove)
+
+                # Tras borrar, las keys que quedan se renumeran; las fijadas se escriben en bloque por curva
+                removed = set(remove)
+                new_index = {old: new for new, old in enumerate(index for index in range(len(snapshot)) if index not in removed)}
+                backend.write_tangents(snapshot, [new_index[index] for index in pinned],
+                                       [snapshot.in_angles[index] for index in pinned],
+                                       [snapshot.out_angles[index] for index in pinned])
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    return {
+        "curves": [snapshot.curve for snapshot in snapshots],
+        "static_curves": static_curves,
+        "keys_before": keys_before,
+        "keys_after": keys_before - keys_removed,
+    }
+
+
+def cleanup_message(summary):
+    return "Cleaned {} curves: {} static curves deleted, {} -> {} keys".format(
+        len(summary["curves"]), len(summary["static_curves"]), summary["keys_before"], summary["keys_after"])
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                       Tangents                                                              #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Los modos de tangentEngine calculan de una vez los angulos de todas las keys seleccionadas de cada curva y se
+# escriben en bloque por curva. Los tipos de tangente (auto, spline, linear...) se agrupan en un keyTangent por curva.
+
+def set_tangents(mode, factor=None, backend=None):
+    # Devuelve el numero de keys cambiadas
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+    snapshots = backend.read_selected_curves()
+    fps = backend.frames_per_second()
+
+    changed = 0
+    cmds.undoInfo(openChunk=True)
+    try:
+        for snapshot in snapshots:
+            indices = snapshot.selected_indices()
+            in_angles, out_angles = tangentEngine.compute_tangents(
+                mode, snapshot.times, snapshot.values, indices, snapshot.in_angles, snapshot.out_angles, fps, factor)
+            backend.write_tangents(snapshot, indices, in_angles, out_angles)
+            changed += len(indices)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return changed
+
+
+def set_tangent_type(tangent_type, backend=None):
+    # Tipo de tangente de entrada y salida de las keys seleccionadas. Devuelve el numero de keys cambiadas
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+    code = curveSnapshot.tangent_code(tangent_type)
+
+    changed = 0
+    cmds.undoInfo(openChunk=True)
+    try:
+        for snapshot in backend.read_selected_curves():
+            indices = snapshot.selected_indices()
+            for index in indices:
+                snapshot.in_types[index] = code
+                snapshot.out_types[index] = code
+            backend.write_tangent_types(snapshot, indices)
+            changed += len(indices)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return changed
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                      Key snapping                                                           #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Cada curva se resuelve entera con keySnap: las keys que chocan en un frame se borran con un solo cutKey y los
+# tiempos y valores nuevos se escriben con un solo setAttr .keyTimeValue. Los tipos y angulos de tangente viajan
+# con cada key.
+
+def snap_keys(nodes=None, policy="nearest", step=1.0, backend=None):
+    # Devuelve {"curves": curvas cambiadas, "moved": keys movidas, "removed": keys borradas por chocar}
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+    snapshots = backend.read_curves(backend.animated_curves(nodes), selection=False)
+
+    changed, moved, removed = [], 0, 0
+    cmds.undoInfo(openChunk=True)
+    try:
+        for snapshot in snapshots:
+            snap = keySnap.snap_keys(snapshot.times, snapshot.values, policy, step)
+            if not snap.moved and not snap.remove:
+                continue
+            backend.remove_keys(snapshot.curve, snap.remove)
+            snapshot.drop_keys(snap.remove)
+            snapshot.times = curveSnapshot.float_column(snap.times)
+            snapshot.set_values(snap.values)
+            backend.commit_curve(snapshot)
+            changed.append(snapshot.curve)
+            moved += snap.moved
+            removed += len(snap.remove)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return {"curves": changed, "moved": moved, "removed": removed}
+
+
+def snap_message(summary):
+    return "Snapped {} keys on {} curves, {} colliding keys removed".format(
+        summary["moved"], len(summary["curves"]), summary["removed"])
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                    Share / match keys                                                       #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Share y match por diferencias de conjuntos entre los tiempos de key de cada curva y los de referencia: las keys que
+# faltan se insertan con un setKeyframe -insert por curva y las que sobran se borran con un cutKey por curva.
+
+def share_key_times(curves, reference, start=None, end=None, backend=None):
+    # Deja en cada curva, dentro de [start, end] si se indica, exactamente las keys de reference.
+    # Devuelve {"curves": curvas cambiadas, "inserted", "removed"}
+    backend = backend or sceneBackend.get_backend()
+    key_times = backend.read_key_times(curves)
+
+    changed, inserted, removed = [], 0, 0
+    cmds.undoInfo(openChunk=True)
+    try:
+        for curve in curves:
+            missing, extra = keyTimes.share_plan(key_times[curve], reference, start, end)
+            if not missing and not extra:
+                continue
+            backend.insert_keys(curve, missing)
+            backend.remove_keys(curve, extra)
+            changed.append(curve)
+            inserted += len(missing)
+            removed += len(extra)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return {"curves": changed, "inserted": inserted, "removed": removed}
+
+
+def match_curves(curves, reference_curve, backend=None):
+    # Cada curva pasa a tener las mismas keys (tiempos y valores) que reference_curve
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+    reference = backend.read_curve(reference_curve)
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        share_key_times(curves, reference.times, backend=backend)
+        for curve in curves:
+            snapshot = backend.read_curve(curve)
+            if len(snapshot) != len(reference):
+                continue
+            snapshot.times = curveSnapshot.copy_column(reference.times)
+            snapshot.set_values(reference.values)
+            backend.commit_curve(snapshot)
+    finally:
+        cmds.undoInfo(closeChunk=True)
@@ -0,0 +1,217 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import maya.cmds as cmds
+
+import json
+import os
+import threading
+
+import TheKeyMachine.mods.generalMod as general
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                   Defaults store                                                            #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Valores por defecto guardados con "Set Default" (reset_default_data.json). El JSON se mantiene en memoria indexado
+# por namespace y nombre corto del objeto, y solo se vuelve a leer si su mtime cambia (por ejemplo otra sesion de Maya).
+# Las escrituras se hacen en un hilo aparte y de forma atomica (archivo temporal + os.replace).
+#
+# Formato del archivo (sin cambios): {namespace: {"nombre_corto.attr": valor}}
+
+
+def split_name(node):
+    # Misma clave que se ha usado siempre en el JSON: lo que hay antes del primer ':' es el namespace
+    partes = node.split(':')
+    namespace = partes[0] if len(partes) > 1 else 'default'
+    return namespace, partes[-1]
+
+
+class DefaultsStore(object):
+    def __init__(self):
+        self.index = {}             # {namespace: {nombre_corto: {attr: valor}}}
+        self.mtime = None
+        self.loaded_path = None
+        self.pending_writes = 0
+        self.write_serial = 0
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+        # attributeQuery(listDefault=True) por (nodeType, attr) para atributos estaticos
+        self.list_default_cache = {}
+        self.node_types = {}
+        self.user_attrs = {}
+
+
+    # ____ Lectura ____
+
+    def path(self):
+        return general.get_set_default_data_file()
+
+    def refresh(self):
+        # Recarga el JSON solo si ha cambiado en disco desde la ultima lectura o escritura
+        path = self.path()
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+
+        with self.lock:
+            if self.pending_writes:
+                return
+            if path == self.loaded_path and mtime == self.mtime:
+                return
+
+            data = {}
+            if mtime is not None:
+                try:
+                    with open(path, 'r') as file:
+                        data = json.load(file)
+                except (IOError, ValueError) as e:
+                    print(f"Could not read default values from {path}: {e}")
+                    data = {}
+
+            self.index = self.build_index(data)
+            self.mtime = mtime
+            self.loaded_path = path
+
+    @staticmethod
+    def build_index(data):
+        index = {}
+        for namespace, values in data.items():
+            objects = index.setdefault(namespace, {})
+            for attr_full, value in values.items():
+                nombre_corto, _, attr = attr_full.partition('.')
+                objects.setdefault(nombre_corto, {})[attr] = value
+        return index
+
+    def to_data(self):
+        return {namespace: {f"{nombre_corto}.{attr}": value
+                            for nombre_corto, values in objects.items() for attr, value in values.items()}
+                for namespace, objects in self.index.items() if objects}
+
+    def node_values(self, node):
+        # {attr: valor} guardados para el objeto, sin tocar el disco salvo que el archivo haya cambiado
+        self.refresh()
+        namespace, nombre_corto = split_name(node)
+        return self.index.get(namespace, {}).get(nombre_corto, {})
+
+    def get(self, node, attr, fallback=True):
+        values = self.node_values(node)
+        if attr in values:
+            return values[attr]
+        return self.list_default(node, attr) if fallback else None
+
+
+    # ____ Defaults de Maya ____
+
+    def clear_node_cache(self):
+        # El tipo y los atributos dinamicos de cada nodo se guardan solo durante una operacion (un drag, un reset)
+        self.node_types = {}
+        self.user_attrs = {}
+
+    def list_default(self, node, attr):
+        node_type = self.node_types.get(node)
+        if node_type is None:
+            node_type = self.node_types[node] = cmds.nodeType(node)
+
+        user_attrs = self.user_attrs.get(node)
+        if user_attrs is None:
+            user_attrs = self.user_attrs[node] = set(cmds.listAttr(node, userDefined=True) or [])
+
+        # Los atributos dinamicos pueden tener defaults distintos en cada nodo del mismo tipo
+        dynamic = attr in user_attrs
+        key = (node_type, attr)
+        if not dynamic and key in self.list_default_cache:
+            return self.list_default_cache[key]
+
+        default_query = cmds.attributeQuery(attr, node=node, listDefault=True)
+        value = default_query[0] if default_query else None
+        if not dynamic:
+            self.list_default_cache[key] = value
+        return value
+
+
+    # ____ Escritura ____
+
+    def set_node_values(self, node, values):
+        self.refresh()
+        namespace, nombre_corto = split_name(node)
+        with self.lock:
+            self.index.setdefault(namespace, {}).setdefault(nombre_corto, {}).update(values)
+
+    def remove_node(self, node):
+        self.refresh()
+        namespace, nombre_corto = split_name(node)
+        with self.lock:
+            objects = self.index.get(namespace)
+            if objects is None or objects.pop(nombre_corto, None) is None:
+                return False
+            # Si el namespace queda vacio, eliminarlo tambien
+            if not objects:
+                del self.index[namespace]
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.index = {}
+
+    def save(self, indent=4, wait=False):
+        # Serializa en el hilo principal y escribe en segundo plano
+        path = self.path()
+        with self.lock:
+            text = json.dumps(self.to_data(), indent=indent)
+            self.pending_writes += 1
+            self.write_serial += 1
+            serial = self.write_serial
+
+        thread = threading.Thread(target=self.write_file, args=(path, text, serial))
+        thread.daemon = True
+        thread.start()
+        if wait:
+            thread.join()
+        return thread
+
+    def write_file(self, path, text, serial):
+        temp_path = path + ".tmp"
+        try:
+            with self.write_lock:
+                # Si ya hay una escritura mas reciente en cola, esta copia esta obsoleta
+                if serial == self.write_serial:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(temp_path, 'w') as file:
+                        file.write(text)
+                    os.replace(temp_path, path)
+        except (IOError, OSError) as e:
+            print(f"Could not write default values to {path}: {e}")
+        finally:
+            with self.lock:
+                self.pending_writes -= 1
+                try:
+                    self.mtime = os.path.getmtime(path)
+                    self.loaded_path = path
+                except OSError:
+                    self.mtime = None
+
+
+# Instancia compartida por blend to default, reset y set default
+store = DefaultsStore()
@@ -0,0 +1,134 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+from array import array
+
+# NumPy viene con Maya 2023+. Sin NumPy se usa el mismo algoritmo en Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                       Euler filter                                                          #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Sustituto de cmds.filterCurve para curvas de rotacion en grados. Con las tres curvas de un rotate (mismos
+# tiempos de key) cada frame tiene dos soluciones Euler equivalentes: (a, b, c) y (a + 180, 180 - b, c + 180),
+# donde b es el eje del medio del rotateOrder. Se elige en cada frame la que queda mas cerca del frame anterior
+# y despues se desenrollan los saltos de 360 para que cada canal sea continuo. Las distancias entre soluciones
+# se calculan de una vez para todos los frames; la eleccion es un recorrido lineal con dos estados.
+# Este modulo no depende de Maya.
+
+
+ROTATE_ORDERS = ['xyz', 'yzx', 'zxy', 'xzy', 'yxz', 'zyx']
+AXES = "xyz"
+
+
+def _column(values):
+    if np is not None:
+        return np.array(values, dtype=np.float64)
+    return array("d", values)
+
+
+def wrap(values):
+    # Angulos a [-180, 180)
+    if np is not None:
+        return (np.asarray(values, dtype=np.float64) + 180.0) % 360.0 - 180.0
+    return _column([(value + 180.0) % 360.0 - 180.0 for value in values])
+
+
+def unwrap(values, start=None):
+    # Quita los saltos de mas de 180 grados entre keys consecutivas. La primera key queda en start (por defecto
+    # su propio valor)
+    if not len(values):
+        return _column(values)
+    if np is not None:
+        values = np.asarray(values, dtype=np.float64)
+        steps = wrap(np.diff(values))
+        first = values[0] if start is None else start
+        return np.concatenate(([first], first + np.cumsum(steps)))
+
+    result = [values[0] if start is None else start]
+    for previous, current in zip(values, values[1:]):
+        result.append(result[-1] + (current - previous + 180.0) % 360.0 - 180.0)
+    return _column(result)
+
+
+def flipped(x, y, z, order="xyz"):
+    # La otra solucion Euler de la misma orientacion
+    middle = AXES.index(order[1])
+    result = []
+    for axis, channel in enumerate((x, y, z)):
+        channel = _column(channel)
+        if np is not None:
+            result.append(180.0 - channel if axis == middle else channel + 180.0)
+        elif axis == middle:
+            result.append(_column([180.0 - value for value in channel]))
+        else:
+            result.append(_column([value + 180.0 for value in channel]))
+    return result
+
+
+def _distance(a, b):
+    # Suma de distancias angulares por frame entre dos triples de canales (cada canal una columna)
+    if np is not None:
+        return sum(np.abs(wrap(np.asarray(a[axis]) - np.asarray(b[axis]))) for axis in range(3))
+    return [sum(abs((a[axis][i] - b[axis][i] + 180.0) % 360.0 - 180.0) for axis in range(3))
+            for i in range(len(a[0]))]
+
+
+def _shift(channels):
+    # Cada canal desplazado un frame: el frame i queda frente al i - 1
+    if np is not None:
+        return [np.concatenate((np.asarray(channel[:1]), np.asarray(channel[:-1]))) for channel in channels]
+    return [_column(list(channel[:1]) + list(channel[:-1])) for channel in channels]
+
+
+def euler_filter(x, y, z, order="xyz"):
+    # Devuelve (x, y, z) filtrados. El primer frame conserva su solucion y sus valores
+    count = len(x)
+    if count < 2:
+        return _column(x), _column(y), _column(z)
+
+    original = [_column(x), _column(y), _column(z)]
+    alternate = flipped(x, y, z, order)
+
+    # Distancia del frame i (con cada solucion) al frame i - 1 (con cada solucion)
+    previous_original = _shift(original)
+    previous_alternate = _shift(alternate)
+    from_original = (_distance(original, previous_original), _distance(alternate, previous_original))
+    from_alternate = (_distance(original, previous_alternate), _distance(alternate, previous_alternate))
+
+    use_alternate = [False] * count
+    for i in range(1, count):
+        distances = from_alternate if use_alternate[i - 1] else from_original
+        use_alternate[i] = distances[1][i] < distances[0][i]
+
+    result = []
+    for axis in range(3):
+        if np is not None:
+            chosen = np.where(np.asarray(use_alternate), alternate[axis], original[axis])
+        else:
+            chosen = [alternate[axis][i] if use_alternate[i] else original[axis][i] for i in range(count)]
+        result.append(unwrap(chosen, start=original[axis][0]))
+    return tuple(result)
@@ -78,7 +78,9 @@ def load_config():
         "CUSTOM_TOOLS_MENU": True,
         "CUSTOM_TOOLS_EDITABLE_BY_USER": True,
         "CUSTOM_SCRIPTS_MENU": True,
-        "CUSTOM_SCRIPTS_EDITABLE_BY_USER": True
+        "CUSTOM_SCRIPTS_EDITABLE_BY_USER": True,
+        "WORLDSPACE_CACHE_SIZE": 200000,        # matrices guardadas entre copias de worldspace
+        "WORLDSPACE_CACHE_AGE": 1800            # segundos
     }
 
     for key, default_value in default_config.items():
@@ -0,0 +1,230 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import sys
+import time
+import traceback
+
+import maya.cmds as cmds
+import maya.mel as mel
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                     Time-sliced jobs                                                        #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Las herramientas que recorren muchos frames se escriben como generadores de pasos: hacen un frame de trabajo y
+# hacen `cancel = yield 1`. Si cancel es True paran y devuelven (return) lo que lleven. Asi la misma herramienta se
+# puede ejecutar de dos formas:
+#
+#   run_steps(pasos, progress)   de una vez, en el hilo principal (scripts, tests, Maya en batch)
+#   Job(...).start()             en trozos de SLICE_TIME segundos en la cola idle de Maya (evalDeferred
+#                                lowestPriority), con la barra de progreso viva entre trozos y cancelable con Esc
+#
+# Todo el Job va en un solo chunk de undo con un nombre unico del job: se abre en el primer trozo y se cierra al
+# terminar, como el chunk de un slider que se abre al pulsar y se cierra al soltar. Un solo Ctrl+Z deshace el job
+# entero. Lo que haga el usuario mientras el job esta en marcha entra en el mismo chunk. Si el job se cancela o falla,
+# deshace su chunk si es la entrada de arriba de la cola; si no grabo nada, Maya no guarda el chunk y no se deshace
+# ninguna entrada ajena. Guarda cuanto tardo cada trozo (timings) para poder perfilar las herramientas. Mientras un
+# job esta en marcha no se puede empezar otro.
+
+
+# Segundos de trabajo por trozo antes de devolver el control a Maya
+SLICE_TIME = 0.05
+
+# Reloj con el que se miden los trozos. Los benchmarks lo cambian por uno que avanza lo mismo en cada lectura para
+# que el numero de trozos no dependa de la maquina
+slice_clock = time.perf_counter
+
+current_job = None
+job_count = 0
+
+
+def run_steps(steps, progress=None):
+    # Ejecuta un generador de pasos entero. progress(pasos hechos) tras cada paso; si devuelve True se cancela
+    done = 0
+    try:
+        step = next(steps)
+        while True:
+            done += step
+            step = steps.send(bool(progress(done)) if progress else False)
+    except StopIteration as stop:
+        return stop.value
+
+
+class MainProgressBar(object):
+    # La barra de progreso principal de Maya ($gMainProgressBar)
+    def __init__(self):
+        self.bar = None
+
+    def begin(self, status, total):
+        self.bar = mel.eval('$tmp = $gMainProgressBar')
+        if self.bar:
+            cmds.progressBar(self.bar, edit=True, beginProgress=True, isInterruptable=True, status=status,
+                             maxValue=max(int(total), 1))
+
+    def update(self, done):
+        if self.bar:
+            cmds.progressBar(self.bar, edit=True, progress=int(done))
+
+    def cancelled(self):
+        return bool(self.bar) and bool(cmds.progressBar(self.bar, query=True, isCancelled=True))
+
+    def end(self):
+        if self.bar:
+            cmds.progressBar(self.bar, edit=True, endProgress=True)
+        self.bar = None
+
+
+class Job(object):
+    def __init__(self, name, steps, total, on_finish=None, undo=True, status=None, progress=None,
+                 slice_time=None, schedule=None, clock=None):
+        self.name = name
+        self.steps = steps                  # generador de pasos (ver arriba)
+        self.total = total                  # pasos esperados, para la barra de progreso
+        self.on_finish = on_finish          # on_finish(job) al terminar, cancelar o fallar
+        self.undo = undo
+        self.status = status or name
+        self.progress = progress or MainProgressBar()
+        self.slice_time = SLICE_TIME if slice_time is None else slice_time
+        self.schedule = schedule or (lambda command: cmds.evalDeferred(command, lowestPriority=True))
+        self.clock = clock or slice_clock
+
+        self.state = "pending"              # pending, running, done, cancelled, failed
+        self.done = 0
+        self.result = None
+        self.error = None
+        self.cancel_requested = False
+        self.started = False
+        self.timings = []                   # [(pasos del trozo, segundos)]
+        self.chunk_open = False
+        self.chunks = 0                     # 1 si el chunk del job grabo algo y quedo en la cola de undo
+        self.undone = 0
+
+        global job_count
+        job_count += 1
+        self.chunk_name = "{} #{}".format(name, job_count)
+
+    @property
+    def running(self):
+        return self.state == "running"
+
+    def start(self):
+        global current_job
+        if current_job is not None and current_job.running:
+            cmds.warning("{} is still running.".format(current_job.name))
+            return None
+        current_job = self
+        self.state = "running"
+        self.progress.begin(self.status, self.total)
+        self.schedule(self.run_slice)
+        return self
+
+    def run(self):
+        # Todos los trozos seguidos, sin pasar por la cola idle
+        if self.start() is None:
+            return None
+        while self.running:
+            self.run_slice(reschedule=False)
+        return self.result
+
+    def cancel(self):
+        self.cancel_requested = True
+
+    def run_slice(self, reschedule=True):
+        if not self.running:
+            return
+        started = self.clock()
+        steps = 0
+        state = None
+        if self.undo and not self.chunk_open:
+            cmds.undoInfo(openChunk=True, chunkName=self.chunk_name)
+            self.chunk_open = True
+        cmds.refresh(suspend=True)
+        try:
+            while True:
+                if not self.started:
+                    self.started = True
+                    step = next(self.steps)
+                else:
+                    if self.progress.cancelled():
+                        self.cancel_requested = True
+                    step = self.steps.send(self.cancel_requested)
+                steps += step
+                self.done += step
+                if self.clock() - started >= self.slice_time:
+                    break
+        except StopIteration as stop:
+            self.result = stop.value
+            state = "cancelled" if self.cancel_requested else "done"
+        except Exception:
+            self.error = sys.exc_info()[1]
+            traceback.print_exc()
+            state = "failed"
+        finally:
+            cmds.refresh(suspend=False)
+            self.timings.append((steps, self.clock() - started))
+
+        if state is not None:
+            self.finish(state)
+        elif self.running:
+            self.progress.update(self.done)
+            if reschedule:
+                self.schedule(self.run_slice)
+
+    def finish(self, state):
+        global current_job
+        self.state = state
+        self.progress.end()
+        self.close_chunk()
+        if state != "done":
+            self.rollback()
+        if current_job is self:
+            current_job = None
+        if state == "failed":
+            cmds.warning("{} failed: {}".format(self.name, self.error))
+        elif state == "cancelled":
+            cmds.warning("{} cancelled".format(self.name))
+        if self.on_finish:
+            self.on_finish(self)
+
+    def close_chunk(self):
+        # Maya descarta un chunk sin cambios: solo cuenta si ha quedado arriba de la cola con el nombre del job
+        if not self.chunk_open:
+            return
+        cmds.undoInfo(closeChunk=True)
+        self.chunk_open = False
+        if cmds.undoInfo(query=True, undoName=True) == self.chunk_name:
+            self.chunks = 1
+
+    def rollback(self):
+        # Deshace el chunk del job si es la entrada de arriba de la cola, nunca una entrada ajena
+        if self.undone < self.chunks and cmds.undoInfo(query=True, undoName=True) == self.chunk_name:
+            cmds.undo()
+            self.undone += 1
+
+    def report(self):
+        # Resumen de los trozos para perfilar: cuantos, pasos por trozo y tiempos
+        if not self.timings:
+            return "{}: no slices".format(self.name)
+        seconds = [elapsed for _, elapsed in self.timings]
+        return "{}: {} steps in {} slices, {:.1f} ms total, {:.1f} ms max slice".format(
+            self.name, self.done, len(self.timings), sum(seconds) * 1000.0, max(seconds) * 1000.0)
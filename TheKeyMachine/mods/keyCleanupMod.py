@@ -0,0 +1,161 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+
+# NumPy viene con Maya 2023+. Sin NumPy se usa el mismo algoritmo en Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                    Static / redundant keys                                                  #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Deteccion con tolerancia de curvas estaticas y de keys que sobran. Una key sobra si al quitarla el tramo que une
+# sus dos vecinas (con las tangentes que tienen ahora) pasa a menos de tolerance de la curva actual en la propia
+# key y en varios puntos de cada uno de sus dos tramos. Cada pasada evalua todas las keys de la curva de una vez
+# y quita keys no contiguas; se repite hasta que no sobra ninguna, sumando a cada tramo el error que ya arrastra
+# para que la curva final nunca se aleje de la original mas que tolerance.
+#
+# Tiempos en frames, valores en unidades de UI, angulos de tangente en grados como los devuelve keyTangent
+# (tiempo en segundos, por eso hace falta fps). Este modulo no depende de Maya.
+
+
+# Puntos de cada tramo (en proporcion) donde se compara la curva con y sin la key
+SAMPLES = (0.25, 0.5, 0.75)
+
+# Tangentes que no dependen de las keys vecinas: el resto se recalcula al borrar una vecina
+STEPPED_TYPES = ("step", "stepnext")
+FIXED_TYPES = ("fixed", "flat", "step", "stepnext")
+
+
+def is_static(values, tolerance=1e-4):
+    if not len(values):
+        return False
+    return max(values) - min(values) <= tolerance
+
+
+def angle_to_slope(angle, fps=24.0):
+    return math.tan(math.radians(angle)) / fps
+
+
+def _hermite(t0, v0, s0, t1, v1, s1, time):
+    span = t1 - t0
+    s = (time - t0) / span
+    s2 = s * s
+    s3 = s2 * s
+    return ((2 * s3 - 3 * s2 + 1) * v0 + (s3 - 2 * s2 + s) * s0 * span +
+            (-2 * s3 + 3 * s2) * v1 + (s3 - s2) * s1 * span)
+
+
+def removal_errors(times, values, in_slopes, out_slopes):
+    # Error de quitar cada key interior (indices 1..n-2). Funciona igual con arrays de NumPy que con listas
+    if np is not None:
+        t, v = np.asarray(times, dtype=np.float64), np.asarray(values, dtype=np.float64)
+        s_in, s_out = np.asarray(in_slopes, dtype=np.float64), np.asarray(out_slopes, dtype=np.float64)
+        t0, v0, o0 = t[:-2], v[:-2], s_out[:-2]
+        t1, v1, i1, o1 = t[1:-1], v[1:-1], s_in[1:-1], s_out[1:-1]
+        t2, v2, i2 = t[2:], v[2:], s_in[2:]
+        errors = np.abs(_hermite(t0, v0, o0, t2, v2, i2, t1) - v1)
+        for fraction in SAMPLES:
+            first = t0 + (t1 - t0) * fraction
+            second = t1 + (t2 - t1) * fraction
+            merged = _hermite(t0, v0, o0, t2, v2, i2, first)
+            errors = np.maximum(errors, np.abs(merged - _hermite(t0, v0, o0, t1, v1, i1, first)))
+            merged = _hermite(t0, v0, o0, t2, v2, i2, second)
+            errors = np.maximum(errors, np.abs(merged - _hermite(t1, v1, o1, t2, v2, i2, second)))
+        return errors
+
+    errors = []
+    for i in range(1, len(times) - 1):
+        t0, t1, t2 = times[i - 1], times[i], times[i + 1]
+        v0, v1, v2 = values[i - 1], values[i], values[i + 1]
+        o0, i1, o1, i2 = out_slopes[i - 1], in_slopes[i], out_slopes[i], in_slopes[i + 1]
+        error = abs(_hermite(t0, v0, o0, t2, v2, i2, t1) - v1)
+        for fraction in SAMPLES:
+            first = t0 + (t1 - t0) * fraction
+            second = t1 + (t2 - t1) * fraction
+            error = max(error,
+                        abs(_hermite(t0, v0, o0, t2, v2, i2, first) - _hermite(t0, v0, o0, t1, v1, i1, first)),
+                        abs(_hermite(t0, v0, o0, t2, v2, i2, second) - _hermite(t1, v1, o1, t2, v2, i2, second)))
+        errors.append(error)
+    return errors
+
+
+def redundant_keys(times, values, in_slopes, out_slopes, out_types=None, tolerance=1e-4):
+    # Indices (de la curva original) de las keys que se pueden borrar
+    alive = list(range(len(times)))
+    removed = []
+    out_types = out_types or [None] * len(times)
+    # Distancia maxima de cada tramo actual a la curva original, para que el error no se acumule entre pasadas
+    drift = [0.0] * (len(times) - 1)
+
+    while len(alive) > 2:
+        errors = removal_errors([times[i] for i in alive], [values[i] for i in alive],
+                                [in_slopes[i] for i in alive], [out_slopes[i] for i in alive])
+        candidates = []
+        totals = {}
+        for position, error in enumerate(errors, 1):
+            error = error + max(drift[position - 1], drift[position])
+            if error > tolerance:
+                continue
+            previous, index, following = alive[position - 1], alive[position], alive[position + 1]
+            if (out_types[previous] in STEPPED_TYPES or out_types[index] in STEPPED_TYPES) and \
+                    max(abs(values[index] - values[previous]), abs(values[following] - values[index])) > tolerance:
+                continue
+            # Nunca dos vecinas en la misma pasada
+            if candidates and candidates[-1] == position - 1:
+                continue
+            candidates.append(position)
+            totals[position] = error
+
+        if not candidates:
+            break
+        drop = set(alive[position] for position in candidates)
+        removed.extend(drop)
+        # Los dos tramos de cada key borrada pasan a ser uno
+        new_drift = []
+        for position, value in enumerate(drift):
+            if position + 1 in totals:
+                new_drift.append(totals[position + 1])
+            elif position not in totals:
+                new_drift.append(value)
+        drift = new_drift
+        alive = [index for index in alive if index not in drop]
+
+    return sorted(removed)
+
+
+def pinned_neighbours(count, removed, in_types, out_types):
+    # Keys que quedan junto a una borrada y cuya tangente se recalcularia (auto, spline, linear...): hay que fijar
+    # su angulo actual para que la forma no cambie
+    removed = set(removed)
+    pinned = set()
+    for index in removed:
+        for neighbour in (index - 1, index + 1):
+            while neighbour in removed:
+                neighbour += -1 if neighbour < index else 1
+            if 0 <= neighbour < count and (in_types[neighbour] not in FIXED_TYPES or out_types[neighbour] not in FIXED_TYPES):
+                pinned.add(neighbour)
+    return sorted(pinned)
@@ -0,0 +1,78 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import maya.cmds as cmds
+
+from bisect import bisect_left, bisect_right
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                   Key time index                                                            #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Indice ordenado de los tiempos de key de una curva. Se llena con una sola consulta de keyframe (tiempos y
+# valores) y una de keyTangent (tangentes de salida de todas las keys), y las keys vecinas de cualquier frame
+# se encuentran con bisect en O(log n) en lugar de recorrer la lista entera.
+
+
+class CurveKeyIndex(object):
+    __slots__ = ("times", "values", "out_tangent_types")
+
+    def __init__(self, times, values, out_tangent_types=None):
+        # keyframe devuelve las keys ordenadas por tiempo
+        self.times = times
+        self.values = values
+        self.out_tangent_types = out_tangent_types or [None] * len(times)
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def from_plug(cls, plug):
+        flat = cmds.keyframe(plug, query=True, timeChange=True, valueChange=True) or []
+        if not flat:
+            return cls([], [], [])
+
+        out_tangent_types = cmds.keyTangent(plug, query=True, outTangentType=True) or []
+        return cls(flat[0::2], flat[1::2], out_tangent_types)
+
+    def previous_index(self, time):
+        # ultima key estrictamente anterior a time
+        index = bisect_left(self.times, time) - 1
+        return index if index >= 0 else None
+
+    def next_index(self, time):
+        # primera key estrictamente posterior a time
+        index = bisect_right(self.times, time)
+        return index if index < len(self.times) else None
+
+    def previous_key(self, time):
+        # (tiempo, valor, tangente de salida) o None
+        index = self.previous_index(time)
+        if index is None:
+            return None
+        return self.times[index], self.values[index], self.out_tangent_types[index]
+
+    def next_key(self, time):
+        index = self.next_index(time)
+        if index is None:
+            return None
+        return self.times[index], self.values[index], self.out_tangent_types[index]
@@ -0,0 +1,188 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+# NumPy viene con Maya 2023+. Sin NumPy se usa el mismo algoritmo en Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                      Key reduction                                                          #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Reduce una curva densa (un bake, un paste en worldspace...) a las pocas keys Hermite que la reproducen dentro de
+# una tolerancia. Se empieza con la primera y la ultima key, cada una con la pendiente de la curva densa en ese
+# punto, y cada tramo se evalua de una vez sobre todas las keys densas que cubre: si el error maximo (en valor o,
+# opcionalmente, en angulo de la tangente) pasa la tolerancia, el tramo se parte en la key con mas error.
+#
+# Tiempos en frames, valores en unidades de UI, pendientes en unidades por frame. Los angulos se comparan como
+# los muestra el graph editor (tiempo en segundos, por eso hace falta fps). Este modulo no depende de Maya.
+
+
+class Reduction(object):
+    __slots__ = ("keep", "remove", "tangents", "keys_before", "keys_after", "max_error", "max_angle_error")
+
+    def __init__(self, keep, remove, tangents, max_error, max_angle_error):
+        self.keep = keep                    # indices que se quedan
+        self.remove = remove                # indices que se borran
+        self.tangents = tangents            # [(indice, pendiente de entrada o None, pendiente de salida o None)]
+        self.keys_before = len(keep) + len(remove)
+        self.keys_after = len(keep)
+        self.max_error = max_error
+        self.max_angle_error = max_angle_error
+
+    def __repr__(self):
+        return "Reduction({} -> {} keys, max error {:.6g})".format(self.keys_before, self.keys_after, self.max_error)
+
+
+def slope_to_angle(slope, fps):
+    return math.degrees(math.atan(slope * fps))
+
+
+def dense_slopes(times, values):
+    # Pendiente de la curva densa en cada key: diferencias centrales, laterales en los extremos
+    count = len(times)
+    if count < 2:
+        return [0.0] * count
+    if np is not None:
+        return np.gradient(np.asarray(values, dtype=np.float64), np.asarray(times, dtype=np.float64))
+
+    slopes = [0.0] * count
+    slopes[0] = (values[1] - values[0]) / (times[1] - times[0])
+    slopes[-1] = (values[-1] - values[-2]) / (times[-1] - times[-2])
+    for index in range(1, count - 1):
+        h0 = times[index] - times[index - 1]
+        h1 = times[index + 1] - times[index]
+        # Igual que numpy.gradient con espaciado irregular
+        slopes[index] = (h0 * h0 * values[index + 1] - h1 * h1 * values[index - 1] +
+                         (h1 * h1 - h0 * h0) * values[index]) / (h0 * h1 * (h0 + h1))
+    return slopes
+
+
+def segment_errors(times, values, slopes, first, last, fps=24.0):
+    # Error en valor y en angulo (grados) de las keys densas entre first y last con el tramo Hermite que las une
+    t0, t1 = times[first], times[last]
+    v0, v1 = values[first], values[last]
+    span = t1 - t0
+    m0, m1 = slopes[first] * span, slopes[last] * span
+
+    if np is not None:
+        s = (np.asarray(times[first + 1:last], dtype=np.float64) - t0) / span
+        s2 = s * s
+        s3 = s2 * s
+        curve = (2 * s3 - 3 * s2 + 1) * v0 + (s3 - 2 * s2 + s) * m0 + (-2 * s3 + 3 * s2) * v1 + (s3 - s2) * m1
+        derivative = ((6 * s2 - 6 * s) * (v0 - v1) + (3 * s2 - 4 * s + 1) * m0 + (3 * s2 - 2 * s) * m1) / span
+        errors = np.abs(curve - np.asarray(values[first + 1:last], dtype=np.float64))
+        angle_errors = np.abs(np.degrees(np.arctan(derivative * fps)) -
+                              np.degrees(np.arctan(np.asarray(slopes[first + 1:last]) * fps)))
+        return errors, angle_errors
+
+    errors, angle_errors = [], []
+    for index in range(first + 1, last):
+        s = (times[index] - t0) / span
+        s2 = s * s
+        s3 = s2 * s
+        curve = (2 * s3 - 3 * s2 + 1) * v0 + (s3 - 2 * s2 + s) * m0 + (-2 * s3 + 3 * s2) * v1 + (s3 - s2) * m1
+        derivative = ((6 * s2 - 6 * s) * (v0 - v1) + (3 * s2 - 4 * s + 1) * m0 + (3 * s2 - 2 * s) * m1) / span
+        errors.append(abs(curve - values[index]))
+        angle_errors.append(abs(slope_to_angle(derivative, fps) - slope_to_angle(slopes[index], fps)))
+    return errors, angle_errors
+
+
+def _worst(errors, angle_errors, tolerance, angle_tolerance):
+    # (posicion del peor error relativo a su tolerancia, ese error relativo)
+    if np is not None:
+        score = np.asarray(errors) / tolerance
+        if angle_tolerance is not None:
+            score = np.maximum(score, np.asarray(angle_errors) / angle_tolerance)
+        position = int(np.argmax(score))
+        return position, float(score[position])
+
+    position, worst = 0, -1.0
+    for index, error in enumerate(errors):
+        score = error / tolerance
+        if angle_tolerance is not None:
+            score = max(score, angle_errors[index] / angle_tolerance)
+        if score > worst:
+            position, worst = index, score
+    return position, worst
+
+
+def reduce_keys(times, values, tolerance=0.01, angle_tolerance=None, fps=24.0, start=0, end=None):
+    # Reduce las keys entre start y end (incluidas, que se quedan). Las de fuera no se tocan
+    count = len(times)
+    end = count - 1 if end is None else end
+    tolerance = max(tolerance, 1e-12)
+    if end - start < 2:
+        return Reduction(list(range(count)), [], [], 0.0, 0.0)
+
+    slopes = dense_slopes(times, values)[start:end + 1]
+    local_times = times[start:end + 1]
+    local_values = values[start:end + 1]
+
+    kept = {0, end - start}
+    max_error = 0.0
+    max_angle_error = 0.0
+    pending = [(0, end - start)]
+    while pending:
+        first, last = pending.pop()
+        if last - first < 2:
+            continue
+        errors, angle_errors = segment_errors(local_times, local_values, slopes, first, last, fps)
+        position, score = _worst(errors, angle_errors, tolerance, angle_tolerance)
+        if score > 1.0:
+            split = first + 1 + position
+            kept.add(split)
+            pending.append((first, split))
+            pending.append((split, last))
+            continue
+        max_error = max(max_error, float(max(errors)))
+        max_angle_error = max(max_angle_error, float(max(angle_errors)))
+
+    kept = sorted(kept)
+    keep = list(range(start)) + [start + index for index in kept] + list(range(end + 1, count))
+    remove = sorted(set(range(start, end + 1)) - set(start + index for index in kept))
+
+    # En los extremos del rango solo se cambia la tangente que mira hacia dentro
+    tangents = []
+    for index in kept:
+        slope = float(slopes[index])
+        in_slope = None if (index == 0 and start > 0) else slope
+        out_slope = None if (index == end - start and end < count - 1) else slope
+        tangents.append((start + index, in_slope, out_slope))
+    return Reduction(keep, remove, tangents, max_error, max_angle_error)
+
+
+def reduce_many(curves, tolerance=0.01, angle_tolerance=None, fps=24.0, workers=1):
+    # curves: [(times, values, start, end)]. Cada curva es independiente; con workers > 1 se reparten en hilos
+    def reduce_one(curve):
+        times, values, start, end = curve
+        return reduce_keys(times, values, tolerance, angle_tolerance, fps, start, end)
+
+    if workers and workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(reduce_one, curves))
+    return [reduce_one(curve) for curve in curves]
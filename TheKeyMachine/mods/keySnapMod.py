@@ -0,0 +1,106 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+
+# NumPy viene con Maya 2023+. Sin NumPy se usa el mismo algoritmo en Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                       Key snapping                                                          #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Lleva las keys que estan en un sub-frame al frame mas cercano calculando de una vez el frame de destino de todas
+# las keys de la curva. Si varias keys caen en el mismo frame solo queda una, segun la politica:
+#
+#   nearest     la key que estaba mas cerca del frame
+#   average     la key mas cercana, con la media de los valores del grupo
+#   original    no se borra ninguna key: las que chocan se quedan donde estaban
+#
+# El redondeo es siempre hacia arriba en los .5 (2.5 -> 3), igual en NumPy que en Python puro. Este modulo no
+# depende de Maya.
+
+POLICIES = ("nearest", "average", "original")
+EPSILON = 1e-6
+
+
+class Snap(object):
+    __slots__ = ("keep", "remove", "times", "values", "moved")
+
+    def __init__(self, keep, remove, times, values, moved):
+        self.keep = keep            # indices que se quedan
+        self.remove = remove        # indices que se borran por caer en el frame de otra key
+        self.times = times          # tiempos nuevos de las keys que se quedan
+        self.values = values        # valores nuevos de las keys que se quedan
+        self.moved = moved          # numero de keys que cambian de tiempo
+
+    def __repr__(self):
+        return "Snap({} moved, {} removed)".format(self.moved, len(self.remove))
+
+
+def target_frames(times, step=1.0):
+    if np is not None:
+        return np.floor(np.asarray(times, dtype=np.float64) / step + 0.5) * step
+    return [math.floor(time / step + 0.5) * step for time in times]
+
+
+def snap_keys(times, values, policy="nearest", step=1.0):
+    if policy not in POLICIES:
+        raise ValueError("Unknown snap policy: {}".format(policy))
+    count = len(times)
+    targets = target_frames(times, step)
+
+    if np is not None:
+        times_column = np.asarray(times, dtype=np.float64)
+        distance = np.abs(times_column - targets)
+        # Inicio de cada grupo de keys con el mismo destino (el redondeo no cambia el orden)
+        starts = np.flatnonzero(np.concatenate(([True], np.diff(targets) > EPSILON))).tolist()
+        distance = distance.tolist()
+        targets = targets.tolist()
+    else:
+        distance = [abs(time - target) for time, target in zip(times, targets)]
+        starts = [index for index in range(count) if index == 0 or targets[index] - targets[index - 1] > EPSILON]
+
+    keep, remove, new_times, new_values = [], [], [], []
+    for group, start in enumerate(starts):
+        end = starts[group + 1] if group + 1 < len(starts) else count
+        if policy == "original" and end - start > 1:
+            keep.extend(range(start, end))
+            new_times.extend(times[index] for index in range(start, end))
+            new_values.extend(values[index] for index in range(start, end))
+            continue
+
+        # min() se queda con la primera en caso de empate: la que ya esta en el frame o la anterior
+        chosen = min(range(start, end), key=distance.__getitem__)
+        keep.append(chosen)
+        remove.extend(index for index in range(start, end) if index != chosen)
+        new_times.append(targets[chosen])
+        if policy == "average":
+            new_values.append(sum(values[index] for index in range(start, end)) / (end - start))
+        else:
+            new_values.append(values[chosen])
+
+    moved = sum(1 for index, time in zip(keep, new_times) if abs(times[index] - time) > EPSILON)
+    return Snap(keep, sorted(remove), new_times, new_values, moved)
@@ -0,0 +1,94 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+# NumPy viene con Maya 2023+. Sin NumPy se usa el mismo algoritmo en Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                     Key time sets                                                           #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Aritmetica de conjuntos sobre los tiempos de key ordenados de una curva y una lista de referencia, para share y
+# match keys. Los tiempos se comparan redondeados a DECIMALS para que 12.0 y 12.000000001 sean la misma key.
+# Este modulo no depende de Maya.
+
+DECIMALS = 6
+
+
+def _rounded(times):
+    if np is not None:
+        return np.round(np.asarray(times, dtype=np.float64), DECIMALS)
+    return [round(time, DECIMALS) for time in times]
+
+
+def in_range(times, start=None, end=None):
+    # Mascara de los tiempos dentro de [start, end]; sin rango, todos
+    if np is not None:
+        times = np.asarray(times, dtype=np.float64)
+        mask = np.ones(len(times), dtype=bool)
+        if start is not None:
+            mask &= times >= start - 10 ** -DECIMALS
+        if end is not None:
+            mask &= times <= end + 10 ** -DECIMALS
+        return mask
+    low = -float("inf") if start is None else start - 10 ** -DECIMALS
+    high = float("inf") if end is None else end + 10 ** -DECIMALS
+    return [low <= time <= high for time in times]
+
+
+def unique_times(times):
+    # Tiempos ordenados sin repetir
+    if np is not None:
+        return np.unique(_rounded(times)).tolist()
+    return sorted(set(_rounded(times)))
+
+
+def missing_times(times, reference):
+    # Tiempos de reference que no tienen key en times
+    if np is not None:
+        reference = np.unique(_rounded(reference))
+        return reference[~np.isin(reference, _rounded(times))].tolist()
+    present = set(_rounded(times))
+    return [time for time in unique_times(reference) if time not in present]
+
+
+def extra_indices(times, reference, start=None, end=None):
+    # Indices de las keys de times (dentro del rango) cuyo tiempo no esta en reference
+    if np is not None:
+        extra = ~np.isin(_rounded(times), _rounded(reference)) & in_range(times, start, end)
+        return np.flatnonzero(extra).tolist()
+    wanted = set(_rounded(reference))
+    return [index for index, (time, inside) in enumerate(zip(_rounded(times), in_range(times, start, end)))
+            if inside and time not in wanted]
+
+
+def share_plan(times, reference, start=None, end=None):
+    # (tiempos a insertar, indices a borrar despues de insertarlos) para que la curva tenga dentro del rango
+    # exactamente las keys de reference
+    if start is not None or end is not None:
+        reference = [time for time, inside in zip(reference, in_range(reference, start, end)) if inside]
+    missing = missing_times(times, reference)
+    merged = unique_times(list(times) + missing)
+    return missing, extra_indices(merged, reference, start, end)
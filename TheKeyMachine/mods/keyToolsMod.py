@@ -71,6 +71,13 @@ import TheKeyMachine.mods.generalMod as general
 import TheKeyMachine.mods.uiMod as ui
 import TheKeyMachine.mods.keyToolsMod as keyTools
 import TheKeyMachine.mods.selSetsMod as selSets
+import TheKeyMachine.mods.defaultsStoreMod as defaultsStore
+import TheKeyMachine.mods.clipStoreMod as clipStore
+import TheKeyMachine.mods.jobRunnerMod as jobRunner
+import TheKeyMachine.mods.sceneBackendMod as sceneBackend
+import TheKeyMachine.mods.curveToolsMod as curveTools
+import TheKeyMachine.mods.sliderMod as slider
+import TheKeyMachine.mods.sliderMathMod as sliderMath
 
 
 # _____________________________________________________ General _______________________________________________________________#
@@ -151,27 +158,8 @@ def get_graph_editor_selected_keyframes():
 
 
 def getSelectedCurves():
-    curveNames = []
-
-    # get the current selection list
-    selectionList = om.MSelectionList()
-    om.MGlobal.getActiveSelectionList(selectionList)
-
-    # filter through the anim curves
-    listIter = om.MItSelectionList(selectionList,  om.MFn.kAnimCurve)
-    while not listIter.isDone():
-        # Retrieve current item's MObject
-        mobj = om.MObject()
-        listIter.getDependNode(mobj)
-
-        # Convert MObject to MFnDependencyNode
-        depNodeFn = om.MFnDependencyNode(mobj)
-        curveName = depNodeFn.name()
-
-        curveNames.append(curveName)
-        listIter.next()
-
-    return curveNames
+    # Curvas de animacion en la seleccion activa (OpenMaya 2.0 a traves del backend)
+    return sceneBackend.get_backend().selected_curves()
 
 
 def get_selected_channels():
@@ -345,29 +333,39 @@ def paste_link(*args):
         # Si no hay un rango seleccionado, aplicar solo al frame actual
         frames = [cmds.currentTime(query=True)]
     
-    for frame in frames:
-        cmds.currentTime(frame)
-        
-        for follow_obj in follow_objs:
-            if follow_obj in relative_matrices:
-                relative_matrix_list = relative_matrices[follow_obj]
-                relative_matrix = om.MMatrix()
-                for i in range(4):
-                    for j in range(4):
-                        relative_matrix.setElement(i, j, relative_matrix_list[i * 4 + j])
-                
-                main_matrix = cmds.xform(main_obj, query=True, matrix=True, worldSpace=True)
-                main_mmatrix = om.MMatrix(main_matrix)
-                
-                new_follow_matrix = relative_matrix * main_mmatrix
-                new_follow_matrix_list = [new_follow_matrix.getElement(i, j) for i in range(4) for j in range(4)]
-                
-                cmds.xform(follow_obj, matrix=new_follow_matrix_list, worldSpace=True)
-                cmds.setKeyframe(follow_obj, attribute='translate', t=frame)
-                cmds.setKeyframe(follow_obj, attribute='rotate', t=frame)
-                cmds.setKeyframe(follow_obj, attribute='scale', t=frame)
-            else:
-                cmds.warning(f"No se ha guardado una matriz relativa para {follow_obj}.")
+    # Un frame por paso; el job reparte los frames en la cola idle y deshace todo si se cancela
+    def steps():
+        for frame in frames:
+            cmds.currentTime(frame)
+            
+            for follow_obj in follow_objs:
+                if follow_obj in relative_matrices:
+                    relative_matrix_list = relative_matrices[follow_obj]
+                    relative_matrix = om.MMatrix()
+                    for i in range(4):
+                        for j in range(4):
+                            relative_matrix.setElement(i, j, relative_matrix_list[i * 4 + j])
+                    
+                    main_matrix = cmds.xform(main_obj, query=True, matrix=True, worldSpace=True)
+                    main_mmatrix = om.MMatrix(main_matrix)
+                    
+                    new_follow_matrix = relative_matrix * main_mmatrix
+                    new_follow_matrix_list = [new_follow_matrix.getElement(i, j) for i in range(4) for j in range(4)]
+                    
+                    cmds.xform(follow_obj, matrix=new_follow_matrix_list, worldSpace=True)
+                    cmds.setKeyframe(follow_obj, attribute='translate', t=frame)
+                    cmds.setKeyframe(follow_obj, attribute='rotate', t=frame)
+                    cmds.setKeyframe(follow_obj, attribute='scale', t=frame)
+                else:
+                    cmds.warning(f"No se ha guardado una matriz relativa para {follow_obj}.")
+
+            if (yield 1):
+                return
+
+    if len(frames) == 1:
+        jobRunner.run_steps(steps())
+    else:
+        jobRunner.Job("Paste link", steps(), len(frames), status='Pasting link...').start()
 
 
 
@@ -513,24 +511,19 @@ def share_keys(*args):
         cmds.warning(f"There is no keys in {objeto_principal}.")
         return
 
+    frames_claves = sorted(set(frames_claves))
+    start, end = (time_range[0], time_range[1]) if time_range and time_range[1] - time_range[0] != 1 else (None, None)
+
+    # Los objetos sin animacion reciben todas las keys de una vez; el resto, curva a curva por diferencia de tiempos
+    curves = []
     for objeto_secundario in objetos_secundarios:
-        if time_range:
-            frames_secundario = cmds.keyframe(objeto_secundario, query=True, time=(time_range[0], time_range[1])) or []
+        curvas_secundario = cmds.keyframe(objeto_secundario, query=True, name=True)
+        if curvas_secundario:
+            curves.extend(curvas_secundario)
         else:
-            frames_secundario = cmds.keyframe(objeto_secundario, query=True) or []
-
-        if not frames_secundario:
-            for frame in frames_claves:
-                cmds.setKeyframe(objeto_secundario, time=frame)
-            continue
+            cmds.setKeyframe(objeto_secundario, time=frames_claves)
 
-        for frame in frames_claves:
-            if frame not in frames_secundario:
-                cmds.setKeyframe(objeto_secundario, time=frame, insert=True)
-        
-        for frame in frames_secundario:
-            if frame not in frames_claves:
-                cmds.cutKey(objeto_secundario, time=(frame, frame))
+    curveTools.share_key_times(list(dict.fromkeys(curves)), frames_claves, start, end)
 
 
 
@@ -1083,11 +1076,6 @@ def move_keyframes_in_range(*args):
 is_dragging = False
 original_keyframes = {}
 original_values = {}  # Vamos a guardar el valor original de cada atributo
-frame_data_cache = {}  # New dictionary to cache frame data for performance
-original_keyframe_values = {} 
-
-global tween_frame_data_cache
-tween_frame_data_cache = {}
 
 global original_auto_key_state
 original_auto_key_state = None
@@ -1111,11 +1099,11 @@ def handle_autokey_end():
 
 
 
+pull_push_session = None
+
 def blend_pull_and_push(value, objs=None, selection=True):
-    global original_values, original_keyframe_values, is_dragging
+    global is_dragging, pull_push_session
 
-    selected_channels = get_selected_channels()
-    
     if not objs and not selection:
         raise ValueError("No objects given to blend_pull_and_push")
 
@@ -1126,135 +1114,43 @@ def blend_pull_and_push(value, objs=None, selection=True):
         cmds.undoInfo(openChunk=True)
         is_dragging = True
 
-    selected_keyframes = get_graph_editor_selected_keyframes()
+    if pull_push_session is None:
+        pull_push_session = slider.DragSession(objs, attrs=get_selected_channels(), suspend_autokey=False)
 
     # Define los factores de cambio
     rotation_factor = 2.0  # Ajusta este factor según tus necesidades para los atributos de rotación
     translation_factor = 0.1  # Ajusta este factor según tus necesidades para los atributos de translación
     other_factor = 0.2  # Ajusta este factor según tus necesidades para otros atributos
 
-    for obj in objs:
-        if not cmds.objExists(obj):
-            continue
-
-        attrs = selected_channels if selected_channels else cmds.listAttr(obj, keyable=True)
-
-        if attrs is None:
-            continue
-
-        for attr in attrs:
-            if not cmds.attributeQuery(attr, node=obj, exists=True):
-                continue
-
-            if cmds.getAttr(f'{obj}.{attr}', lock=True) or not cmds.getAttr(f'{obj}.{attr}', keyable=True):
-                # Si el atributo está bloqueado o no es keyable, continuar con el siguiente
-                continue
-
-            attrFull = f'{obj}.{attr}'
-
-            if attrFull not in original_values:
-                # Guardar el valor original solo si es numérico
-                original_attr_value = cmds.getAttr(attrFull)
-                if isinstance(original_attr_value, (float, int)):
-                    original_values[attrFull] = original_attr_value
-                else:
-                    # Si no es numérico, imprimir una advertencia y continuar con el siguiente atributo
-                    print(f"Warning: Non-numeric attribute value detected for {attrFull}: {original_attr_value}")
-                    continue
-
-            if selected_keyframes:
-                for curve, frame in selected_keyframes:
-                    if curve.startswith(obj) and curve.endswith(attr):
-                        key_identifier = f"{curve}_{frame}"  # Crea un identificador único para el keyframe
-                        if key_identifier not in original_keyframe_values:
-                            original_keyframe_values[key_identifier] = cmds.keyframe(curve, time=(frame,), q=True, valueChange=True)[0]
-
-                        original_value = original_keyframe_values[key_identifier]
-
-                        if attr in ['rx', 'ry', 'rz']:
-                            # Aplicar un factor de cambio para los atributos de rotación
-                            newValue = original_value + value * rotation_factor
-                        elif attr in ['tx', 'ty', 'tz']:
-                            # Aplicar un factor de cambio para los atributos de translación
-                            newValue = original_value + value * translation_factor
-                        else:
-                            # Aplicar un factor de cambio para otros atributos
-                            newValue = original_value + value * other_factor
-
-                        cmds.keyframe(curve, time=(frame,), valueChange=newValue)
-            else:
-                currentValue = original_values.get(attrFull)
-                if currentValue is not None:
-                    if attr in ['rx', 'ry', 'rz']:
-                        # Aplicar un factor de cambio para los atributos de rotación
-                        newValue = currentValue + value * rotation_factor
-                    elif attr in ['tx', 'ty', 'tz']:
-                        # Aplicar un factor de cambio para los atributos de translación
-                        newValue = currentValue + value * translation_factor
-                    else:
-                        # Aplicar un factor de cambio para otros atributos
-                        newValue = currentValue + value * other_factor
-
-                    # Limitar el valor entre un min y un max si existe
-                    minValue, maxValue = None, None
-                    if cmds.attributeQuery(attr, node=obj, minExists=True):
-                        minValue = cmds.attributeQuery(attr, node=obj, min=True)[0]
-                    if cmds.attributeQuery(attr, node=obj, maxExists=True):
-                        maxValue = cmds.attributeQuery(attr, node=obj, max=True)[0]
-
-                    if minValue is not None and newValue < minValue:
-                        continue
-
-                    if maxValue is not None and newValue > maxValue:
-                        continue
-
-                    cmds.setAttr(attrFull, newValue)
+    def pull_push_factor(session_plug):
+        if session_plug.attr in ['rx', 'ry', 'rz']:
+            return rotation_factor
+        elif session_plug.attr in ['tx', 'ty', 'tz']:
+            return translation_factor
+        return other_factor
+
+    # Con keys seleccionadas en el graph editor solo se mueven esas keys, una edicion por curva
+    selected_curve_keys = pull_push_session.selected_curve_keys()
+    if selected_curve_keys is not None:
+        for curve_keys in selected_curve_keys:
+            pull_push_session.offset_curve_keys(curve_keys, value * pull_push_factor(curve_keys.session_plug))
+    else:
+        # Los valores fuera de los limites min/max no se escriben
+        factors = pull_push_session.column("pull_push_factor", pull_push_factor)
+        keyable = pull_push_session.column("keyable", lambda session_plug: session_plug.keyable)
+        values, mask = sliderMath.pull_push(pull_push_session.arrays, value, factors, keyable)
+        pull_push_session.set_array_values(values, mask)
 
 
 
 
 # Blend normal .................................................................................
 
-is_cached = False
-frame_data_cache = {}
-def cache_keyframe_data(objs):
-    keyframe_data = {}
-    currentTime = cmds.currentTime(query=True)
-    for obj in objs:
-        attrs = cmds.listAttr(obj, keyable=True) or []
-        for attr in attrs:
-            attrFull = f'{obj}.{attr}'
-            if cmds.objExists(attrFull):
-                keyframes = cmds.keyframe(attrFull, query=True) or []
-                original_value = cmds.getAttr(attrFull)
-                previousKeyframes = [frame for frame in keyframes if frame < currentTime]
-                laterKeyframes = [frame for frame in keyframes if frame > currentTime]
-
-                previousFrame = max(previousKeyframes) if previousKeyframes else None
-                nextFrame = min(laterKeyframes) if laterKeyframes else None
-                previousValue = cmds.getAttr(attrFull, time=previousFrame) if previousFrame is not None else None
-                nextValue = cmds.getAttr(attrFull, time=nextFrame) if nextFrame is not None else None
-
-                minValue, maxValue = None, None
-                if cmds.attributeQuery(attr, node=obj, minExists=True):
-                    minValue = cmds.attributeQuery(attr, node=obj, min=True)[0]
-                if cmds.attributeQuery(attr, node=obj, maxExists=True):
-                    maxValue = cmds.attributeQuery(attr, node=obj, max=True)[0]
+blend_session = None
 
-                # Obtener el tipo de tangente para el keyframe anterior
-                prevTanType = None
-                if previousKeyframes:
-                    prevTanType = cmds.keyTangent(attrFull, query=True, time=(previousFrame,), outTangentType=True)[0]
-
-                keyframe_data[attrFull] = {
-                    "original_value": original_value,
-                    "previousValue": previousValue,
-                    "nextValue": nextValue,
-                    "minValue": minValue,
-                    "maxValue": maxValue,
-                    "prevTanType": prevTanType  # Añadir tipo de tangente
-                }
-    return keyframe_data
+def cache_keyframe_data(objs):
+    # Resuelve una sola vez todos los plugs con su key anterior y posterior
+    return slider.DragSession(objs)
 
 
 
@@ -1265,82 +1161,27 @@ def cache_keyframe_data(objs):
 
 def blend_to_key(percentage, objs=None, selection=True):
 
-    global is_dragging, frame_data_cache, is_cached, last_autokey_time, autokey_interval
+    global is_dragging, blend_session
 
 
     if not is_dragging:
         cmds.undoInfo(openChunk=True)
         is_dragging = True
 
-    if objs is None and selection:
-        objs = cmds.ls(selection=True)
-
-    if not objs:
-        if is_dragging:
-            cmds.undoInfo(closeChunk=True)
-            is_dragging = False
-        return
-
-    if not is_cached:
+    if blend_session is None:
+        if objs is None and selection:
+            objs = cmds.ls(selection=True)
 
-        frame_data_cache = cache_keyframe_data(objs)
-        is_cached = True
-
-    currentTime = cmds.currentTime(query=True)  
-
-    for obj in objs:
-        # Sólo atributos escalares keyables (evita double3 compuestos como rotate/translate)
-        attrs = cmds.listAttr(obj, keyable=True, scalar=True) or []
-
-        for attr in attrs:
-            attrFull = f"{obj}.{attr}"
-
-            # salta si no existe en la caché
-            if attrFull not in frame_data_cache:
-                continue
-
-            # salta si está bloqueado o no es seteable
-            if cmds.getAttr(attrFull, lock=True) or not cmds.getAttr(attrFull, settable=True):
-                continue
-
-            # salta tipos no numéricos
-            a_type = cmds.getAttr(attrFull, type=True)
-            if a_type in ("enum", "string", "message"):
-                continue
-
-            cachedData = frame_data_cache[attrFull]
-
-            # nombres tal cual en tu cache: "original_value", "previousValue", "nextValue"
-            orig = cachedData.get("original_value")
-            nxt  = cachedData.get("nextValue")
-            prev = cachedData.get("previousValue")
-
-            # si por cualquier motivo llega lista/tupla, pasa
-            if any(isinstance(v, (list, tuple)) for v in (orig, nxt, prev) if v is not None):
-                continue
-
-            # también salta si orig no es número
-            if not isinstance(orig, (int, float)):
-                continue
-
-            if nxt is not None and isinstance(nxt, (int, float)) and percentage > 0:
-                difference = nxt - orig
-            elif prev is not None and isinstance(prev, (int, float)):
-                difference = orig - prev
-            else:
-                continue
+        if not objs:
+            if is_dragging:
+                cmds.undoInfo(closeChunk=True)
+                is_dragging = False
+            return
 
-            weightedDifference = (difference * abs(percentage)) / 50.0
-            currentValue = orig + weightedDifference if percentage > 0 else orig - weightedDifference
+        blend_session = cache_keyframe_data(objs)
 
-            try:
-                cmds.setAttr(attrFull, float(currentValue))
-            except Exception:
-                # por si un attr acepta sólo enteros o tiene límites
-                try:
-                    cmds.setAttr(attrFull, int(round(currentValue)))
-                except Exception:
-                    continue
+    values, mask = sliderMath.blend(blend_session.arrays, percentage)
+    blend_session.set_array_values(values, mask)
 
 
 
@@ -1350,32 +1191,8 @@ def blend_to_key(percentage, objs=None, selection=True):
 
 
 def cache_blend_frame_data(objs, left_frame, right_frame):
-    frame_data_cache = {}
-    currentTime = cmds.currentTime(query=True)
-    for obj in objs:
-        attrs = cmds.listAttr(obj, keyable=True, scalar=True) or []  # Solo atributos escalares (numéricos)
-        for attr in attrs:
-            attrFull = f'{obj}.{attr}'
-            if cmds.objExists(attrFull):
-                leftValue = cmds.getAttr(attrFull, time=left_frame) if left_frame is not None else None
-                rightValue = cmds.getAttr(attrFull, time=right_frame) if right_frame is not None else None
-
-                # Obtener el tipo de tangente para el keyframe anterior
-                keyframes = cmds.keyframe(attrFull, query=True) or []
-                previousKeyframes = [frame for frame in keyframes if frame < currentTime]
-                prevTanType = None
-                if previousKeyframes:
-                    previousFrame = max(previousKeyframes)
-                    prevTanType = cmds.keyTangent(attrFull, query=True, time=(previousFrame,), outTangentType=True)[0]
-
-                frame_data_cache[attrFull] = {
-                    "leftValue": leftValue,
-                    "rightValue": rightValue,
-                    "original_value": cmds.getAttr(attrFull),
-                    "needsCalculation": True,
-                    "prevTanType": prevTanType  # Añadir tipo de tangente
-                }
-    return frame_data_cache
+    # Los valores vecinos se leen en los frames de los botones en lugar de en las keys
+    return slider.DragSession(objs, left_frame=left_frame, right_frame=right_frame)
 
 
 
@@ -1387,7 +1204,7 @@ def cache_blend_frame_data(objs, left_frame, right_frame):
 # Esta es la funcion para el modo Blend to Frame
 
 def blend_to_frame(percentage, left_frame=None, right_frame=None, objs=None, selection=True):
-    global is_dragging, frame_data_cache, is_cached
+    global is_dragging, blend_session
 
     if not objs and not selection:
         raise ValueError("No objects given to blend_to_frame")
@@ -1399,78 +1216,85 @@ def blend_to_frame(percentage, left_frame=None, right_frame=None, objs=None, sel
         cmds.undoInfo(openChunk=True)
         is_dragging = True
 
-    if not is_cached:
-        frame_data_cache = cache_blend_frame_data(objs, left_frame, right_frame)
-        is_cached = True
+    if blend_session is None:
+        blend_session = cache_blend_frame_data(objs, left_frame, right_frame)
 
-    for obj in objs:
-        attrs = cmds.listAttr(obj, keyable=True, scalar=True) or []
+    # Misma formula que Blend, con los valores de los frames izquierdo/derecho
+    values, mask = sliderMath.blend(blend_session.arrays, percentage)
+    blend_session.set_array_values(values, mask)
 
-        for attr in attrs:
-            attrFull = f'{obj}.{attr}'
-            if attrFull not in frame_data_cache:
-                continue
 
-            cachedData = frame_data_cache[attrFull]
-            if not cachedData["needsCalculation"]:
-                continue
 
-            original_value = cachedData["original_value"]
-            previousValue = cachedData["leftValue"]
-            nextValue = cachedData["rightValue"]
 
+# blend to default ....................................................................................
 
+default_session = None
 
-            if nextValue is not None and percentage > 0:
-                difference = nextValue - original_value
-            elif previousValue is not None:
-                difference = original_value - previousValue
+def blend_to_default(value, objs=None):
+    global is_dragging, default_session
 
-            else:
-                continue
+    if not is_dragging:
+        cmds.undoInfo(openChunk=True)
+        is_dragging = True
+
+    if default_session is None:
+        objs = objs or cmds.ls(selection=True, long=True)
+        if not objs:
+            return
+
+        # Los valores guardados estan en memoria, el JSON solo se relee si ha cambiado
+        defaults = defaultsStore.store
+        defaults.clear_node_cache()
 
-            weightedDifference = (difference * abs(percentage)) / 50.0
-            currentValue = original_value + weightedDifference if percentage > 0 else original_value - weightedDifference
+        default_session = slider.DragSession(objs, suspend_autokey=False)
 
-            cmds.setAttr(attrFull, currentValue)
+        def default_for(session_plug):
+            # Valor por defecto desde el JSON o desde Maya
+            return defaults.get(session_plug.node, session_plug.attr)
 
+        default_session.column("default_value", lambda session_plug: sliderMath.as_float(default_for(session_plug)))
 
+    # Interpolar entre el valor al empezar el drag y el valor por defecto. Antes cada tick mezclaba desde el valor
+    # actual y el resultado dependia de cuantos ticks llegaban; con el TickScheduler los ticks se agrupan, asi que
+    # se mezcla siempre desde el original: el slider (0 a 1) deja el valor por defecto en 1 y el original en 0
+    defaults = default_session.column("default_value", None)
+    values, mask = sliderMath.blend_to_default(default_session.arrays, defaults, value)
+    default_session.set_array_values(values, mask)
 
 
 
 
 
 
-def blendSliderReset(slider):
-    global original_keyframes, original_values, is_dragging, frame_data_cache, original_keyframe_values, is_cached
 
-    # Comprobar si frame_data_cache tiene elementos
-    if frame_data_cache:
-        currentTime = cmds.currentTime(query=True)
-        for attrFull, cacheData in frame_data_cache.items():
-            if 'prevTanType' in cacheData:
-                prevTanType = cacheData['prevTanType']
-                # Ajustar 'step' a 'stepnext'
-                if prevTanType == 'step':
-                    prevTanType = 'stepnext'
-                # Crear un nuevo keyframe
-                cmds.setKeyframe(attrFull, time=currentTime)
-                # Aplicar la tangente al keyframe
-                cmds.keyTangent(attrFull, edit=True, time=(currentTime,), inTangentType=prevTanType, outTangentType=prevTanType)
 
-        frame_data_cache = {}
-        is_cached = False
+def blendSliderReset(slider_name):
+    global original_keyframes, original_values, is_dragging, blend_session, pull_push_session, default_session
+
+    # Crear la key final con la tangente de la key anterior y liberar la sesion
+    if blend_session is not None:
+        blend_session.key_current_frame(blend_session.writable_plugs(), stepnext=True)
+        blend_session.release()
+        blend_session = None
+
+    # Pull/Push y Blend to Default no crean su key, solo dejan el valor final en el undo (con autokey, Maya lo keya)
+    if pull_push_session is not None:
+        pull_push_session.release()
+        pull_push_session = None
+
+    if default_session is not None:
+        default_session.release()
+        default_session = None
 
     # Resetear las variables globales
     original_keyframes = {}
     original_values = {}
-    original_keyframe_values = {}
 
     if is_dragging:
         cmds.undoInfo(closeChunk=True)
         is_dragging = False
 
-    cmds.floatSlider(slider, edit=True, value=0)
+    cmds.floatSlider(slider_name, edit=True, value=0)
 
 
 
@@ -1478,68 +1302,22 @@ def blendSliderReset(slider):
 # _____________________________________________________ Tween Machine _______________________________________________________________#
 
 
-
+tween_session = None
 
 
 
 
 def prepare_tween_data(objs=None, attrs=None):
-    global tween_frame_data_cache
-    tween_frame_data_cache = {}
-    currentTime = cmds.currentTime(query=True)
-
-
-    for obj in objs or cmds.ls(selection=True):
-        if not cmds.objExists(obj):
-            continue
-
-        current_attrs = attrs if attrs else cmds.listAttr(obj, keyable=True)
-        if current_attrs is None:
-            continue
-
-        for attr in current_attrs:
-            attrFull = '%s.%s' % (obj, attr)
-            keyframes = cmds.keyframe(attrFull, query=True) or []
-            
-            if not keyframes:
-                continue
-
-            previousKeyframes = [frame for frame in keyframes if frame < currentTime]
-            laterKeyframes = [frame for frame in keyframes if frame > currentTime]
-            
-            if not previousKeyframes or not laterKeyframes:
-                tween_frame_data_cache[attrFull] = {"needsCalculation": False}
-                continue
-
-            previousFrame = max(previousKeyframes)
-            nextFrame = min(laterKeyframes)
-
-            previousValue = cmds.getAttr(attrFull, time=previousFrame)
-            nextValue = cmds.getAttr(attrFull, time=nextFrame)
-            
-            tween_frame_data_cache[attrFull] = {
-                "previousValue": previousValue,
-                "nextValue": nextValue,
-                "needsCalculation": previousValue != nextValue
-            }
-
-            previousKeyframes = [frame for frame in keyframes if frame < currentTime]
-            if previousKeyframes:
-                previousFrame = max(previousKeyframes)
-                prevTanType = cmds.keyTangent(attrFull, query=True, time=(previousFrame,), outTangentType=True)[0]
-
-                tween_frame_data_cache[attrFull]["prevTanType"] = prevTanType
-
-    return tween_frame_data_cache
+    return slider.DragSession(objs or cmds.ls(selection=True), attrs=attrs)
 
 
 
 
 def tween(percentage, slider_name="bar_tween_slider"):
-    global is_dragging, tween_frame_data_cache
+    global is_dragging, tween_session
 
-    if not tween_frame_data_cache:
-        tween_frame_data_cache = prepare_tween_data()
+    if tween_session is None:
+        tween_session = prepare_tween_data()
 
     # puntos de "resistencia" al 100% y 0%
     resistance_points = [(100.0, 4.5), (0.0, 4.5)]
@@ -1553,102 +1331,30 @@ def tween(percentage, slider_name="bar_tween_slider"):
         cmds.undoInfo(openChunk=True)
         is_dragging = True
 
-    currentTime = cmds.currentTime(query=True)
-    adjustments = []
+    # Interpola entre la key anterior y la posterior, con los limites min/max del atributo
+    values, mask = sliderMath.tween(tween_session.arrays, percentage)
+    tween_session.set_array_values(values, mask)
 
-    for attrFull, cache in tween_frame_data_cache.items():
-        if not cache.get("needsCalculation", False):
-            continue
-
-        # salta attrs inexistentes/bloqueados/no seteables/no numéricos
-        try:
-            if not cmds.objExists(attrFull):
-                continue
-            if cmds.getAttr(attrFull, lock=True) or not cmds.getAttr(attrFull, settable=True):
-                continue
-            a_type = cmds.getAttr(attrFull, type=True)
-            if a_type in ("enum", "string", "message"):
-                continue
-        except Exception:
-            continue
-
-        previousValue = cache.get("previousValue")
-        nextValue = cache.get("nextValue")
-
-        # sin valores válidos, nada que hacer
-        if previousValue is None or nextValue is None:
-            continue
-
-        # evita restar listas/tuplas (double3, matrices, etc.)
-        if isinstance(previousValue, (list, tuple)) or isinstance(nextValue, (list, tuple)):
-            continue
-
-        # exige número escalar
-        if not isinstance(previousValue, (int, float)) or not isinstance(nextValue, (int, float)):
-            continue
-
-        difference = nextValue - previousValue
-        weightedDifference = (difference * percentage) / 100.0
-        currentValue = previousValue + weightedDifference
-
-        adjustments.append((attrFull, currentValue))
-
-
-    apply_tween_adjustments(adjustments, currentTime, tween_frame_data_cache)
-    
-
-def apply_tween_adjustments(adjustments, currentTime, tween_frame_data_cache):
-    for attrFull, currentValue in adjustments:
-        obj, attr = attrFull.split('.')
-        
-        if cmds.attributeQuery(attr, node=obj, minExists=True):
-            minLimit = cmds.attributeQuery(attr, node=obj, minimum=True)[0]
-            currentValue = max(currentValue, minLimit)
-
-        if cmds.attributeQuery(attr, node=obj, maxExists=True):
-            maxLimit = cmds.attributeQuery(attr, node=obj, maximum=True)[0]
-            currentValue = min(currentValue, maxLimit)
-                
-        cmds.setAttr(attrFull, currentValue)
-
-
-
-def tweenSliderReset(slider):
-    global original_keyframes, original_values, is_dragging, tween_frame_data_cache
-
-    currentTime = cmds.currentTime(query=True)
-
-    # Comprobar si tween_frame_data_cache tiene elementos
-    if tween_frame_data_cache:
-        for attrFull, cacheData in tween_frame_data_cache.items():
-            # Crear un nuevo keyframe
-            cmds.setKeyframe(attrFull, time=currentTime)
-
-            if 'prevTanType' in cacheData:
-                prevTanType = cacheData['prevTanType']
-                # Ajustar 'step' a 'stepnext'
-                if prevTanType == 'step':
-                    prevTanType = 'step'
-                # Aplicar la tangente al keyframe
-                cmds.keyTangent(attrFull, edit=True, time=(currentTime,), inTangentType=prevTanType, outTangentType=prevTanType)
-                print("") # this print hide the error that happens when applying setTangent step
-
-            if 'currentValue' in cacheData:
-                currentValue = cacheData['currentValue']
-                cmds.setAttr(attrFull, currentValue)
 
 
+def tweenSliderReset(slider_name):
+    global original_keyframes, original_values, is_dragging, tween_session
 
+    # Crear la key final en todos los atributos animados y liberar la sesion
+    if tween_session is not None:
+        keyed_plugs = [session_plug for session_plug in tween_session.plugs if session_plug.has_keys and not session_plug.locked]
+        tween_session.key_current_frame(keyed_plugs)
+        tween_session.release()
+        tween_session = None
 
     # Resetear las variables globales
     original_keyframes = {}
     original_values = {}
-    tween_frame_data_cache = {}
 
     if is_dragging:
         cmds.undoInfo(closeChunk=True)
         is_dragging = False
-    cmds.floatSlider(slider, edit=True, value=50)
+    cmds.floatSlider(slider_name, edit=True, value=50)
 
 
 
@@ -1657,7 +1363,13 @@ def tweenSliderReset(slider):
 # _____________________________________________________ Key Tools  Customgraph _______________________________________________________________#
 
 
-def deleteStaticCurves():
+def deleteStaticCurves(redundant=False, scene=False, tolerance=1e-4):
+    # Borra las curvas estaticas (y con redundant tambien las keys que sobran) de la seleccion o de toda la escena
+    if scene:
+        summary = curveTools.cleanup_keys(scene=True, tolerance=tolerance, redundant=redundant)
+        print(curveTools.cleanup_message(summary))
+        return summary
+
     # Obtener los objetos seleccionados con sus nombres completos una sola vez
     selected_objects = cmds.ls(selection=True, long=True)
 
@@ -1671,106 +1383,39 @@ def deleteStaticCurves():
     # Fusionar las listas de objetos y formas
     all_selected = list(set(selected_objects + selected_shapes))
 
-    # Recopilar todas las curvas de animación para todos los objetos seleccionados una sola vez
-    curves_to_delete = []
-    for obj in all_selected:
-        anim_curves = cmds.listConnections(obj, type="animCurve", connections=False, plugs=False) or []
-        for curve in anim_curves:
-            keyframes = cmds.keyframe(curve, query=True, timeChange=True) or []
-            values = cmds.keyframe(curve, query=True, valueChange=True) or []
-            if len(set(values)) == 1:  # Usar un conjunto para buscar valores únicos
-                curves_to_delete.append(curve)
+    if not all_selected:
+        return None
 
-    # Eliminar todas las curvas recopiladas en un solo comando
-    if curves_to_delete:
-        cmds.delete(curves_to_delete)
+    # Todas las curvas se leen en bloque y se borran con un solo delete / un cutKey por curva
+    summary = curveTools.cleanup_keys(nodes=all_selected, tolerance=tolerance, redundant=redundant)
+    print(curveTools.cleanup_message(summary))
+    return summary
 
 
 
-def snapKeyframes():
-# Obtén la selección actual
+def snapKeyframes(policy="nearest"):
+    # Keys en sub-frames al frame mas cercano. Si varias caen en el mismo frame, policy decide cual queda:
+    # "nearest", "average" o "original" (no borra ninguna)
     selected_objects = cmds.ls(sl=True)
+    if not selected_objects:
+        return None
 
-    for obj in selected_objects:
-
-        if not cmds.attributeQuery('translateX', node=obj, exists=True):
-            print(f"Objet {obj} is not animatable.")
-            continue
-
-        # Obtén las curvas de animación para el objeto
-        anim_curves = cmds.listConnections(obj, type="animCurve")
-
-        # Si el objeto no tiene curvas de animación, continúa con el siguiente objeto
-        if not anim_curves:
-            continue
-
-        for curve in anim_curves:
-            # Obtén todos los keyframes para la curva
-            keyframes = cmds.keyframe(curve, query=True)
-
-            # Si no hay keyframes, continúa con la siguiente curva
-            if not keyframes:
-                continue
-
-            for key in keyframes:
-                # Si el keyframe no está en un fotograma completo, redondea al más cercano
-                if not key.is_integer():
-                    # Almacena el valor del keyframe antes de eliminarlo
-                    value = cmds.keyframe(curve, time=(key, key), query=True, valueChange=True)
-
-                    # Almacena las tangentes del keyframe antes de eliminarlo
-                    in_tangent = cmds.keyTangent(curve, time=(key,), query=True, inTangentType=True)
-                    out_tangent = cmds.keyTangent(curve, time=(key,), query=True, outTangentType=True)
-
-                    # Borra el keyframe
-                    cmds.cutKey(curve, time=(key, key))
-
-                    # Redondea el fotograma
-                    rounded_key = round(key)
-
-                    # Establece el valor del keyframe borrado al nuevo fotograma redondeado
-                    cmds.setKeyframe(curve, time=rounded_key, value=value[0])
-
-                    # Establece las tangentes del keyframe redondeado
-                    cmds.keyTangent(curve, time=(rounded_key,), edit=True, inTangentType=in_tangent[0])
-                    cmds.keyTangent(curve, time=(rounded_key,), edit=True, outTangentType=out_tangent[0])
+    summary = curveTools.snap_keys(nodes=selected_objects, policy=policy)
+    print(curveTools.snap_message(summary))
+    return summary
 
 
 
 def shareKeys():
-    # Obtener los keyframes de todas las curvas
+    # Todas las curvas seleccionadas reciben las keys de todas las curvas de la seleccion (sin cambiar su forma)
     all_times = cmds.keyframe(query=True, timeChange=True)
 
     # Obtener las curvas seleccionadas
     selected_curves = cmds.keyframe(selected=True, query=True, name=True)
 
     # Verificar si hay al menos una curva seleccionada
-    if selected_curves:
-        for curve in selected_curves:
-            # Obtener el valor del primer y último keyframe de la curva seleccionada
-            first_frame_value = cmds.keyframe(curve, query=True, time=(all_times[0], all_times[0]), valueChange=True)
-            last_frame_value = cmds.keyframe(curve, query=True, time=(all_times[-1], all_times[-1]), valueChange=True)
-
-            # Si la curva tiene keyframes, establecer todos los keyframes con el valor del primer y último frame
-            if first_frame_value and last_frame_value:
-                first_frame_value = first_frame_value[0]
-                last_frame_value = last_frame_value[0]
-
-                # Crear todos los keyframes con el mismo valor del primer y último frame
-                for time in all_times:
-                    if time == all_times[0] or time == all_times[-1]:
-                        cmds.setKeyframe(curve, time=time, value=first_frame_value)
-                    else:
-                        # Obtener la lista de los keyframes actuales de la curva
-                        curve_times = cmds.keyframe(curve, query=True, timeChange=True)
-                        if time in curve_times:
-                            # Si el frame actual ya tiene un keyframe, usar su valor
-                            frame_value = cmds.keyframe(curve, query=True, time=(time, time), valueChange=True)[0]
-                        else:
-                            # Si no, usar el valor del primer keyframe
-                            frame_value = first_frame_value
-
-                        cmds.setKeyframe(curve, time=time, value=frame_value)
+    if selected_curves and all_times:
+        curveTools.share_key_times(list(dict.fromkeys(selected_curves)), all_times)
 
 
 
@@ -1779,85 +1424,32 @@ def match_keys():
     selected_curves = cmds.keyframe(selected=True, query=True, name=True)
 
     # Verificar si hay al menos dos curvas seleccionadas
-    if not selected_curves:
+    if not selected_curves or len(selected_curves) < 2:
         cmds.warning("Please select at least two animation curves.")
 
     else:
+        # La ultima curva seleccionada es la referencia
+        curveTools.match_curves(selected_curves[:-1], selected_curves[-1])
 
-        # Obtener los keyframes de la primera curva seleccionada
-        first_curve_times = cmds.keyframe(selected_curves[-1], query=True, timeChange=True)
-        first_curve_values = cmds.keyframe(selected_curves[-1], query=True, valueChange=True)
-
-        # Para cada curva restante, ajustar los keyframes para que coincidan con la primera curva
-        for curve in selected_curves[:-1]:
-            # Obtener los keyframes actuales de la curva
-            curve_times = cmds.keyframe(curve, query=True, timeChange=True)
-            
-            # Borrar keyframes que no están en la primera curva
-            extra_frames = set(curve_times) - set(first_curve_times)
-            for frame in extra_frames:
-                cmds.cutKey(curve, time=(frame, frame))
-
-            # Agregar o ajustar keyframes para que coincidan con la primera curva
-            for time, value in zip(first_curve_times, first_curve_values):
-                cmds.setKeyframe(curve, time=time, value=value)
-
-
-def flipCurves():
-    selectedCurves = cmds.keyframe(n=1, sl=1, q=1)
-    
-    if selectedCurves is not None:
-        for curve in selectedCurves:
-            # Obtener todos los valores de keyframes para la curva
-            values = cmds.keyframe(curve, query=True, valueChange=True)
-
-            # Calcular el punto medio de los keyframes
-            pivot = (min(values) + max(values)) / 2
 
-            # Realizar el flip usando el punto medio como pivote
-            cmds.scaleKey(curve, valueScale=-1, valuePivot=pivot)
-    else:
+def flipCurves(pivot="midrange"):
+    # Invierte las curvas con keys seleccionadas alrededor de pivot: "midrange", "selected", "default" o "zero"
+    if not curveTools.flip_curves(pivot):
         cmds.warning("Select at least one animation curve in Graph Editor.")
 
 
 
 def flipKeyGroup():
-
-    # Obtener las curvas con keyframes seleccionados
-    selectedCurves = cmds.keyframe(q=True, name=True, sl=True)
-    
-    if selectedCurves is not None:
-        for curve in selectedCurves:
-            # Obtener los tiempos de los keyframes seleccionados para la curva
-            selected_times = cmds.keyframe(curve, query=True, timeChange=True, sl=True)
-            
-            # Obtener los valores de los keyframes seleccionados en base a los tiempos
-            selected_values = [cmds.keyframe(curve, query=True, time=(t, t), valueChange=True)[0] for t in selected_times]
-
-            # Calcular el punto medio de los keyframes seleccionados
-            pivot = (min(selected_values) + max(selected_values)) / 2
-
-            # Realizar el flip de los keyframes seleccionados usando el punto medio como pivote
-            for t in selected_times:
-                value = cmds.keyframe(curve, query=True, time=(t, t), valueChange=True)[0]
-                flipped_value = pivot + (pivot - value)  # Calcula el valor opuesto en relación al pivot
-                cmds.keyframe(curve, edit=True, time=(t, t), valueChange=flipped_value)
-    else:
+    # Invierte solo las keys seleccionadas, alrededor del punto medio de sus valores
+    if not curveTools.flip_curves("midrange", selected_only=True):
         cmds.warning("Please select at least one keyframe in Graph Editor.")
 
 
 
 
 def flipFromKeyframe():
-    selectedCurves=cmds.keyframe(n=1, sl=1, q=1)
-
-    if selectedCurves is not None:
-        for piv in selectedCurves:
-            pivot = cmds.keyframe(query=True, valueChange=True)[0]
-        
-        for s in selectedCurves:
-            cmds.scaleKey(s, valueScale=-1, valuePivot=pivot, scaleSpecifiedKeys=1)
-    else:
+    # Cada curva se invierte alrededor del valor de su primera key seleccionada
+    if not curveTools.flip_curves("selected"):
         cmds.warning("No keys selected")
 
 
@@ -2037,42 +1629,22 @@ def save_default_values(*args):
     # Obtener objetos seleccionados
     objetos_seleccionados = cmds.ls(selection=True, long=True)
 
-    json_file_path = general.get_set_default_data_file()
-
-    # Asegurar que la carpeta donde se guardará el archivo exista
-    os.makedirs(os.path.dirname(json_file_path), exist_ok=True)
-
-    # Leer datos existentes del archivo JSON, si existe
-    if os.path.exists(json_file_path):
-        with open(json_file_path, 'r') as file:
-            data = json.load(file)
-    else:
-        data = {}
+    defaults = defaultsStore.store
 
     for obj in objetos_seleccionados:
-        # Extraer el namespace y el nombre corto del objeto
-        partes = obj.split(':')
-        namespace = partes[0] if len(partes) > 1 else 'default'
-        nombre_corto = partes[-1]
-
-        # Agregar namespace al diccionario si no existe
-        if namespace not in data:
-            data[namespace] = {}
-
         # Obtener atributos claveables que no estén ocultos o bloqueados
         atributos = cmds.listAttr(obj, keyable=True, unlocked=True, visible=True) or []
 
         # Actualizar o agregar valores de los atributos, excluyendo el atributo "tag"
+        valores = {}
         for attr in atributos:
             if attr == "tag":
                 continue  # Ignorar el atributo "tag"
-            atributo_completo = f'{nombre_corto}.{attr}'
-            valor = cmds.getAttr(f'{obj}.{attr}')
-            data[namespace][atributo_completo] = valor
+            valores[attr] = cmds.getAttr(f'{obj}.{attr}')
+        defaults.set_node_values(obj, valores)
 
-    # Guardar los datos actualizados en un archivo JSON
-    with open(json_file_path, 'w') as file:
-        json.dump(data, file, indent=4)
+    # Guardar los datos actualizados en el JSON (en segundo plano)
+    defaults.save()
 
     cmds.warning(f'Data saved')
 
@@ -2080,12 +1652,12 @@ def save_default_values(*args):
 
 def restore_default_data(*args):
 
-    json_file_path = general.get_set_default_data_file()
+    defaults = defaultsStore.store
 
     # Verificar si el archivo existe y vaciar su contenido
-    if os.path.exists(json_file_path):
-        with open(json_file_path, 'w') as file:
-            json.dump({}, file)  # Escribe un diccionario vacío en el archivo
+    if os.path.exists(defaults.path()):
+        defaults.clear()
+        defaults.save(indent=None)  # Escribe un diccionario vacío en el archivo
 
         cmds.warning(f"All default values restored")
     else:
@@ -2096,40 +1668,22 @@ def restore_default_data(*args):
 
 def remove_default_values_for_selected_object(*args):
 
-    json_file_path = general.get_set_default_data_file()
+    defaults = defaultsStore.store
+    json_file_path = defaults.path()
 
-    # Leer datos existentes del archivo JSON, si existe
-    if os.path.exists(json_file_path):
-        with open(json_file_path, 'r') as file:
-            data = json.load(file)
-    else:
+    if not os.path.exists(json_file_path):
         print("There is not a JSON file.")
         return
 
     # Obtener objetos seleccionados
     objetos_seleccionados = cmds.ls(selection=True, long=True)
 
+    # Eliminar la información de los objetos del JSON
     for obj in objetos_seleccionados:
-        # Extraer el namespace y el nombre corto del objeto
-        partes = obj.split(':')
-        namespace = partes[0] if len(partes) > 1 else 'default'
-        nombre_corto = partes[-1]
-
-        # Eliminar la información del objeto del JSON
-        if namespace in data:
-            # Crear una lista de claves a eliminar para evitar modificar el diccionario durante la iteración
-            keys_to_remove = [key for key in data[namespace] if key.startswith(nombre_corto + ".")]
-
-            for key in keys_to_remove:
-                del data[namespace][key]
-
-            # Si el namespace queda vacío, eliminarlo también
-            if not data[namespace]:
-                del data[namespace]
+        defaults.remove_node(obj)
 
-    # Guardar los datos actualizados en un archivo JSON
-    with open(json_file_path, 'w') as file:
-        json.dump(data, file, indent=4)
+    # Guardar los datos actualizados en el JSON (en segundo plano)
+    defaults.save()
 
     print(f"Data removed from JSON {json_file_path}")
 
@@ -2142,23 +1696,15 @@ def reset_object_values(reset_translations=False, reset_rotations=False):
     cmds.undoInfo(openChunk=True)
 
     try:
-        json_file_path = general.get_set_default_data_file()
-
-        # Leer datos del archivo JSON si existe
-        if os.path.exists(json_file_path):
-            with open(json_file_path, 'r') as file:
-                data = json.load(file)
-        else:
-            data = {}
+        # Valores guardados en memoria, sin leer el JSON salvo que haya cambiado
+        defaults = defaultsStore.store
+        defaults.clear_node_cache()
 
         selected_objects = cmds.ls(selection=True, long=True)
         selected_channels = get_selected_channels()
 
         for obj in selected_objects:
-            # Extraer el namespace y el nombre corto del objeto
-            partes = obj.split(':')
-            namespace = partes[0] if len(partes) > 1 else 'default'
-            nombre_corto = partes[-1]
+            saved_values = defaults.node_values(obj)
 
             attrs = selected_channels if selected_channels else cmds.listAttr(obj, keyable=True)
 
@@ -2166,13 +1712,11 @@ def reset_object_values(reset_translations=False, reset_rotations=False):
                 continue
 
             for attr in attrs:
-                attr_full = f'{nombre_corto}.{attr}'
-
                 # Comprobar si hay datos guardados para el atributo
-                if namespace in data and attr_full in data[namespace]:
+                if attr in saved_values:
                     # Restaurar valores desde el JSON
                     try:
-                        cmds.setAttr(obj + "." + attr, data[namespace][attr_full])
+                        cmds.setAttr(obj + "." + attr, saved_values[attr])
                     except Exception as e:
                         print(f"Could not process the attribute {attr} on {obj}: {str(e)}")
                 else:
@@ -2193,9 +1737,9 @@ def reset_object_values(reset_translations=False, reset_rotations=False):
                             if node_type not in ["animCurveTL", "animCurveTA", "animCurveTT", "animCurveTU"]:
                                 cmds.disconnectAttr(connections[0], obj + "." + attr)
 
-                        default_value = cmds.attributeQuery(attr, node=obj, listDefault=True)
-                        if default_value:
-                            cmds.setAttr(obj + "." + attr, default_value[0])
+                        default_value = defaults.list_default(obj, attr)
+                        if default_value is not None:
+                            cmds.setAttr(obj + "." + attr, default_value)
                     except Exception as e:
                         print(f"Could not process the attribute {attr} on {obj}: {str(e)}")
                         continue
@@ -2897,14 +2441,6 @@ def copy_animation(*args):
                     animated_channels.append(attr)
         return animated_channels
 
-    # Función para guardar la animación en un archivo JSON
-    def save_animation_to_json(json_file_path, animation_data):
-        # Asegurar que la carpeta donde se guardará el archivo exista
-        os.makedirs(os.path.dirname(json_file_path), exist_ok=True)
-        
-        with open(json_file_path, "w") as json_file:
-            json.dump(animation_data, json_file, indent=4)
-
     selected_objects = cmds.ls(selection=True)
 
     if not selected_objects:
@@ -2933,7 +2469,8 @@ def copy_animation(*args):
 
         json_file_path = general.get_copy_paste_animation_file()
 
-        save_animation_to_json(json_file_path, animation_data)
+        # Se guarda como contenedor binario junto a la ruta del JSON (clipStoreMod)
+        clipStore.save_data(json_file_path, "animation", animation_data)
 
         if time_range:
             clear_timeslider_selection()
@@ -2948,22 +2485,30 @@ def copy_animation(*args):
 
 def paste_animation(*args):
     def apply_animation_from_json(json_file_path, selected_objects):
-        # Leer el archivo JSON
-        with open(json_file_path, "r") as json_file:
-            animation_data = json.load(json_file)
+        backend = sceneBackend.get_backend()
 
-        # Aplicar animación a los objetos seleccionados
-        for control in selected_objects:
-            control_name = control.rsplit(":", 1)[-1]  # Eliminar namespace
+        # Leer solo los controles seleccionados del archivo
+        with clipStore.open_data(json_file_path, "animation") as animation_data:
+            if animation_data is None:
+                return
 
-            if control_name in animation_data:
-                for channel, anim_data in animation_data[control_name].items():
-                    # Borrar animación existente
-                    cmds.cutKey(control, time=(0, 10000), attribute=channel, option="keys")
+            # Aplicar animación a los objetos seleccionados
+            for control in selected_objects:
+                control_name = control.rsplit(":", 1)[-1]  # Eliminar namespace
 
-                    # Aplicar nueva animación
-                    for frame, value in zip(anim_data['keyframes'], anim_data['values']):
-                        cmds.setKeyframe(control, time=frame, attribute=channel, value=value)
+                if control_name in animation_data:
+                    for channel, anim_data in animation_data[control_name].items():
+                        # Borrar animación existente
+                        cmds.cutKey(control, time=(0, 10000), attribute=channel, option="keys")
+
+                        # Aplicar nueva animación: todas las keys del canal con dos escrituras. Si quedan keys fuera
+                        # del rango borrado se crean una a una para no pisarlas
+                        plug = f"{control}.{channel}"
+                        if not cmds.keyframe(plug, query=True, keyframeCount=True):
+                            backend.write_keys(plug, anim_data['keyframes'], anim_data['values'])
+                            continue
+                        for frame, value in zip(anim_data['keyframes'], anim_data['values']):
+                            cmds.setKeyframe(control, time=frame, attribute=channel, value=value)
 
     # Obtener los objetos seleccionados
     selected_objects = cmds.ls(selection=True)
@@ -2986,24 +2531,25 @@ def paste_animation(*args):
 
 def paste_insert_animation(*args):
     def apply_animation_from_json(json_file_path, selected_objects, insert_time):
-        # Leer el archivo JSON
-        with open(json_file_path, "r") as json_file:
-            animation_data = json.load(json_file)
+        # Leer solo los controles seleccionados del archivo
+        with clipStore.open_data(json_file_path, "animation") as animation_data:
+            if animation_data is None:
+                return
 
-        # Aplicar animación a los objetos seleccionados
-        for control in selected_objects:
-            control_name = control.rsplit(":", 1)[-1]  # Eliminar namespace
+            # Aplicar animación a los objetos seleccionados
+            for control in selected_objects:
+                control_name = control.rsplit(":", 1)[-1]  # Eliminar namespace
 
-            if control_name in animation_data:
-                for channel, anim_data in animation_data[control_name].items():
-                    if anim_data['keyframes']:
-                        # Calcular la diferencia de tiempo
-                        time_diff = insert_time - anim_data['keyframes'][0]
+                if control_name in animation_data:
+                    for channel, anim_data in animation_data[control_name].items():
+                        if anim_data['keyframes']:
+                            # Calcular la diferencia de tiempo
+                            time_diff = insert_time - anim_data['keyframes'][0]
 
-                        # Insertar animación ajustada
-                        for frame, value in zip(anim_data['keyframes'], anim_data['values']):
-                            adjusted_frame = frame + time_diff
-                            cmds.setKeyframe(control, time=adjusted_frame, attribute=channel, value=value)
+                            # Insertar animación ajustada
+                            for frame, value in zip(anim_data['keyframes'], anim_data['values']):
+                                adjusted_frame = frame + time_diff
+                                cmds.setKeyframe(control, time=adjusted_frame, attribute=channel, value=value)
 
     # Obtener los objetos seleccionados y el tiempo actual
     selected_objects = cmds.ls(selection=True)
@@ -3061,8 +2607,8 @@ def paste_opposite_animation(*args):
 
     json_file_path = general.get_copy_paste_animation_file()
 
-    with open(json_file_path, "r") as json_file:
-        animation_data = json.load(json_file)
+    with clipStore.open_data(json_file_path, "animation") as animation_data:
+        animation_data = dict(animation_data.items()) if animation_data is not None else {}
 
     for control_name, anim_data in animation_data.items():
         mirror_control_name = find_mirror_control(control_name)
@@ -3101,8 +2647,8 @@ def paste_animation_to(source_control_name=None, replace=True, insert_at_current
             return False
 
     def _load_animation(json_file_path):
-        with open(json_file_path, "r") as f:
-            return json.load(f)
+        with clipStore.open_data(json_file_path, "animation") as animation_data:
+            return dict(animation_data.items()) if animation_data is not None else {}
 
     # Destinos: selección actual
     targets = cmds.ls(selection=True) or []
@@ -3112,7 +2658,7 @@ def paste_animation_to(source_control_name=None, replace=True, insert_at_current
 
     # Cargar JSON
     json_file_path = general.get_copy_paste_animation_file()
-    if not os.path.exists(json_file_path):
+    if not clipStore.data_exists(json_file_path):
         cmds.warning("No animation file found. Please copy animation first.")
         return
 
@@ -3229,11 +2775,6 @@ def paste_animation_to(source_control_name=None, replace=True, insert_at_current
 
 
 def copy_pose(*args):
-    def save_pose_to_json(json_file_path, pose_data):
-        os.makedirs(os.path.dirname(json_file_path), exist_ok=True)
-        with open(json_file_path, "w") as json_file:
-            json.dump(pose_data, json_file, indent=4)
-
     selected_objects = cmds.ls(selection=True)
 
     if not selected_objects:
@@ -3262,7 +2803,7 @@ def copy_pose(*args):
 
     json_file_path = general.get_copy_paste_pose_file()
 
-    save_pose_to_json(json_file_path, pose_data)
+    clipStore.save_data(json_file_path, "pose", pose_data)
 
     cmds.warning("Pose saved")
 
@@ -3289,9 +2830,10 @@ def paste_pose(*args):
         return False
 
     def apply_pose_from_json(json_file_path, selected_objects):
-        # Leer el archivo JSON
-        with open(json_file_path, "r") as json_file:
-            pose_data = json.load(json_file)
+        # Leer solo los controles seleccionados del archivo
+        with clipStore.open_data(json_file_path, "pose") as stored:
+            names = [control.rsplit(":", 1)[-1] for control in selected_objects]
+            pose_data = {name: stored[name] for name in names if stored is not None and name in stored}
 
         # Aplicar pose a los objetos seleccionados
         for control in selected_objects:
@@ -3329,35 +2871,47 @@ def paste_pose(*args):
 
 
 
+# Exportar lo copiado en el formato JSON de siempre, para llevarlo a otra maquina o a otra herramienta
 
+COPY_DATA_FILES = {
+    "animation": general.get_copy_paste_animation_file,
+    "pose": general.get_copy_paste_pose_file,
+    "worldspace": general.get_copy_worldspace_data_file,
+}
 
-# ______________________________________________ TANGENTS
 
+def export_copy_data(kind, *args):
+    json_file_path = COPY_DATA_FILES[kind]()
+    if not clipStore.data_exists(json_file_path):
+        cmds.warning("There is no copied {} to export.".format(kind))
+        return None
 
-# MATCH CYCLE
+    target = cmds.fileDialog2(fileMode=0, fileFilter="JSON (*.json)", caption="Export {} as JSON".format(kind.title()))
+    if not target:
+        return None
+    target = target[0]
+
+    # Un JSON mas reciente en la ruta de la herramienta se leeria al pegar en lugar del contenedor
+    if os.path.normcase(os.path.abspath(target)) == os.path.normcase(os.path.abspath(json_file_path)):
+        cmds.warning("Choose a file outside the TheKeyMachine data folder.")
+        return None
+
+    clipStore.export_json(json_file_path, kind, target)
+    cmds.warning("{} exported to {}".format(kind.title(), target))
+    return target
 
-def getSelectedCurves():
-    curveNames = []
 
-    # get the current selection list
-    selectionList = om.MSelectionList()
-    om.MGlobal.getActiveSelectionList(selectionList)
 
-    # filter through the anim curves
-    listIter = om.MItSelectionList(selectionList,  om.MFn.kAnimCurve)
-    while not listIter.isDone():
-        # Retrieve current item's MObject
-        mobj = om.MObject()
-        listIter.getDependNode(mobj)
 
-        # Convert MObject to MFnDependencyNode
-        depNodeFn = om.MFnDependencyNode(mobj)
-        curveName = depNodeFn.name()
 
-        curveNames.append(curveName)
-        listIter.next()
+# ______________________________________________ TANGENTS
+
+
+# MATCH CYCLE
 
-    return curveNames
+def getSelectedCurves():
+    # Curvas de animacion en la seleccion activa (OpenMaya 2.0 a traves del backend)
+    return sceneBackend.get_backend().selected_curves()
 
 
 def match_curve_cycle(*args):
@@ -3401,46 +2955,13 @@ def get_graph_editor_selected_keyframes():
 
     return keyframes
 
-def calculateTangentAngle(curve, time1, value1, time2, value2):
-    # Calcula el ángulo de la tangente entre dos keyframes
-    if time2 - time1 == 0:
-        return 0  # Evitar división por cero
-    angle_radians = math.atan2(value2 - value1, time2 - time1)
-    angle_degrees = math.degrees(angle_radians)
-    return angle_degrees
-
 def bouncy_tangets(*args, angle_adjustment_factor=1.3):  # Ajuste de ángulo
-    selectedKeyframes = get_graph_editor_selected_keyframes()
-
-    if not selectedKeyframes:
+    # Todas las keys seleccionadas de cada curva se calculan de una vez y se escriben en bloque
+    if not curveTools.set_tangents("Bouncy", angle_adjustment_factor):
         cmds.warning("Please select a keyframe in GraphEditor")
-        return
-
-    for curve, time in selectedKeyframes:
-        # Obtener los tiempos y valores de los keyframes
-        keyTimes = cmds.keyframe(curve, query=True, timeChange=True)
-        keyValues = cmds.keyframe(curve, query=True, valueChange=True)
-
-        # Encontrar índice del keyframe actual
-        currentIndex = keyTimes.index(time)
-
-        # Calcular ángulo para la tangente de entrada
-        if currentIndex > 0:
-            inAngle = calculateTangentAngle(curve, keyTimes[currentIndex - 1], keyValues[currentIndex - 1], time, keyValues[currentIndex])
-        else:
-            inAngle = 0  # No hay keyframe anterior
-
-        # Calcular ángulo para la tangente de salida
-        if currentIndex < len(keyTimes) - 1:
-            outAngle = calculateTangentAngle(curve, time, keyValues[currentIndex], keyTimes[currentIndex + 1], keyValues[currentIndex + 1])
-        else:
-            outAngle = 0  # No hay keyframe posterior
-
-        adjusted_in_angle = max(-85, min(85, inAngle * angle_adjustment_factor))
-        adjusted_out_angle = max(-85, min(85, outAngle * angle_adjustment_factor))
 
 
-        # Ajustar las tangentes con el factor de ajuste de ángulo
-        cmds.keyTangent(curve, time=(time,), edit=True, lock=False, absolute=True, 
-                        inAngle=adjusted_in_angle, 
-                        outAngle=adjusted_out_angle)
\ No newline at end of file
+def set_tangent_mode(mode, factor=None):
+    # Modos de tangentEngine: "Bouncy", "Auto Clamped", "Flat Extremes", "Overshoot"
+    if not curveTools.set_tangents(mode, factor):
+        cmds.warning("Please select a keyframe in GraphEditor")
\ No newline at end of file
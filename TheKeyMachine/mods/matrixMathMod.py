@@ -0,0 +1,196 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+
+# NumPy viene con Maya 2023+. Sin NumPy se usa el mismo algoritmo en Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                     Transform matrices                                                      #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Matrices 4x4 de transform con la convencion de Maya: vectores fila, traslacion en la ultima fila y
+# matriz = escala * rotacion * jointOrient * traslacion, con la rotacion compuesta en el orden de rotateOrder
+# ("xyz" gira primero en X). No se tienen en cuenta pivotes, shear ni rotateAxis.
+#
+# Todas las funciones trabajan sobre lotes: con NumPy arrays (n, 4, 4) y (n, 3); sin NumPy listas de matrices
+# 4x4 (listas de filas) y listas de triples. Angulos en grados. Este modulo no depende de Maya.
+
+ROTATE_ORDERS = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+AXES = {"x": 0, "y": 1, "z": 2}
+EPSILON = 1e-9
+
+
+def _order(order):
+    return ROTATE_ORDERS[order] if isinstance(order, int) else order
+
+
+def _axis_matrix(axis, cosine, sine):
+    # Rotacion de vectores fila alrededor de un eje
+    if axis == 0:
+        return [[1.0, 0.0, 0.0], [0.0, cosine, sine], [0.0, -sine, cosine]]
+    if axis == 1:
+        return [[cosine, 0.0, -sine], [0.0, 1.0, 0.0], [sine, 0.0, cosine]]
+    return [[cosine, sine, 0.0], [-sine, cosine, 0.0], [0.0, 0.0, 1.0]]
+
+
+def _multiply3(a, b):
+    return [[sum(a[row][i] * b[i][column] for i in range(3)) for column in range(3)] for row in range(3)]
+
+
+def _multiply4(a, b):
+    return [[sum(a[row][i] * b[i][column] for i in range(4)) for column in range(4)] for row in range(4)]
+
+
+def identity(count):
+    if np is not None:
+        return np.tile(np.eye(4), (count, 1, 1))
+    return [[[1.0 if row == column else 0.0 for column in range(4)] for row in range(4)] for _ in range(count)]
+
+
+def from_flat(values):
+    # Listas de 16 valores (como getAttr .worldMatrix) -> matrices 4x4
+    if np is not None:
+        return np.asarray(values, dtype=np.float64).reshape(-1, 4, 4)
+    return [[list(flat[row * 4:row * 4 + 4]) for row in range(4)] for flat in values]
+
+
+def rotation_matrices(rotations, order="xyz"):
+    # (n, 3) angulos -> (n, 3, 3) rotaciones
+    axes = [AXES[axis] for axis in _order(order)]
+    if np is not None:
+        radians = np.radians(np.asarray(rotations, dtype=np.float64).reshape(-1, 3))
+        result = None
+        for axis in axes:
+            cosine, sine = np.cos(radians[:, axis]), np.sin(radians[:, axis])
+            zeros, ones = np.zeros_like(cosine), np.ones_like(cosine)
+            if axis == 0:
+                rows = [[ones, zeros, zeros], [zeros, cosine, sine], [zeros, -sine, cosine]]
+            elif axis == 1:
+                rows = [[cosine, zeros, -sine], [zeros, ones, zeros], [sine, zeros, cosine]]
+            else:
+                rows = [[cosine, sine, zeros], [-sine, cosine, zeros], [zeros, zeros, ones]]
+            matrix = np.moveaxis(np.array(rows), 2, 0)
+            result = matrix if result is None else result @ matrix
+        return result
+
+    result = []
+    for rotation in rotations:
+        matrix = None
+        for axis in axes:
+            angle = math.radians(rotation[axis])
+            axis_matrix = _axis_matrix(axis, math.cos(angle), math.sin(angle))
+            matrix = axis_matrix if matrix is None else _multiply3(matrix, axis_matrix)
+        result.append(matrix)
+    return result
+
+
+def compose(translations, rotations, scales=None, order="xyz", joint_orient=None):
+    # Matrices locales de transform (o de joint, con joint_orient) para n muestras
+    rotation = rotation_matrices(rotations, order)
+    if joint_orient is not None:
+        orient = rotation_matrices([joint_orient], "xyz")[0]
+        rotation = rotation @ orient if np is not None else [_multiply3(matrix, orient) for matrix in rotation]
+
+    if np is not None:
+        count = len(rotation)
+        result = identity(count)
+        scales = np.ones((count, 3)) if scales is None else np.asarray(scales, dtype=np.float64).reshape(-1, 3)
+        result[:, :3, :3] = rotation * scales[:, :, None]
+        result[:, 3, :3] = np.asarray(translations, dtype=np.float64).reshape(-1, 3)
+        return result
+
+    result = []
+    scales = [(1.0, 1.0, 1.0)] * len(rotation) if scales is None else scales
+    for matrix, translate, scale in zip(rotation, translations, scales):
+        result.append([[matrix[row][column] * scale[row] for column in range(3)] + [0.0] for row in range(3)] +
+                      [list(translate) + [1.0]])
+    return result
+
+
+def multiply(a, b):
+    # Producto matriz a matriz de dos lotes del mismo tamaño
+    if np is not None:
+        return np.asarray(a) @ np.asarray(b)
+    return [_multiply4(left, right) for left, right in zip(a, b)]
+
+
+def euler_angles(rotation, order="xyz"):
+    # (n, 3, 3) rotaciones sin escala -> (n, 3) angulos en el orden de rotateOrder. En gimbal lock el tercer eje
+    # queda a 0
+    i, j, k = [AXES[axis] for axis in _order(order)]
+    sign = 1.0 if (j - i) % 3 == 1 else -1.0
+
+    if np is not None:
+        rotation = np.asarray(rotation, dtype=np.float64)
+        middle = np.arcsin(np.clip(-sign * rotation[:, i, k], -1.0, 1.0))
+        first = np.arctan2(sign * rotation[:, j, k], rotation[:, k, k])
+        last = np.arctan2(sign * rotation[:, i, j], rotation[:, i, i])
+        locked = np.abs(rotation[:, i, k]) > 1.0 - EPSILON
+        first = np.where(locked, np.arctan2(-sign * rotation[:, k, j], rotation[:, j, j]), first)
+        last = np.where(locked, 0.0, last)
+        result = np.zeros((len(rotation), 3))
+        result[:, i], result[:, j], result[:, k] = first, middle, last
+        return np.degrees(result)
+
+    result = []
+    for matrix in rotation:
+        middle = math.asin(max(-1.0, min(1.0, -sign * matrix[i][k])))
+        if abs(matrix[i][k]) > 1.0 - EPSILON:
+            first, last = math.atan2(-sign * matrix[k][j], matrix[j][j]), 0.0
+        else:
+            first, last = math.atan2(sign * matrix[j][k], matrix[k][k]), math.atan2(sign * matrix[i][j], matrix[i][i])
+        angles = [0.0, 0.0, 0.0]
+        angles[i], angles[j], angles[k] = math.degrees(first), math.degrees(middle), math.degrees(last)
+        result.append(angles)
+    return result
+
+
+def decompose(matrices, order="xyz", joint_orient=None):
+    # Matrices -> (traslaciones, rotaciones, escalas). Con joint_orient se descuenta de la rotacion, como en un joint
+    if np is not None:
+        matrices = np.asarray(matrices, dtype=np.float64)
+        scales = np.linalg.norm(matrices[:, :3, :3], axis=2)
+        rotation = matrices[:, :3, :3] / np.where(scales > EPSILON, scales, 1.0)[:, :, None]
+        if joint_orient is not None:
+            rotation = rotation @ rotation_matrices([joint_orient], "xyz")[0].T
+        return matrices[:, 3, :3].copy(), euler_angles(rotation, order), scales
+
+    translations, rotations, scales = [], [], []
+    orient = None
+    if joint_orient is not None:
+        orient = rotation_matrices([joint_orient], "xyz")[0]
+        orient = [[orient[column][row] for column in range(3)] for row in range(3)]
+    for matrix in matrices:
+        scale = [math.sqrt(sum(value * value for value in matrix[row][:3])) for row in range(3)]
+        rotation = [[matrix[row][column] / (scale[row] if scale[row] > EPSILON else 1.0) for column in range(3)]
+                    for row in range(3)]
+        if orient is not None:
+            rotation = _multiply3(rotation, orient)
+        rotations.append(rotation)
+        translations.append(list(matrix[3][:3]))
+        scales.append(scale)
+    return translations, euler_angles(rotations, order), scales
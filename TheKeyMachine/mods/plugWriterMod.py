@@ -0,0 +1,141 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                  OpenMaya batched writer                                                    #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Los sliders escriben cientos de atributos en cada tick. Con cmds.setAttr cada valor es un comando y una entrada
+# de undo; aqui los MPlug se resuelven una vez por sesion y todos los valores de un tick se aplican con un solo
+# MDGModifier.doIt(), es decir, una unica transaccion del DG.
+#
+# Un MDGModifier usado fuera de un comando no entra en la cola de undo. Por eso, al terminar el drag, commit()
+# devuelve los plugs a su valor original y aplica el valor final con cmds.setAttr dentro del chunk de undo que
+# abre el slider: una sola entrada de undo por drag.
+
+
+ANGLE_TYPES = ("doubleAngle", "floatAngle")
+LINEAR_TYPES = ("doubleLinear", "floatLinear")
+INT_TYPES = ("long", "short", "byte", "char", "enum")
+
+
+class PlugWriter(object):
+    def __init__(self):
+        self.mplugs = {}
+        self.attr_types = {}
+        self.original_values = {}
+        self.last_values = {}
+
+
+    def register(self, plug, attr_type, original_value):
+        self.attr_types[plug] = attr_type
+        self.original_values[plug] = original_value
+
+
+    def get_mplug(self, plug):
+        mplug = self.mplugs.get(plug)
+        if mplug is None:
+            selection = om.MSelectionList()
+            selection.add(plug)
+            mplug = selection.getPlug(0)
+            self.mplugs[plug] = mplug
+        return mplug
+
+
+    def add_to_modifier(self, modifier, plug, value):
+        add_plug_value(modifier, self.get_mplug(plug), self.attr_types.get(plug), value)
+
+
+    def write(self, values):
+        # values: lista de (plug, valor). Todo el tick en un solo doIt()
+        modifier = om.MDGModifier()
+        fallback = []
+
+        for plug, value in values:
+            try:
+                self.add_to_modifier(modifier, plug, value)
+            except (RuntimeError, ValueError, TypeError):
+                fallback.append((plug, value))
+            self.last_values[plug] = value
+
+        try:
+            modifier.doIt()
+        except RuntimeError:
+            fallback = values
+
+        for plug, value in fallback:
+            set_attr(plug, value)
+
+
+    def commit(self):
+        # Deja el valor final registrado en el undo del slider
+        if not self.last_values:
+            return
+
+        # write() apunta en last_values lo que escribe, asi que los valores finales se apartan antes
+        final_values = self.last_values
+        self.last_values = {}
+        self.write([(plug, self.original_values[plug]) for plug in final_values if plug in self.original_values])
+
+        for plug, value in final_values.items():
+            set_attr(plug, value)
+
+        self.last_values = {}
+
+
+    def clear(self):
+        self.mplugs = {}
+        self.attr_types = {}
+        self.original_values = {}
+        self.last_values = {}
+
+
+def add_plug_value(modifier, mplug, attr_type, value):
+    # setAttr trabaja en unidades de UI; el API en unidades internas (radianes, centimetros)
+    if attr_type in ANGLE_TYPES:
+        modifier.newPlugValueMAngle(mplug, om.MAngle(value, om.MAngle.uiUnit()))
+    elif attr_type in LINEAR_TYPES:
+        modifier.newPlugValueMDistance(mplug, om.MDistance(value, om.MDistance.uiUnit()))
+    elif attr_type == "time":
+        modifier.newPlugValueMTime(mplug, om.MTime(value, om.MTime.uiUnit()))
+    elif attr_type == "bool":
+        modifier.newPlugValueBool(mplug, bool(round(value)))
+    elif attr_type in INT_TYPES:
+        modifier.newPlugValueInt(mplug, int(round(value)))
+    elif attr_type == "float":
+        modifier.newPlugValueFloat(mplug, value)
+    else:
+        modifier.newPlugValueDouble(mplug, value)
+
+
+def set_attr(plug, value):
+    try:
+        cmds.setAttr(plug, float(value))
+    except Exception:
+        # por si un attr acepta solo enteros
+        try:
+            cmds.setAttr(plug, int(round(value)))
+        except Exception:
+            pass
@@ -0,0 +1,656 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+
+import TheKeyMachine.mods.curveSnapshotMod as curveSnapshot
+import TheKeyMachine.mods.keyIndexMod as keyIndex
+import TheKeyMachine.mods.plugWriterMod as plugWriter
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                      Scene backends                                                         #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Operaciones de escena que necesitan las herramientas, detras de una interfaz pequeña:
+#
+#   keyable_plugs(node)                      atributos keyables escalares
+#   plug_state(node, attr)                   lock, settable, keyable, tipo, limites y valor (None si no existe)
+#   get_value(plug, time=None)               valor en unidades de UI, opcionalmente evaluado en otro frame
+#   set_values([(plug, valor)], attr_types)  escribe valores
+#   read_keys(plug o curva)                  CurveKeyIndex con tiempos, valores y tangentes de la curva
+#   write_key_values(curva, indices, vals)   escribe valores de keys
+#   evaluate(plug, times)                    valores del plug en varios frames
+#   driven_plugs(curvas)                     {curva: "nodo.attrLargo"} que mueve cada curva
+#   long_name(node, attr)                    nombre largo del atributo
+#   default_value(plug)                      valor por defecto del atributo
+#   selected_curves()                        curvas de animacion en la seleccion activa
+#   read_curves(curvas)                      una CurveSnapshot por curva (columnas de keys, tangentes y seleccion)
+#   read_selected_curves()                   snapshots de las curvas con keys seleccionadas en el graph editor
+#   write_curve(snapshot)                    escribe los tiempos/valores cambiados de una snapshot
+#   commit_curve(snapshot)                   deja el estado final de la snapshot en el undo
+#   write_tangent_types(snapshot, indices)   escribe los tipos de tangente de las keys indicadas
+#   write_tangents(snapshot, indices, a, b)  angulos de entrada y salida de muchas keys en bloque
+#   remove_keys(curva, indices)              borra keys con un solo cutKey
+#   read_key_times(curvas)                   {curva: tiempos de key}, una consulta por curva
+#   insert_keys(curva, tiempos)              inserta keys sin cambiar la forma, con un solo setKeyframe
+#   write_keys(plug, tiempos, valores)       crea todas las keys de un canal sin keys con dos escrituras
+#   animated_curves(nodos=None)              curvas de animacion de los nodos (o de la seleccion)
+#   scene_curves()                           curvas de animacion de tiempo de toda la escena
+#   delete_curves(curvas)                    borra curvas enteras con un solo delete
+#   frames_per_second()                      fps de la unidad de tiempo de la escena
+#   sample_matrices(plugs, tiempos, prog)    matrices (16 floats) de cada plug en cada frame, sin mover el tiempo
+#
+# SceneBackend lo hace con maya.cmds (todas sus escrituras entran en el undo). OpenMayaBackend usa el API 2.0
+# (MPlug, MFnAnimCurve, MDGContext) en proceso y sin pasar por el parser de comandos; sus escrituras no entran en
+# el undo, asi que quien las use debe dejar el estado final con cmds al terminar (undoable = False).
+# Los tests usan un backend en memoria sobre la escena simulada (tests/perf/fakeBackend.py).
+
+
+class SceneBackend(object):
+    undoable = True
+
+    def clear(self):
+        # Olvida lo que se haya cacheado de la escena; se llama al empezar cada operacion
+        pass
+
+    def keyable_plugs(self, node):
+        return cmds.listAttr(node, keyable=True, scalar=True) or []
+
+    def long_name(self, node, attr):
+        return cmds.attributeQuery(attr, node=node, longName=True)
+
+    def plug_state(self, node, attr):
+        plug = "{}.{}".format(node, attr)
+        if not cmds.objExists(plug):
+            return None
+
+        state = PlugState()
+        state.locked = cmds.getAttr(plug, lock=True)
+        state.settable = cmds.getAttr(plug, settable=True)
+        state.keyable = cmds.getAttr(plug, keyable=True)
+        state.attr_type = cmds.getAttr(plug, type=True)
+        state.value = cmds.getAttr(plug)
+
+        if cmds.attributeQuery(attr, node=node, minExists=True):
+            state.min_value = cmds.attributeQuery(attr, node=node, minimum=True)[0]
+        if cmds.attributeQuery(attr, node=node, maxExists=True):
+            state.max_value = cmds.attributeQuery(attr, node=node, maximum=True)[0]
+        return state
+
+    def get_value(self, plug, time=None):
+        if time is None:
+            return cmds.getAttr(plug)
+        return cmds.getAttr(plug, time=time)
+
+    def default_value(self, plug):
+        node, _, attr = plug.rpartition(".")
+        default = cmds.attributeQuery(attr, node=node, listDefault=True)
+        return default[0] if default else 0.0
+
+    def set_values(self, values, attr_types=None):
+        for plug, value in values:
+            plugWriter.set_attr(plug, value)
+
+    def read_keys(self, plug):
+        return keyIndex.CurveKeyIndex.from_plug(plug)
+
+    def write_key_values(self, curve, indices, values):
+        for index, value in zip(indices, values):
+            cmds.keyframe(curve, edit=True, index=(index, index), absolute=True, valueChange=value)
+
+    def evaluate(self, plug, times):
+        return [cmds.getAttr(plug, time=time) for time in times]
+
+    def selected_curves(self):
+        return cmds.ls(selection=True, type="animCurve") or []
+
+    def driven_plugs(self, curves):
+        connections = cmds.listConnections([curve + ".output" for curve in curves], source=False, destination=True,
+                                           plugs=True, connections=True, skipConversionNodes=True) or []
+        return {output.split(".")[0]: driven for output, driven in zip(connections[0::2], connections[1::2])}
+
+    # ____ Snapshots ____
+
+    def selected_key_indices(self, curves=None):
+        # {curva: [indices]} de las keys seleccionadas en el graph editor
+        selected = cmds.keyframe(query=True, selected=True, name=True) or []
+        if curves is not None:
+            curves = set(curves)
+            selected = [curve for curve in selected if curve in curves]
+        return {curve: cmds.keyframe(curve, query=True, selected=True, indexValue=True) or [] for curve in selected}
+
+    def read_curves(self, curves, selection=True):
+        selected = self.selected_key_indices(curves) if selection else {}
+        driven = self.driven_plugs(curves)
+        return [self.read_curve(curve, selected.get(curve, ()), driven.get(curve)) for curve in curves]
+
+    def read_selected_curves(self):
+        selected = self.selected_key_indices()
+        curves = list(selected)
+        driven = self.driven_plugs(curves)
+        return [self.read_curve(curve, selected[curve], driven.get(curve)) for curve in curves]
+
+    def read_curve(self, curve, selected_indices=(), driven=None):
+        # Una consulta por columna para toda la curva
+        flat = cmds.keyframe(curve, query=True, timeChange=True, valueChange=True) or []
+        if not flat:
+            return curveSnapshot.CurveSnapshot(curve, [], [], driven=driven)
+
+        return curveSnapshot.CurveSnapshot(
+            curve, flat[0::2], flat[1::2],
+            in_types=cmds.keyTangent(curve, query=True, inTangentType=True),
+            out_types=cmds.keyTangent(curve, query=True, outTangentType=True),
+            in_angles=cmds.keyTangent(curve, query=True, inAngle=True),
+            out_angles=cmds.keyTangent(curve, query=True, outAngle=True),
+            in_weights=cmds.keyTangent(curve, query=True, inWeight=True),
+            out_weights=cmds.keyTangent(curve, query=True, outWeight=True),
+            selected_indices=selected_indices,
+            weighted=bool((cmds.keyTangent(curve, query=True, weightedTangents=True) or [False])[0]),
+            driven=driven)
+
+    def write_curve(self, snapshot):
+        # Un solo setAttr sobre .keyTimeValue para el rango de keys que ha cambiado (entra en el undo).
+        # Las keys tienen que seguir ordenadas por tiempo.
+        changed = snapshot.changed_range()
+        if changed is None:
+            return
+        start, end = changed
+        cmds.setAttr("{}.keyTimeValue[{}:{}]".format(snapshot.curve, start, end), *snapshot.key_time_values(start, end))
+        snapshot.mark_written()
+
+    def commit_curve(self, snapshot):
+        if not self.undoable and snapshot.is_modified():
+            # Las escrituras en proceso no estan en el undo: volver a lo leido y escribir el estado final con cmds
+            final_times, final_values = snapshot.times, snapshot.values
+            snapshot.times = curveSnapshot.copy_column(snapshot.original_times)
+            snapshot.values = curveSnapshot.copy_column(snapshot.original_values)
+            self.write_curve(snapshot)
+            snapshot.times, snapshot.values = final_times, final_values
+            SceneBackend.write_curve(self, snapshot)
+        else:
+            self.write_curve(snapshot)
+        snapshot.mark_committed()
+
+    def write_tangent_types(self, snapshot, indices=None):
+        # Un keyTangent por combinacion de tipos (entrada, salida) en lugar de uno por key
+        indices = range(len(snapshot)) if indices is None else indices
+        groups = {}
+        for index in indices:
+            groups.setdefault((snapshot.in_type(index), snapshot.out_type(index)), []).append(index)
+        for (in_type, out_type), group in groups.items():
+            cmds.keyTangent(snapshot.curve, edit=True, index=index_ranges(group), inTangentType=in_type,
+                            outTangentType=out_type)
+
+    # ____ Edicion de keys ____
+
+    def write_tangents(self, snapshot, indices, in_angles, out_angles):
+        # Un keyTangent deja las keys en fixed y sin lock; las componentes de las tangentes (kix/kiy/kox/koy, como
+        # las guarda un .ma) se escriben con un setAttr por componente sobre el tramo de la primera a la ultima key.
+        # Las keys del tramo que no se cambian reciben lo que ya tenian (un getAttr por componente); si no son fixed
+        # Maya no usa esos valores. Sin weights el vector es unitario; con weights se mantiene su x (el alcance en
+        # tiempo) y solo cambia la altura
+        if not len(indices):
+            return
+        curve = snapshot.curve
+        cmds.keyTangent(curve, edit=True, index=index_ranges(indices), inTangentType="fixed", outTangentType="fixed",
+                        lock=False)
+
+        angles = dict(zip(indices, zip(in_angles, out_angles)))
+        start, end = min(angles), max(angles)
+        gaps = len(angles) < end - start + 1
+        for column, x_attr, y_attr in ((0, "kix", "kiy"), (1, "kox", "koy")):
+            x_plug = "{}.{}[{}:{}]".format(curve, x_attr, start, end)
+            y_plug = "{}.{}[{}:{}]".format(curve, y_attr, start, end)
+            old_xs = component_values(x_plug) if snapshot.weighted or gaps else None
+            old_ys = component_values(y_plug) if gaps else None
+
+            xs, ys = [], []
+            for offset, index in enumerate(range(start, end + 1)):
+                if index not in angles:
+                    xs.append(old_xs[offset])
+                    ys.append(old_ys[offset])
+                    continue
+                radians = math.radians(angles[index][column])
+                x = old_xs[offset] if snapshot.weighted else math.cos(radians)
+                xs.append(x)
+                ys.append(x * math.tan(radians))
+            if not snapshot.weighted:
+                cmds.setAttr(x_plug, *xs)
+            cmds.setAttr(y_plug, *ys)
+
+    def remove_keys(self, curve, indices):
+        if indices:
+            cmds.cutKey(curve, index=index_ranges(indices), clear=True)
+
+    def read_key_times(self, curves):
+        return {curve: cmds.keyframe(curve, query=True, timeChange=True) or [] for curve in curves}
+
+    def insert_keys(self, curve, times):
+        if len(times):
+            cmds.setKeyframe(curve, time=list(times), insert=True)
+
+    def write_keys(self, plug, times, values):
+        # Un setKeyframe crea todas las keys (con las tangentes por defecto) y un setAttr sobre .keyTimeValue les
+        # da su valor. El canal no debe tener keys en otros tiempos. Tambien en OpenMayaBackend: MFnAnimCurve.addKeys
+        # no entra en el undo y pegar tiene que poder deshacerse
+        if not len(times):
+            return
+        cmds.setKeyframe(plug, time=list(times), value=values[0])
+        curve = cmds.keyframe(plug, query=True, name=True)[0]
+        flat = [value for pair in zip(times, values) for value in pair]
+        cmds.setAttr("{}.keyTimeValue[0:{}]".format(curve, len(times) - 1), *flat)
+
+    def animated_curves(self, nodes=None):
+        if nodes:
+            curves = cmds.keyframe(nodes, query=True, name=True)
+        else:
+            curves = cmds.keyframe(query=True, name=True)
+        return list(dict.fromkeys(curves or []))
+
+    def scene_curves(self):
+        # Solo curvas que dependen del tiempo: las de set driven key (animCurveU*) no son animacion
+        return cmds.ls(type=TIME_CURVE_TYPES) or []
+
+    def delete_curves(self, curves):
+        if curves:
+            cmds.delete(curves)
+
+    def frames_per_second(self):
+        unit = cmds.currentUnit(query=True, time=True)
+        if unit in TIME_UNIT_FPS:
+            return TIME_UNIT_FPS[unit]
+        try:
+            return float(unit.replace("fps", ""))
+        except ValueError:
+            return 24.0
+
+    # ____ Matrices ____
+
+    def sample_matrices(self, plugs, times, progress=None):
+        # getAttr -time evalua en otro frame sin cambiar currentTime. progress(frames hechos) se llama tras cada
+        # frame; si devuelve True se para y se devuelve lo muestreado hasta ahi
+        samples = [[] for _ in plugs]
+        for done, time in enumerate(times, 1):
+            for plug_samples, plug in zip(samples, plugs):
+                plug_samples.append(cmds.getAttr(plug, time=time))
+            if progress and progress(done):
+                break
+        return samples
+
+
+TIME_CURVE_TYPES = ["animCurveTL", "animCurveTA", "animCurveTT", "animCurveTU"]
+
+# Unidades de tiempo con nombre de currentUnit; el resto son "<n>fps"
+TIME_UNIT_FPS = {"game": 15.0, "film": 24.0, "pal": 25.0, "ntsc": 30.0, "show": 48.0, "palf": 50.0, "ntscf": 60.0}
+
+
+def component_values(plug):
+    # getAttr de un tramo de un multi devuelve un valor suelto si el tramo tiene un solo elemento
+    values = cmds.getAttr(plug)
+    return list(values) if isinstance(values, (list, tuple)) else [values]
+
+
+def index_ranges(indices):
+    # [0, 1, 2, 5, 7, 8] -> [(0, 2), (5, 5), (7, 8)] para el flag index de cutKey / keyTangent
+    ranges = []
+    for index in sorted(indices):
+        if ranges and index == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], index)
+        else:
+            ranges.append((index, index))
+    return ranges
+
+
+class PlugState(object):
+    __slots__ = ("locked", "settable", "keyable", "attr_type", "min_value", "max_value", "value")
+
+    def __init__(self):
+        self.locked = False
+        self.settable = True
+        self.keyable = True
+        self.attr_type = None
+        self.min_value = None
+        self.max_value = None
+        self.value = None
+
+
+# ____ OpenMaya 2.0 ____
+
+NUMERIC_TYPES = {
+    om.MFnNumericData.kBoolean: "bool",
+    om.MFnNumericData.kByte: "byte",
+    om.MFnNumericData.kChar: "char",
+    om.MFnNumericData.kShort: "short",
+    om.MFnNumericData.kInt: "long",
+    om.MFnNumericData.kFloat: "float",
+    om.MFnNumericData.kDouble: "double",
+}
+
+UNIT_TYPES = {
+    om.MFnUnitAttribute.kAngle: "doubleAngle",
+    om.MFnUnitAttribute.kDistance: "doubleLinear",
+    om.MFnUnitAttribute.kTime: "time",
+}
+
+# Nombres de tangente de MFnAnimCurve tal como los devuelve keyTangent
+TANGENT_NAMES = {}
+for _name, _constant in (("global", "kTangentGlobal"), ("fixed", "kTangentFixed"), ("linear", "kTangentLinear"),
+                         ("flat", "kTangentFlat"), ("spline", "kTangentSmooth"), ("step", "kTangentStep"),
+                         ("slow", "kTangentSlow"), ("fast", "kTangentFast"), ("clamped", "kTangentClamped"),
+                         ("plateau", "kTangentPlateau"), ("stepnext", "kTangentStepNext"), ("auto", "kTangentAuto")):
+    if hasattr(oma.MFnAnimCurve, _constant):
+        TANGENT_NAMES[getattr(oma.MFnAnimCurve, _constant)] = _name
+
+ANGLE_CURVES = (oma.MFnAnimCurve.kAnimCurveTA, oma.MFnAnimCurve.kAnimCurveUA)
+LINEAR_CURVES = (oma.MFnAnimCurve.kAnimCurveTL, oma.MFnAnimCurve.kAnimCurveUL)
+
+
+class OpenMayaBackend(SceneBackend):
+    undoable = False
+
+    def __init__(self):
+        self.mplugs = {}
+        self.curves = {}
+
+    def clear(self):
+        self.mplugs = {}
+        self.curves = {}
+
+    def get_mplug(self, plug):
+        mplug = self.mplugs.get(plug)
+        if mplug is None:
+            selection = om.MSelectionList()
+            selection.add(plug)
+            mplug = self.mplugs[plug] = selection.getPlug(0)
+        return mplug
+
+    def get_curve(self, curve):
+        fn = self.curves.get(curve)
+        if fn is None:
+            selection = om.MSelectionList()
+            selection.add(curve)
+            fn = self.curves[curve] = oma.MFnAnimCurve(selection.getDependNode(0))
+        return fn
+
+    def curve_of(self, mplug):
+        # Solo curvas conectadas directamente; capas de animacion, pairBlends... van por cmds
+        if not mplug.isDestination:
+            return None
+        source = mplug.source().node()
+        if not source.hasFn(om.MFn.kAnimCurve):
+            return None
+        return oma.MFnAnimCurve(source)
+
+    def long_name(self, node, attr):
+        return om.MFnAttribute(self.get_mplug("{}.{}".format(node, attr)).attribute()).name
+
+    def attr_type(self, attribute):
+        if attribute.hasFn(om.MFn.kUnitAttribute):
+            return UNIT_TYPES.get(om.MFnUnitAttribute(attribute).unitType())
+        if attribute.hasFn(om.MFn.kEnumAttribute):
+            return "enum"
+        if attribute.hasFn(om.MFn.kNumericAttribute):
+            return NUMERIC_TYPES.get(om.MFnNumericAttribute(attribute).numericType())
+        return None
+
+    def plug_state(self, node, attr):
+        try:
+            mplug = self.get_mplug("{}.{}".format(node, attr))
+        except RuntimeError:
+            return None
+
+        attribute = mplug.attribute()
+        state = PlugState()
+        state.locked = mplug.isLocked
+        state.keyable = mplug.isKeyable
+        state.attr_type = self.attr_type(attribute)
+
+        # Como getAttr -settable: bloqueado o conectado a algo que no sea una curva no se puede editar
+        state.settable = not state.locked and (not mplug.isDestination or self.curve_of(mplug) is not None)
+
+        if state.attr_type is None:
+            # Tipos que los sliders no interpolan: el valor se lee con cmds para conservar su forma
+            return SceneBackend.plug_state(self, node, attr)
+
+        state.value = self.plug_value(mplug, state.attr_type)
+
+        if attribute.hasFn(om.MFn.kNumericAttribute):
+            fn = om.MFnNumericAttribute(attribute)
+            if fn.hasMin():
+                state.min_value = fn.getMin()
+            if fn.hasMax():
+                state.max_value = fn.getMax()
+        elif attribute.hasFn(om.MFn.kUnitAttribute):
+            fn = om.MFnUnitAttribute(attribute)
+            if fn.hasMin():
+                state.min_value = ui_units(fn.getMin())
+            if fn.hasMax():
+                state.max_value = ui_units(fn.getMax())
+        return state
+
+    def plug_value(self, mplug, attr_type, context=None):
+        if attr_type == "doubleAngle":
+            getter = mplug.asMAngle
+        elif attr_type == "doubleLinear":
+            getter = mplug.asMDistance
+        elif attr_type == "time":
+            getter = mplug.asMTime
+        elif attr_type == "bool":
+            getter = mplug.asBool
+        elif attr_type in plugWriter.INT_TYPES:
+            getter = mplug.asInt
+        else:
+            getter = mplug.asDouble
+
+        return ui_units(in_context(getter, context))
+
+    def get_value(self, plug, time=None):
+        mplug = self.get_mplug(plug)
+        attr_type = self.attr_type(mplug.attribute())
+        if attr_type is None:
+            return SceneBackend.get_value(self, plug, time)
+        context = om.MDGContext(om.MTime(time, om.MTime.uiUnit())) if time is not None else None
+        return self.plug_value(mplug, attr_type, context)
+
+    def evaluate(self, plug, times):
+        return [self.get_value(plug, time) for time in times]
+
+    def sample_matrices(self, plugs, times, progress=None):
+        # Un MDGContext por frame: el grafo se evalua en ese tiempo sin tocar el tiempo global ni redibujar
+        mplugs = [self.get_mplug(plug) for plug in plugs]
+        samples = [[] for _ in plugs]
+        for done, time in enumerate(times, 1):
+            context = om.MDGContext(om.MTime(time, om.MTime.uiUnit()))
+            for plug_samples, mplug in zip(samples, mplugs):
+                data = om.MFnMatrixData(in_context(mplug.asMObject, context))
+                plug_samples.append(list(data.matrix()))
+            if progress and progress(done):
+                break
+        return samples
+
+    def set_values(self, values, attr_types=None):
+        # Un solo MDGModifier para todos los valores (no entra en el undo)
+        attr_types = attr_types or {}
+        modifier = om.MDGModifier()
+        for plug, value in values:
+            plugWriter.add_plug_value(modifier, self.get_mplug(plug), attr_types.get(plug), value)
+        modifier.doIt()
+
+    def read_keys(self, plug):
+        try:
+            if "." in plug:
+                fn = self.curve_of(self.get_mplug(plug))
+            else:
+                fn = self.get_curve(plug)
+        except RuntimeError:
+            fn = None
+        if fn is None:
+            return SceneBackend.read_keys(self, plug)
+
+        count = fn.numKeys
+        time_unit = om.MTime.uiUnit()
+        times = [fn.input(index).asUnits(time_unit) for index in range(count)]
+        values = [curve_value_to_ui(fn, fn.value(index)) for index in range(count)]
+        out_types = [TANGENT_NAMES.get(fn.outTangentType(index)) for index in range(count)]
+        return keyIndex.CurveKeyIndex(times, values, out_types)
+
+    def write_key_values(self, curve, indices, values):
+        fn = self.get_curve(curve)
+        for index, value in zip(indices, values):
+            fn.setValue(index, curve_value_to_internal(fn, value))
+
+    def read_curve(self, curve, selected_indices=(), driven=None):
+        # Una sola pasada por MFnAnimCurve
+        try:
+            fn = self.get_curve(curve)
+        except RuntimeError:
+            return SceneBackend.read_curve(self, curve, selected_indices, driven)
+
+        count = fn.numKeys
+        time_unit = om.MTime.uiUnit()
+        scale = curve_value_to_ui(fn, 1.0)
+        times, values = [0.0] * count, [0.0] * count
+        in_types, out_types = [None] * count, [None] * count
+        in_angles, out_angles = [0.0] * count, [0.0] * count
+        in_weights, out_weights = [1.0] * count, [1.0] * count
+
+        for index in range(count):
+            times[index] = fn.input(index).asUnits(time_unit)
+            values[index] = fn.value(index) * scale
+            in_types[index] = TANGENT_NAMES.get(fn.inTangentType(index), "auto")
+            out_types[index] = TANGENT_NAMES.get(fn.outTangentType(index), "auto")
+            angle, in_weights[index] = fn.getTangentAngleWeight(index, True)
+            in_angles[index] = angle.asDegrees()
+            angle, out_weights[index] = fn.getTangentAngleWeight(index, False)
+            out_angles[index] = angle.asDegrees()
+
+        return curveSnapshot.CurveSnapshot(curve, times, values, in_types, out_types, in_angles, out_angles,
+                                           in_weights, out_weights, selected_indices, fn.isWeighted, driven)
+
+    def write_curve(self, snapshot):
+        # En proceso, sin undo; commit_curve deja el estado final con cmds
+        changed = snapshot.changed_range()
+        if changed is None:
+            return
+        fn = self.get_curve(snapshot.curve)
+        time_unit = om.MTime.uiUnit()
+        scale = curve_value_to_internal(fn, 1.0)
+        for index in range(changed[0], changed[1] + 1):
+            if snapshot.times[index] != snapshot.written_times[index]:
+                fn.setInput(index, om.MTime(float(snapshot.times[index]), time_unit))
+            fn.setValue(index, float(snapshot.values[index]) * scale)
+        snapshot.mark_written()
+
+    def selected_curves(self):
+        curves = []
+        iterator = om.MItSelectionList(om.MGlobal.getActiveSelectionList(), om.MFn.kAnimCurve)
+        while not iterator.isDone():
+            curves.append(om.MFnDependencyNode(iterator.getDependNode()).name())
+            iterator.next()
+        return curves
+
+    def driven_plugs(self, curves):
+        driven = {}
+        for curve in curves:
+            try:
+                output = self.get_curve(curve).findPlug("output", False)
+            except RuntimeError:
+                continue
+            for destination in output.destinations():
+                # Saltar unitConversion como listConnections -skipConversionNodes
+                if destination.node().hasFn(om.MFn.kUnitConversion):
+                    conversion_output = om.MFnDependencyNode(destination.node()).findPlug("output", False)
+                    destinations = conversion_output.destinations()
+                    if not destinations:
+                        continue
+                    destination = destinations[0]
+                driven[curve] = "{}.{}".format(node_name(destination.node()),
+                                               destination.partialName(useLongNames=True))
+                break
+        return driven
+
+
+def in_context(getter, context):
+    # Maya 2022+ evalua en otro frame con MDGContext.makeCurrent(); versiones anteriores aceptan el contexto
+    if context is None:
+        return getter()
+    if hasattr(context, "makeCurrent"):
+        previous = context.makeCurrent()
+        try:
+            return getter()
+        finally:
+            previous.makeCurrent()
+    return getter(context)
+
+
+def node_name(mobject):
+    # Nombre corto unico, como lo devuelven ls y listConnections
+    if mobject.hasFn(om.MFn.kDagNode):
+        return om.MFnDagNode(mobject).partialPathName()
+    return om.MFnDependencyNode(mobject).name()
+
+
+def ui_units(value):
+    # MAngle / MDistance / MTime -> float en unidades de UI
+    if hasattr(value, "asUnits"):
+        return value.asUnits(value.uiUnit())
+    return value
+
+
+def curve_value_to_ui(fn, value):
+    # MFnAnimCurve trabaja en unidades internas (radianes, centimetros)
+    if fn.animCurveType in ANGLE_CURVES:
+        return om.MAngle(value).asUnits(om.MAngle.uiUnit())
+    if fn.animCurveType in LINEAR_CURVES:
+        return om.MDistance(value).asUnits(om.MDistance.uiUnit())
+    return value
+
+
+def curve_value_to_internal(fn, value):
+    if fn.animCurveType in ANGLE_CURVES:
+        return om.MAngle(value, om.MAngle.uiUnit()).asRadians()
+    if fn.animCurveType in LINEAR_CURVES:
+        return om.MDistance(value, om.MDistance.uiUnit()).asCentimeters()
+    return value
+
+
+# ____ Backend activo ____
+
+backend = None
+
+
+def get_backend():
+    global backend
+    if backend is None:
+        backend = OpenMayaBackend()
+    return backend
+
+
+def set_backend(new_backend):
+    # Los tests instalan aqui el backend en memoria; None vuelve al de OpenMaya
+    global backend
+    backend = new_backend
+    return backend
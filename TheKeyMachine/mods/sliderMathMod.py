@@ -0,0 +1,178 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+from array import array
+
+# NumPy viene con Maya 2023+. En versiones sin NumPy se usan los mismos kernels sobre array('d')
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                  Slider kernels                                                             #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Los datos de un drag se guardan como arrays paralelos (uno por columna) en lugar de un dict por atributo.
+# Cada modo del slider es una sola expresion sobre los arrays que devuelve el vector completo de valores
+# y una mascara con los canales que hay que escribir. Los valores que faltan se guardan como NaN y los
+# limites que no existen como -inf/+inf. Este modulo no depende de Maya.
+
+
+NAN = float("nan")
+INF = float("inf")
+
+
+def as_float(value, missing=NAN):
+    if isinstance(value, (int, float)):
+        return float(value)
+    return missing
+
+
+class SliderArrays(object):
+    def __init__(self, previous, next, original, minimum, maximum, valid):
+        if np is not None:
+            self.previous = np.asarray(previous, dtype=np.float64)
+            self.next = np.asarray(next, dtype=np.float64)
+            self.original = np.asarray(original, dtype=np.float64)
+            self.minimum = np.asarray(minimum, dtype=np.float64)
+            self.maximum = np.asarray(maximum, dtype=np.float64)
+            self.valid = np.asarray(valid, dtype=bool)
+        else:
+            self.previous = array("d", previous)
+            self.next = array("d", next)
+            self.original = array("d", original)
+            self.minimum = array("d", minimum)
+            self.maximum = array("d", maximum)
+            self.valid = array("b", [bool(v) for v in valid])
+
+    def __len__(self):
+        return len(self.original)
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows: iterable de (previous, next, original, min, max). None = no existe
+        previous, next_values, original, minimum, maximum, valid = [], [], [], [], [], []
+        for prev_value, next_value, original_value, min_value, max_value in rows:
+            previous.append(as_float(prev_value))
+            next_values.append(as_float(next_value))
+            original.append(as_float(original_value))
+            minimum.append(as_float(min_value, -INF))
+            maximum.append(as_float(max_value, INF))
+            valid.append(isinstance(original_value, (int, float)))
+        return cls(previous, next_values, original, minimum, maximum, valid)
+
+
+def _clip(values, minimum, maximum):
+    if np is not None:
+        return np.minimum(np.maximum(values, minimum), maximum)
+    return array("d", [min(max(v, lo), hi) for v, lo, hi in zip(values, minimum, maximum)])
+
+
+def _isnan(value):
+    return value != value
+
+
+
+# Tween: interpola entre la key anterior y la posterior. Solo canales con dos keys distintas
+
+def tween(data, percentage):
+    t = percentage / 100.0
+    if np is not None:
+        mask = data.valid & ~np.isnan(data.previous) & ~np.isnan(data.next) & (data.previous != data.next)
+        values = _clip(data.previous + (data.next - data.previous) * t, data.minimum, data.maximum)
+        return values, mask
+
+    mask = array("b", [bool(ok and not _isnan(p) and not _isnan(n) and p != n)
+                       for ok, p, n in zip(data.valid, data.previous, data.next)])
+    values = _clip(array("d", [p + (n - p) * t for p, n in zip(data.previous, data.next)]), data.minimum, data.maximum)
+    return values, mask
+
+
+
+# Blend to Key / Blend to Frame: empuja el valor original hacia la key (o frame) siguiente o anterior
+
+def blend(data, percentage):
+    weight = abs(percentage) / 50.0
+    sign = 1.0 if percentage > 0 else -1.0
+    if np is not None:
+        has_prev = ~np.isnan(data.previous)
+        use_next = ~np.isnan(data.next) if percentage > 0 else np.zeros(len(data), dtype=bool)
+        difference = np.where(use_next, data.next - data.original, data.original - data.previous)
+        mask = data.valid & (use_next | has_prev)
+        return data.original + sign * difference * weight, mask
+
+    values = array("d")
+    mask = array("b")
+    for ok, p, n, o in zip(data.valid, data.previous, data.next, data.original):
+        if percentage > 0 and not _isnan(n):
+            difference = n - o
+        elif not _isnan(p):
+            difference = o - p
+        else:
+            values.append(o)
+            mask.append(False)
+            continue
+        values.append(o + sign * difference * weight)
+        mask.append(bool(ok))
+    return values, mask
+
+
+
+# Pull / Push: desplaza el original un factor por canal. Los valores fuera de limites no se escriben
+
+def pull_push(data, value, factors, channel_mask=None):
+    if np is not None:
+        values = data.original + value * np.asarray(factors, dtype=np.float64)
+        mask = data.valid & (values >= data.minimum) & (values <= data.maximum)
+        if channel_mask is not None:
+            mask &= np.asarray(channel_mask, dtype=bool)
+        return values, mask
+
+    values = array("d", [o + value * f for o, f in zip(data.original, factors)])
+    mask = array("b", [bool(ok and lo <= v <= hi) for ok, v, lo, hi in zip(data.valid, values, data.minimum, data.maximum)])
+    if channel_mask is not None:
+        mask = array("b", [bool(m and c) for m, c in zip(mask, channel_mask)])
+    return values, mask
+
+
+
+# Blend to Default: mezcla lineal entre el original y el valor por defecto
+
+def blend_to_default(data, defaults, t):
+    if np is not None:
+        defaults = np.asarray(defaults, dtype=np.float64)
+        mask = data.valid & ~np.isnan(defaults)
+        return (1.0 - t) * data.original + t * defaults, mask
+
+    values = array("d", [(1.0 - t) * o + t * d for o, d in zip(data.original, defaults)])
+    mask = array("b", [bool(ok and not _isnan(d)) for ok, d in zip(data.valid, defaults)])
+    return values, mask
+
+
+
+def masked_items(values, mask):
+    # Devuelve (indice, valor) como floats de Python, listos para escribir en Maya
+    if np is not None and isinstance(mask, np.ndarray):
+        indices = np.flatnonzero(mask)
+        return list(zip(indices.tolist(), np.asarray(values)[indices].tolist()))
+    return [(i, v) for i, (v, m) in enumerate(zip(values, mask)) if m]
@@ -0,0 +1,326 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import maya.cmds as cmds
+
+import TheKeyMachine.mods.plugWriterMod as plugWriter
+import TheKeyMachine.mods.sceneBackendMod as sceneBackend
+import TheKeyMachine.mods.sliderMathMod as sliderMath
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                      Drag sessions                                                          #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Un DragSession se construye una sola vez cuando el usuario empieza a arrastrar un slider (blend, tween...).
+# Resuelve todos los plugs con su estado (lock, settable, tipo, limites, keys vecinas y autokey) para que
+# cada tick del slider solo tenga que hacer calculos y escribir valores, sin volver a preguntar a Maya.
+
+
+# Tipos de atributo que los sliders no pueden interpolar
+NON_NUMERIC_TYPES = ("enum", "string", "message")
+
+
+class SessionPlug(object):
+    __slots__ = ("node", "attr", "plug", "locked", "settable", "keyable", "attr_type", "min_value", "max_value",
+                 "original_value", "has_keys", "previous_frame", "next_frame", "previous_value", "next_value",
+                 "prev_tangent_type")
+
+    def __init__(self, node, attr):
+        self.node = node
+        self.attr = attr
+        self.plug = f"{node}.{attr}"
+        self.locked = False
+        self.settable = True
+        self.keyable = True
+        self.attr_type = None
+        self.min_value = None
+        self.max_value = None
+        self.original_value = None
+        self.has_keys = False
+        self.previous_frame = None
+        self.next_frame = None
+        self.previous_value = None
+        self.next_value = None
+        self.prev_tangent_type = None
+
+    @property
+    def writable(self):
+        if self.locked or not self.settable or self.attr_type in NON_NUMERIC_TYPES:
+            return False
+        return is_scalar(self.original_value)
+
+    def clamp(self, value):
+        if self.min_value is not None and value < self.min_value:
+            value = self.min_value
+        if self.max_value is not None and value > self.max_value:
+            value = self.max_value
+        return value
+
+
+class CurveKeys(object):
+    # Keys seleccionadas en el graph editor de una curva que mueve un plug de la sesion
+    __slots__ = ("curve", "session_plug", "indices", "offset", "original_values", "committed_offset")
+
+    def __init__(self, curve, session_plug, indices):
+        self.curve = curve
+        self.session_plug = session_plug
+        self.indices = indices
+        self.offset = 0.0               # desplazamiento ya aplicado a las keys durante el drag
+        self.original_values = None     # valores de las keys antes del drag (backend no undoable)
+        self.committed_offset = 0.0     # desplazamiento que ya esta en el undo
+
+
+def is_scalar(value):
+    # getAttr devuelve listas de tuplas para atributos compuestos (double3, matrices...)
+    return isinstance(value, (int, float))
+
+
+class DragSession(object):
+    def __init__(self, objs=None, attrs=None, left_frame=None, right_frame=None, suspend_autokey=True):
+        self.objs = objs if objs is not None else (cmds.ls(selection=True) or [])
+        self.current_time = cmds.currentTime(query=True)
+        self.left_frame = left_frame
+        self.right_frame = right_frame
+        self.plugs = []
+        self.plugs_by_name = {}
+        self.released = False
+        self._writable_plugs = None
+        self._arrays = None
+        self._columns = {}
+        self._curve_keys = None
+
+        # Todas las escrituras del drag pasan por un unico PlugWriter (OpenMaya 2.0)
+        self.writer = plugWriter.PlugWriter()
+
+        # Las lecturas de la escena (estado de plugs, keys, conexiones) van por el backend activo
+        self.backend = sceneBackend.get_backend()
+        self.backend.clear()
+
+        # Los modos que crean su propia key al soltar (blend, tween) desactivan el autokey durante el drag para que
+        # cada setAttr no cree keys. Pull/push y blend to default lo dejan como esta: con autokey el valor final se keya
+        self.autokey_state = suspend_autokey and cmds.autoKeyframe(query=True, state=True)
+        if self.autokey_state:
+            cmds.autoKeyframe(state=False)
+
+        skipped = []
+        for obj in self.objs:
+            if not cmds.objExists(obj):
+                continue
+
+            obj_attrs = attrs if attrs else self.backend.keyable_plugs(obj)
+            for attr in obj_attrs:
+                session_plug = SessionPlug(obj, attr)
+                if session_plug.plug in self.plugs_by_name:
+                    continue
+
+                try:
+                    if not self.resolve_plug(session_plug):
+                        continue
+                except (RuntimeError, ValueError) as e:
+                    skipped.append(f"{session_plug.plug} ({e})")
+                    continue
+
+                self.plugs.append(session_plug)
+                self.plugs_by_name[session_plug.plug] = session_plug
+
+                if session_plug.writable:
+                    self.writer.register(session_plug.plug, session_plug.attr_type, session_plug.original_value)
+
+        # Un solo aviso por drag con los plugs que no se han podido leer
+        if skipped:
+            cmds.warning("Skipping {} attributes: {}".format(len(skipped), ", ".join(skipped)))
+
+
+    def resolve_plug(self, session_plug):
+        # Devuelve False si el plug no existe en el nodo
+        plug = session_plug.plug
+        state = self.backend.plug_state(session_plug.node, session_plug.attr)
+        if state is None:
+            return False
+
+        session_plug.locked = state.locked
+        session_plug.settable = state.settable
+        session_plug.keyable = state.keyable
+        session_plug.attr_type = state.attr_type
+        session_plug.original_value = state.value
+        session_plug.min_value = state.min_value
+        session_plug.max_value = state.max_value
+
+        # Keys vecinas, sus valores y la tangente anterior salen del indice de la curva
+        key_index = self.backend.read_keys(plug)
+        session_plug.has_keys = bool(len(key_index))
+
+        previous_key = key_index.previous_key(self.current_time)
+        if previous_key is not None:
+            session_plug.previous_frame, session_plug.previous_value, session_plug.prev_tangent_type = previous_key
+
+        next_key = key_index.next_key(self.current_time)
+        if next_key is not None:
+            session_plug.next_frame, session_plug.next_value, _ = next_key
+
+        # Blend to Frame usa los frames de los botones en lugar de las keys vecinas
+        if self.left_frame is not None:
+            session_plug.previous_value = self.backend.get_value(plug, self.left_frame)
+        if self.right_frame is not None:
+            session_plug.next_value = self.backend.get_value(plug, self.right_frame)
+        return True
+
+
+    def writable_plugs(self):
+        if self._writable_plugs is None:
+            self._writable_plugs = [session_plug for session_plug in self.plugs if session_plug.writable]
+        return self._writable_plugs
+
+
+    @property
+    def arrays(self):
+        # Arrays paralelos (previous, next, original, min, max, valid) de los plugs escribibles
+        if self._arrays is None:
+            self._arrays = sliderMath.SliderArrays.from_rows(
+                (p.previous_value, p.next_value, p.original_value, p.min_value, p.max_value) for p in self.writable_plugs())
+        return self._arrays
+
+
+    def column(self, name, func):
+        # Columnas extra por plug escribible (factores, valores por defecto...), calculadas una vez por sesion
+        if name not in self._columns:
+            self._columns[name] = [func(p) for p in self.writable_plugs()]
+        return self._columns[name]
+
+
+    def selected_curve_keys(self):
+        # Mapa curva -> plug de la sesion de las keys seleccionadas en el graph editor, construido una vez por drag.
+        # Devuelve None si no hay keys seleccionadas.
+        if self._curve_keys is None:
+            curves = cmds.keyframe(query=True, selected=True, name=True) or []
+            if not curves:
+                self._curve_keys = False
+                return None
+
+            # Plugs keyables de la sesion por su nombre largo, que es el que devuelve listConnections
+            plugs_by_long_name = {}
+            for session_plug in self.writable_plugs():
+                if not session_plug.keyable:
+                    continue
+                long_attr = self.backend.long_name(session_plug.node, session_plug.attr)
+                plugs_by_long_name["{}.{}".format(session_plug.node, long_attr)] = session_plug
+
+            # Una sola resolucion de conexiones para todas las curvas
+            driven_plugs = self.backend.driven_plugs(curves)
+
+            self._curve_keys = []
+            for curve in curves:
+                session_plug = plugs_by_long_name.get(driven_plugs.get(curve))
+                if session_plug is None:
+                    continue
+                indices = cmds.keyframe(curve, query=True, selected=True, indexValue=True) or []
+                if indices:
+                    self._curve_keys.append(CurveKeys(curve, session_plug, indices))
+
+        return self._curve_keys if self._curve_keys is not False else None
+
+
+    def offset_curve_keys(self, curve_keys, offset):
+        # Desplaza todas las keys seleccionadas de la curva
+        delta = offset - curve_keys.offset
+        if not delta:
+            return
+
+        if self.backend.undoable:
+            self.offset_keys_in_undo(curve_keys, delta)
+            curve_keys.committed_offset = offset
+        else:
+            # Escritura directa en la curva; commit() deja el desplazamiento final en el undo
+            if curve_keys.original_values is None:
+                values = self.backend.read_keys(curve_keys.curve).values
+                curve_keys.original_values = [values[index] for index in curve_keys.indices]
+            self.backend.write_key_values(curve_keys.curve, curve_keys.indices,
+                                          [value + offset for value in curve_keys.original_values])
+        curve_keys.offset = offset
+
+
+    def offset_keys_in_undo(self, curve_keys, delta):
+        # Una sola edicion relativa por curva
+        cmds.keyframe(curve_keys.curve, edit=True, relative=True, valueChange=delta,
+                      index=[(index, index) for index in curve_keys.indices])
+
+
+    def commit_curve_keys(self):
+        for curve_keys in self._curve_keys or []:
+            delta = curve_keys.offset - curve_keys.committed_offset
+            if not delta:
+                continue
+            # Volver al valor original por el backend y aplicar el desplazamiento final con cmds
+            self.backend.write_key_values(curve_keys.curve, curve_keys.indices,
+                                          [value + curve_keys.committed_offset for value in curve_keys.original_values])
+            self.offset_keys_in_undo(curve_keys, delta)
+            curve_keys.committed_offset = curve_keys.offset
+
+
+    def set_array_values(self, values, mask):
+        # Escribe la salida de un kernel de sliderMath (indices de writable_plugs)
+        plugs = self.writable_plugs()
+        self.writer.write([(plugs[i].plug, value) for i, value in sliderMath.masked_items(values, mask)])
+
+
+    def set_values(self, values):
+        # values: lista de (SessionPlug, valor) calculados en el tick
+        self.writer.write([(session_plug.plug, value) for session_plug, value in values])
+
+
+    def commit(self):
+        self.writer.commit()
+        self.commit_curve_keys()
+
+
+    def key_current_frame(self, session_plugs, stepnext=False):
+        self.commit()
+
+        # Crea la key final del drag copiando la tangente de salida de la key anterior
+        for session_plug in session_plugs:
+            cmds.setKeyframe(session_plug.plug, time=self.current_time)
+
+            tangent_type = session_plug.prev_tangent_type
+            if not tangent_type:
+                continue
+            if stepnext and tangent_type == "step":
+                tangent_type = "stepnext"
+            cmds.keyTangent(session_plug.plug, edit=True, time=(self.current_time,), inTangentType=tangent_type, outTangentType=tangent_type)
+
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+
+        self.commit()
+        self.writer.clear()
+
+        if self.autokey_state:
+            cmds.autoKeyframe(state=True)
+
+        self.plugs = []
+        self.plugs_by_name = {}
+        self._writable_plugs = None
+        self._arrays = None
+        self._columns = {}
+        self._curve_keys = None
@@ -0,0 +1,173 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+
+# NumPy viene con Maya 2023+. Sin NumPy se usa el mismo algoritmo en Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                     Tangent engine                                                          #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Angulos de tangente de todas las keys seleccionadas de una curva en una sola pasada sobre sus columnas. Cada modo
+# recibe la curva entera (tiempos, valores y angulos actuales) y los indices de las keys a cambiar, y devuelve los
+# nuevos angulos de entrada y salida de esas keys, en el orden de indices:
+#
+#   Bouncy          angulo hacia cada key vecina (medido en frames, como siempre lo ha hecho bouncy) por factor
+#   Auto Clamped    pendiente entre las keys vecinas, plana en los extremos y limitada para no pasarse de ellas
+#   Flat Extremes   deja las tangentes como estan salvo en los picos y valles, que quedan planos
+#   Overshoot       multiplica la pendiente actual por factor (> 1 pasa de largo las keys, < 1 las suaviza)
+#
+# Tiempos en frames, valores en unidades de UI, angulos en grados como los devuelve keyTangent (tiempo en segundos,
+# por eso hace falta fps). Este modulo no depende de Maya.
+
+BOUNCY_LIMIT = 85.0
+
+
+def _segment_slopes(times, values):
+    # Pendiente de cada tramo entre keys (n - 1 valores), en unidades por frame
+    if np is not None:
+        return np.diff(values) / np.diff(times)
+    return [(values[i + 1] - values[i]) / (times[i + 1] - times[i]) for i in range(len(times) - 1)]
+
+
+def _neighbour_slopes(times, values):
+    # Pendiente del tramo anterior y del siguiente de cada key; 0 donde no hay tramo
+    slopes = _segment_slopes(times, values)
+    if np is not None:
+        return np.concatenate(([0.0], slopes)), np.concatenate((slopes, [0.0]))
+    return [0.0] + list(slopes), list(slopes) + [0.0]
+
+
+def _extremes(previous, following):
+    # Picos, valles, holds y los dos extremos de la curva
+    if np is not None:
+        extreme = previous * following <= 0.0
+        extreme[0] = extreme[-1] = True
+        return extreme
+    extreme = [a * b <= 0.0 for a, b in zip(previous, following)]
+    extreme[0] = extreme[-1] = True
+    return extreme
+
+
+def _to_angles(slopes, fps):
+    if np is not None:
+        return np.degrees(np.arctan(np.asarray(slopes) * fps))
+    return [math.degrees(math.atan(slope * fps)) for slope in slopes]
+
+
+def _to_slopes(angles, fps):
+    if np is not None:
+        return np.tan(np.radians(np.asarray(angles, dtype=np.float64))) / fps
+    return [math.tan(math.radians(angle)) / fps for angle in angles]
+
+
+def _pick(column, indices):
+    if np is not None:
+        return np.asarray(column)[list(indices)].tolist()
+    return [column[index] for index in indices]
+
+
+def _columns(times, values):
+    if np is not None:
+        return np.asarray(times, dtype=np.float64), np.asarray(values, dtype=np.float64)
+    return list(times), list(values)
+
+
+# ____ Modos ____
+
+def bouncy(times, values, indices, in_angles, out_angles, fps=24.0, factor=1.3):
+    times, values = _columns(times, values)
+    previous, following = _neighbour_slopes(times, values)
+    if np is not None:
+        in_column = np.clip(np.degrees(np.arctan(previous)) * factor, -BOUNCY_LIMIT, BOUNCY_LIMIT)
+        out_column = np.clip(np.degrees(np.arctan(following)) * factor, -BOUNCY_LIMIT, BOUNCY_LIMIT)
+    else:
+        in_column = [max(-BOUNCY_LIMIT, min(BOUNCY_LIMIT, math.degrees(math.atan(slope)) * factor)) for slope in previous]
+        out_column = [max(-BOUNCY_LIMIT, min(BOUNCY_LIMIT, math.degrees(math.atan(slope)) * factor)) for slope in following]
+    return _pick(in_column, indices), _pick(out_column, indices)
+
+
+def auto_clamped(times, values, indices, in_angles, out_angles, fps=24.0, factor=1.0):
+    times, values = _columns(times, values)
+    if len(times) < 3:
+        zeros = [0.0] * len(indices)
+        return zeros, list(zeros)
+    previous, following = _neighbour_slopes(times, values)
+    extreme = _extremes(previous, following)
+
+    if np is not None:
+        slopes = np.zeros(len(times))
+        slopes[1:-1] = (values[2:] - values[:-2]) / (times[2:] - times[:-2])
+        # Limite de Fritsch-Carlson: con menos de 3 veces la pendiente de cada tramo la curva no se pasa de las keys
+        limit = 3.0 * np.minimum(np.abs(previous), np.abs(following))
+        slopes = np.where(extreme, 0.0, np.clip(slopes, -limit, limit))
+    else:
+        slopes = [0.0] * len(times)
+        for i in range(1, len(times) - 1):
+            if extreme[i]:
+                continue
+            slope = (values[i + 1] - values[i - 1]) / (times[i + 1] - times[i - 1])
+            limit = 3.0 * min(abs(previous[i]), abs(following[i]))
+            slopes[i] = max(-limit, min(limit, slope))
+
+    angles = _pick(_to_angles(slopes, fps), indices)
+    return angles, list(angles)
+
+
+def flat_extremes(times, values, indices, in_angles, out_angles, fps=24.0, factor=1.0):
+    times, values = _columns(times, values)
+    previous, following = _neighbour_slopes(times, values)
+    extreme = _pick(_extremes(previous, following), indices)
+    new_in = [0.0 if flat else angle for flat, angle in zip(extreme, _pick(in_angles, indices))]
+    new_out = [0.0 if flat else angle for flat, angle in zip(extreme, _pick(out_angles, indices))]
+    return new_in, new_out
+
+
+def overshoot(times, values, indices, in_angles, out_angles, fps=24.0, factor=1.5):
+    in_slopes = _to_slopes(_pick(in_angles, indices), fps)
+    out_slopes = _to_slopes(_pick(out_angles, indices), fps)
+    if np is not None:
+        return _to_angles(in_slopes * factor, fps).tolist(), _to_angles(out_slopes * factor, fps).tolist()
+    return _to_angles([slope * factor for slope in in_slopes], fps), _to_angles([slope * factor for slope in out_slopes], fps)
+
+
+MODES = {
+    "Bouncy": bouncy,
+    "Auto Clamped": auto_clamped,
+    "Flat Extremes": flat_extremes,
+    "Overshoot": overshoot,
+}
+
+
+def compute_tangents(mode, times, values, indices, in_angles, out_angles, fps=24.0, factor=None):
+    # (angulos de entrada, angulos de salida) de las keys indicadas
+    function = MODES[mode]
+    if not len(indices):
+        return [], []
+    if factor is None:
+        return function(times, values, indices, in_angles, out_angles, fps)
+    return function(times, values, indices, in_angles, out_angles, fps, factor)
@@ -0,0 +1,125 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import maya.cmds as cmds
+
+import time
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                   Tick scheduler                                                            #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Los dragCommand de los floatSlider se ejecutan de forma sincrona con cada evento de Qt. En rigs pesados los
+# eventos se acumulan y el slider va segundos por detras del raton. TickScheduler guarda solo el ultimo valor,
+# lo aplica en el siguiente idle de Maya y descarta los valores intermedios que ya no sirven.
+
+# Schedulers registrados por nombre, para poder consultar sus estadisticas desde el script editor
+schedulers = {}
+
+
+class TickScheduler(object):
+    def __init__(self, name, callback, schedule=None):
+        self.name = name
+        self.callback = callback
+        # schedule(funcion) la deja para el siguiente idle de Maya
+        self.schedule = schedule or (lambda command: cmds.evalDeferred(command, lowestPriority=True))
+        self.pending = False
+        self.value = None
+        self.submitted_at = None
+        self.reset_stats()
+        schedulers[name] = self
+
+    def reset_stats(self):
+        self.stats = {
+            "submitted": 0,         # valores recibidos del slider
+            "applied": 0,           # ticks aplicados
+            "dropped": 0,           # valores descartados por llegar otro mas nuevo
+            "last_latency": 0.0,    # segundos entre el primer valor pendiente y su aplicacion
+            "max_latency": 0.0,
+            "total_latency": 0.0,
+            "last_duration": 0.0,   # segundos que tarda el callback
+            "max_duration": 0.0,
+            "total_duration": 0.0,
+        }
+
+    def submit(self, value):
+        self.stats["submitted"] += 1
+        if self.pending:
+            self.stats["dropped"] += 1
+        else:
+            self.pending = True
+            self.submitted_at = time.perf_counter()
+            self.schedule(self.run)
+        self.value = value
+
+    def run(self):
+        # Puede llegar despues de un flush, en ese caso no queda nada por aplicar
+        if not self.pending:
+            return
+
+        self.pending = False
+        started = time.perf_counter()
+        try:
+            self.callback(self.value)
+        finally:
+            finished = time.perf_counter()
+            latency = finished - self.submitted_at
+            duration = finished - started
+
+            stats = self.stats
+            stats["applied"] += 1
+            stats["last_latency"] = latency
+            stats["max_latency"] = max(stats["max_latency"], latency)
+            stats["total_latency"] += latency
+            stats["last_duration"] = duration
+            stats["max_duration"] = max(stats["max_duration"], duration)
+            stats["total_duration"] += duration
+
+    def flush(self):
+        # Aplica ahora el valor pendiente, se llama desde el changeCommand antes de resetear el slider
+        self.run()
+
+    def cancel(self):
+        # Descarta el valor pendiente sin aplicarlo
+        if self.pending:
+            self.pending = False
+            self.stats["dropped"] += 1
+
+    def summary(self):
+        stats = dict(self.stats)
+        applied = stats["applied"] or 1
+        stats["mean_latency"] = stats["total_latency"] / applied
+        stats["mean_duration"] = stats["total_duration"] / applied
+        return stats
+
+
+def get_stats():
+    # {nombre: estadisticas} de todos los schedulers registrados
+    return {name: scheduler.summary() for name, scheduler in schedulers.items()}
+
+
+def print_stats():
+    for name, stats in sorted(get_stats().items()):
+        print("{}: applied {} / submitted {} (dropped {}), latency mean {:.1f} ms max {:.1f} ms, tick mean {:.1f} ms max {:.1f} ms".format(
+            name, stats["applied"], stats["submitted"], stats["dropped"],
+            stats["mean_latency"] * 1000.0, stats["max_latency"] * 1000.0,
+            stats["mean_duration"] * 1000.0, stats["max_duration"] * 1000.0))
@@ -0,0 +1,371 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import hashlib
+import time
+from collections import OrderedDict
+
+import maya.cmds as cmds
+
+import TheKeyMachine.mods.jobRunnerMod as jobRunner
+import TheKeyMachine.mods.matrixMathMod as matrixMath
+import TheKeyMachine.mods.sceneBackendMod as sceneBackend
+
+# NumPy viene con Maya 2023+. Sin NumPy las matrices se devuelven como listas anidadas
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                   Worldspace sampling                                                       #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Muestreo de worldMatrix de muchos objetos en muchos frames sin mover el tiempo global: el backend evalua cada
+# frame en su propio contexto (getAttr -time o MDGContext), asi que no hay currentTime por frame, ni redibujado,
+# ni evaluacion del resto de la escena. El resultado es un bloque denso (objetos, frames, 4, 4) que se descompone
+# de una vez con el rotateOrder de cada objeto.
+#
+# Las matrices llegan en unidades internas (centimetros); las traslaciones se pasan a la unidad lineal de la UI
+# para que coincidan con xform -worldSpace.
+#
+# Copiar y pegar son generadores de pasos de un frame (jobRunnerMod): copy_worldspace / paste_worldspace los
+# ejecutan de una vez y la barra de herramientas los lanza como Job, repartidos en la cola idle de Maya.
+
+
+# Centimetros -> unidad lineal de la UI
+LINEAR_UNIT_SCALE = {"mm": 10.0, "cm": 1.0, "m": 0.01, "km": 0.00001, "in": 1.0 / 2.54, "ft": 1.0 / 30.48,
+                     "yd": 1.0 / 91.44, "mi": 1.0 / 160934.4}
+
+
+def linear_unit_scale():
+    return LINEAR_UNIT_SCALE.get(cmds.currentUnit(query=True, linear=True), 1.0)
+
+
+def key_frames(objects, time_range=None):
+    # {objeto: frames con key ordenados}, una consulta por objeto
+    frames = {}
+    for obj in objects:
+        if time_range is None:
+            times = cmds.keyframe(obj, query=True)
+        else:
+            times = cmds.keyframe(obj, query=True, time=(time_range[0], time_range[1]))
+        frames[obj] = sorted(set(times or []))
+    return frames
+
+
+def sample_world_matrices(objects, frames, backend=None, progress=None):
+    # Matrices de mundo (objetos, frames, 4, 4). Si progress cancela, el bloque llega hasta el ultimo frame leido
+    backend = backend or sceneBackend.get_backend()
+    samples = backend.sample_matrices([obj + ".worldMatrix[0]" for obj in objects], list(frames), progress)
+    count = min(len(plug_samples) for plug_samples in samples) if samples else 0
+    if np is not None:
+        return np.asarray([plug_samples[:count] for plug_samples in samples],
+                          dtype=np.float64).reshape(len(objects), count, 4, 4)
+    return [matrixMath.from_flat(plug_samples[:count]) for plug_samples in samples]
+
+
+def world_transforms(objects, matrices, backend=None):
+    # Descompone las matrices de cada objeto con su rotateOrder -> {objeto: (traslaciones, rotaciones)}
+    backend = backend or sceneBackend.get_backend()
+    scale = linear_unit_scale()
+    transforms = {}
+    for obj, obj_matrices in zip(objects, matrices):
+        if not len(obj_matrices):
+            transforms[obj] = ([], [])
+            continue
+        order = matrixMath.ROTATE_ORDERS[int(backend.get_value(obj + ".rotateOrder"))]
+        translations, rotations, _ = matrixMath.decompose(obj_matrices, order)
+        if np is not None:
+            transforms[obj] = ((translations * scale).tolist(), rotations.tolist())
+        else:
+            transforms[obj] = ([[value * scale for value in row] for row in translations], rotations)
+    return transforms
+
+
+def sample_steps(backend, plugs, frames):
+    # Pasos de muestreo, un frame por paso. Devuelve [plug][frame] hasta donde se haya llegado si se cancela
+    samples = [[] for _ in plugs]
+    for frame in frames:
+        for plug_samples, frame_samples in zip(samples, backend.sample_matrices(plugs, [frame])):
+            plug_samples.extend(frame_samples)
+        if (yield 1):
+            break
+    return samples
+
+
+def copy_worldspace(objects, time_range=None, backend=None, progress=None, cache=None):
+    # progress(frames hechos) tras cada frame muestreado; si devuelve True se para y se devuelve lo copiado
+    return jobRunner.run_steps(copy_worldspace_steps(objects, time_range, backend, cache), progress)
+
+
+def copy_worldspace_steps(objects, time_range=None, backend=None, cache=None):
+    # {objeto: {frame: [tx, ty, tz, rx, ry, rz]}} en los frames con key de cada objeto, el formato del json de
+    # copy worldspace. Se muestrea una vez la union de los frames que faltan; con cache (SampleCache) solo los de
+    # objetos cuya animacion, o la de sus padres, ha cambiado desde la ultima copia
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+    frames = key_frames(objects, time_range)
+    digests = cache.digests(objects, backend) if cache is not None else {}
+    samples = {obj: cache.samples(obj, digests[obj]) if cache is not None else {} for obj in objects}
+
+    stale = [obj for obj in objects if any(frame not in samples[obj] for frame in frames[obj])]
+    missing = sorted(set(frame for obj in stale for frame in frames[obj] if frame not in samples[obj]))
+    if missing:
+        sampled = yield from sample_steps(backend, [obj + ".worldMatrix[0]" for obj in stale], missing)
+        for obj, obj_samples in zip(stale, sampled):
+            samples[obj].update(zip(missing, obj_samples))
+    if cache is not None:
+        for obj in stale:
+            cache.store(obj, digests[obj], samples[obj])
+        cache.evict()
+
+    sampled_frames = {obj: [frame for frame in frames[obj] if frame in samples[obj]] for obj in objects}
+    matrices = [matrixMath.from_flat([samples[obj][frame] for frame in sampled_frames[obj]]) for obj in objects]
+    transforms = world_transforms(objects, matrices, backend)
+
+    animation_data = {}
+    for obj in objects:
+        translations, rotations = transforms[obj]
+        for frame, translation, rotation in zip(sampled_frames[obj], translations, rotations):
+            animation_data.setdefault(obj, {})[int(frame)] = list(translation) + list(rotation)
+    return animation_data
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                      Sample cache                                                           #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Al iterar un plano se repite copy worldspace muchas veces cambiando pocos controles. SampleCache guarda las
+# worldMatrix muestreadas de cada objeto ({frame: 16 floats}) junto a un hash de lo que las mueve: las keys y
+# tangentes de las curvas del objeto y de todos sus padres, su jerarquia (ruta larga) y la matriz local de cada
+# uno en REFERENCE_FRAME, que cubre los valores sin animar. Si el hash no cambia solo se muestrean los frames que
+# falten. Constraints, expresiones o capas de animacion que no se vean en esas curvas no se detectan.
+#
+# Las entradas caducan a los max_age segundos y, si hay mas de max_samples matrices guardadas, se descartan las
+# usadas hace mas tiempo.
+
+
+# Frame fijo en el que se compara la matriz local de cada nodo de la cadena
+REFERENCE_FRAME = 0.0
+MAX_SAMPLES = 200000
+MAX_AGE = 1800.0
+
+
+def chain_paths(path):
+    # "|a|b|c" -> ["|a", "|a|b", "|a|b|c"]
+    parts = path.split("|")[1:]
+    return ["|" + "|".join(parts[:depth]) for depth in range(1, len(parts) + 1)]
+
+
+def column_bytes(column):
+    if np is not None:
+        return np.ascontiguousarray(column).tobytes()
+    return repr(list(column)).encode("utf-8")
+
+
+def curve_digest(snapshot):
+    digest = hashlib.sha1(snapshot.curve.encode("utf-8"))
+    for column in (snapshot.times, snapshot.values, snapshot.in_types, snapshot.out_types, snapshot.in_angles,
+                   snapshot.out_angles, snapshot.in_weights, snapshot.out_weights):
+        digest.update(column_bytes(column))
+    digest.update(b"w" if snapshot.weighted else b"n")
+    return digest.hexdigest()
+
+
+class CacheEntry(object):
+    __slots__ = ("digest", "samples", "stamp")
+
+    def __init__(self, digest, samples, stamp):
+        self.digest = digest
+        self.samples = samples
+        self.stamp = stamp
+
+
+class SampleCache(object):
+    def __init__(self, max_samples=MAX_SAMPLES, max_age=MAX_AGE, clock=time.time):
+        self.max_samples = max_samples
+        self.max_age = max_age
+        self.clock = clock
+        self.entries = OrderedDict()        # objeto -> CacheEntry, de menos a mas reciente
+
+    def __len__(self):
+        return len(self.entries)
+
+    def configure(self, max_samples=None, max_age=None):
+        if max_samples is not None:
+            self.max_samples = max_samples
+        if max_age is not None:
+            self.max_age = max_age
+        self.evict()
+
+    def clear(self):
+        self.entries = OrderedDict()
+
+    def size(self):
+        return sum(len(entry.samples) for entry in self.entries.values())
+
+    def digests(self, objects, backend):
+        # {objeto: hash de su cadena de padres}; cada nodo de la cadena se lee una vez aunque lo compartan varios
+        paths = dict(zip(objects, cmds.ls(objects, long=True)))
+        chains = {obj: chain_paths(paths.get(obj, "|" + obj)) for obj in objects}
+        nodes = list(OrderedDict.fromkeys(node for chain in chains.values() for node in chain))
+
+        node_curves = {node: backend.animated_curves([node]) for node in nodes}
+        curves = list(OrderedDict.fromkeys(curve for node in nodes for curve in node_curves[node]))
+        curve_digests = {snapshot.curve: curve_digest(snapshot)
+                         for snapshot in backend.read_curves(curves, selection=False)}
+        references = backend.sample_matrices([node + ".matrix" for node in nodes], [REFERENCE_FRAME])
+
+        node_digests = {}
+        for node, reference in zip(nodes, references):
+            digest = hashlib.sha1(node.encode("utf-8"))
+            digest.update(repr([list(matrix) for matrix in reference]).encode("utf-8"))
+            for curve in node_curves[node]:
+                digest.update(curve_digests.get(curve, curve).encode("utf-8"))
+            node_digests[node] = digest.hexdigest()
+        return {obj: hashlib.sha1("".join(node_digests[node] for node in chains[obj]).encode("utf-8")).hexdigest()
+                for obj in objects}
+
+    def samples(self, obj, digest):
+        # Copia de las matrices guardadas si el hash coincide y no han caducado; si no, {} y la entrada se descarta
+        entry = self.entries.get(obj)
+        if entry is None:
+            return {}
+        if entry.digest != digest or self.clock() - entry.stamp > self.max_age:
+            del self.entries[obj]
+            return {}
+        self.entries.move_to_end(obj)
+        return dict(entry.samples)
+
+    def store(self, obj, digest, samples):
+        self.entries.pop(obj, None)
+        self.entries[obj] = CacheEntry(digest, dict(samples), self.clock())
+
+    def evict(self):
+        now = self.clock()
+        for obj in [obj for obj, entry in self.entries.items() if now - entry.stamp > self.max_age]:
+            del self.entries[obj]
+        size = self.size()
+        while self.entries and size > self.max_samples:
+            _, entry = self.entries.popitem(last=False)
+            size -= len(entry.samples)
+
+
+# Cache de la sesion que usa copy worldspace
+sample_cache = SampleCache()
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                    Worldspace paste                                                         #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Pegar worldspace es resolver, para cada frame, la transformacion local que deja el objeto en la posicion y
+# rotacion de mundo copiadas: local = mundo * parentInverseMatrix. Se muestrea parentInverseMatrix de todos los
+# objetos en todos sus frames de una vez, se resuelve en bloque (con rotateOrder y jointOrient de cada objeto) y
+# cada canal se escribe entero con backend.write_keys, sin currentTime ni xform por frame.
+#
+# Si un objeto pegado es descendiente de otro que tambien se pega, su padre cambia al pegar; por eso los objetos
+# se resuelven por niveles de jerarquia y cada nivel se muestrea despues de escribir los anteriores.
+# Como xform -worldSpace, no se tienen en cuenta pivots ni rotateAxis.
+
+
+TRANSFORM_CHANNELS = ("translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ")
+JOINT_ORIENT_ATTRS = ("jointOrientX", "jointOrientY", "jointOrientZ")
+
+
+def hierarchy_levels(objects):
+    # [[objetos sin ancestros en la lista], [hijos de esos], ...]
+    paths = dict(zip(objects, cmds.ls(objects, long=True)))
+    levels = {}
+    for obj in objects:
+        depth = sum(1 for other in objects if other != obj and paths[obj].startswith(paths[other] + "|"))
+        levels.setdefault(depth, []).append(obj)
+    return [levels[depth] for depth in sorted(levels)]
+
+
+def joint_orient(obj, backend):
+    if not cmds.attributeQuery(JOINT_ORIENT_ATTRS[0], node=obj, exists=True):
+        return None
+    return [backend.get_value("{}.{}".format(obj, attr)) for attr in JOINT_ORIENT_ATTRS]
+
+
+def local_transforms(world_values, parent_inverse, order="xyz", orient=None):
+    # [tx, ty, tz, rx, ry, rz] de mundo (unidades de UI) + parentInverseMatrix del mismo frame -> (t, r) locales
+    scale = linear_unit_scale()
+    translations = [[value / scale for value in values[:3]] for values in world_values]
+    rotations = [list(values[3:6]) for values in world_values]
+    local = matrixMath.multiply(matrixMath.compose(translations, rotations, order=order), parent_inverse)
+    translations, rotations, _ = matrixMath.decompose(local, order, orient)
+    if np is not None:
+        return (translations * scale).tolist(), rotations.tolist()
+    return [[value * scale for value in row] for row in translations], rotations
+
+
+def paste_worldspace(animation_data, backend=None, progress=None):
+    # progress(frames hechos) tras cada frame muestreado; si devuelve True se para antes de escribir el nivel
+    return jobRunner.run_steps(paste_worldspace_steps(animation_data, backend), progress)
+
+
+def paste_step_count(animation_data):
+    # Pasos que hace paste_worldspace_steps, para la barra de progreso: un frame muestreado por nivel de jerarquia
+    objects = [obj for obj in animation_data if cmds.objExists(obj)]
+    if not objects:
+        return 0
+    return sum(len(set(float(frame) for obj in level for frame in animation_data[obj])) for level in hierarchy_levels(objects))
+
+
+def paste_worldspace_steps(animation_data, backend=None):
+    # animation_data es el json de copy worldspace: {objeto: {frame: [tx, ty, tz, rx, ry, rz]}}. Sustituye las keys
+    # de translate/rotate de cada objeto por las resueltas.
+    # Devuelve {"objects": objetos pegados, "keys": keys escritas, "cancelled": bool}
+    backend = backend or sceneBackend.get_backend()
+    backend.clear()
+    objects = [obj for obj in animation_data if cmds.objExists(obj)]
+    summary = {"objects": [], "keys": 0, "cancelled": False}
+
+    for level in hierarchy_levels(objects) if objects else []:
+        frames = {obj: sorted((float(frame), values) for frame, values in animation_data[obj].items())
+                  for obj in level}
+        all_frames = sorted(set(frame for obj_frames in frames.values() for frame, _ in obj_frames))
+        samples = yield from sample_steps(backend, [obj + ".parentInverseMatrix[0]" for obj in level], all_frames)
+        if min(len(plug_samples) for plug_samples in samples) < len(all_frames):
+            summary["cancelled"] = True
+            break
+
+        frame_index = {frame: index for index, frame in enumerate(all_frames)}
+        for obj, plug_samples in zip(level, samples):
+            times = [frame for frame, _ in frames[obj]]
+            parent_inverse = matrixMath.from_flat([plug_samples[frame_index[frame]] for frame in times])
+            order = matrixMath.ROTATE_ORDERS[int(backend.get_value(obj + ".rotateOrder"))]
+            translations, rotations = local_transforms([values for _, values in frames[obj]], parent_inverse,
+                                                       order, joint_orient(obj, backend))
+
+            cmds.cutKey(obj, attribute=list(TRANSFORM_CHANNELS))
+            columns = list(zip(*translations)) + list(zip(*rotations))
+            for attr, values in zip(TRANSFORM_CHANNELS, columns):
+                backend.write_keys("{}.{}".format(obj, attr), times, list(values))
+            summary["objects"].append(obj)
+            summary["keys"] += len(times) * len(TRANSFORM_CHANNELS)
+    return summary
@@ -0,0 +1,46 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import argparse
+
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+# python -m tests.perf [--preset reference] [--rounds 3] [--backend cmds] [tool ...]
+
+def main():
+    parser = argparse.ArgumentParser(description="TheKeyMachine headless benchmarks")
+    parser.add_argument("tools", nargs="*", help="Runners to execute (all by default)")
+    parser.add_argument("--preset", default="small", choices=sorted(scenarios.PRESETS))
+    parser.add_argument("--rounds", default=3, type=int)
+    parser.add_argument("--backend", default="fake", choices=("fake", "cmds"))
+    args = parser.parse_args()
+
+    for name in args.tools or sorted(runners.RUNNERS):
+        try:
+            print(runners.run(name, preset=args.preset, rounds=args.rounds, backend=args.backend).report())
+        except runners.RunnerUnavailable as e:
+            print("{:<22} skipped: {}".format(name, e))
+
+
+if __name__ == "__main__":
+    main()
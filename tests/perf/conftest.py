@@ -0,0 +1,61 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+from tests.perf import fakeMaya
+from tests.perf import runners
+
+
+
+# Los benchmarks usan el preset "small" por defecto; --perf-preset=reference para la escena de 200x12x500
+
+def pytest_addoption(parser):
+    parser.addoption("--perf-preset", default="small", choices=sorted(runners.scenarios.PRESETS),
+                     help="Scenario preset used by the tests/perf benchmarks")
+    parser.addoption("--perf-rounds", default=3, type=int, help="Rounds per benchmark")
+    parser.addoption("--perf-backend", default="fake", choices=("fake", "cmds"),
+                     help="Scene backend used by the runners")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_maya():
+    return fakeMaya.install()
+
+
+@pytest.fixture
+def scene(fake_maya):
+    return fakeMaya.use_scene(fakeMaya.Scene())
+
+
+@pytest.fixture
+def bench(request):
+    # Estilo pytest-benchmark: bench("tween") ejecuta el runner y deja el resultado en el reporte
+    def run(name):
+        try:
+            result = runners.run(name, preset=request.config.getoption("--perf-preset"),
+                                 rounds=request.config.getoption("--perf-rounds"),
+                                 backend=request.config.getoption("--perf-backend"))
+        except runners.RunnerUnavailable as e:
+            pytest.skip(str(e))
+        request.node.user_properties.append(("benchmark", result.report()))
+        print(result.report())
+        return result
+    return run
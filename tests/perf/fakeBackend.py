@@ -0,0 +1,147 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+from tests.perf import fakeMaya
+
+fakeMaya.install()
+
+import TheKeyMachine.mods.curveSnapshotMod as curveSnapshot
+import TheKeyMachine.mods.keyIndexMod as keyIndex
+import TheKeyMachine.mods.sceneBackendMod as sceneBackend
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                   In-memory scene backend                                                   #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Implementacion de sceneBackendMod sobre la escena simulada, sin pasar por maya.cmds: hace el papel del backend
+# de OpenMaya en los benchmarks (lecturas y escrituras en proceso, no undoables). Cada metodo cuenta una llamada
+# "backend.<metodo>" en Scene.calls.
+
+
+class FakeBackend(sceneBackend.SceneBackend):
+    undoable = False
+
+    def __init__(self, scene=None):
+        self._scene = scene
+
+    @property
+    def scene(self):
+        return self._scene or fakeMaya.active_scene()
+
+    def count(self, name):
+        self.scene.calls["backend." + name] += 1
+
+    def keyable_plugs(self, node):
+        self.count("keyable_plugs")
+        return [attribute.name for attribute in self.scene.node(node).attrs.values() if attribute.keyable]
+
+    def long_name(self, node, attr):
+        self.count("long_name")
+        return self.scene.node(node).attr(attr).name
+
+    def plug_state(self, node, attr):
+        self.count("plug_state")
+        try:
+            node, attribute = self.scene.plug("{}.{}".format(node, attr))
+        except ValueError:
+            return None
+
+        state = sceneBackend.PlugState()
+        state.locked = attribute.locked
+        state.settable = not attribute.locked
+        state.keyable = attribute.keyable
+        state.attr_type = attribute.type
+        state.min_value = attribute.minimum
+        state.max_value = attribute.maximum
+        state.value = self.scene.get_value(node, attribute)
+        return state
+
+    def get_value(self, plug, time=None):
+        self.count("get_value")
+        node, attribute = self.scene.plug(plug)
+        return self.scene.get_value(node, attribute, time)
+
+    def evaluate(self, plug, times):
+        self.count("evaluate")
+        node, attribute = self.scene.plug(plug)
+        return [self.scene.get_value(node, attribute, time) for time in times]
+
+    def set_values(self, values, attr_types=None):
+        self.count("set_values")
+        for plug, value in values:
+            node, attribute = self.scene.plug(plug)
+            self.scene.set_value(node, attribute, value)
+
+    def curve(self, plug):
+        scene = self.scene
+        name = plug.rsplit("|", 1)[-1]
+        if name in scene.curves:
+            return scene.curves[name]
+        node, attribute = scene.plug(name)
+        return scene.curve_for(node.name, attribute.name)
+
+    def read_keys(self, plug):
+        self.count("read_keys")
+        curve = self.curve(plug)
+        if curve is None:
+            return keyIndex.CurveKeyIndex([], [], [])
+        return keyIndex.CurveKeyIndex(list(curve.times), list(curve.values), list(curve.out_types))
+
+    def write_key_values(self, curve, indices, values):
+        self.count("write_key_values")
+        curve = self.scene.curves[curve]
+        for index, value in zip(indices, values):
+            curve.values[index] = value
+
+    def selected_curves(self):
+        self.count("selected_curves")
+        scene = self.scene
+        return [name for name in scene.selection if name in scene.curves]
+
+    def driven_plugs(self, curves):
+        self.count("driven_plugs")
+        scene = self.scene
+        return {curve: scene.curves[curve].driven for curve in curves if curve in scene.curves and scene.curves[curve].driven}
+
+    def selected_key_indices(self, curves=None):
+        self.count("selected_key_indices")
+        scene = self.scene
+        names = scene.curves if curves is None else [curve for curve in curves if curve in scene.curves]
+        return {name: sorted(scene.curves[name].selected) for name in names if scene.curves[name].selected}
+
+    def read_curve(self, curve, selected_indices=(), driven=None):
+        self.count("read_curve")
+        curve = self.scene.curves[curve]
+        count = len(curve)
+        return curveSnapshot.CurveSnapshot(
+            curve.name, curve.times, curve.values, curve.in_types, curve.out_types,
+            [curve.angle(i, "in") for i in range(count)], [curve.angle(i, "out") for i in range(count)],
+            selected_indices=selected_indices, weighted=curve.weighted, driven=driven)
+
+    def write_curve(self, snapshot):
+        changed = snapshot.changed_range()
+        if changed is None:
+            return
+        self.count("write_curve")
+        start, end = changed
+        self.scene.curves[snapshot.curve].set_key_time_values(start, end, snapshot.key_time_values(start, end))
+        snapshot.mark_written()
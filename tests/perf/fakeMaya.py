@@ -0,0 +1,1363 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+import os
+import sys
+import tempfile
+import types
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                 Fake Maya scene simulator                                                   #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Simulador en memoria de la parte de maya.cmds / maya.api.OpenMaya que usan las herramientas: transforms con
+# atributos keyables, animCurves con evaluacion Hermite, seleccion (objetos y keys del graph editor), namespaces,
+# tiempo actual y autokey. Cada comando cuenta sus llamadas en Scene.calls para que los benchmarks puedan
+# reportar cuantos round-trips a Maya hace cada herramienta.
+#
+# install() registra una sola vez los modulos falsos en sys.modules; use_scene() cambia la escena activa sin
+# tener que recargar los modulos de TheKeyMachine que ya hicieron "import maya.cmds as cmds".
+
+
+SHORT_NAMES = OrderedDict([
+    ("translateX", "tx"), ("translateY", "ty"), ("translateZ", "tz"),
+    ("rotateX", "rx"), ("rotateY", "ry"), ("rotateZ", "rz"),
+    ("scaleX", "sx"), ("scaleY", "sy"), ("scaleZ", "sz"),
+    ("visibility", "v"), ("rotateOrder", "ro"),
+])
+
+TRANSFORM_ATTRS = [
+    ("translateX", "doubleLinear", 0.0), ("translateY", "doubleLinear", 0.0), ("translateZ", "doubleLinear", 0.0),
+    ("rotateX", "doubleAngle", 0.0), ("rotateY", "doubleAngle", 0.0), ("rotateZ", "doubleAngle", 0.0),
+    ("scaleX", "double", 1.0), ("scaleY", "double", 1.0), ("scaleZ", "double", 1.0),
+    ("visibility", "bool", 1.0),
+]
+
+CURVE_TYPES = {"doubleLinear": "animCurveTL", "doubleAngle": "animCurveTA", "time": "animCurveTT"}
+
+# Flags cortos de los comandos que simulamos
+FLAG_ALIASES = {
+    "q": "query", "e": "edit", "tc": "timeChange", "vc": "valueChange", "sl": "selected", "n": "name",
+    "iv": "indexValue", "t": "time", "r": "relative", "a": "absolute", "kc": "keyframeCount", "ev": "eval",
+    "at": "attribute", "itt": "inTangentType", "ott": "outTangentType", "k": "keyable", "s": "source",
+    "d": "destination", "p": "plugs", "c": "connections", "scn": "skipConversionNodes", "se": "settable",
+    "l": "lock", "ln": "longName", "sn": "shortName", "ld": "listDefault", "ex": "exists", "mn": "minimum",
+    "mx": "maximum", "mne": "minExists", "mxe": "maxExists", "ud": "userDefined", "u": "unlocked",
+    "sa": "scalar", "typ": "type", "cl": "clear", "o": "option",
+    "min": "minTime", "max": "maxTime", "ast": "animationStartTime", "aet": "animationEndTime",
+    "bd": "breakdown", "v": "value", "dv": "defaultValue", "ocn": "openChunk",
+    "cck": "closeChunk", "st": "state", "lp": "lowestPriority", "ia": "inAngle", "oa": "outAngle",
+    "iw": "inWeight", "ow": "outWeight", "wt": "weightedTangents",
+}
+
+# Unidad de tiempo de la escena simulada (film)
+FPS = 24.0
+
+
+def normalize_flags(flags):
+    return {FLAG_ALIASES.get(key, key): value for key, value in flags.items()}
+
+
+def as_list(objects):
+    result = []
+    for obj in objects:
+        if obj is None:
+            continue
+        if isinstance(obj, (list, tuple)):
+            result.extend(obj)
+        else:
+            result.append(obj)
+    return result
+
+
+def curve_multi_range(attr_name):
+    # "keyTimeValue[3:7]" -> ("keyTimeValue", 3, 7)
+    name, _, indices = attr_name.partition("[")
+    start, _, end = indices.rstrip("]").partition(":")
+    start = int(start)
+    return name, start, int(end) if end else start
+
+
+def time_ranges(value):
+    # time=(a, b) | (a,) | a | [(a, b), ...] -> lista de (inicio, fin)
+    if value is None:
+        return None
+    if isinstance(value, list):
+        ranges = []
+        for item in value:
+            ranges.extend(time_ranges(item))
+        return ranges
+    if isinstance(value, tuple):
+        if len(value) == 1:
+            return [(value[0], value[0])]
+        start = value[0] if value[0] is not None else -float("inf")
+        end = value[1] if value[1] is not None else float("inf")
+        return [(start, end)]
+    return [(value, value)]
+
+
+def index_ranges(value):
+    if value is None:
+        return None
+    if isinstance(value, list):
+        ranges = []
+        for item in value:
+            ranges.extend(index_ranges(item))
+        return ranges
+    if isinstance(value, tuple):
+        return [(value[0], value[-1])]
+    return [(value, value)]
+
+
+# ____ Nodos y atributos ____
+
+class Attribute(object):
+    __slots__ = ("name", "short", "type", "value", "default", "keyable", "locked", "minimum", "maximum", "dynamic",
+                 "override")
+
+    def __init__(self, name, attr_type="double", default=0.0, keyable=True, minimum=None, maximum=None, dynamic=False):
+        self.name = name
+        self.short = SHORT_NAMES.get(name, name)
+        self.type = attr_type
+        self.value = default
+        self.default = default
+        self.keyable = keyable
+        self.locked = False
+        self.minimum = minimum
+        self.maximum = maximum
+        self.dynamic = dynamic
+        self.override = False   # setAttr sobre un atributo animado mantiene el valor hasta cambiar de frame
+
+
+# ____ Matrices 4x4 (vectores fila, como Maya) ____
+
+ROTATE_ORDER_AXES = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+MATRIX_ATTRS = ("matrix", "worldMatrix", "parentMatrix", "parentInverseMatrix", "worldInverseMatrix")
+
+
+def identity_matrix():
+    return [[1.0 if row == column else 0.0 for column in range(4)] for row in range(4)]
+
+
+def matrix_product(a, b):
+    return [[sum(a[row][i] * b[i][column] for i in range(4)) for column in range(4)] for row in range(4)]
+
+
+def axis_rotation(axis, degrees):
+    cosine, sine = math.cos(math.radians(degrees)), math.sin(math.radians(degrees))
+    matrix = identity_matrix()
+    a, b = {"x": (1, 2), "y": (2, 0), "z": (0, 1)}[axis]
+    matrix[a][a], matrix[a][b], matrix[b][a], matrix[b][b] = cosine, sine, -sine, cosine
+    return matrix
+
+
+def matrix_inverse(matrix):
+    # Gauss-Jordan con pivote parcial
+    size = len(matrix)
+    rows = [list(row) + [1.0 if i == j else 0.0 for j in range(size)] for i, row in enumerate(matrix)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(rows[row][column]))
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        factor = rows[column][column]
+        rows[column] = [value / factor for value in rows[column]]
+        for row in range(size):
+            if row != column and rows[row][column]:
+                scale = rows[row][column]
+                rows[row] = [value - scale * other for value, other in zip(rows[row], rows[column])]
+    return [row[size:] for row in rows]
+
+
+class Node(object):
+    def __init__(self, name, node_type="transform"):
+        self.name = name
+        self.type = node_type
+        self.attrs = OrderedDict()
+        self.aliases = {}
+        self.parent = None
+
+    def add_attr(self, attribute):
+        self.attrs[attribute.name] = attribute
+        self.aliases[attribute.short] = attribute.name
+        return attribute
+
+    def attr(self, name):
+        attribute = self.attrs.get(name)
+        if attribute is None and name in self.aliases:
+            attribute = self.attrs[self.aliases[name]]
+        return attribute
+
+
+# Atributos multi de un animCurve con las componentes de las tangentes (como los escribe un .ma)
+TANGENT_COMPONENTS = ("kix", "kiy", "kox", "koy")
+TANGENT_COMPONENT_NAMES = {"keyTanInX": "kix", "keyTanInY": "kiy", "keyTanOutX": "kox", "keyTanOutY": "koy"}
+
+
+class AnimCurve(object):
+    def __init__(self, name, curve_type="animCurveTU"):
+        self.name = name
+        self.type = curve_type
+        self.times = []
+        self.values = []
+        self.in_types = []
+        self.out_types = []
+        self.selected = set()
+        self.driven = None      # "nodo.attr" que mueve la curva
+        self.fixed = {}         # tiempo -> [kix, kiy, kox, koy] de las tangentes fixed (vectores unitarios, sin weights)
+        self.weighted = False   # solo se consulta; la forma se evalua siempre sin weights
+
+    def __len__(self):
+        return len(self.times)
+
+    def find(self, time):
+        index = bisect_left(self.times, time - 1e-6)
+        if index < len(self.times) and abs(self.times[index] - time) < 1e-6:
+            return index
+        return None
+
+    def insert(self, time, value, in_type="auto", out_type="auto"):
+        index = self.find(time)
+        if index is not None:
+            self.values[index] = value
+            return index
+
+        index = bisect_left(self.times, time)
+        self.times.insert(index, time)
+        self.values.insert(index, value)
+        self.in_types.insert(index, in_type)
+        self.out_types.insert(index, out_type)
+        self.selected = {i + 1 if i >= index else i for i in self.selected}
+        return index
+
+    def remove(self, indices):
+        indices = set(indices)
+        keep = [i for i in range(len(self.times)) if i not in indices]
+        remap = {old: new for new, old in enumerate(keep)}
+        self.times = [self.times[i] for i in keep]
+        self.values = [self.values[i] for i in keep]
+        self.in_types = [self.in_types[i] for i in keep]
+        self.out_types = [self.out_types[i] for i in keep]
+        self.selected = {remap[i] for i in self.selected if i in remap}
+
+    def slope(self, index, side):
+        tangent_type = self.out_types[index] if side == "out" else self.in_types[index]
+        times, values = self.times, self.values
+        count = len(times)
+
+        if tangent_type == "fixed":
+            # Como keyTangent: el angulo se mide con el tiempo en segundos
+            x, y = self.tangent_vector(index, side)
+            return y / x / FPS if x else 0.0
+
+        if tangent_type in ("flat", "step", "stepnext") or count < 2:
+            return 0.0
+        if tangent_type == "linear":
+            other = index + 1 if side == "out" else index - 1
+            if other < 0 or other >= count:
+                return 0.0
+            return (values[other] - values[index]) / (times[other] - times[index])
+
+        # spline / auto / clamped: Catmull-Rom, planas en los extremos de la curva
+        if index == 0 or index == count - 1:
+            return 0.0
+        previous_value, next_value = values[index - 1], values[index + 1]
+        if tangent_type in ("auto", "clamped", "plateau"):
+            # los extremos locales quedan planos
+            if (values[index] - previous_value) * (next_value - values[index]) <= 0:
+                return 0.0
+        return (next_value - previous_value) / (times[index + 1] - times[index - 1])
+
+    def angle(self, index, side):
+        # Angulo de la tangente en grados, como lo devuelve keyTangent -inAngle/-outAngle
+        return math.degrees(math.atan(self.slope(index, side) * FPS))
+
+    def tangent_vector(self, index, side):
+        vector = self.fixed.get(self.times[index], (1.0, 0.0, 1.0, 0.0))
+        return vector[2:] if side == "out" else vector[:2]
+
+    def fix(self, index):
+        # Guarda el vector de las tangentes que aun no son fixed con su angulo actual, como keyTangent -itt fixed
+        vector = list(self.fixed.get(self.times[index], (1.0, 0.0, 1.0, 0.0)))
+        for offset, side, tangent_type in ((0, "in", self.in_types[index]), (2, "out", self.out_types[index])):
+            if tangent_type != "fixed":
+                angle = math.radians(self.angle(index, side))
+                vector[offset:offset + 2] = [math.cos(angle), math.sin(angle)]
+        self.fixed[self.times[index]] = vector
+
+    def set_angle(self, index, side, angle):
+        self.fix(index)
+        offset = 2 if side == "out" else 0
+        self.fixed[self.times[index]][offset:offset + 2] = [math.cos(math.radians(angle)), math.sin(math.radians(angle))]
+        if side == "out":
+            self.out_types[index] = "fixed"
+        else:
+            self.in_types[index] = "fixed"
+
+    def tangent_component(self, index, component):
+        offset = TANGENT_COMPONENTS.index(component)
+        if self.times[index] in self.fixed:
+            return self.fixed[self.times[index]][offset]
+        angle = math.radians(self.angle(index, "out" if offset >= 2 else "in"))
+        return math.sin(angle) if offset % 2 else math.cos(angle)
+
+    def set_tangent_component(self, index, component, value):
+        # Como setAttr curva.kix[i]: cambia la tangente guardada, el tipo no cambia
+        self.fix(index)
+        self.fixed[self.times[index]][TANGENT_COMPONENTS.index(component)] = float(value)
+
+    def set_key_time_values(self, start, end, flat):
+        # setAttr curva.keyTimeValue[start:end] t0 v0 t1 v1...
+        self.times[start:end + 1] = [float(time) for time in flat[0::2]]
+        self.values[start:end + 1] = [float(value) for value in flat[1::2]]
+        times = self.times[max(start - 1, 0):end + 2]
+        if any(a >= b for a, b in zip(times, times[1:])):
+            raise RuntimeError("Keys of {} are no longer sorted by time".format(self.name))
+
+    def evaluate(self, time):
+        times, values = self.times, self.values
+        if not times:
+            return 0.0
+        if time <= times[0]:
+            return values[0]
+        if time >= times[-1]:
+            return values[-1]
+
+        index = bisect_right(times, time) - 1
+        if abs(times[index + 1] - time) < 1e-9:
+            return values[index + 1]
+
+        if self.out_types[index] == "step":
+            return values[index]
+        if self.out_types[index] == "stepnext":
+            return values[index + 1]
+
+        t0, t1 = times[index], times[index + 1]
+        v0, v1 = values[index], values[index + 1]
+        span = t1 - t0
+        s = (time - t0) / span
+        m0 = self.slope(index, "out") * span
+        m1 = self.slope(index + 1, "in") * span
+
+        # Hermite cubica
+        s2 = s * s
+        s3 = s2 * s
+        return ((2 * s3 - 3 * s2 + 1) * v0 + (s3 - 2 * s2 + s) * m0 +
+                (-2 * s3 + 3 * s2) * v1 + (s3 - s2) * m1)
+
+
+class UndoChunk(object):
+    def __init__(self, name, changes=None):
+        self.name = name
+        self.changes = changes or []
+
+    def revert(self):
+        for attribute, value, override in reversed(self.changes):
+            attribute.value = value
+            attribute.override = override
+
+
+class Scene(object):
+    def __init__(self):
+        self.nodes = OrderedDict()
+        self.curves = OrderedDict()
+        self.drivers = {}           # "nodo.attrLargo" -> nombre de curva
+        self.selection = []
+        self.current_time = 1.0
+        self.min_time = 1.0
+        self.max_time = 120.0
+        self.autokey = False
+        self.undo_chunks = 0        # chunks abiertos (profundidad)
+        self.undo_queue = []        # entradas de undo cerradas, la ultima es la que deshace undo()
+        self.open_chunk = None
+        self.drop_empty_chunks = False  # Maya no guarda los chunks vacios; las keys no se registran, por eso va aparte
+        self.undos = 0
+        self.progress = {"active": False, "value": 0, "cancelled": False}
+        self.deferred = []
+        self.warnings = []
+        self.dialog_files = None    # lo que devuelve fileDialog2 (None = cancelado)
+        self.calls = Counter()
+        self.user_dir = maya_app_dir()
+
+    def reset_calls(self):
+        self.calls = Counter()
+
+    def run_idle(self):
+        # La cola idle de Maya: ejecuta lo diferido (evalDeferred) hasta que no quede nada
+        while self.deferred:
+            self.deferred.pop(0)()
+
+    # ____ Construccion ____
+
+    def create_transform(self, name, parent=None, node_type="transform"):
+        node = Node(name, node_type)
+        for attr_name, attr_type, default in TRANSFORM_ATTRS:
+            node.add_attr(Attribute(attr_name, attr_type, default))
+        node.add_attr(Attribute("rotateOrder", "enum", 0.0, keyable=False))
+        node.parent = parent
+        self.nodes[name] = node
+        return node
+
+    def create_joint(self, name, parent=None, orient=(0.0, 0.0, 0.0)):
+        node = self.create_transform(name, parent, "joint")
+        for axis, value in zip("XYZ", orient):
+            node.add_attr(Attribute("jointOrient" + axis, "doubleAngle", value, keyable=False))
+        return node
+
+    def add_attr(self, node_name, attr_name, attr_type="double", default=0.0, minimum=None, maximum=None, keyable=True):
+        return self.nodes[node_name].add_attr(
+            Attribute(attr_name, attr_type, default, keyable, minimum, maximum, dynamic=True))
+
+    def curve_for(self, node_name, attr_name, create=False):
+        node = self.node(node_name)
+        attribute = node.attr(attr_name)
+        plug = "{}.{}".format(node.name, attribute.name)
+        curve_name = self.drivers.get(plug)
+        if curve_name is None and create:
+            curve_name = "{}_{}".format(node.name, attribute.name)
+            curve = AnimCurve(curve_name, CURVE_TYPES.get(attribute.type, "animCurveTU"))
+            curve.driven = plug
+            self.curves[curve_name] = curve
+            self.drivers[plug] = curve_name
+        return self.curves.get(curve_name) if curve_name else None
+
+    def set_key(self, node_name, attr_name, time, value, in_type="auto", out_type="auto"):
+        return self.curve_for(node_name, attr_name, create=True).insert(time, value, in_type, out_type)
+
+    # ____ Resolucion de nombres ____
+
+    def node(self, name):
+        # Acepta nombres largos ("|grp|ns:ctrl") y cortos
+        short = name.rsplit("|", 1)[-1]
+        node = self.nodes.get(short)
+        if node is None:
+            raise ValueError("No object matches name: {}".format(name))
+        return node
+
+    def exists(self, name):
+        name = name.rsplit("|", 1)[-1]
+        if "." in name:
+            node_name, attr_name = name.split(".", 1)
+            node = self.nodes.get(node_name)
+            if node is not None:
+                return node.attr(attr_name) is not None
+            return node_name in self.curves and attr_name == "output"
+        return name in self.nodes or name in self.curves
+
+    def plug(self, plug):
+        node_name, attr_name = plug.rsplit("|", 1)[-1].split(".", 1)
+        node = self.node(node_name)
+        attribute = node.attr(attr_name)
+        if attribute is None:
+            raise ValueError("No object matches name: {}".format(plug))
+        return node, attribute
+
+    # ____ Matrices ____
+
+    def local_matrix(self, node, time=None):
+        # escala * rotacion (en el orden de rotateOrder) * jointOrient * traslacion
+        value = lambda name: self.get_value(node, node.attr(name), time)
+        matrix = identity_matrix()
+        for row, axis in enumerate("XYZ"):
+            matrix[row][row] = value("scale" + axis)
+        order = ROTATE_ORDER_AXES[int(value("rotateOrder"))]
+        for axis in order:
+            matrix = matrix_product(matrix, axis_rotation(axis, value("rotate" + axis.upper())))
+        if node.attr("jointOrientX") is not None:
+            for axis in "xyz":
+                matrix = matrix_product(matrix, axis_rotation(axis, value("jointOrient" + axis.upper())))
+        for column, axis in enumerate("XYZ"):
+            matrix[3][column] = value("translate" + axis)
+        return matrix
+
+    def long_name(self, name):
+        path = []
+        while name is not None:
+            path.insert(0, name)
+            name = self.node(name).parent
+        return "|" + "|".join(path)
+
+    def world_matrix(self, node, time=None):
+        matrix = self.local_matrix(node, time)
+        while node.parent is not None:
+            node = self.node(node.parent)
+            matrix = matrix_product(matrix, self.local_matrix(node, time))
+        return matrix
+
+    def matrix_attr(self, node, attr_name, time=None):
+        if attr_name == "matrix":
+            return self.local_matrix(node, time)
+        if attr_name == "worldMatrix":
+            return self.world_matrix(node, time)
+        if attr_name == "worldInverseMatrix":
+            return matrix_inverse(self.world_matrix(node, time))
+        parent = self.world_matrix(self.node(node.parent), time) if node.parent else identity_matrix()
+        return parent if attr_name == "parentMatrix" else matrix_inverse(parent)
+
+    # ____ Valores ____
+
+    def get_value(self, node, attribute, time=None):
+        curve_name = self.drivers.get("{}.{}".format(node.name, attribute.name))
+        if curve_name is not None and self.curves[curve_name].times:
+            if time is not None or not attribute.override:
+                return self.curves[curve_name].evaluate(self.current_time if time is None else time)
+        return attribute.value
+
+    def set_value(self, node, attribute, value):
+        if attribute.locked:
+            raise RuntimeError("The attribute '{}.{}' is locked or connected and cannot be modified.".format(
+                node.name, attribute.name))
+        attribute.value = value
+        attribute.override = "{}.{}".format(node.name, attribute.name) in self.drivers
+
+    def record_undo(self, attribute, name):
+        # setAttr guarda el valor anterior en el chunk abierto o, fuera de un chunk, en su propia entrada. Solo se
+        # deshacen valores de atributos; las keys no se registran
+        change = (attribute, attribute.value, attribute.override)
+        if self.open_chunk is not None:
+            self.open_chunk.changes.append(change)
+        else:
+            self.undo_queue.append(UndoChunk(name, [change]))
+
+    def set_time(self, time):
+        self.current_time = float(time)
+        for node in self.nodes.values():
+            for attribute in node.attrs.values():
+                attribute.override = False
+
+    def curves_of(self, obj, attribute=None):
+        # Curvas de un objeto, plug o curva
+        name = obj.rsplit("|", 1)[-1]
+        if name in self.curves:
+            return [self.curves[name]]
+        if "." in name:
+            curve = self.curve_for(*name.split(".", 1))
+            return [curve] if curve else []
+        node = self.node(name)
+        attrs = [attribute] if isinstance(attribute, str) else (attribute or list(node.attrs))
+        curves = []
+        for attr_name in attrs:
+            curve = self.curve_for(node.name, attr_name)
+            if curve is not None:
+                curves.append(curve)
+        return curves
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                         maya.cmds                                                           #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+class FakeCmds(object):
+    def __init__(self, scene_getter):
+        self._scene = scene_getter
+
+    @property
+    def scene(self):
+        return self._scene()
+
+    # ____ Escena ____
+
+    def ls(self, *objects, **flags):
+        flags = normalize_flags(flags)
+        scene = self.scene
+        if flags.get("selection"):
+            names = list(scene.selection)
+        elif objects:
+            names = [name.rsplit("|", 1)[-1] for name in as_list(objects) if scene.exists(name)]
+        else:
+            names = list(scene.nodes) + list(scene.curves)
+        node_type = flags.get("type")
+        if node_type:
+            types_ = node_type if isinstance(node_type, (list, tuple)) else [node_type]
+            names = [name for name in names if self.nodeType(name) in types_]
+        if flags.get("long"):
+            names = [scene.long_name(name) if name in scene.nodes else name for name in names]
+        return names
+
+    def select(self, *objects, **flags):
+        flags = normalize_flags(flags)
+        scene = self.scene
+        names = [name.rsplit("|", 1)[-1] for name in as_list(objects)]
+        if flags.get("clear"):
+            scene.selection = []
+        elif flags.get("add"):
+            scene.selection += [name for name in names if name not in scene.selection]
+        elif flags.get("deselect"):
+            scene.selection = [name for name in scene.selection if name not in names]
+        else:
+            scene.selection = names
+
+    def objExists(self, name):
+        return self.scene.exists(name)
+
+    def listRelatives(self, *objects, **flags):
+        # La escena simulada no tiene jerarquia ni shapes
+        return None
+
+    def delete(self, *objects, **flags):
+        scene = self.scene
+        for name in as_list(objects):
+            name = name.rsplit("|", 1)[-1]
+            curve = scene.curves.pop(name, None)
+            if curve is not None:
+                scene.drivers.pop(curve.driven, None)
+            elif name in scene.nodes:
+                del scene.nodes[name]
+
+    def nodeType(self, name):
+        name = name.rsplit("|", 1)[-1].split(".", 1)[0]
+        if name in self.scene.curves:
+            return self.scene.curves[name].type
+        return self.scene.node(name).type
+
+    def currentTime(self, *args, **flags):
+        flags = normalize_flags(flags)
+        if flags.get("query"):
+            return self.scene.current_time
+        time = args[0] if args else flags.get("edit")
+        self.scene.set_time(time)
+        return self.scene.current_time
+
+    def currentUnit(self, **flags):
+        flags = normalize_flags(flags)
+        if flags.get("query") and flags.get("time"):
+            return "film"
+        if flags.get("query"):
+            return "cm"
+        return None
+
+    def playbackOptions(self, **flags):
+        flags = normalize_flags(flags)
+        scene = self.scene
+        if flags.get("query"):
+            if flags.get("minTime") or flags.get("animationStartTime"):
+                return scene.min_time
+            if flags.get("maxTime") or flags.get("animationEndTime"):
+                return scene.max_time
+            return None
+        if "minTime" in flags:
+            scene.min_time = flags["minTime"]
+        if "maxTime" in flags:
+            scene.max_time = flags["maxTime"]
+
+    def timeControl(self, name=None, **flags):
+        # Time slider sin rango seleccionado: rangeArray es el frame actual
+        flags = normalize_flags(flags)
+        if flags.get("query") and flags.get("rangeArray"):
+            return [self.scene.current_time, self.scene.current_time + 1.0]
+        return None
+
+    def autoKeyframe(self, **flags):
+        flags = normalize_flags(flags)
+        if flags.get("query"):
+            return self.scene.autokey
+        if "state" in flags:
+            self.scene.autokey = bool(flags["state"])
+
+    def undoInfo(self, **flags):
+        flags = normalize_flags(flags)
+        scene = self.scene
+        if flags.get("query"):
+            if flags.get("undoName"):
+                return scene.undo_queue[-1].name if scene.undo_queue else ""
+            return None
+        if flags.get("openChunk"):
+            scene.undo_chunks += 1
+            if scene.undo_chunks == 1:
+                scene.open_chunk = UndoChunk(flags.get("chunkName", ""))
+        elif flags.get("closeChunk"):
+            scene.undo_chunks -= 1
+            if scene.undo_chunks == 0 and scene.open_chunk is not None:
+                if scene.open_chunk.changes or not scene.drop_empty_chunks:
+                    scene.undo_queue.append(scene.open_chunk)
+                scene.open_chunk = None
+
+    def undo(self, **flags):
+        scene = self.scene
+        scene.undos += 1
+        if scene.undo_queue:
+            scene.undo_queue.pop().revert()
+
+    def progressBar(self, name=None, **flags):
+        # Barra de progreso principal: el test marca progress["cancelled"] para simular Esc
+        flags = normalize_flags(flags)
+        progress = self.scene.progress
+        if flags.get("query"):
+            if flags.get("isCancelled"):
+                return progress["cancelled"]
+            return progress["value"]
+        if flags.get("beginProgress"):
+            progress.update(active=True, value=0)
+        if "progress" in flags:
+            progress["value"] = flags["progress"]
+        if flags.get("endProgress"):
+            progress.update(active=False, cancelled=False)
+
+    def refresh(self, **flags):
+        return None
+
+    def channelBox(self, name=None, **flags):
+        # Channel box sin canales seleccionados: las herramientas usan todos los atributos keyables
+        return None
+
+    def fileDialog2(self, **flags):
+        return self.scene.dialog_files
+
+    def floatSlider(self, name=None, **flags):
+        # Sliders de la UI: los tests llaman a las funciones del drag directamente
+        return 0.0
+
+    def waitCursor(self, **flags):
+        return None
+
+    def warning(self, message):
+        self.scene.warnings.append(message)
+
+    def evalDeferred(self, command, **flags):
+        self.scene.deferred.append(command)
+
+    def internalVar(self, **flags):
+        return self.scene.user_dir + "/"
+
+    # ____ Atributos ____
+
+    def listAttr(self, node_name, **flags):
+        flags = normalize_flags(flags)
+        node = self.scene.node(node_name)
+        result = []
+        for attribute in node.attrs.values():
+            if flags.get("keyable") and not attribute.keyable:
+                continue
+            if flags.get("unlocked") and attribute.locked:
+                continue
+            if flags.get("userDefined") and not attribute.dynamic:
+                continue
+            result.append(attribute.name)
+        return result or None
+
+    def getAttr(self, plug, **flags):
+        flags = normalize_flags(flags)
+        node_name, _, attr_name = plug.rsplit("|", 1)[-1].partition(".")
+        if node_name in self.scene.curves:
+            curve = self.scene.curves[node_name]
+            component, start, end = curve_multi_range(attr_name)
+            component = TANGENT_COMPONENT_NAMES.get(component, component)
+            if component not in TANGENT_COMPONENTS:
+                raise RuntimeError("Unsupported animCurve attribute: {}".format(attr_name))
+            return [curve.tangent_component(index, component) for index in range(start, end + 1)]
+        if attr_name.split("[")[0] in MATRIX_ATTRS:
+            matrix = self.scene.matrix_attr(self.scene.node(node_name), attr_name.split("[")[0], flags.get("time"))
+            return [value for row in matrix for value in row]
+
+        node, attribute = self.scene.plug(plug)
+        if flags.get("lock"):
+            return attribute.locked
+        if flags.get("settable"):
+            return not attribute.locked
+        if flags.get("keyable"):
+            return attribute.keyable
+        if flags.get("type"):
+            return attribute.type
+        value = self.scene.get_value(node, attribute, flags.get("time"))
+        if attribute.type == "bool":
+            return bool(round(value))
+        return value
+
+    def setAttr(self, plug, *values, **flags):
+        flags = normalize_flags(flags)
+        node_name, _, attr_name = plug.rsplit("|", 1)[-1].partition(".")
+        if node_name in self.scene.curves:
+            return self._set_key_time_values(self.scene.curves[node_name], attr_name, values)
+
+        node, attribute = self.scene.plug(plug)
+        if "lock" in flags:
+            attribute.locked = bool(flags["lock"])
+        if values:
+            self.scene.record_undo(attribute, "setAttr")
+            self.scene.set_value(node, attribute, float(values[0]))
+            # Con autokey, cambiar un atributo que ya tiene keys crea una key en el frame actual
+            curve = self.scene.curve_for(node.name, attribute.name) if self.scene.autokey else None
+            if curve is not None:
+                curve.insert(self.scene.current_time, float(values[0]))
+
+    def _set_key_time_values(self, curve, attr_name, values):
+        name, start, end = curve_multi_range(attr_name)
+        values = as_list(values)
+        name = TANGENT_COMPONENT_NAMES.get(name, name)
+        if name in TANGENT_COMPONENTS:
+            if len(values) != end - start + 1:
+                raise RuntimeError("{}[{}:{}] expects {} values".format(name, start, end, end - start + 1))
+            for index, value in zip(range(start, end + 1), values):
+                curve.set_tangent_component(index, name, value)
+            return
+        if name not in ("keyTimeValue", "ktv"):
+            raise RuntimeError("Unsupported animCurve attribute: {}".format(attr_name))
+        if len(values) != (end - start + 1) * 2:
+            raise RuntimeError("keyTimeValue[{}:{}] expects {} values".format(start, end, (end - start + 1) * 2))
+        curve.set_key_time_values(start, end, values)
+
+    def attributeQuery(self, attr_name, node=None, **flags):
+        flags = normalize_flags(flags)
+        node = self.scene.node(node)
+        attribute = node.attr(attr_name)
+        if flags.get("exists"):
+            return attribute is not None
+        if attribute is None:
+            raise RuntimeError("No attribute named {}".format(attr_name))
+        if flags.get("minExists"):
+            return attribute.minimum is not None
+        if flags.get("maxExists"):
+            return attribute.maximum is not None
+        if flags.get("minimum"):
+            return [attribute.minimum]
+        if flags.get("maximum"):
+            return [attribute.maximum]
+        if flags.get("longName"):
+            return attribute.name
+        if flags.get("shortName"):
+            return attribute.short
+        if flags.get("listDefault"):
+            return [attribute.default]
+        if flags.get("keyable"):
+            return attribute.keyable
+        return None
+
+    def addAttr(self, node_name, **flags):
+        flags = normalize_flags(flags)
+        self.scene.add_attr(node_name, flags["longName"], flags.get("attributeType", "double"),
+                            flags.get("defaultValue", 0.0), flags.get("minValue"), flags.get("maxValue"),
+                            flags.get("keyable", True))
+
+    def listConnections(self, *objects, **flags):
+        flags = normalize_flags(flags)
+        scene = self.scene
+        source = flags.get("source", True)
+        destination = flags.get("destination", True)
+        plugs = flags.get("plugs", False)
+        result = []
+
+        for obj in as_list(objects):
+            name = obj.rsplit("|", 1)[-1]
+            node_name, _, attr_name = name.partition(".")
+
+            if node_name in scene.curves:
+                curve = scene.curves[node_name]
+                if destination and curve.driven:
+                    driven = curve.driven if plugs else curve.driven.split(".")[0]
+                    result += [node_name + ".output", driven] if flags.get("connections") else [driven]
+                continue
+
+            node = scene.node(node_name)
+            attrs = [node.attr(attr_name).name] if attr_name else list(node.attrs)
+            for attr in attrs:
+                curve_name = scene.drivers.get("{}.{}".format(node.name, attr))
+                if source and curve_name:
+                    source_name = curve_name + ".output" if plugs else curve_name
+                    result += ["{}.{}".format(node.name, attr), source_name] if flags.get("connections") else [source_name]
+
+        return result or None
+
+    # ____ Keys ____
+
+    def _key_indices(self, curve, flags):
+        indices = range(len(curve))
+        ranges = time_ranges(flags.get("time"))
+        if ranges is not None:
+            found = set()
+            for start, end in ranges:
+                found.update(range(bisect_left(curve.times, start - 1e-6), bisect_right(curve.times, end + 1e-6)))
+            indices = sorted(found)
+        index_flag = index_ranges(flags.get("index"))
+        if index_flag is not None:
+            found = set()
+            for start, end in index_flag:
+                found.update(range(max(start, 0), min(end, len(curve) - 1) + 1))
+            indices = [i for i in indices if i in found]
+        if flags.get("selected"):
+            indices = [i for i in indices if i in curve.selected]
+        return list(indices)
+
+    def _target_curves(self, objects, flags):
+        scene = self.scene
+        objects = as_list(objects)
+        if not objects:
+            if flags.get("selected"):
+                return [curve for curve in scene.curves.values() if curve.selected]
+            objects = scene.selection
+        curves = []
+        for obj in objects:
+            for curve in scene.curves_of(obj, flags.get("attribute")):
+                if curve not in curves:
+                    curves.append(curve)
+        return curves
+
+    def keyframe(self, *objects, **flags):
+        flags = normalize_flags(flags)
+        curves = self._target_curves(objects, flags)
+
+        if flags.get("edit") or (not flags.get("query") and ("valueChange" in flags or "timeChange" in flags)):
+            count = 0
+            for curve in curves:
+                indices = self._key_indices(curve, flags)
+                for i in indices:
+                    if "valueChange" in flags:
+                        value = flags["valueChange"]
+                        curve.values[i] = curve.values[i] + value if flags.get("relative") else value
+                    if "timeChange" in flags:
+                        time = flags["timeChange"]
+                        curve.times[i] = curve.times[i] + time if flags.get("relative") else time
+                count += len(indices)
+            return count
+
+        if flags.get("name"):
+            return [curve.name for curve in curves if self._key_indices(curve, flags)] or None
+        if flags.get("keyframeCount"):
+            return sum(len(self._key_indices(curve, flags)) for curve in curves)
+        if flags.get("eval"):
+            times = [start for start, _ in time_ranges(flags.get("time"))] if flags.get("time") is not None else [self.scene.current_time]
+            return [curve.evaluate(time) for curve in curves for time in times]
+
+        result = []
+        for curve in curves:
+            for i in self._key_indices(curve, flags):
+                if flags.get("indexValue"):
+                    result.append(i)
+                    continue
+                if flags.get("timeChange") or not flags.get("valueChange"):
+                    result.append(curve.times[i])
+                if flags.get("valueChange"):
+                    result.append(curve.values[i])
+        return result or None
+
+    def keyTangent(self, *objects, **flags):
+        flags = normalize_flags(flags)
+        curves = self._target_curves(objects, flags)
+        result = []
+        for curve in curves:
+            indices = self._key_indices(curve, flags)
+            if flags.get("query"):
+                if flags.get("inTangentType"):
+                    result += [curve.in_types[i] for i in indices]
+                if flags.get("outTangentType"):
+                    result += [curve.out_types[i] for i in indices]
+                if flags.get("inAngle"):
+                    result += [curve.angle(i, "in") for i in indices]
+                if flags.get("outAngle"):
+                    result += [curve.angle(i, "out") for i in indices]
+                if flags.get("inWeight"):
+                    result += [1.0 for i in indices]
+                if flags.get("outWeight"):
+                    result += [1.0 for i in indices]
+                if flags.get("weightedTangents"):
+                    result.append(curve.weighted)
+                continue
+            for i in indices:
+                if "fixed" in (flags.get("inTangentType"), flags.get("outTangentType")):
+                    curve.fix(i)
+                if "inTangentType" in flags:
+                    curve.in_types[i] = flags["inTangentType"]
+                if "outTangentType" in flags:
+                    curve.out_types[i] = flags["outTangentType"]
+                if "inAngle" in flags:
+                    curve.set_angle(i, "in", flags["inAngle"])
+                if "outAngle" in flags:
+                    curve.set_angle(i, "out", flags["outAngle"])
+        return result if flags.get("query") else None
+
+    def setKeyframe(self, *objects, **flags):
+        flags = normalize_flags(flags)
+        scene = self.scene
+        objects = as_list(objects) or scene.selection
+        times = flags.get("time", scene.current_time)
+        times = [start for start, _ in time_ranges(times)]
+        count = 0
+        for obj in objects:
+            name = obj.rsplit("|", 1)[-1]
+            if name in scene.curves:
+                # Sobre una curva: -insert conserva la forma evaluandola en cada tiempo
+                curve = scene.curves[name]
+                for time in times:
+                    value = curve.evaluate(float(time)) if flags.get("insert") else flags.get("value", 0.0)
+                    curve.insert(float(time), float(value))
+                    count += 1
+                continue
+            if "." in name:
+                plugs = [name]
+            else:
+                node = scene.node(name)
+                attribute = flags.get("attribute")
+                attrs = as_list([attribute]) if attribute else [a.name for a in node.attrs.values() if a.keyable]
+                plugs = ["{}.{}".format(node.name, attr) for attr in attrs]
+            for plug in plugs:
+                node, attribute = scene.plug(plug)
+                curve = scene.curve_for(node.name, attribute.name)
+                if flags.get("insert") and curve is None:
+                    continue
+                for time in times:
+                    value = curve.evaluate(float(time)) if flags.get("insert") else flags.get("value")
+                    if value is None:
+                        value = scene.get_value(node, attribute)
+                    scene.set_key(node.name, attribute.name, float(time), float(value))
+                    count += 1
+        return count
+
+    def cutKey(self, *objects, **flags):
+        flags = normalize_flags(flags)
+        count = 0
+        for curve in self._target_curves(objects, flags):
+            indices = self._key_indices(curve, flags)
+            curve.remove(indices)
+            count += len(indices)
+        return count
+
+    def selectKey(self, *objects, **flags):
+        flags = normalize_flags(flags)
+        scene = self.scene
+        if flags.get("clear"):
+            for curve in scene.curves.values():
+                curve.selected = set()
+            return 0
+        count = 0
+        for curve in self._target_curves(objects, dict(flags, selected=False)):
+            indices = self._key_indices(curve, dict(flags, selected=False))
+            if flags.get("add"):
+                curve.selected |= set(indices)
+            else:
+                curve.selected = set(indices)
+            count += len(indices)
+        return count
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                   maya.api.OpenMaya                                                         #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+def build_oma():
+    oma = types.ModuleType("maya.api.OpenMayaAnim")
+
+    class MFnAnimCurve(object):
+        kAnimCurveTA, kAnimCurveTL, kAnimCurveTT, kAnimCurveTU, kAnimCurveUA, kAnimCurveUL = range(6)
+        (kTangentGlobal, kTangentFixed, kTangentLinear, kTangentFlat, kTangentSmooth, kTangentStep, kTangentSlow,
+         kTangentFast, kTangentClamped, kTangentPlateau, kTangentStepNext, kTangentAuto) = range(12)
+
+    oma.MFnAnimCurve = MFnAnimCurve
+    return oma
+
+
+def build_om2(scene_getter, count):
+    om2 = types.ModuleType("maya.api.OpenMaya")
+
+    class MAngle(object):
+        kRadians, kDegrees = 1, 2
+
+        def __init__(self, value=0.0, unit=1):
+            self.value = value if unit == MAngle.kRadians else math.radians(value)
+
+        @staticmethod
+        def uiUnit():
+            return MAngle.kDegrees
+
+        def asUnits(self, unit):
+            return self.value if unit == MAngle.kRadians else math.degrees(self.value)
+
+    class MDistance(object):
+        kCentimeters = 6
+
+        def __init__(self, value=0.0, unit=6):
+            self.value = value
+
+        @staticmethod
+        def uiUnit():
+            return MDistance.kCentimeters
+
+        def asUnits(self, unit):
+            return self.value
+
+    class MTime(object):
+        kFilm = 6
+
+        def __init__(self, value=0.0, unit=6):
+            self.value = value
+
+        @staticmethod
+        def uiUnit():
+            return MTime.kFilm
+
+        def asUnits(self, unit):
+            return self.value
+
+    class MPlug(object):
+        def __init__(self, node_name=None, attr_name=None):
+            self.node_name = node_name
+            self.attr_name = attr_name
+
+        def name(self):
+            return "{}.{}".format(self.node_name, self.attr_name)
+
+        def isNull(self):
+            return self.node_name is None
+
+        def asDouble(self):
+            scene = scene_getter()
+            node, attribute = scene.plug(self.name())
+            return scene.get_value(node, attribute)
+
+    class MSelectionList(object):
+        def __init__(self):
+            self.items = []
+
+        def add(self, name):
+            count("MSelectionList.add")
+            if not scene_getter().exists(name):
+                raise RuntimeError("(kInvalidParameter): Object does not exist")
+            self.items.append(name)
+            return self
+
+        def length(self):
+            return len(self.items)
+
+        def getPlug(self, index):
+            node, attribute = scene_getter().plug(self.items[index])
+            return MPlug(node.name, attribute.name)
+
+    class MDGModifier(object):
+        def __init__(self):
+            self.pending = []
+
+        def _queue(self, plug, value):
+            self.pending.append((plug, value))
+
+        def newPlugValueDouble(self, plug, value):
+            self._queue(plug, float(value))
+
+        def newPlugValueFloat(self, plug, value):
+            self._queue(plug, float(value))
+
+        def newPlugValueInt(self, plug, value):
+            self._queue(plug, int(value))
+
+        def newPlugValueBool(self, plug, value):
+            self._queue(plug, 1.0 if value else 0.0)
+
+        def newPlugValueMAngle(self, plug, value):
+            self._queue(plug, value.asUnits(MAngle.kDegrees))
+
+        def newPlugValueMDistance(self, plug, value):
+            self._queue(plug, value.asUnits(MDistance.kCentimeters))
+
+        def newPlugValueMTime(self, plug, value):
+            self._queue(plug, value.asUnits(MTime.kFilm))
+
+        def doIt(self):
+            count("MDGModifier.doIt")
+            scene = scene_getter()
+            for plug, value in self.pending:
+                node, attribute = scene.plug(plug.name())
+                scene.set_value(node, attribute, value)
+
+    # Constantes que usa sceneBackendMod al importarse; el backend de OpenMaya no se ejecuta contra el simulador
+    class MFnNumericData(object):
+        kBoolean, kByte, kChar, kShort, kInt, kFloat, kDouble = range(1, 8)
+
+    class MFnUnitAttribute(object):
+        kAngle, kDistance, kTime = range(1, 4)
+
+    class MFn(object):
+        kAnimCurve, kUnitAttribute, kEnumAttribute, kNumericAttribute, kUnitConversion, kDagNode = range(1, 7)
+
+    om2.MFnNumericData = MFnNumericData
+    om2.MFnUnitAttribute = MFnUnitAttribute
+    om2.MFn = MFn
+    om2.MAngle = MAngle
+    om2.MDistance = MDistance
+    om2.MTime = MTime
+    om2.MPlug = MPlug
+    om2.MSelectionList = MSelectionList
+    om2.MDGModifier = MDGModifier
+    return om2
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                          maya.OpenMaya, maya.OpenMayaUI y Qt                                                #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# keyToolsMod, barMod y los modulos de UI que importan (toolbar, customGraph, uiMod...) construyen widgets y usan
+# la API 1.0 solo dentro de sus funciones de UI. Para poder importarlos sin Maya ni Qt, estos modulos devuelven un
+# objeto comodin para cualquier nombre: se puede heredar de el, llamarlo, combinarlo con | y pedirle atributos.
+
+class StubMeta(type):
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub
+
+    def __or__(cls, other):
+        return cls
+
+    __ror__ = __and__ = __rand__ = __or__
+
+
+class Stub(object, metaclass=StubMeta):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub()
+
+    def __call__(self, *args, **kwargs):
+        return Stub()
+
+    def __or__(self, other):
+        return self
+
+    __ror__ = __and__ = __rand__ = __or__
+
+    def __iter__(self):
+        return iter(())
+
+    def __bool__(self):
+        return False
+
+    def __int__(self):
+        return 0
+
+    def __float__(self):
+        return 0.0
+
+
+class StubModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub
+
+
+def build_stub_modules():
+    # Qt (PySide2 con shiboken2; el fallback a PySide6 no se llega a usar) y la API 1.0 de Maya. toolbar crea la
+    # barra al importarse (widget, scriptJob y un hilo que la centra cada segundo), asi que tambien se sustituye
+    modules = {"TheKeyMachine.core.toolbar": StubModule("TheKeyMachine.core.toolbar")}
+    for name in ("maya.OpenMaya", "maya.OpenMayaUI", "maya.OpenMayaAnim", "maya.utils", "shiboken2", "PySide2"):
+        modules[name] = StubModule(name)
+    modules["PySide2"].__path__ = []
+    for name in ("QtCore", "QtGui", "QtWidgets", "QtSvg"):
+        module = StubModule("PySide2." + name)
+        setattr(modules["PySide2"], name, module)
+        modules[module.__name__] = module
+    return modules
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                        Instalacion                                                          #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+_active_scene = [None]
+_modules = {}
+_app_dir = [None]
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def maya_app_dir():
+    # Carpeta de usuario de Maya (internalVar userAppDir) compartida por todas las escenas. Como en una instalacion,
+    # scripts/TheKeyMachine es el plugin; toolbar crea ahi TheKeyMachine_user_data al importarse
+    if _app_dir[0] is None:
+        app_dir = tempfile.mkdtemp(prefix="tkm_perf_")
+        scripts = os.path.join(app_dir, "scripts")
+        os.makedirs(scripts)
+        os.symlink(os.path.join(ROOT, "TheKeyMachine"), os.path.join(scripts, "TheKeyMachine"), target_is_directory=True)
+        _app_dir[0] = app_dir
+    return _app_dir[0]
+
+
+def active_scene():
+    if _active_scene[0] is None:
+        _active_scene[0] = Scene()
+    return _active_scene[0]
+
+
+def use_scene(scene):
+    _active_scene[0] = scene
+    return scene
+
+
+def count(name):
+    active_scene().calls[name] += 1
+
+
+def counted(name, func):
+    def wrapper(*args, **kwargs):
+        count(name)
+        return func(*args, **kwargs)
+    wrapper.__name__ = name
+    return wrapper
+
+
+def install():
+    # Registra el paquete maya (cmds, mel, utils, OpenMaya, OpenMayaUI, api.OpenMaya) y Qt falsos. Idempotente.
+    if _modules:
+        return _modules
+
+    fake_cmds = FakeCmds(active_scene)
+
+    maya = types.ModuleType("maya")
+    maya.__path__ = []
+    cmds = types.ModuleType("maya.cmds")
+    for name in dir(fake_cmds):
+        if not name.startswith("_") and name != "scene":
+            setattr(cmds, name, counted(name, getattr(fake_cmds, name)))
+
+    mel = types.ModuleType("maya.mel")
+    mel.eval = counted("mel.eval", lambda command: "MainProgressBar" if "gMainProgressBar" in command else None)
+
+    api = types.ModuleType("maya.api")
+    api.__path__ = []
+    om2 = build_om2(active_scene, count)
+
+    oma = build_oma()
+
+    maya.cmds = cmds
+    maya.mel = mel
+    maya.api = api
+    api.OpenMaya = om2
+    api.OpenMayaAnim = oma
+
+    stubs = build_stub_modules()
+    maya.OpenMaya = stubs["maya.OpenMaya"]
+    maya.OpenMayaUI = stubs["maya.OpenMayaUI"]
+    maya.OpenMayaAnim = stubs["maya.OpenMayaAnim"]
+    maya.utils = stubs["maya.utils"]
+
+    _modules.update(stubs)
+    _modules.update({"maya": maya, "maya.cmds": cmds, "maya.mel": mel, "maya.api": api, "maya.api.OpenMaya": om2,
+                     "maya.api.OpenMayaAnim": oma})
+    sys.modules.update(_modules)
+
+    # Raiz del repo para poder importar TheKeyMachine sin instalarlo; la carpeta scripts va al final, como en Maya
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    scripts = os.path.join(maya_app_dir(), "scripts")
+    if scripts not in sys.path:
+        sys.path.append(scripts)
+    return _modules
@@ -0,0 +1,343 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import importlib
+import time
+from collections import Counter
+
+from tests.perf import fakeMaya
+from tests.perf import scenarios
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                      Benchmark runners                                                      #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Cada runner prepara su escena (fuera del tiempo medido) y ejecuta una herramienta tal como la dispara la UI:
+# los sliders hacen un drag completo (sesion, N ticks y reset). El resultado guarda tiempos y el numero de
+# llamadas a Maya por comando, que es lo que realmente escala en un rig pesado.
+#
+# Las lecturas de escena van por sceneBackendMod: "fake" (en memoria, hace el papel del backend de OpenMaya) o
+# "cmds" (el backend base, todo por maya.cmds simulado).
+#
+# keyToolsMod, barMod y customGraph importan Qt, la API 1.0 y el toolbar al cargarse; fakeMaya los sustituye por
+# modulos comodin para que sus herramientas tambien se midan. Si un modulo aun asi no se puede importar, el runner
+# lanza RunnerUnavailable y el test se salta.
+
+
+RUNNERS = {}
+
+# Valores de un drag tipico: el slider pasa por todo el rango
+DRAG_TICKS = 20
+
+
+class RunnerUnavailable(Exception):
+    pass
+
+
+class BenchResult(object):
+    def __init__(self, name, times, calls):
+        self.name = name
+        self.times = times
+        self.calls = calls      # Counter de llamadas por comando en una ronda
+
+    @property
+    def best(self):
+        return min(self.times)
+
+    @property
+    def mean(self):
+        return sum(self.times) / len(self.times)
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def report(self):
+        top = ", ".join("{} {}".format(name, number) for name, number in self.calls.most_common(6))
+        return "{:<22} best {:8.2f} ms  mean {:8.2f} ms  calls {:7d}  ({})".format(
+            self.name, self.best * 1000.0, self.mean * 1000.0, self.total_calls, top)
+
+
+def runner(name):
+    def register(func):
+        RUNNERS[name] = func
+        return func
+    return register
+
+
+def load_module(module_name):
+    # Importa un modulo de TheKeyMachine con el Maya falso; los que dependen de Qt/UI pueden no estar disponibles
+    fakeMaya.install()
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise RunnerUnavailable("{} cannot be imported headless: {}".format(module_name, e))
+
+
+def fixed_job_slices(tool, steps_per_slice=25):
+    # Los jobs de jobRunnerMod cortan los trozos por tiempo real: refresh, progressBar y evalDeferred saldrian
+    # distintos en cada maquina. Los jobs que crea tool() usan un reloj que avanza SLICE_TIME / steps_per_slice en
+    # cada lectura, asi que cada trozo hace siempre los mismos pasos
+    jobRunner = load_module("TheKeyMachine.mods.jobRunnerMod")
+
+    def run():
+        now = [0.0]
+
+        def clock():
+            now[0] += jobRunner.SLICE_TIME / steps_per_slice
+            return now[0]
+
+        default_clock = jobRunner.slice_clock
+        jobRunner.slice_clock = clock
+        try:
+            return tool()
+        finally:
+            jobRunner.slice_clock = default_clock
+    return run
+
+
+def use_backend(backend):
+    fakeMaya.install()
+    from tests.perf import fakeBackend
+    import TheKeyMachine.mods.sceneBackendMod as sceneBackend
+
+    if backend == "fake":
+        return sceneBackend.set_backend(fakeBackend.FakeBackend())
+    if backend == "cmds":
+        return sceneBackend.set_backend(sceneBackend.SceneBackend())
+    raise ValueError("Unknown backend: {}".format(backend))
+
+
+def run(name, preset="small", rounds=3, backend="fake"):
+    # Ejecuta el runner `name` en `rounds` escenas recien generadas y devuelve un BenchResult
+    use_backend(backend)
+    func = RUNNERS[name]
+    times = []
+    calls = Counter()
+
+    for _ in range(rounds):
+        scene = fakeMaya.use_scene(scenarios.build_preset(preset))
+        tool = func(scene)                  # preparacion, no se mide
+        scene.reset_calls()
+        started = time.perf_counter()
+        tool()
+        scene.run_idle()                    # los jobs de jobRunnerMod corren en la cola idle
+        times.append(time.perf_counter() - started)
+        calls = scene.calls
+
+    return BenchResult(name, times, calls)
+
+
+# ____ Sliders ____
+
+def drag(session_factory, kernel, values, release):
+    slider = load_module("TheKeyMachine.mods.sliderMod")
+
+    def tool():
+        session = session_factory(slider)
+        for value in values:
+            result, mask = kernel(session.arrays, value)
+            session.set_array_values(result, mask)
+        release(session)
+    return tool
+
+
+@runner("tween")
+def tween_runner(scene):
+    sliderMath = load_module("TheKeyMachine.mods.sliderMathMod")
+    scenarios.select_all_controls(scene)
+
+    def release(session):
+        # tweenSliderReset: key en las curvas que ya tenian keys
+        session.key_current_frame([p for p in session.writable_plugs() if p.has_keys and not p.locked])
+        session.release()
+
+    values = [50.0 + 70.0 * i / (DRAG_TICKS - 1) for i in range(DRAG_TICKS)]
+    return drag(lambda slider: slider.DragSession(), sliderMath.tween, values, release)
+
+
+@runner("blend_to_key")
+def blend_to_key_runner(scene):
+    sliderMath = load_module("TheKeyMachine.mods.sliderMathMod")
+    scenarios.select_all_controls(scene)
+
+    def release(session):
+        # blendSliderReset
+        session.key_current_frame(session.writable_plugs(), stepnext=True)
+        session.release()
+
+    values = [-50.0 + 100.0 * i / (DRAG_TICKS - 1) for i in range(DRAG_TICKS)]
+    return drag(lambda slider: slider.DragSession(), sliderMath.blend, values, release)
+
+
+@runner("pull_push_keys")
+def pull_push_keys_runner(scene):
+    # Pull/Push con keys seleccionadas en el graph editor
+    slider = load_module("TheKeyMachine.mods.sliderMod")
+    scenarios.select_all_controls(scene)
+    scenarios.select_keys_around_current_time(scene)
+
+    def tool():
+        session = slider.DragSession()
+        for i in range(DRAG_TICKS):
+            value = -5.0 + 10.0 * i / (DRAG_TICKS - 1)
+            for curve_keys in session.selected_curve_keys() or []:
+                session.offset_curve_keys(curve_keys, value * 0.2)
+        session.release()
+    return tool
+
+
+# ____ Curvas ____
+
+@runner("curve_snapshot")
+def curve_snapshot_runner(scene):
+    # Lee todas las curvas en columnas, mueve las keys seleccionadas y deja el resultado en el undo
+    sceneBackend = load_module("TheKeyMachine.mods.sceneBackendMod")
+    for curve in scene.curves.values():
+        curve.selected = set(range(0, len(curve), 2))
+
+    def tool():
+        backend = sceneBackend.get_backend()
+        snapshots = backend.read_curves(list(scene.curves))
+        for snapshot in snapshots:
+            indices = snapshot.selected_indices()
+            snapshot.set_values([snapshot.values[index] + 1.0 for index in indices], indices)
+            backend.write_curve(snapshot)
+        for snapshot in snapshots:
+            backend.commit_curve(snapshot)
+    return tool
+
+
+@runner("curve_filters")
+def curve_filters_runner(scene):
+    # Un drag de cada modo del slider de curvas del graph editor sobre un rango de keys seleccionadas
+    curveTools = load_module("TheKeyMachine.mods.curveToolsMod")
+    scenarios.select_key_range(scene)
+    modes = [("Smooth", 0.0, 0.5), ("Wave", -1.0, 1.0), ("Scale", 0.7, 1.3), ("Scale Sel", 0.7, 1.3),
+             ("Lineal", 0.0, 1.0), ("Flat", 0.0, 1.0), ("Ease in/out", 0.0, 1.0), ("Noise", 0.0, 0.5)]
+
+    def tool():
+        for mode, low, high in modes:
+            session = curveTools.FilterSession()
+            for i in range(DRAG_TICKS):
+                session.apply(mode, low + (high - low) * i / (DRAG_TICKS - 1))
+            session.release()
+    return tool
+
+
+@runner("gaussian_smooth")
+def gaussian_smooth_runner(scene):
+    # Un solo tick del modo Gaussian sobre todas las keys (--preset mocap: 50 curvas de 3000 keys)
+    curveTools = load_module("TheKeyMachine.mods.curveToolsMod")
+    scenarios.select_key_range(scene, 0.0, 1.0)
+
+    def tool():
+        session = curveTools.FilterSession()
+        session.apply("Gaussian", 4.0)
+        session.release()
+    return tool
+
+
+@runner("key_reduction")
+def key_reduction_runner(scene):
+    # Reduce todas las curvas de los objetos seleccionados (--preset baked: 50 curvas bakeadas de 3000 keys)
+    curveTools = load_module("TheKeyMachine.mods.curveToolsMod")
+    scenarios.select_all_controls(scene)
+    return lambda: curveTools.reduce_curves(tolerance=0.05)
+
+
+@runner("key_cleanup")
+def key_cleanup_runner(scene):
+    # Curvas estaticas y keys que sobran de toda la escena (--preset baked para curvas densas sin ruido)
+    curveTools = load_module("TheKeyMachine.mods.curveToolsMod")
+    return lambda: curveTools.cleanup_keys(scene=True)
+
+
+@runner("tangents")
+def tangents_runner(scene):
+    # Todos los modos de tangentEngine sobre el tramo central de keys de todas las curvas
+    curveTools = load_module("TheKeyMachine.mods.curveToolsMod")
+    tangentEngine = load_module("TheKeyMachine.mods.tangentEngineMod")
+    scenarios.select_key_range(scene)
+
+    def tool():
+        for mode in sorted(tangentEngine.MODES):
+            curveTools.set_tangents(mode)
+    return tool
+
+
+# ____ Herramientas ligadas a la UI ____
+
+@runner("mirror")
+def mirror_runner(scene):
+    keyTools = load_module("TheKeyMachine.mods.keyToolsMod")
+    scenarios.select_all_controls(scene)
+    return keyTools.mirror
+
+
+@runner("copy_paste_animation")
+def copy_paste_animation_runner(scene):
+    keyTools = load_module("TheKeyMachine.mods.keyToolsMod")
+    scenarios.select_all_controls(scene)
+
+    def tool():
+        keyTools.copy_animation()
+        keyTools.paste_animation()
+    return tool
+
+
+@runner("copy_worldspace_animation")
+def copy_worldspace_animation_runner(scene):
+    # Primera copia: sin muestras de una ronda anterior en la cache de worldspace
+    bar = load_module("TheKeyMachine.mods.barMod")
+    load_module("TheKeyMachine.mods.worldspaceMod").sample_cache.clear()
+    scenarios.select_all_controls(scene)
+    return fixed_job_slices(bar.copy_worldspace_animation)
+
+
+@runner("worldspace_sample")
+def worldspace_sample_runner(scene):
+    # El muestreo de copy worldspace sin la UI: worldMatrix de todos los controles en sus frames con key
+    worldspace = load_module("TheKeyMachine.mods.worldspaceMod")
+    scenarios.select_all_controls(scene)
+    return lambda: worldspace.copy_worldspace(list(scene.selection))
+
+
+@runner("worldspace_recopy")
+def worldspace_recopy_runner(scene):
+    # Segunda copia con la cache de la primera tras cambiar una key de un solo control
+    worldspace = load_module("TheKeyMachine.mods.worldspaceMod")
+    scenarios.select_all_controls(scene)
+    cache = worldspace.SampleCache()
+    worldspace.copy_worldspace(list(scene.selection), cache=cache)
+    curve = next(iter(scene.curves.values()))
+    curve.values[0] += 1.0
+    return lambda: worldspace.copy_worldspace(list(scene.selection), cache=cache)
+
+
+@runner("worldspace_paste")
+def worldspace_paste_runner(scene):
+    # Pega lo copiado de todos los controles: un muestreo de parentInverseMatrix y una escritura por canal
+    worldspace = load_module("TheKeyMachine.mods.worldspaceMod")
+    scenarios.select_all_controls(scene)
+    animation_data = worldspace.copy_worldspace(list(scene.selection))
+    return lambda: worldspace.paste_worldspace(animation_data)
@@ -0,0 +1,125 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+import random
+
+from tests.perf import fakeMaya
+
+
+
+# -----------------------------------------------------------------------------------------------------------------------------
+#                                                     Scenario generators                                                     #
+# -----------------------------------------------------------------------------------------------------------------------------
+
+# Escenas de referencia para los benchmarks. Los controles van en parejas L_/R_ (para mirror) dentro de un
+# namespace, con los 9 canales de transform mas atributos dinamicos hasta completar los canales pedidos.
+
+EXTRA_ATTRS = [("ikFk", 0.0, 0.0, 1.0), ("stretch", 1.0, 0.0, 10.0), ("twist", 0.0, None, None),
+               ("roll", 0.0, None, None), ("bend", 0.0, -10.0, 10.0), ("squash", 0.0, None, None)]
+
+TRANSFORM_CHANNELS = ["translateX", "translateY", "translateZ", "rotateX", "rotateY", "rotateZ",
+                      "scaleX", "scaleY", "scaleZ"]
+
+# Tamaños con nombre: (controles, canales, keys por canal)
+PRESETS = {
+    "tiny": (10, 12, 20),
+    "small": (40, 12, 60),
+    "reference": (200, 12, 500),
+    "dense": (10, 10, 1000),        # 100 curvas de 1000 keys, para las herramientas de curvas
+    "mocap": (5, 10, 3000),         # 50 curvas bakeadas de 3000 keys (una por frame)
+    "baked": (5, 10, 3000),         # lo mismo sin ruido, como un bake de una animacion limpia
+}
+
+# Opciones de build_rig distintas de las de por defecto
+PRESET_OPTIONS = {
+    "mocap": {"step": 1.0},
+    "baked": {"step": 1.0, "noise": 0.0},
+}
+
+
+def control_names(controls, namespace="char"):
+    names = []
+    for index in range(controls):
+        side = "L" if index % 2 == 0 else "R"
+        names.append("{}:{}_ctrl_{:03d}".format(namespace, side, index // 2) if namespace else
+                     "{}_ctrl_{:03d}".format(side, index // 2))
+    return names
+
+
+def build_rig(scene=None, controls=200, channels=12, keys=500, namespace="char", step=2.0, seed=0, noise=0.02):
+    # controls x channels curvas de keys cada una, espaciadas cada step frames a partir del frame 1. noise es el
+    # ruido gaussiano en proporcion a la amplitud
+    scene = scene or fakeMaya.Scene()
+    rng = random.Random(seed)
+
+    channel_names = TRANSFORM_CHANNELS[:channels]
+    extra = EXTRA_ATTRS[:max(0, channels - len(channel_names))]
+
+    for name in control_names(controls, namespace):
+        scene.create_transform(name)
+        for attr_name, default, minimum, maximum in extra:
+            scene.add_attr(name, attr_name, "double", default, minimum, maximum)
+
+        for attr_name in channel_names + [attr[0] for attr in extra]:
+            curve = scene.curve_for(name, attr_name, create=True)
+            attribute = scene.nodes[name].attr(attr_name)
+            amplitude = 30.0 if attribute.type == "doubleAngle" else 2.0
+            phase = rng.uniform(0.0, math.pi * 2.0)
+            frequency = rng.uniform(0.02, 0.1)
+            base = attribute.default
+
+            curve.times = [1.0 + i * step for i in range(keys)]
+            values = [base + amplitude * math.sin(phase + frequency * t) + rng.gauss(0.0, amplitude * noise) for t in curve.times]
+            if attribute.minimum is not None or attribute.maximum is not None:
+                low = attribute.minimum if attribute.minimum is not None else -float("inf")
+                high = attribute.maximum if attribute.maximum is not None else float("inf")
+                values = [min(max(value, low), high) for value in values]
+            curve.values = values
+            curve.in_types = ["auto"] * keys
+            curve.out_types = ["auto"] * keys
+
+    scene.min_time = 1.0
+    scene.max_time = 1.0 + (keys - 1) * step
+    scene.set_time(1.0 + step * (keys // 2) + step * 0.5)   # entre dos keys
+    return scene
+
+
+def build_preset(name, scene=None, **kwargs):
+    controls, channels, keys = PRESETS[name]
+    options = dict(PRESET_OPTIONS.get(name, {}), **kwargs)
+    return build_rig(scene, controls=controls, channels=channels, keys=keys, **options)
+
+
+def select_all_controls(scene):
+    scene.selection = list(scene.nodes)
+
+
+def select_keys_around_current_time(scene, radius=3):
+    # Selecciona en el graph editor las keys cercanas al frame actual de todas las curvas
+    for curve in scene.curves.values():
+        curve.selected = {i for i, time in enumerate(curve.times) if abs(time - scene.current_time) <= radius}
+
+
+def select_key_range(scene, start=0.25, end=0.75):
+    # Selecciona en el graph editor las keys del tramo central (en proporcion) de todas las curvas
+    for curve in scene.curves.values():
+        count = len(curve)
+        curve.selected = set(range(int(count * start), min(int(count * end), count - 1) + 1))
@@ -0,0 +1,53 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+from tests.perf import fakeMaya
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+# El backend en memoria y el de cmds tienen que dejar la escena exactamente igual
+
+def scene_state(scene):
+    curves = {name: (curve.times, [round(value, 9) for value in curve.values], curve.in_types, curve.out_types)
+              for name, curve in scene.curves.items()}
+    values = {"{}.{}".format(node.name, attribute.name): round(attribute.value, 9)
+              for node in scene.nodes.values() for attribute in node.attrs.values()}
+    return curves, values
+
+
+def run_with_backend(name, backend):
+    runners.use_backend(backend)
+    scene = fakeMaya.use_scene(scenarios.build_preset("tiny"))
+    runners.RUNNERS[name](scene)()
+    return scene
+
+
+@pytest.mark.parametrize("name", ["tween", "blend_to_key", "pull_push_keys"])
+def test_backends_agree(name):
+    fake_scene = run_with_backend(name, "fake")
+    cmds_scene = run_with_backend(name, "cmds")
+
+    assert scene_state(fake_scene) == scene_state(cmds_scene)
+    assert fake_scene.calls["backend.read_keys"] > 0
+    assert cmds_scene.calls["getAttr"] > fake_scene.calls["getAttr"]
@@ -0,0 +1,120 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import json
+import os
+
+import pytest
+
+from tests.perf import fakeMaya
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+# Limite de llamadas a Maya por herramienta en la escena de referencia de budgets.json. Un patron O(n^2) de
+# consultas dispara el numero de llamadas mucho antes que el tiempo, asi que falla aqui aunque la maquina sea rapida.
+
+BUDGETS_FILE = os.path.join(os.path.dirname(__file__), "budgets.json")
+
+
+def load_budgets():
+    with open(BUDGETS_FILE, "r") as file:
+        return json.load(file)
+
+
+BUDGETS = load_budgets()
+
+
+def count_tool_calls(name, preset, backend):
+    runners.use_backend(backend)
+    import TheKeyMachine.mods.callCounterMod as callCounter
+
+    scene = fakeMaya.use_scene(scenarios.build_preset(preset))
+    tool = runners.RUNNERS[name](scene)
+
+    callCounter.counter.reset()
+    callCounter.enable()
+    try:
+        with callCounter.counter.measure(name) as measure:
+            tool()
+            scene.run_idle()
+    finally:
+        callCounter.disable()
+
+    backend_calls = sum(number for command, number in scene.calls.items() if command.startswith("backend."))
+    return measure.stats.last_calls, backend_calls
+
+
+@pytest.mark.parametrize("name", sorted(BUDGETS["tools"]))
+def test_call_budget(name):
+    budget = BUDGETS["tools"][name]
+    try:
+        calls, backend_calls = count_tool_calls(name, BUDGETS["preset"], BUDGETS["backend"])
+    except runners.RunnerUnavailable as e:
+        pytest.skip(str(e))
+
+    total = sum(calls.values())
+    assert total <= budget["max_calls"], "{} made {} Maya calls (budget {}): {}".format(
+        name, total, budget["max_calls"], calls.most_common(8))
+
+    # Llamadas al backend en memoria (equivalen a llamadas en proceso al API de OpenMaya)
+    if "max_backend_calls" in budget:
+        assert backend_calls <= budget["max_backend_calls"], "{} made {} backend calls (budget {})".format(
+            name, backend_calls, budget["max_backend_calls"])
+
+    for command, limit in budget.get("commands", {}).items():
+        assert calls[command] <= limit, "{} made {} {} calls (budget {})".format(name, calls[command], command, limit)
+
+
+def test_counter_tracks_nested_calls_once():
+    fakeMaya.install()
+    import TheKeyMachine.mods.callCounterMod as callCounter
+    from maya import cmds
+
+    scene = fakeMaya.use_scene(fakeMaya.Scene())
+    scene.create_transform("ctrl")
+
+    counter = callCounter.CallCounter()
+    proxy = callCounter.MayaProxy(cmds, "cmds", counter)
+    with counter.measure("outer"):
+        proxy.getAttr("ctrl.tx")
+        with counter.measure("inner"):
+            proxy.setAttr("ctrl.tx", 1.0)
+
+    assert list(counter.tools) == ["outer"]
+    assert counter.tools["outer"].calls == {"cmds.getAttr": 1, "cmds.setAttr": 1}
+    assert counter.tools["outer"].invocations == 1
+
+
+def test_default_modules_cover_maya_modules():
+    # Todo modulo de herramientas que importa maya.cmds se tiene que contar; los de UI (menus, iconos) no
+    import TheKeyMachine.mods.callCounterMod as callCounter
+
+    ui_modules = {"generalMod", "helperMod", "hotkeysMod", "mediaMod", "selSetsMod", "uiMod", "callCounterMod"}
+    mods_dir = os.path.join(fakeMaya.ROOT, "TheKeyMachine", "mods")
+    for file_name in sorted(os.listdir(mods_dir)):
+        name, ext = os.path.splitext(file_name)
+        if ext != ".py" or name in ui_modules:
+            continue
+        with open(os.path.join(mods_dir, file_name), "r", encoding="utf-8") as file:
+            source = file.read()
+        if "import maya.cmds" in source:
+            assert "TheKeyMachine.mods." + name in callCounter.DEFAULT_MODULES, name
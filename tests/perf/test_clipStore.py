@@ -0,0 +1,207 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import json
+import os
+
+import pytest
+
+import TheKeyMachine.mods.clipStoreMod as clipStore
+from tests.perf import runners
+
+
+
+ANIMATION = {
+    "arm_ctrl": {"translateX": {"keyframes": [1.0, 5.0, 9.5], "values": [0.0, 2.5, -1.0]},
+                 "rotateZ": {"keyframes": [1.0], "values": [45.0]}},
+    "leg_ctrl": {"visibility": {"keyframes": None, "values": None}},
+}
+WORLDSPACE = {"pelvis": {1: [1.0, 2.0, 3.0, 10.0, 20.0, 30.0], 12: [4.0, 5.0, 6.0, -10.0, 0.0, 90.0]},
+              "spine": {}}
+POSE = {"arm_ctrl": {"translateX": 1.5, "rotateOrder": 3, "visibility": True, "label": "left"}}
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    return str(tmp_path / "tool" / "copy_data.json")
+
+
+def plain(view):
+    return {obj: view[obj] for obj in view}
+
+
+def test_animation_round_trip(json_path):
+    clipStore.save_data(json_path, "animation", ANIMATION)
+    assert not os.path.exists(json_path)
+    with clipStore.open_data(json_path, "animation") as data:
+        result = plain(data)
+    assert result["arm_ctrl"] == ANIMATION["arm_ctrl"]
+    assert result["leg_ctrl"] == {"visibility": {"keyframes": [], "values": []}}
+
+
+def test_worldspace_keeps_integer_frames(json_path):
+    clipStore.save_data(json_path, "worldspace", WORLDSPACE)
+    with clipStore.open_data(json_path, "worldspace") as data:
+        assert plain(data) == WORLDSPACE
+
+
+def test_pose_keeps_non_numeric_values(json_path):
+    clipStore.save_data(json_path, "pose", POSE)
+    with clipStore.open_data(json_path, "pose") as data:
+        assert data["arm_ctrl"] == POSE["arm_ctrl"]
+
+
+def test_only_requested_objects_are_decoded(json_path, monkeypatch):
+    clipStore.save_data(json_path, "animation", ANIMATION)
+    decoded = []
+    decode = clipStore.decode
+    monkeypatch.setattr(clipStore, "decode", lambda kind, clip, obj: decoded.append(obj) or decode(kind, clip, obj))
+    with clipStore.open_data(json_path, "animation") as data:
+        assert "leg_ctrl" in data and "missing" not in data
+        data["arm_ctrl"]
+    assert decoded == ["arm_ctrl"]
+
+
+def test_pure_python_matches_numpy(json_path, monkeypatch):
+    if clipStore.np is None:
+        pytest.skip("NumPy not available")
+    clipStore.save_data(json_path, "worldspace", WORLDSPACE)
+    with clipStore.open_data(json_path, "worldspace") as data:
+        expected = plain(data)
+    monkeypatch.setattr(clipStore, "np", None)
+    with clipStore.open_data(json_path, "worldspace") as data:
+        assert plain(data) == expected
+
+
+def test_legacy_json_is_still_read(json_path):
+    os.makedirs(os.path.dirname(json_path))
+    with open(json_path, "w") as json_file:
+        json.dump(WORLDSPACE, json_file)
+    assert clipStore.data_exists(json_path)
+    with clipStore.open_data(json_path, "worldspace") as data:
+        assert data["pelvis"]["12"] == WORLDSPACE["pelvis"][12]
+
+
+def test_newest_file_wins(json_path):
+    clipStore.save_data(json_path, "pose", POSE)
+    with open(json_path, "w") as json_file:
+        json.dump({"other_ctrl": {"translateY": 2.0}}, json_file)
+    clip = clipStore.clip_path(json_path)
+    os.utime(clip, (os.path.getmtime(json_path) - 10.0,) * 2)
+    with clipStore.open_data(json_path, "pose") as data:
+        assert list(data) == ["other_ctrl"]
+
+
+def test_missing_data_is_none(json_path):
+    assert not clipStore.data_exists(json_path)
+    with clipStore.open_data(json_path, "animation") as data:
+        assert data is None
+
+
+def test_export_json(json_path, tmp_path):
+    clipStore.save_data(json_path, "worldspace", WORLDSPACE)
+    target = clipStore.export_json(json_path, "worldspace", str(tmp_path / "export.json"))
+    with open(target) as json_file:
+        exported = json.load(json_file)
+    assert exported["pelvis"]["1"] == WORLDSPACE["pelvis"][1]
+
+
+def test_close_with_a_column_still_alive(json_path):
+    # Una vista de NumPy guardada despues del with no impide cerrar el contenedor
+    clipStore.save_data(json_path, "worldspace", WORLDSPACE)
+    with clipStore.open_clip(clipStore.clip_path(json_path)) as clip:
+        columns = clip.columns("pelvis", clipStore.WORLD_CHANNEL)
+    assert clip.buffer is None and clip.file.closed
+    assert list(columns[0]) == [1.0, 12.0]
+
+
+def test_export_copy_data_from_the_menu(scene, json_path, tmp_path, monkeypatch):
+    keyTools = runners.load_module("TheKeyMachine.mods.keyToolsMod")
+    monkeypatch.setitem(keyTools.COPY_DATA_FILES, "pose", lambda: json_path)
+    target = str(tmp_path / "pose.json")
+
+    scene.dialog_files = [target]
+    assert keyTools.export_copy_data("pose") is None
+    assert any("no copied pose" in warning for warning in scene.warnings)
+
+    clipStore.save_data(json_path, "pose", POSE)
+    scene.dialog_files = None
+    assert keyTools.export_copy_data("pose") is None and not os.path.exists(target)
+
+    scene.dialog_files = [target]
+    assert keyTools.export_copy_data("pose") == target
+    with open(target) as json_file:
+        assert json.load(json_file) == POSE
+
+    scene.dialog_files = [json_path]
+    assert keyTools.export_copy_data("pose") is None
+
+
+def test_paste_animation_writes_each_channel_in_bulk(scene):
+    keyTools = runners.load_module("TheKeyMachine.mods.keyToolsMod")
+    runners.use_backend("fake")
+    scene.create_transform("ctrl")
+    for frame, value in ((1.0, 0.0), (5.0, 2.5), (9.0, -1.0)):
+        scene.set_key("ctrl", "translateX", frame, value)
+    for frame, value in ((-5.0, 7.0), (3.0, 1.0)):
+        scene.set_key("ctrl", "translateY", frame, value)
+    scene.selection = ["ctrl"]
+    keyTools.copy_animation()
+    scene.set_key("ctrl", "translateX", 5.0, 100.0)
+    scene.set_key("ctrl", "translateY", 3.0, 100.0)
+
+    scene.reset_calls()
+    keyTools.paste_animation()
+
+    tx, ty = scene.curve_for("ctrl", "translateX"), scene.curve_for("ctrl", "translateY")
+    assert (tx.times, tx.values) == ([1.0, 5.0, 9.0], [0.0, 2.5, -1.0])
+    # La key de -5 queda fuera del rango que se borra: ese canal se pega key a key
+    assert (ty.times, ty.values) == ([-5.0, 3.0], [7.0, 1.0])
+    assert scene.calls["setKeyframe"] == 1 + 2
+
+
+def test_wrong_files_are_rejected(json_path):
+    clipStore.save_data(json_path, "pose", POSE)
+    with pytest.raises(ValueError):
+        with clipStore.open_data(json_path, "animation"):
+            pass
+
+    clip = clipStore.clip_path(json_path)
+    with open(clip, "r+b") as file:
+        file.seek(4)
+        file.write(b"\x63\x00")
+    with pytest.raises(ValueError):
+        clipStore.open_clip(clip)
+
+    with open(clip, "wb") as file:
+        file.write(b"{}")
+    with pytest.raises(ValueError):
+        clipStore.open_clip(clip)
+
+
+def test_binary_is_smaller_than_the_indented_json(json_path):
+    frames = [float(frame) for frame in range(2000)]
+    data = {"ctrl{}".format(index): {channel: {"keyframes": frames, "values": [frame * 0.123456789 for frame in frames]}
+                                     for channel in ("translateX", "translateY", "rotateZ")}
+            for index in range(5)}
+    clipStore.save_data(json_path, "animation", data)
+    assert os.path.getsize(clipStore.clip_path(json_path)) < len(json.dumps(data, indent=4)) / 2
+    with clipStore.open_data(json_path, "animation") as view:
+        assert view["ctrl3"]["rotateZ"] == data["ctrl3"]["rotateZ"]
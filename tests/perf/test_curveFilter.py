@@ -0,0 +1,208 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+import random
+
+import pytest
+
+import TheKeyMachine.mods.curveFilterMod as curveFilter
+from tests.perf import fakeMaya
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+# Kernels puros: no necesitan Maya
+
+TIMES = [1.0 + 2.0 * i for i in range(30)]
+VALUES = [math.sin(t * 0.3) * 5.0 + random.Random(i).uniform(-0.5, 0.5) for i, t in enumerate(TIMES)]
+MASK = [10 <= i <= 20 for i in range(30)]
+
+CASES = [(mode, value) for mode in sorted(curveFilter.MODES) for value in (0.0, 0.3, 0.75, 1.2)]
+
+
+def unselected_unchanged(result):
+    return all(result[i] == pytest.approx(VALUES[i]) for i in range(30) if not MASK[i])
+
+
+@pytest.mark.parametrize("mode,value", CASES)
+def test_modes_only_touch_selected_keys(mode, value):
+    result = curveFilter.apply_mode(mode, TIMES, VALUES, MASK, value)
+    assert len(result) == len(VALUES)
+    if mode != "Scale Sel":
+        assert unselected_unchanged(result)
+
+
+@pytest.mark.parametrize("mode,value", CASES)
+def test_pure_python_kernels_match_numpy(monkeypatch, mode, value):
+    if curveFilter.np is None:
+        pytest.skip("NumPy not available")
+    state = {"seeds": curveFilter.noise_seeds(sum(MASK))}
+    expected = list(curveFilter.apply_mode(mode, TIMES, VALUES, MASK, value, dict(state)))
+
+    monkeypatch.setattr(curveFilter, "np", None)
+    state = {"seeds": list(state["seeds"])}
+    assert list(curveFilter.apply_mode(mode, TIMES, VALUES, MASK, value, state)) == pytest.approx(expected)
+
+
+def test_neutral_values_leave_curve_unchanged():
+    for mode, neutral in (("Smooth", 0.0), ("Gaussian", 0.0), ("Wave", 0.0), ("Scale", 1.0), ("Scale Sel", 1.0), ("Lineal", 0.0),
+                          ("Flat", 0.0), ("Ease in/out", 0.5), ("Noise", 0.0)):
+        assert list(curveFilter.apply_mode(mode, TIMES, VALUES, MASK, neutral)) == pytest.approx(VALUES)
+
+
+def test_linear_and_flat_targets():
+    selected = [i for i in range(30) if MASK[i]]
+    line = curveFilter.linear(TIMES, VALUES, MASK, 1.0)
+    first, last = selected[0], selected[-1]
+    for i in selected:
+        t = (TIMES[i] - TIMES[first]) / (TIMES[last] - TIMES[first])
+        assert line[i] == pytest.approx(VALUES[first] + (VALUES[last] - VALUES[first]) * t)
+
+    flat = curveFilter.flat(VALUES, MASK, 1.0)
+    average = sum(VALUES[i] for i in selected) / len(selected)
+    assert all(flat[i] == pytest.approx(average) for i in selected)
+
+
+def test_smooth_reduces_roughness():
+    def roughness(values):
+        return sum(abs(values[i - 1] - 2 * values[i] + values[i + 1]) for i in range(11, 20))
+    result = curveFilter.smooth(TIMES, VALUES, MASK, 0.8, passes=5)
+    assert roughness(result) < roughness(VALUES) * 0.5
+
+
+def test_gaussian_keeps_lines_and_run_endpoints():
+    times = list(range(40))
+    line = [0.5 * t - 3.0 for t in times]
+    mask = [5 <= i <= 30 for i in times]
+    assert list(curveFilter.gaussian_smooth(line, mask, 3.0)) == pytest.approx(line)
+
+    noisy = [value + random.Random(i).gauss(0.0, 1.0) for i, value in enumerate(line)]
+    result = curveFilter.gaussian_smooth(noisy, mask, 3.0)
+    assert result[5] == noisy[5] and result[30] == noisy[30]
+    assert all(result[i] == noisy[i] for i in times if not mask[i])
+    error = sum(abs(result[i] - line[i]) for i in range(6, 30))
+    assert error < sum(abs(noisy[i] - line[i]) for i in range(6, 30)) * 0.6
+
+
+def test_gaussian_filters_each_selected_run_separately():
+    values = [0.0] * 10 + [10.0] * 10
+    mask = [True] * 9 + [False, False] + [True] * 9
+    assert curveFilter.selected_runs(mask) == [(0, 8), (11, 19)]
+    # Cada tramo es constante: no se mezcla con el otro
+    assert list(curveFilter.gaussian_smooth(values, mask, 5.0)) == pytest.approx(values)
+
+
+def test_gaussian_kernel_is_normalized_and_clipped():
+    kernel = curveFilter.gaussian_kernel(2.0)
+    assert len(kernel) == 13 and sum(kernel) == pytest.approx(1.0)
+    assert len(curveFilter.gaussian_kernel(20.0, limit=4)) == 9
+
+
+# Sesiones sobre la escena simulada
+
+def selected_state(scene):
+    return {name: [round(v, 9) for v in curve.values] for name, curve in scene.curves.items()}
+
+
+@pytest.mark.parametrize("mode", sorted(curveFilter.MODES))
+def test_session_writes_once_per_curve_per_tick(mode):
+    runners.use_backend("fake")
+    scene = fakeMaya.use_scene(scenarios.build_preset("tiny"))
+    scenarios.select_key_range(scene)
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    session = curveTools.FilterSession()
+    scene.reset_calls()
+    session.apply(mode, 0.4)
+    assert scene.calls["backend.write_curve"] <= len(scene.curves)
+    assert sum(count for name, count in scene.calls.items() if not name.startswith("backend.")) == 0
+
+    # Un tick posterior parte de los originales: repetir el valor no cambia nada
+    values = selected_state(scene)
+    session.apply(mode, 0.4)
+    assert selected_state(scene) == values
+    session.release()
+    assert selected_state(scene) == values
+
+
+@pytest.mark.parametrize("mode", ["Smooth", "Ease in/out", "Scale Sel"])
+def test_backends_agree(mode):
+    states = []
+    for backend in ("fake", "cmds"):
+        runners.use_backend(backend)
+        scene = fakeMaya.use_scene(scenarios.build_preset("tiny"))
+        scenarios.select_key_range(scene)
+        curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+        session = curveTools.FilterSession()
+        for value in (0.1, 0.3, 0.2):
+            session.apply(mode, value)
+        session.release()
+        states.append(selected_state(scene))
+    assert states[0] == states[1]
+
+
+# Flip
+
+@pytest.mark.parametrize("pivot", curveFilter.FLIP_PIVOTS)
+def test_flip_reflects_selected_keys(pivot):
+    selected = [i == 12 for i in range(30)]
+    value = curveFilter.flip_pivot(VALUES, MASK, pivot, selected, default=1.5)
+    expected = {"midrange": (min(VALUES[10:21]) + max(VALUES[10:21])) / 2.0, "selected": VALUES[12], "default": 1.5,
+                "zero": 0.0}[pivot]
+    assert value == pytest.approx(expected)
+    result = curveFilter.flip(VALUES, MASK, value)
+    assert unselected_unchanged(result)
+    assert all(result[i] == pytest.approx(2.0 * value - VALUES[i]) for i in range(10, 21))
+
+
+def test_flip_pure_python_matches_numpy(monkeypatch):
+    if curveFilter.np is None:
+        pytest.skip("NumPy not available")
+    expected = list(curveFilter.flip(VALUES, MASK, curveFilter.flip_pivot(VALUES, MASK)))
+    angles = list(curveFilter.negate(VALUES, MASK))
+    monkeypatch.setattr(curveFilter, "np", None)
+    assert list(curveFilter.flip(VALUES, MASK, curveFilter.flip_pivot(VALUES, MASK))) == pytest.approx(expected)
+    assert list(curveFilter.negate(VALUES, MASK)) == pytest.approx(angles)
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_flip_curves_writes_each_curve_once(backend):
+    runners.use_backend(backend)
+    scene = fakeMaya.use_scene(scenarios.build_preset("tiny"))
+    scenarios.select_key_range(scene)
+    curve = next(iter(scene.curves.values()))
+    index = min(curve.selected)
+    curve.set_angle(index, "in", 30.0)
+    curve.set_angle(index, "out", -10.0)
+    before = {name: list(c.values) for name, c in scene.curves.items()}
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    scene.reset_calls()
+    curveTools.flip_curves("zero")
+
+    assert scene.calls["undoInfo"] == 2 and scene.undo_chunks == 0
+    assert scene.calls["keyTangent"] <= len(scene.curves) * 7 + 1
+    for name, values in before.items():
+        assert scene.curves[name].values == pytest.approx([-value for value in values])
+    assert curve.angle(index, "in") == pytest.approx(-30.0)
+    assert curve.angle(index, "out") == pytest.approx(10.0)
+
@@ -0,0 +1,118 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+from tests.perf import fakeMaya
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+def read_all(scene, backend):
+    backend = runners.use_backend(backend)
+    return backend, backend.read_curves(list(scene.curves))
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_snapshot_columns_match_scene(backend):
+    scene = fakeMaya.use_scene(scenarios.build_preset("tiny"))
+    scenarios.select_keys_around_current_time(scene)
+    backend, snapshots = read_all(scene, backend)
+
+    assert len(snapshots) == len(scene.curves)
+    for snapshot in snapshots:
+        curve = scene.curves[snapshot.curve]
+        assert list(snapshot.times) == curve.times
+        assert list(snapshot.values) == pytest.approx(curve.values)
+        assert [snapshot.out_type(i) for i in range(len(snapshot))] == curve.out_types
+        assert snapshot.selected_indices() == sorted(curve.selected)
+        assert snapshot.driven == curve.driven
+        assert list(snapshot.out_angles) == pytest.approx([curve.angle(i, "out") for i in range(len(curve))])
+
+
+def test_cmds_backend_reads_each_curve_with_a_fixed_number_of_calls():
+    scene = fakeMaya.use_scene(scenarios.build_preset("tiny"))
+    scene.reset_calls()
+    read_all(scene, "cmds")
+
+    # keyframe + 6 keyTangent + weightedTangents por curva, sin depender del numero de keys
+    assert scene.calls["keyframe"] <= len(scene.curves) + 1
+    assert scene.calls["keyTangent"] == len(scene.curves) * 7
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_write_and_commit_use_one_set_attr_per_curve(backend):
+    scene = fakeMaya.use_scene(scenarios.build_preset("tiny"))
+    backend, snapshots = read_all(scene, backend)
+    expected = {}
+    scene.reset_calls()
+    for snapshot in snapshots:
+        snapshot.set_values([value + 1.0 for value in snapshot.values])
+        backend.write_curve(snapshot)
+        expected[snapshot.curve] = list(snapshot.values)
+
+    for snapshot in snapshots:
+        backend.commit_curve(snapshot)
+
+    for name, values in expected.items():
+        assert scene.curves[name].values == pytest.approx(values)
+    # El estado final entra en el undo con un setAttr .keyTimeValue por curva (durante el drag en el backend de
+    # cmds, al hacer commit en el de memoria)
+    assert scene.calls["setAttr"] == len(scene.curves)
+    assert not any(snapshot.is_modified() for snapshot in snapshots)
+
+
+def test_write_only_touches_changed_range():
+    scene = fakeMaya.use_scene(scenarios.build_preset("tiny"))
+    backend, snapshots = read_all(scene, "cmds")
+    snapshot = snapshots[0]
+    snapshot.set_values([snapshot.values[5] + 1.0, snapshot.values[7] - 1.0], [5, 7])
+
+    assert snapshot.changed_range() == (5, 7)
+    assert snapshot.key_time_values(5, 5) == [snapshot.times[5], snapshot.values[5]]
+    backend.write_curve(snapshot)
+    assert snapshot.changed_range() is None
+
+    # Volver al valor original tambien se escribe
+    snapshot.set_values([snapshot.original_values[5]], [5])
+    backend.write_curve(snapshot)
+    assert scene.curves[snapshot.curve].values[5] == pytest.approx(snapshot.original_values[5])
+
+
+def test_write_tangent_types_groups_keys():
+    scene = fakeMaya.use_scene(scenarios.build_preset("tiny"))
+    backend, snapshots = read_all(scene, "cmds")
+    snapshot = snapshots[0]
+    for index in range(len(snapshot)):
+        snapshot.out_types[index] = snapshot.in_types[index] = \
+            curveSnapshot_code("linear" if index % 2 else "flat")
+
+    scene.reset_calls()
+    backend.write_tangent_types(snapshot)
+
+    curve = scene.curves[snapshot.curve]
+    assert curve.out_types == ["flat" if index % 2 == 0 else "linear" for index in range(len(curve))]
+    assert scene.calls["keyTangent"] == 2
+
+
+def curveSnapshot_code(name):
+    import TheKeyMachine.mods.curveSnapshotMod as curveSnapshot
+    return curveSnapshot.tangent_code(name)
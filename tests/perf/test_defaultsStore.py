@@ -0,0 +1,131 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import json
+import os
+import threading
+
+import pytest
+
+from tests.perf import runners
+
+
+
+@pytest.fixture
+def defaultsStore(scene):
+    return runners.load_module("TheKeyMachine.mods.defaultsStoreMod")
+
+
+@pytest.fixture
+def store(defaultsStore, tmp_path):
+    store = defaultsStore.DefaultsStore()
+    path = str(tmp_path / "reset_default" / "reset_default_data.json")
+    store.path = lambda: path
+    return store
+
+
+def write_json(path, data, mtime):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(data, file)
+    os.utime(path, (mtime, mtime))
+
+
+def read_json(path):
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def test_reloads_only_when_the_mtime_changes(store):
+    path = store.path()
+    write_json(path, {"char": {"ctrl.tx": 1.0}}, 1000.0)
+    assert store.get("char:ctrl", "tx") == 1.0
+
+    # Mismo mtime: se sigue usando lo que hay en memoria
+    write_json(path, {"char": {"ctrl.tx": 2.0}}, 1000.0)
+    assert store.get("char:ctrl", "tx") == 1.0
+
+    # Otra sesion de Maya lo ha cambiado
+    write_json(path, {"char": {"ctrl.tx": 3.0}, "default": {"root.ry": 90.0}}, 2000.0)
+    assert store.get("char:ctrl", "tx") == 3.0
+    assert store.node_values("root") == {"ry": 90.0}
+
+
+def test_save_writes_a_temp_file_and_replaces(store, defaultsStore, monkeypatch):
+    replaced = []
+    real_replace = os.replace
+
+    def replace(source, target):
+        # el archivo temporal ya esta completo cuando se sustituye el bueno
+        replaced.append((source, target, read_json(source)))
+        real_replace(source, target)
+    monkeypatch.setattr(defaultsStore.os, "replace", replace)
+
+    store.set_node_values("char:ctrl", {"tx": 1.5, "ry": 45.0})
+    store.save(wait=True)
+
+    path = store.path()
+    assert replaced == [(path + ".tmp", path, {"char": {"ctrl.tx": 1.5, "ctrl.ry": 45.0}})]
+    assert read_json(path) == {"char": {"ctrl.tx": 1.5, "ctrl.ry": 45.0}}
+    assert not os.path.exists(path + ".tmp")
+    # La escritura deja el mtime al dia: no hace falta volver a leer
+    assert store.mtime == os.path.getmtime(path) and store.pending_writes == 0
+
+
+def test_superseded_write_does_not_overwrite_newer_data(store):
+    path = store.path()
+    store.set_node_values("char:ctrl", {"tx": 1.0})
+
+    # Las dos escrituras quedan en cola detras de write_lock
+    with store.write_lock:
+        first = store.save()
+        store.set_node_values("char:ctrl", {"tx": 2.0})
+        second = store.save()
+        # Con escrituras pendientes no se recarga el archivo viejo encima de la memoria
+        assert store.get("char:ctrl", "tx") == 2.0
+    first.join()
+    second.join()
+
+    assert read_json(path) == {"char": {"ctrl.tx": 2.0}}
+    assert store.pending_writes == 0 and store.write_serial == 2
+    assert store.get("char:ctrl", "tx") == 2.0
+
+
+def test_list_default_is_cached_per_node_type_and_attr(store, scene):
+    for name in ("a_ctrl", "b_ctrl"):
+        scene.create_transform(name)
+        scene.add_attr(name, "space", default=1.0 if name == "a_ctrl" else 2.0)
+    scene.reset_calls()
+
+    assert store.get("a_ctrl", "sx") == 1.0 and store.get("b_ctrl", "sx") == 1.0
+    assert store.get("a_ctrl", "tx") == 0.0
+    assert scene.calls["attributeQuery"] == 2
+    assert store.list_default_cache == {("transform", "sx"): 1.0, ("transform", "tx"): 0.0}
+
+    # Los atributos dinamicos pueden tener un default distinto en cada nodo: no se cachean
+    assert store.get("a_ctrl", "space") == 1.0 and store.get("b_ctrl", "space") == 2.0
+    assert store.get("a_ctrl", "space") == 1.0
+    assert scene.calls["attributeQuery"] == 5
+
+    # El tipo y los atributos dinamicos de cada nodo se preguntan una vez por operacion
+    assert scene.calls["nodeType"] == 2 and scene.calls["listAttr"] == 2
+    store.clear_node_cache()
+    store.get("a_ctrl", "sx")
+    assert scene.calls["nodeType"] == 3 and scene.calls["attributeQuery"] == 5
@@ -0,0 +1,115 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+
+import pytest
+
+import TheKeyMachine.mods.eulerFilterMod as eulerFilter
+from tests.perf import fakeMaya
+from tests.perf import runners
+
+
+
+# Una rotacion suave y la misma con saltos: frames en la solucion alternativa y valores envueltos a [-180, 180)
+
+FRAMES = 120
+SMOOTH = ([40.0 + 200.0 * math.sin(i * 0.03) for i in range(FRAMES)],
+          [20.0 * math.sin(i * 0.05) for i in range(FRAMES)],
+          [-30.0 + 3.0 * i for i in range(FRAMES)])
+
+
+def broken(order):
+    alternate = eulerFilter.flipped(*SMOOTH, order=order)
+    channels = []
+    for axis in range(3):
+        values = [alternate[axis][i] if i % 7 in (3, 4) else SMOOTH[axis][i] for i in range(FRAMES)]
+        channels.append(list(eulerFilter.wrap(values)))
+    return channels
+
+
+def assert_continuous(channels, limit=20.0):
+    for channel in channels:
+        assert max(abs(b - a) for a, b in zip(channel, channel[1:])) < limit
+
+
+def test_unwrap_removes_full_turns():
+    values = [170.0, 178.0, -175.0, -160.0, 175.0]
+    assert list(eulerFilter.unwrap(values)) == pytest.approx([170.0, 178.0, 185.0, 200.0, 175.0])
+    assert list(eulerFilter.unwrap(values, start=-190.0)) == pytest.approx([-190.0, -182.0, -175.0, -160.0, -185.0])
+
+
+@pytest.mark.parametrize("order", eulerFilter.ROTATE_ORDERS)
+def test_filter_recovers_smooth_rotation(order):
+    channels = broken(order)
+    filtered = eulerFilter.euler_filter(*channels, order=order)
+    assert_continuous(filtered)
+    # Misma orientacion que la rotacion original, hasta vueltas completas
+    for axis in range(3):
+        offsets = [(f - s) % 360.0 for f, s in zip(filtered[axis], SMOOTH[axis])]
+        assert all(min(offset, 360.0 - offset) < 1e-6 for offset in offsets)
+
+
+def test_pure_python_matches_numpy(monkeypatch):
+    if eulerFilter.np is None:
+        pytest.skip("NumPy not available")
+    channels = broken("zxy")
+    expected = [list(channel) for channel in eulerFilter.euler_filter(*channels, order="zxy")]
+    monkeypatch.setattr(eulerFilter, "np", None)
+    result = eulerFilter.euler_filter(*channels, order="zxy")
+    for axis in range(3):
+        assert list(result[axis]) == pytest.approx(expected[axis])
+
+
+# Herramienta sobre la escena simulada
+
+def build_flipping_scene():
+    scene = fakeMaya.use_scene(fakeMaya.Scene())
+    scene.create_transform("ctrl")
+    for axis, attr in enumerate(("rotateX", "rotateY", "rotateZ")):
+        for frame, value in enumerate(broken("xyz")[axis]):
+            scene.set_key("ctrl", attr, float(frame + 1), value)
+    return scene
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_euler_filter_tool_writes_each_curve_once(backend):
+    runners.use_backend(backend)
+    scene = build_flipping_scene()
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    scene.reset_calls()
+    result = curveTools.euler_filter(nodes=["ctrl"])
+
+    assert len(result["curves"]) == 3 and len(result["changed"]) == 3
+    assert scene.calls["setAttr"] == 3
+    assert scene.undo_chunks == 0
+    assert_continuous([scene.curves[name].values for name in result["curves"]])
+
+
+def test_selected_curve_pulls_its_rotate_siblings():
+    runners.use_backend("fake")
+    scene = build_flipping_scene()
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+    scene.curves["ctrl_rotateY"].selected = {0, 1}
+
+    result = curveTools.euler_filter()
+    assert sorted(result["curves"]) == ["ctrl_rotateX", "ctrl_rotateY", "ctrl_rotateZ"]
+    assert_continuous([curve.values for curve in scene.curves.values()])
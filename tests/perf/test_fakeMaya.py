@@ -0,0 +1,108 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+from tests.perf import fakeMaya
+from tests.perf import scenarios
+
+
+
+def test_hermite_passes_through_keys(scene):
+    scene.create_transform("ctrl")
+    for time, value in ((1.0, 0.0), (5.0, 10.0), (9.0, 4.0), (13.0, 4.0)):
+        scene.set_key("ctrl", "tx", time, value)
+    curve = scene.curve_for("ctrl", "translateX")
+
+    for time, value in zip(curve.times, curve.values):
+        assert curve.evaluate(time) == pytest.approx(value)
+    # auto: los extremos locales no se pasan
+    assert max(curve.evaluate(5.0 + i * 0.1) for i in range(-20, 21)) == pytest.approx(10.0)
+    # segmento con valores iguales queda plano
+    assert curve.evaluate(11.0) == pytest.approx(4.0)
+
+
+def test_step_and_linear_tangents(scene):
+    scene.create_transform("ctrl")
+    scene.set_key("ctrl", "ty", 1.0, 0.0, "linear", "linear")
+    scene.set_key("ctrl", "ty", 11.0, 10.0, "linear", "step")
+    scene.set_key("ctrl", "ty", 21.0, 0.0, "linear", "linear")
+    curve = scene.curve_for("ctrl", "ty")
+
+    assert curve.evaluate(6.0) == pytest.approx(5.0)
+    assert curve.evaluate(20.0) == pytest.approx(10.0)
+
+
+def test_cmds_queries(scene):
+    from maya import cmds
+
+    scenarios.build_rig(scene, controls=2, channels=12, keys=5, step=10.0)
+    node = "char:L_ctrl_000"
+    plug = node + ".tx"
+
+    assert cmds.ls(node, long=True) == ["|" + node]
+    assert len(cmds.listAttr(node, keyable=True)) == 13
+    assert cmds.keyframe(plug, query=True) == [1.0, 11.0, 21.0, 31.0, 41.0]
+    assert len(cmds.keyframe(plug, query=True, timeChange=True, valueChange=True)) == 10
+    assert cmds.keyframe(plug, query=True, valueChange=True, time=(11.0,)) == [scene.curve_for(node, "tx").values[1]]
+    assert cmds.listConnections(node + "_translateX.output", plugs=True, source=False) == [node + ".translateX"]
+    assert cmds.getAttr(plug, time=11.0) == pytest.approx(scene.curve_for(node, "tx").values[1])
+
+    cmds.keyframe(plug, edit=True, relative=True, valueChange=1.0, index=[(0, 0), (2, 2)])
+    assert cmds.keyframe(plug, query=True, valueChange=True, index=(0, 0))[0] == pytest.approx(
+        scene.curve_for(node, "tx").values[0])
+    assert scene.calls["keyframe"] == 5
+
+
+def test_setattr_on_animated_plug_holds_until_time_change(scene):
+    from maya import cmds
+
+    scene.create_transform("ctrl")
+    scene.set_key("ctrl", "tz", 1.0, 0.0)
+    scene.set_key("ctrl", "tz", 10.0, 9.0)
+
+    cmds.setAttr("ctrl.tz", 100.0)
+    assert cmds.getAttr("ctrl.tz") == 100.0
+    cmds.currentTime(10.0)
+    assert cmds.getAttr("ctrl.tz") == pytest.approx(9.0)
+
+
+def test_om2_modifier_writes_ui_units(scene):
+    from maya.api import OpenMaya as om
+
+    scene.create_transform("ctrl")
+    selection = om.MSelectionList()
+    selection.add("ctrl.rx")
+    modifier = om.MDGModifier()
+    modifier.newPlugValueMAngle(selection.getPlug(0), om.MAngle(45.0, om.MAngle.uiUnit()))
+    modifier.doIt()
+
+    assert scene.nodes["ctrl"].attr("rx").value == pytest.approx(45.0)
+
+
+@pytest.mark.parametrize("module_name", ["TheKeyMachine.mods.keyToolsMod", "TheKeyMachine.mods.barMod"])
+def test_ui_modules_import_headless(scene, module_name):
+    # maya es un paquete (from maya import OpenMayaUI) y Qt/shiboken son modulos comodin
+    import importlib
+    import maya
+
+    assert maya.__path__ == []
+    module = importlib.import_module(module_name)
+    assert module.cmds is maya.cmds
@@ -0,0 +1,202 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+from tests.perf import fakeMaya
+from tests.perf import runners
+
+
+
+@pytest.fixture
+def jobRunner(scene):
+    module = runners.load_module("TheKeyMachine.mods.jobRunnerMod")
+    module.current_job = None
+    return module
+
+
+def counting_steps(count, log):
+    # Un paso por frame; devuelve cuantos ha hecho
+    for frame in range(count):
+        log.append(frame)
+        if (yield 1):
+            return "cancelled at {}".format(frame)
+    return "done"
+
+
+def ticking_clock(step=0.02):
+    now = [0.0]
+
+    def clock():
+        now[0] += step
+        return now[0]
+    return clock
+
+
+def test_run_steps_drives_the_generator(jobRunner):
+    log = []
+    assert jobRunner.run_steps(counting_steps(5, log)) == "done"
+    assert log == [0, 1, 2, 3, 4]
+
+    seen = []
+    result = jobRunner.run_steps(counting_steps(5, []), lambda done: seen.append(done) or done == 3)
+    assert result == "cancelled at 2" and seen == [1, 2, 3]
+
+
+def test_job_runs_in_slices_on_the_idle_queue(jobRunner, scene):
+    log = []
+    finished = []
+    job = jobRunner.Job("Count", counting_steps(10, log), 10, on_finish=finished.append, clock=ticking_clock())
+    job.start()
+
+    assert job.running and log == [] and scene.progress["active"]
+    scene.run_idle()
+
+    assert job.state == "done" and job.result == "done" and finished == [job]
+    assert log == list(range(10))
+    assert scene.undo_chunks == 0 and scene.undos == 0
+    assert not scene.progress["active"]
+    # Un solo chunk de undo para todos los trozos, con el nombre del job
+    assert job.chunks == len(scene.undo_queue) == 1
+    assert scene.undo_queue[0].name == job.chunk_name
+    # Cada trozo para en cuanto pasa slice_time: el reloj avanza 0.02 s por lectura
+    assert len(job.timings) > 1
+    assert sum(steps for steps, _ in job.timings) == 10
+    assert all(elapsed >= 0.0 for _, elapsed in job.timings)
+    assert "10 steps" in job.report()
+
+
+def test_cancel_rolls_back_as_one_undo(jobRunner, scene):
+    log = []
+    job = jobRunner.Job("Count", counting_steps(100, log), 100, clock=ticking_clock()).start()
+    scene.deferred.pop(0)()
+    done = len(log)
+    job.cancel()
+    scene.run_idle()
+
+    assert job.state == "cancelled"
+    assert job.result == "cancelled at {}".format(done - 1) and len(log) == done
+    # Los dos trozos, el que corrio y el que recibio la cancelacion, se deshacen con un solo undo
+    assert len(job.timings) == 2
+    assert scene.undo_chunks == 0 and scene.undos == job.undone == job.chunks == 1
+    assert scene.undo_queue == []
+    assert jobRunner.current_job is None
+
+
+def setting_steps(count):
+    # Escribe ctrl.tx en cada paso con setAttr, como las herramientas
+    from maya import cmds
+    for frame in range(count):
+        cmds.setAttr("ctrl.tx", float(frame + 1))
+        if (yield 1):
+            return "cancelled"
+    return "done"
+
+
+def test_finished_job_is_one_undo(jobRunner, scene):
+    from maya import cmds
+
+    scene.create_transform("ctrl")
+    job = jobRunner.Job("Set", setting_steps(100), 100, clock=ticking_clock()).start()
+    scene.run_idle()
+
+    assert job.state == "done" and len(job.timings) > 1
+    assert scene.nodes["ctrl"].attr("tx").value == 100.0
+    assert [chunk.name for chunk in scene.undo_queue] == [job.chunk_name]
+    cmds.undo()
+    assert scene.nodes["ctrl"].attr("tx").value == 0.0 and scene.undo_queue == []
+
+
+def test_empty_job_never_undoes_a_foreign_entry(jobRunner, scene):
+    from maya import cmds
+
+    # Maya no guarda el chunk de un job que no ha cambiado nada: arriba de la cola queda la entrada anterior
+    scene.drop_empty_chunks = True
+    scene.create_transform("ctrl")
+    cmds.undoInfo(openChunk=True, chunkName="User edit")
+    cmds.setAttr("ctrl.ty", 5.0)
+    cmds.undoInfo(closeChunk=True)
+
+    job = jobRunner.Job("Count", counting_steps(100, []), 100, clock=ticking_clock()).start()
+    scene.deferred.pop(0)()
+    job.cancel()
+    scene.run_idle()
+
+    assert job.state == "cancelled" and job.chunks == job.undone == 0
+    assert scene.undos == 0 and [chunk.name for chunk in scene.undo_queue] == ["User edit"]
+    assert scene.nodes["ctrl"].attr("ty").value == 5.0
+
+
+def test_cancel_without_other_edits_restores_everything(jobRunner, scene):
+    scene.create_transform("ctrl")
+    job = jobRunner.Job("Set", setting_steps(100), 100, clock=ticking_clock()).start()
+    scene.deferred.pop(0)()
+    scene.deferred.pop(0)()
+    job.cancel()
+    scene.run_idle()
+
+    assert scene.nodes["ctrl"].attr("tx").value == 0.0
+    assert scene.undo_queue == [] and job.undone == job.chunks == 1
+
+
+def test_escape_on_the_progress_bar_cancels(jobRunner, scene):
+    job = jobRunner.Job("Count", counting_steps(100, []), 100, clock=ticking_clock()).start()
+    scene.deferred.pop(0)()
+    scene.progress["cancelled"] = True
+    scene.run_idle()
+    assert job.state == "cancelled" and scene.undos == job.chunks == 1
+
+
+def test_failure_rolls_back_and_frees_the_runner(jobRunner, scene):
+    def failing():
+        yield 1
+        raise RuntimeError("boom")
+
+    job = jobRunner.Job("Fail", failing(), 2).start()
+    scene.run_idle()
+    assert job.state == "failed" and str(job.error) == "boom"
+    assert scene.undo_chunks == 0 and scene.undos == 1 and scene.undo_queue == []
+    assert jobRunner.current_job is None
+
+
+def test_one_job_at_a_time(jobRunner, scene):
+    first = jobRunner.Job("First", counting_steps(3, []), 3).start()
+    assert jobRunner.Job("Second", counting_steps(3, []), 3).start() is None
+    assert any("First" in warning for warning in scene.warnings)
+    scene.run_idle()
+    assert first.state == "done"
+    assert jobRunner.Job("Third", counting_steps(3, []), 3).run() == "done"
+
+
+def test_worldspace_copy_as_a_job(jobRunner, scene):
+    runners.use_backend("fake")
+    worldspace = runners.load_module("TheKeyMachine.mods.worldspaceMod")
+    scene.create_transform("ctrl")
+    for frame in range(1, 40):
+        scene.set_key("ctrl", "translateX", float(frame), frame * 0.5)
+    expected = worldspace.copy_worldspace(["ctrl"])
+
+    job = jobRunner.Job("Copy worldspace", worldspace.copy_worldspace_steps(["ctrl"]), 39, undo=False,
+                        slice_time=0.0).start()
+    scene.run_idle()
+    assert job.result == expected
+    # Un trozo por frame y uno final que decompone las matrices
+    assert [steps for steps, _ in job.timings] == [1] * 39 + [0]
+    assert scene.undos == 0
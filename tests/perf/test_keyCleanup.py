@@ -0,0 +1,118 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+
+import pytest
+
+import TheKeyMachine.mods.keyCleanupMod as keyCleanup
+from tests.perf import fakeMaya
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+# Deteccion sobre columnas
+
+TIMES = [float(frame) for frame in range(1, 61)]
+
+
+def test_static_uses_tolerance():
+    assert keyCleanup.is_static([1.0, 1.0 + 1e-6, 1.0 - 1e-6], tolerance=1e-4)
+    assert not keyCleanup.is_static([1.0, 1.01], tolerance=1e-4)
+    assert keyCleanup.is_static([3.0])
+    assert not keyCleanup.is_static([])
+
+
+def test_linear_keys_reduce_to_ends():
+    values = [0.5 * t for t in TIMES]
+    slopes = [0.5] * len(TIMES)
+    removed = keyCleanup.redundant_keys(TIMES, values, slopes, slopes)
+    assert removed == list(range(1, len(TIMES) - 1))
+
+
+def test_keys_that_shape_the_curve_stay():
+    values = [math.sin(t * 0.3) for t in TIMES]
+    slopes = [0.3 * math.cos(t * 0.3) for t in TIMES]
+    assert keyCleanup.redundant_keys(TIMES, values, slopes, slopes, tolerance=1e-6) == []
+
+
+def test_stepped_keys_only_go_inside_holds():
+    values = [0.0, 0.0, 0.0, 1.0, 2.0]
+    zeros = [0.0] * 5
+    removed = keyCleanup.redundant_keys(TIMES[:5], values, zeros, zeros, ["step"] * 5)
+    assert removed == [1]
+
+
+def test_pinned_neighbours_skip_fixed_tangents():
+    in_types = ["auto", "auto", "auto", "flat", "linear", "auto"]
+    out_types = ["auto", "auto", "auto", "flat", "linear", "auto"]
+    assert keyCleanup.pinned_neighbours(6, [1, 2, 4], in_types, out_types) == [0, 5]
+
+
+def test_pure_python_matches_numpy(monkeypatch):
+    if keyCleanup.np is None:
+        pytest.skip("NumPy not available")
+    values = [round(math.sin(t * 0.1), 2) for t in TIMES]
+    slopes = [0.0] * len(TIMES)
+    expected = keyCleanup.removal_errors(TIMES, values, slopes, slopes)
+    monkeypatch.setattr(keyCleanup, "np", None)
+    assert keyCleanup.removal_errors(TIMES, values, slopes, slopes) == pytest.approx(list(expected))
+
+
+# Herramienta completa sobre la escena simulada
+
+def build_cleanup_scene():
+    scene = scenarios.build_rig(controls=2, channels=3, keys=40, step=1.0, noise=0.0)
+    node = next(iter(scene.nodes))
+    # Una curva casi estatica y una con tramos lineales y holds
+    scene.curve_for(node, "translateX").values = [5.0 + (1e-6 if i % 2 else 0.0) for i in range(40)]
+    curve = scene.curve_for(node, "translateY")
+    curve.values = [min(t, 10.0) if t < 30 else 10.0 - (t - 30.0) for t in curve.times]
+    curve.in_types = ["linear"] * 40
+    curve.out_types = ["linear"] * 40
+    return scene, node
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_cleanup_keeps_the_shape(backend):
+    runners.use_backend(backend)
+    scene, node = build_cleanup_scene()
+    fakeMaya.use_scene(scene)
+    samples = [1.0 + i * 0.25 for i in range(157)]
+    before = {name: [curve.evaluate(t) for t in samples] for name, curve in scene.curves.items()}
+    scenarios.select_all_controls(scene)
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    curves = len(scene.curves)
+    scene.reset_calls()
+    summary = curveTools.cleanup_keys(tolerance=1e-4)
+
+    assert summary["static_curves"] == ["{}_translateX".format(node)]
+    assert "{}_translateX".format(node) not in scene.curves
+    assert scene.calls["delete"] == 1
+    assert scene.calls["keyTangent"] <= curves * 8      # lecturas + un keyTangent por curva para fijar las tangentes
+    assert scene.calls["setAttr"] <= curves * 4         # un tramo por componente aunque las keys fijadas no sean seguidas
+    assert len(scene.curve_for(node, "translateY")) == 4
+    assert summary["keys_after"] == sum(len(curve) for curve in scene.curves.values())
+    assert scene.undo_chunks == 0
+    for name, curve in scene.curves.items():
+        assert max(abs(curve.evaluate(t) - v) for t, v in zip(samples, before[name])) <= 1e-4
+
@@ -0,0 +1,91 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+from tests.perf import runners
+
+
+
+@pytest.fixture
+def keyIndex(scene):
+    return runners.load_module("TheKeyMachine.mods.keyIndexMod")
+
+
+def keyed_plug(scene, keys, name="ctrl"):
+    scene.create_transform(name)
+    for time, value in keys:
+        scene.set_key(name, "translateX", time, value, "linear", "step" if time == 5.0 else "linear")
+    return name + ".translateX"
+
+
+def test_index_reads_keys_in_two_queries(keyIndex, scene):
+    plug = keyed_plug(scene, [(1.0, 0.0), (5.0, 2.0), (9.0, 4.0)])
+    scene.reset_calls()
+    index = keyIndex.CurveKeyIndex.from_plug(plug)
+
+    assert index.times == [1.0, 5.0, 9.0] and index.values == [0.0, 2.0, 4.0]
+    assert index.out_tangent_types == ["linear", "step", "linear"]
+    assert scene.calls["keyframe"] == 1 and scene.calls["keyTangent"] == 1
+
+
+def test_time_on_a_key_skips_that_key(keyIndex, scene):
+    index = keyIndex.CurveKeyIndex.from_plug(keyed_plug(scene, [(1.0, 0.0), (5.0, 2.0), (9.0, 4.0)]))
+
+    assert index.previous_key(5.0) == (1.0, 0.0, "linear")
+    assert index.next_key(5.0) == (9.0, 4.0, "linear")
+    assert index.previous_key(6.5) == (5.0, 2.0, "step")
+    assert index.next_key(6.5) == (9.0, 4.0, "linear")
+
+
+def test_before_the_first_and_after_the_last_key(keyIndex, scene):
+    index = keyIndex.CurveKeyIndex.from_plug(keyed_plug(scene, [(1.0, 0.0), (5.0, 2.0), (9.0, 4.0)]))
+
+    assert index.previous_key(0.0) is None and index.next_key(0.0) == (1.0, 0.0, "linear")
+    assert index.previous_key(1.0) is None
+    assert index.next_key(9.0) is None
+    assert index.next_key(12.0) is None and index.previous_key(12.0) == (9.0, 4.0, "linear")
+
+
+def test_single_key_curve(keyIndex, scene):
+    index = keyIndex.CurveKeyIndex.from_plug(keyed_plug(scene, [(5.0, 3.0)]))
+
+    assert len(index) == 1
+    assert index.previous_key(5.0) is None and index.next_key(5.0) is None
+    assert index.previous_index(8.0) == 0 and index.next_index(2.0) == 0
+
+
+def test_plug_without_keys(keyIndex, scene):
+    scene.create_transform("ctrl")
+    scene.reset_calls()
+    index = keyIndex.CurveKeyIndex.from_plug("ctrl.translateX")
+
+    assert len(index) == 0
+    assert index.previous_key(1.0) is None and index.next_key(1.0) is None
+    # Sin keys no se pregunta por las tangentes
+    assert scene.calls["keyTangent"] == 0
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_backends_build_the_same_index(keyIndex, scene, backend):
+    plug = keyed_plug(scene, [(1.0, 0.0), (5.0, 2.0), (9.0, 4.0)])
+    index = runners.use_backend(backend).read_keys(plug)
+
+    assert (index.previous_key(5.0), index.next_key(5.0)) == ((1.0, 0.0, "linear"), (9.0, 4.0, "linear"))
@@ -0,0 +1,133 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+import random
+
+import pytest
+
+import TheKeyMachine.mods.keyReduceMod as keyReduce
+from tests.perf import fakeMaya
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+# Curvas sinteticas bakeadas a una key por frame
+
+TIMES = [float(frame) for frame in range(1, 241)]
+SINE = [10.0 * math.sin(t * 0.05) + 3.0 * math.sin(t * 0.13) for t in TIMES]
+
+
+def test_linear_curve_reduces_to_two_keys():
+    reduction = keyReduce.reduce_keys(TIMES, [2.0 * t - 5.0 for t in TIMES], tolerance=1e-6)
+    assert reduction.keep == [0, len(TIMES) - 1]
+    assert reduction.keys_before == len(TIMES) and reduction.keys_after == 2
+    assert reduction.max_error == pytest.approx(0.0, abs=1e-9)
+
+
+@pytest.mark.parametrize("tolerance", [0.1, 0.01, 0.001])
+def test_reduction_stays_within_tolerance(tolerance):
+    reduction = keyReduce.reduce_keys(TIMES, SINE, tolerance=tolerance)
+    assert reduction.keys_after < len(TIMES) / 3
+    assert reduction.max_error <= tolerance
+    assert sorted(reduction.keep + reduction.remove) == list(range(len(TIMES)))
+
+
+def test_tighter_tolerances_keep_more_keys():
+    counts = [keyReduce.reduce_keys(TIMES, SINE, tolerance=t).keys_after for t in (0.1, 0.01, 0.001)]
+    assert counts == sorted(counts) and counts[0] < counts[-1]
+
+
+def test_angle_tolerance_adds_keys():
+    value_only = keyReduce.reduce_keys(TIMES, SINE, tolerance=0.05)
+    with_angle = keyReduce.reduce_keys(TIMES, SINE, tolerance=0.05, angle_tolerance=0.5)
+    assert with_angle.keys_after > value_only.keys_after
+    assert with_angle.max_angle_error <= 0.5
+
+
+def test_range_keeps_outside_keys_and_their_tangents():
+    reduction = keyReduce.reduce_keys(TIMES, SINE, tolerance=0.01, start=50, end=150)
+    assert all(index in reduction.keep for index in list(range(50)) + list(range(151, 240)))
+    assert all(50 <= index <= 150 for index in reduction.remove)
+    tangents = {index: (in_slope, out_slope) for index, in_slope, out_slope in reduction.tangents}
+    assert tangents[50][0] is None and tangents[150][1] is None
+
+
+def test_pure_python_matches_numpy(monkeypatch):
+    if keyReduce.np is None:
+        pytest.skip("NumPy not available")
+    times = [t + random.Random(int(t)).uniform(-0.2, 0.2) for t in TIMES]
+    expected = keyReduce.reduce_keys(times, SINE, tolerance=0.01, angle_tolerance=2.0)
+    monkeypatch.setattr(keyReduce, "np", None)
+    result = keyReduce.reduce_keys(times, SINE, tolerance=0.01, angle_tolerance=2.0)
+    assert result.keep == expected.keep
+    assert result.max_error == pytest.approx(expected.max_error)
+
+
+def test_workers_give_the_same_result():
+    curves = [(TIMES, [value * scale for value in SINE], 0, len(TIMES) - 1) for scale in (0.5, 1.0, 2.0, 4.0)]
+    serial = keyReduce.reduce_many(curves, tolerance=0.01)
+    threaded = keyReduce.reduce_many(curves, tolerance=0.01, workers=4)
+    assert [r.keep for r in serial] == [r.keep for r in threaded]
+
+
+# Herramienta completa sobre la escena simulada
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_reduce_curves_reproduces_baked_scene(backend):
+    runners.use_backend(backend)
+    scene = fakeMaya.use_scene(scenarios.build_rig(controls=2, channels=3, keys=200, step=1.0))
+    dense = {name: (list(curve.times), list(curve.values)) for name, curve in scene.curves.items()}
+    scenarios.select_all_controls(scene)
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    scene.reset_calls()
+    summary = curveTools.reduce_curves(tolerance=0.05)
+
+    assert summary["keys_before"] == sum(len(times) for times, _ in dense.values())
+    assert summary["keys_after"] == sum(len(curve) for curve in scene.curves.values())
+    assert summary["keys_after"] < summary["keys_before"]
+    assert scene.calls["cutKey"] == len(scene.curves)
+    assert scene.calls["keyTangent"] <= len(scene.curves) * 8     # lecturas + una escritura por curva
+    assert scene.undo_chunks == 0
+
+    # La curva reducida, evaluada en los frames del bake, no se aleja mas que la tolerancia
+    for name, (times, values) in dense.items():
+        curve = scene.curves[name]
+        assert max(abs(curve.evaluate(t) - v) for t, v in zip(times, values)) <= 0.05 + 1e-9
+
+
+def test_reduce_curves_skips_weighted_curves():
+    runners.use_backend("fake")
+    scene = fakeMaya.use_scene(scenarios.build_rig(controls=1, channels=2, keys=100, step=1.0))
+    weighted, plain = sorted(scene.curves)
+    scene.curves[weighted].weighted = True
+    before = list(scene.curves[weighted].times)
+    scenarios.select_all_controls(scene)
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    summary = curveTools.reduce_curves(tolerance=0.05)
+
+    assert summary["weighted_curves"] == [weighted]
+    assert weighted not in summary["curves"] and plain in summary["curves"]
+    assert scene.curves[weighted].times == before
+    assert len(scene.curves[plain]) < 100
+    assert "1 weighted curves skipped" in curveTools.reduction_message(summary)
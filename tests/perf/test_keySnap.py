@@ -0,0 +1,96 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+import TheKeyMachine.mods.keySnapMod as keySnap
+from tests.perf import fakeMaya
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+# Politicas sobre columnas
+
+TIMES = [1.0, 2.4, 2.5, 3.0, 3.2, 4.7, 6.0]
+VALUES = [0.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+
+
+def test_targets_round_half_up():
+    assert list(keySnap.target_frames([2.5, 3.5, -0.5, 1.49])) == [3.0, 4.0, 0.0, 1.0]
+
+
+def test_nearest_keeps_the_key_on_the_frame():
+    snap = keySnap.snap_keys(TIMES, VALUES, "nearest")
+    assert snap.keep == [0, 1, 3, 5, 6]
+    assert snap.remove == [2, 4]
+    assert snap.times == [1.0, 2.0, 3.0, 5.0, 6.0]
+    assert snap.values == [0.0, 1.0, 3.0, 5.0, 6.0]
+    assert snap.moved == 2
+
+
+def test_average_merges_colliding_values():
+    snap = keySnap.snap_keys(TIMES, VALUES, "average")
+    assert snap.values[2] == pytest.approx(3.0)
+    assert snap.times == [1.0, 2.0, 3.0, 5.0, 6.0]
+
+
+def test_original_never_removes_keys():
+    snap = keySnap.snap_keys(TIMES, VALUES, "original")
+    assert snap.remove == []
+    assert snap.times == [1.0, 2.0, 2.5, 3.0, 3.2, 5.0, 6.0]
+
+
+def test_unknown_policy_raises():
+    with pytest.raises(ValueError):
+        keySnap.snap_keys(TIMES, VALUES, "latest")
+
+
+def test_pure_python_matches_numpy(monkeypatch):
+    if keySnap.np is None:
+        pytest.skip("NumPy not available")
+    expected = keySnap.snap_keys(TIMES, VALUES, "nearest", step=2.0)
+    monkeypatch.setattr(keySnap, "np", None)
+    result = keySnap.snap_keys(TIMES, VALUES, "nearest", step=2.0)
+    assert (result.keep, result.remove, result.times) == (expected.keep, expected.remove, list(expected.times))
+
+
+# Herramienta completa sobre la escena simulada
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_snap_keys_rebuilds_each_curve_once(backend):
+    runners.use_backend(backend)
+    scene = fakeMaya.use_scene(scenarios.build_rig(controls=2, channels=3, keys=40, step=1.3))
+    scenarios.select_all_controls(scene)
+    for curve in scene.curves.values():
+        curve.in_types[5] = curve.out_types[5] = "linear"
+    types = {name: (curve.times[5], curve.in_types[5]) for name, curve in scene.curves.items()}
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    scene.reset_calls()
+    summary = curveTools.snap_keys()
+
+    assert len(summary["curves"]) == len(scene.curves)
+    assert scene.calls["cutKey"] <= len(scene.curves)
+    assert scene.undo_chunks == 0
+    for name, curve in scene.curves.items():
+        assert all(time == int(time) for time in curve.times)
+        assert len(set(curve.times)) == len(curve.times)
+        assert curve.in_types[curve.find(round(types[name][0]))] == "linear"
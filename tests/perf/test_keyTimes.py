@@ -0,0 +1,99 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+import TheKeyMachine.mods.keyTimesMod as keyTimes
+from tests.perf import fakeMaya
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+# Conjuntos de tiempos
+
+TIMES = [1.0, 3.0, 5.0, 7.0, 9.0]
+REFERENCE = [1.0, 2.0, 5.0, 9.000000001, 11.0, 2.0]
+
+
+def test_missing_and_extra_times():
+    assert keyTimes.missing_times(TIMES, REFERENCE) == [2.0, 11.0]
+    assert keyTimes.extra_indices(TIMES, REFERENCE) == [1, 3]
+
+
+def test_share_plan_indices_refer_to_the_curve_after_inserting():
+    missing, extra = keyTimes.share_plan(TIMES, REFERENCE)
+    merged = sorted(TIMES + missing)
+    assert [merged[index] for index in extra] == [3.0, 7.0]
+
+
+def test_share_plan_respects_the_range():
+    missing, extra = keyTimes.share_plan(TIMES, REFERENCE, start=4.0, end=10.0)
+    assert missing == []
+    assert extra == [3]
+
+
+def test_pure_python_matches_numpy(monkeypatch):
+    if keyTimes.np is None:
+        pytest.skip("NumPy not available")
+    expected = keyTimes.share_plan(TIMES, REFERENCE, start=2.0)
+    monkeypatch.setattr(keyTimes, "np", None)
+    assert keyTimes.share_plan(TIMES, REFERENCE, start=2.0) == expected
+
+
+# Herramientas completas sobre la escena simulada
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_share_key_times_uses_one_call_per_curve(backend):
+    runners.use_backend(backend)
+    scene = fakeMaya.use_scene(scenarios.build_rig(controls=4, channels=3, keys=30, step=3.0))
+    reference = [1.0 + frame * 2.0 for frame in range(45)]
+    curves = list(scene.curves)
+    shapes = {name: [curve.evaluate(t) for t in reference] for name, curve in scene.curves.items()}
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    scene.reset_calls()
+    summary = curveTools.share_key_times(curves, reference)
+
+    assert scene.calls["setKeyframe"] == len(curves)
+    assert scene.calls["cutKey"] == len(curves)
+    assert scene.undo_chunks == 0
+    for name, curve in scene.curves.items():
+        assert curve.times == reference
+    assert summary["inserted"] and summary["removed"]
+    # Las keys insertadas estan sobre la curva original
+    curve = scene.curves[curves[0]]
+    assert curve.values[1] == pytest.approx(shapes[curves[0]][1])
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_match_curves_copies_times_and_values(backend):
+    runners.use_backend(backend)
+    scene = fakeMaya.use_scene(scenarios.build_rig(controls=2, channels=3, keys=30, step=2.0))
+    names = list(scene.curves)
+    reference = scene.curves[names[-1]]
+    reference.remove(range(0, 30, 3))
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    curveTools.match_curves(names[:-1], names[-1])
+
+    for name in names[:-1]:
+        assert scene.curves[name].times == reference.times
+        assert scene.curves[name].values == pytest.approx(reference.values)
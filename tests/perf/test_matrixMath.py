@@ -0,0 +1,85 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+import TheKeyMachine.mods.matrixMathMod as matrixMath
+from tests.perf import fakeMaya
+
+
+
+# Composicion / descomposicion
+
+# Angulos dentro de (-90, 90) para que la solucion sea unica en cualquier orden
+ROTATIONS = [[30.0, 40.0, 50.0], [-80.0, 10.0, 75.0], [0.0, 0.0, 0.0], [60.0, -60.0, 5.0]]
+TRANSLATIONS = [[1.0, 2.0, 3.0], [-4.0, 0.5, 10.0], [0.0, 0.0, 0.0], [7.0, -7.0, 1.0]]
+SCALES = [[1.0, 1.0, 1.0], [2.0, 0.5, 1.5], [1.0, 3.0, 1.0], [0.25, 1.0, 4.0]]
+
+
+def as_lists(values):
+    return [[float(value) for value in row] for row in values]
+
+
+@pytest.mark.parametrize("order", matrixMath.ROTATE_ORDERS)
+def test_decompose_inverts_compose(order):
+    matrices = matrixMath.compose(TRANSLATIONS, ROTATIONS, SCALES, order)
+    translations, rotations, scales = matrixMath.decompose(matrices, order)
+    for result, expected in ((translations, TRANSLATIONS), (rotations, ROTATIONS), (scales, SCALES)):
+        for row, expected_row in zip(as_lists(result), expected):
+            assert row == pytest.approx(expected_row, abs=1e-6)
+
+
+@pytest.mark.parametrize("order", matrixMath.ROTATE_ORDERS)
+def test_compose_matches_the_scene_matrix(order):
+    scene = fakeMaya.Scene()
+    node = scene.create_joint("joint1", orient=(15.0, -30.0, 45.0))
+    for axis, rotation, translation in zip("XYZ", ROTATIONS[1], TRANSLATIONS[1]):
+        node.attr("rotate" + axis).value = rotation
+        node.attr("translate" + axis).value = translation
+    node.attr("rotateOrder").value = matrixMath.ROTATE_ORDERS.index(order)
+
+    composed = matrixMath.compose([TRANSLATIONS[1]], [ROTATIONS[1]], order=order, joint_orient=[15.0, -30.0, 45.0])
+    expected = scene.local_matrix(node)
+    assert [float(value) for row in composed[0] for value in row] == pytest.approx(
+        [value for row in expected for value in row], abs=1e-9)
+
+    _, rotations, _ = matrixMath.decompose([expected], order, joint_orient=[15.0, -30.0, 45.0])
+    assert as_lists(rotations)[0] == pytest.approx(ROTATIONS[1], abs=1e-6)
+
+
+@pytest.mark.parametrize("rotation", [[10.0, 90.0, 25.0], [-120.0, 10.0, 75.0], [170.0, -135.0, 5.0]])
+def test_equivalent_angles_keep_the_matrix(rotation):
+    # Gimbal lock o angulos fuera de rango: otros angulos, la misma orientacion
+    matrices = matrixMath.compose([[0.0, 0.0, 0.0]], [rotation], order="yxz")
+    _, angles, _ = matrixMath.decompose(matrices, "yxz")
+    rebuilt = matrixMath.compose([[0.0, 0.0, 0.0]], angles, order="yxz")
+    assert [float(value) for row in rebuilt[0] for value in row] == pytest.approx(
+        [float(value) for row in matrices[0] for value in row], abs=1e-9)
+
+
+def test_pure_python_matches_numpy(monkeypatch):
+    if matrixMath.np is None:
+        pytest.skip("NumPy not available")
+    expected = matrixMath.decompose(matrixMath.compose(TRANSLATIONS, ROTATIONS, SCALES, "zxy"), "zxy")
+    monkeypatch.setattr(matrixMath, "np", None)
+    result = matrixMath.decompose(matrixMath.compose(TRANSLATIONS, ROTATIONS, SCALES, "zxy"), "zxy")
+    for values, expected_values in zip(result, expected):
+        for row, expected_row in zip(values, expected_values):
+            assert list(row) == pytest.approx(list(expected_row), abs=1e-9)
@@ -0,0 +1,180 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+from tests.perf import runners
+
+
+
+@pytest.fixture
+def plugWriter(scene):
+    runners.use_backend("fake")
+    return runners.load_module("TheKeyMachine.mods.plugWriterMod")
+
+
+def animated_ctrl(scene):
+    scene.create_transform("ctrl")
+    for attr in ("translateX", "rotateX"):
+        scene.set_key("ctrl", attr, 1.0, 0.0, "linear", "linear")
+        scene.set_key("ctrl", attr, 11.0, 10.0, "linear", "linear")
+    scene.set_time(6.0)
+
+
+def attr_value(scene, plug):
+    node, attribute = scene.plug(plug)
+    return scene.get_value(node, attribute)
+
+
+def drag_writer(plugWriter, scene):
+    writer = plugWriter.PlugWriter()
+    writer.register("ctrl.tx", "doubleLinear", 5.0)
+    writer.register("ctrl.rx", "doubleAngle", 5.0)
+    for value in (6.0, 7.0, 8.5):
+        writer.write([("ctrl.tx", value), ("ctrl.rx", value * 10.0)])
+    return writer
+
+
+def test_ticks_use_one_modifier_and_stay_out_of_undo(plugWriter, scene):
+    animated_ctrl(scene)
+    scene.reset_calls()
+    drag_writer(plugWriter, scene)
+
+    assert scene.calls["MDGModifier.doIt"] == 3 and scene.calls["setAttr"] == 0
+    assert attr_value(scene, "ctrl.tx") == pytest.approx(8.5)
+    assert attr_value(scene, "ctrl.rx") == pytest.approx(85.0)
+    assert scene.undo_queue == []
+
+
+def test_commit_resets_originals_then_sets_final_values(plugWriter, scene):
+    from maya import cmds
+
+    animated_ctrl(scene)
+    writer = drag_writer(plugWriter, scene)
+    scene.reset_calls()
+
+    cmds.undoInfo(openChunk=True)
+    writer.commit()
+    cmds.undoInfo(closeChunk=True)
+
+    # un doIt para volver a los originales y un setAttr por plug con el valor final
+    assert scene.calls["MDGModifier.doIt"] == 1 and scene.calls["setAttr"] == 2
+    assert attr_value(scene, "ctrl.tx") == pytest.approx(8.5)
+    assert attr_value(scene, "ctrl.rx") == pytest.approx(85.0)
+    assert len(scene.undo_queue) == 1 and writer.last_values == {}
+
+    # El undo guarda los valores originales, no los de un tick intermedio
+    cmds.undo()
+    assert attr_value(scene, "ctrl.tx") == pytest.approx(5.0)
+    assert attr_value(scene, "ctrl.rx") == pytest.approx(5.0)
+
+
+def test_commit_without_ticks_writes_nothing(plugWriter, scene):
+    animated_ctrl(scene)
+    writer = plugWriter.PlugWriter()
+    writer.register("ctrl.tx", "doubleLinear", 5.0)
+    scene.reset_calls()
+    writer.commit()
+    assert sum(scene.calls.values()) == 0
+
+
+def test_tween_drag_is_one_undo_chunk(plugWriter, scene):
+    from maya import cmds
+
+    keyTools = runners.load_module("TheKeyMachine.mods.keyToolsMod")
+    keyTools.tween_session = None
+    keyTools.is_dragging = False
+    animated_ctrl(scene)
+    scene.set_key("ctrl", "translateY", 1.0, 2.0)
+    scene.selection = ["ctrl"]
+    scene.reset_calls()
+
+    for percentage in (20.0, 35.0, 80.0):
+        keyTools.tween(percentage)
+    keyTools.tweenSliderReset("bar_tween_slider")
+
+    assert scene.undo_chunks == 0 and len(scene.undo_queue) == 1
+    assert scene.calls["MDGModifier.doIt"] == 4
+    # Solo tx y rx tienen keys distintas a los dos lados
+    assert scene.calls["setAttr"] == 2
+    assert attr_value(scene, "ctrl.tx") == pytest.approx(8.0)
+    assert attr_value(scene, "ctrl.rx") == pytest.approx(8.0)
+
+    cmds.undo()
+    assert scene.undo_queue == []
+    assert attr_value(scene, "ctrl.tx") == pytest.approx(5.0)
+
+
+def blend_slider_tools(scene):
+    keyTools = runners.load_module("TheKeyMachine.mods.keyToolsMod")
+    keyTools.pull_push_session = keyTools.default_session = keyTools.blend_session = None
+    keyTools.is_dragging = False
+    animated_ctrl(scene)
+    scene.selection = ["ctrl"]
+    return keyTools
+
+
+def test_pull_push_keeps_autokey_and_keys_the_final_value(plugWriter, scene):
+    keyTools = blend_slider_tools(scene)
+    scene.autokey = True
+
+    for value in (1.0, 2.0):
+        keyTools.blend_pull_and_push(value)
+        assert scene.autokey
+    dragged = attr_value(scene, "ctrl.tx")
+    keyTools.blendSliderReset("bar_blend_slider")
+
+    # Pull/push no crea su key: con autokey, el setAttr final del commit la crea en el frame actual
+    curve = scene.curve_for("ctrl", "translateX")
+    assert scene.autokey and dragged != 5.0 and 6.0 in curve.times
+    assert curve.evaluate(6.0) == pytest.approx(dragged)
+
+
+def test_blend_to_default_interpolates_from_the_value_at_drag_start(plugWriter, scene):
+    keyTools = blend_slider_tools(scene)
+
+    # Cada tick parte del valor al empezar el drag: repetir un valor no acumula y volver a 0 lo deja como estaba
+    for value in (0.5, 0.5, 0.5):
+        keyTools.blend_to_default(value)
+        assert attr_value(scene, "ctrl.tx") == pytest.approx(2.5)
+    keyTools.blend_to_default(0.0)
+    assert attr_value(scene, "ctrl.tx") == pytest.approx(5.0)
+    keyTools.blend_to_default(1.0)
+    keyTools.blendSliderReset("bar_blend_slider")
+    assert attr_value(scene, "ctrl.tx") == pytest.approx(0.0)
+
+
+def test_unreadable_plugs_are_reported_with_one_warning(plugWriter, scene, monkeypatch, capsys):
+    slider = runners.load_module("TheKeyMachine.mods.sliderMod")
+    sceneBackend = runners.load_module("TheKeyMachine.mods.sceneBackendMod")
+    animated_ctrl(scene)
+    backend = sceneBackend.get_backend()
+    plug_state = backend.plug_state
+
+    def failing_plug_state(node, attr):
+        if attr in ("translateX", "rotateX"):
+            raise RuntimeError("broken")
+        return plug_state(node, attr)
+    monkeypatch.setattr(backend, "plug_state", failing_plug_state)
+
+    session = slider.DragSession(["ctrl"], attrs=["translateX", "rotateX", "translateY"])
+    assert [p.attr for p in session.plugs] == ["translateY"]
+    assert scene.warnings == ["Skipping 2 attributes: ctrl.translateX (broken), ctrl.rotateX (broken)"]
+    assert capsys.readouterr().out == ""
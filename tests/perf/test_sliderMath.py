@@ -0,0 +1,234 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import random
+import time
+
+import pytest
+
+import TheKeyMachine.mods.sliderMathMod as sliderMath
+
+
+
+# Los kernels se comparan con las formulas por atributo que usaba keyToolsMod antes de sliderMathMod, sobre las
+# mismas filas (previous, next, original, min, max). Las formulas de referencia solo ven los plugs escribibles
+# (original escalar), igual que antes; los kernels tienen que dejar el resto fuera con la mascara.
+
+
+def is_scalar(value):
+    return isinstance(value, (int, float))
+
+
+def clamp(value, minimum, maximum):
+    if minimum is not None and value < minimum:
+        value = minimum
+    if maximum is not None and value > maximum:
+        value = maximum
+    return value
+
+
+def reference_tween(rows, percentage):
+    writes = {}
+    for index, (previous, next_value, original, minimum, maximum) in enumerate(rows):
+        if not is_scalar(original):
+            continue
+        if not is_scalar(previous) or not is_scalar(next_value):
+            continue
+        if previous == next_value:
+            continue
+        difference = next_value - previous
+        writes[index] = clamp(previous + (difference * percentage) / 100.0, minimum, maximum)
+    return writes
+
+
+def reference_blend(rows, percentage):
+    # Blend to Key y Blend to Frame (con los valores de los frames izquierdo/derecho en previous/next)
+    writes = {}
+    for index, (previous, next_value, original, minimum, maximum) in enumerate(rows):
+        if not is_scalar(original):
+            continue
+        if is_scalar(next_value) and percentage > 0:
+            difference = next_value - original
+        elif is_scalar(previous):
+            difference = original - previous
+        else:
+            continue
+        weighted = (difference * abs(percentage)) / 50.0
+        writes[index] = original + weighted if percentage > 0 else original - weighted
+    return writes
+
+
+def reference_pull_push(rows, value, factors, keyable):
+    writes = {}
+    for index, (previous, next_value, original, minimum, maximum) in enumerate(rows):
+        if not is_scalar(original) or not keyable[index]:
+            continue
+        new_value = original + value * factors[index]
+        if minimum is not None and new_value < minimum:
+            continue
+        if maximum is not None and new_value > maximum:
+            continue
+        writes[index] = new_value
+    return writes
+
+
+def reference_blend_to_default(rows, defaults, t):
+    # Sin valor por defecto el valor se quedaba igual; el kernel no lo escribe
+    writes = {}
+    for index, (previous, next_value, original, minimum, maximum) in enumerate(rows):
+        if not is_scalar(original) or defaults[index] is None:
+            continue
+        writes[index] = (1 - t) * original + t * defaults[index]
+    return writes
+
+
+def make_rows(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        original = rng.uniform(-50.0, 50.0)
+        previous = rng.choice([None, rng.uniform(-50.0, 50.0), original])
+        next_value = rng.choice([None, rng.uniform(-50.0, 50.0), previous])
+        minimum = rng.choice([None, None, rng.uniform(-60.0, -10.0)])
+        maximum = rng.choice([None, None, rng.uniform(10.0, 60.0)])
+        original = rng.choice([original] * 8 + ["text", [(1.0, 2.0, 3.0)]])
+        rows.append((previous, next_value, original, minimum, maximum))
+    return rows
+
+
+def writes_of(values, mask):
+    return dict(sliderMath.masked_items(values, mask))
+
+
+def assert_same_writes(writes, expected):
+    assert sorted(writes) == sorted(expected)
+    for index, value in expected.items():
+        assert writes[index] == pytest.approx(value), index
+
+
+ROWS = make_rows(400)
+FACTORS = [random.Random(i).choice([0.2, 0.05, 0.01]) for i in range(len(ROWS))]
+KEYABLE = [i % 7 != 0 for i in range(len(ROWS))]
+DEFAULTS = [random.Random(i).choice([None, 0.0, 1.0, random.Random(i + 1).uniform(-5.0, 5.0)]) for i in range(len(ROWS))]
+
+
+@pytest.fixture(params=["numpy", "array"])
+def kernels(request, monkeypatch):
+    # Los mismos kernels con NumPy y con el fallback de array('d') de las versiones de Maya sin NumPy
+    if request.param == "numpy" and sliderMath.np is None:
+        pytest.skip("NumPy not available")
+    if request.param == "array":
+        monkeypatch.setattr(sliderMath, "np", None)
+    return sliderMath
+
+
+@pytest.mark.parametrize("percentage", [-20.0, 0.0, 33.0, 50.0, 100.0, 130.0])
+def test_tween_matches_per_attribute(kernels, percentage):
+    data = kernels.SliderArrays.from_rows(ROWS)
+    assert_same_writes(writes_of(*kernels.tween(data, percentage)), reference_tween(ROWS, percentage))
+
+
+@pytest.mark.parametrize("percentage", [-50.0, -12.5, 0.0, 20.0, 50.0])
+def test_blend_to_key_matches_per_attribute(kernels, percentage):
+    data = kernels.SliderArrays.from_rows(ROWS)
+    assert_same_writes(writes_of(*kernels.blend(data, percentage)), reference_blend(ROWS, percentage))
+
+
+@pytest.mark.parametrize("percentage", [-50.0, -30.0, 30.0, 50.0])
+def test_blend_to_frame_matches_per_attribute(kernels, percentage):
+    # Los frames izquierdo y derecho siempre tienen valor, aunque no haya key
+    rng = random.Random(7)
+    rows = [(rng.uniform(-5.0, 5.0), rng.uniform(-5.0, 5.0), original, minimum, maximum)
+            for _, _, original, minimum, maximum in ROWS]
+    data = kernels.SliderArrays.from_rows(rows)
+    assert_same_writes(writes_of(*kernels.blend(data, percentage)), reference_blend(rows, percentage))
+
+
+@pytest.mark.parametrize("value", [-5.0, -0.5, 1.0, 5.0])
+def test_pull_push_matches_per_attribute(kernels, value):
+    data = kernels.SliderArrays.from_rows(ROWS)
+    writes = writes_of(*kernels.pull_push(data, value * 40.0, FACTORS, KEYABLE))
+    assert_same_writes(writes, reference_pull_push(ROWS, value * 40.0, FACTORS, KEYABLE))
+
+
+@pytest.mark.parametrize("t", [0.0, 0.25, 1.0])
+def test_blend_to_default_matches_per_attribute(kernels, t):
+    data = kernels.SliderArrays.from_rows(ROWS)
+    defaults = [sliderMath.as_float(default) for default in DEFAULTS]
+    assert_same_writes(writes_of(*kernels.blend_to_default(data, defaults, t)), reference_blend_to_default(ROWS, DEFAULTS, t))
+
+
+def test_tween_clamps_to_min_max(kernels):
+    rows = [(0.0, 10.0, 5.0, None, 8.0), (0.0, 10.0, 5.0, 2.0, None), (0.0, 10.0, 5.0, None, None)]
+    data = kernels.SliderArrays.from_rows(rows)
+
+    assert writes_of(*kernels.tween(data, 130.0)) == pytest.approx({0: 8.0, 1: 13.0, 2: 13.0})
+    assert writes_of(*kernels.tween(data, -30.0)) == pytest.approx({0: -3.0, 1: 2.0, 2: -3.0})
+
+
+def test_pull_push_skips_values_outside_limits(kernels):
+    data = kernels.SliderArrays.from_rows([(None, None, 0.5, 0.0, 1.0), (None, None, 0.5, None, None)])
+    assert writes_of(*kernels.pull_push(data, 1.0, [1.0, 1.0])) == pytest.approx({1: 1.5})
+    assert writes_of(*kernels.pull_push(data, 0.25, [1.0, 1.0])) == pytest.approx({0: 0.75, 1: 0.75})
+
+
+def test_invalid_entries_are_masked(kernels):
+    # Original no numerico (string, atributo compuesto) y vecinos que faltan
+    rows = [(0.0, 10.0, "text", None, None), (0.0, 10.0, [(1.0, 2.0, 3.0)], None, None),
+            (None, 10.0, 5.0, None, None), (0.0, None, 5.0, None, None), (None, None, 5.0, None, None)]
+    data = kernels.SliderArrays.from_rows(rows)
+
+    assert writes_of(*kernels.tween(data, 50.0)) == {}
+    assert sorted(writes_of(*kernels.blend(data, 25.0))) == [2, 3]
+    assert sorted(writes_of(*kernels.blend(data, -25.0))) == [3]
+    assert sorted(writes_of(*kernels.pull_push(data, 1.0, [1.0] * 5))) == [2, 3, 4]
+    assert sorted(writes_of(*kernels.blend_to_default(data, [0.0, 0.0, 0.0, sliderMath.NAN, 0.0], 0.5))) == [2, 4]
+
+
+def test_equal_neighbours_are_not_tweened(kernels):
+    data = kernels.SliderArrays.from_rows([(3.0, 3.0, 1.0, None, None), (3.0, 4.0, 1.0, None, None)])
+    assert writes_of(*kernels.tween(data, 50.0)) == pytest.approx({1: 3.5})
+
+
+def test_masked_items_are_python_floats(kernels):
+    data = kernels.SliderArrays.from_rows([(0.0, 2.0, 1.0, None, None)])
+    ((index, value),) = kernels.masked_items(*kernels.tween(data, 50.0))
+    assert type(index) is int and type(value) is float
+
+
+def test_5000_channels_under_a_millisecond():
+    # Objetivo de un tick de drag: el kernel sobre 5.000 canales por debajo de 1 ms
+    if sliderMath.np is None:
+        pytest.skip("NumPy not available")
+    rows = make_rows(5000, seed=3)
+    data = sliderMath.SliderArrays.from_rows(rows)
+    best = {}
+    for name, kernel in (("tween", lambda: sliderMath.tween(data, 40.0)),
+                         ("blend", lambda: sliderMath.blend(data, 20.0)),
+                         ("pull_push", lambda: sliderMath.pull_push(data, 1.0, [0.2] * 5000))):
+        timings = []
+        for _ in range(20):
+            started = time.perf_counter()
+            values, mask = kernel()
+            timings.append(time.perf_counter() - started)
+        assert len(values) == len(mask) == 5000
+        best[name] = min(timings)
+
+    assert max(best.values()) < 0.001, best
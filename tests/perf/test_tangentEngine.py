@@ -0,0 +1,139 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import math
+
+import pytest
+
+import TheKeyMachine.mods.tangentEngineMod as tangentEngine
+from tests.perf import fakeMaya
+from tests.perf import runners
+from tests.perf import scenarios
+
+
+
+# Modos sobre columnas
+
+TIMES = [1.0, 5.0, 9.0, 13.0, 17.0, 21.0]
+VALUES = [0.0, 4.0, 10.0, 6.0, 6.0, 12.0]
+ALL = list(range(len(TIMES)))
+
+
+def test_bouncy_matches_neighbour_angles():
+    in_angles, out_angles = tangentEngine.bouncy(TIMES, VALUES, [1, 2], None, None, factor=1.3)
+    assert in_angles[0] == pytest.approx(math.degrees(math.atan2(4.0, 4.0)) * 1.3)
+    assert out_angles[0] == pytest.approx(min(85.0, math.degrees(math.atan2(6.0, 4.0)) * 1.3))
+    assert out_angles[1] == pytest.approx(math.degrees(math.atan2(-4.0, 4.0)) * 1.3)
+
+
+def test_auto_clamped_is_flat_at_extremes_and_never_overshoots():
+    in_angles, out_angles = tangentEngine.auto_clamped(TIMES, VALUES, ALL, None, None, fps=24.0)
+    assert in_angles == out_angles
+    assert [in_angles[i] for i in (0, 2, 3, 4, 5)] == [0.0] * 5
+    slope = math.tan(math.radians(in_angles[1])) / 24.0
+    assert 0.0 < slope <= 3.0 * 1.0
+
+
+def test_flat_extremes_keeps_other_tangents():
+    angles = [10.0, 20.0, 30.0, 40.0, 50.0, 60.0]
+    in_angles, out_angles = tangentEngine.flat_extremes(TIMES, VALUES, ALL, angles, angles)
+    assert in_angles == [0.0, 20.0, 0.0, 0.0, 0.0, 0.0]
+
+
+def test_overshoot_scales_slopes():
+    in_angles, _ = tangentEngine.overshoot(TIMES, VALUES, [0], [45.0] * 6, [45.0] * 6, fps=24.0, factor=2.0)
+    assert math.tan(math.radians(in_angles[0])) == pytest.approx(2.0)
+
+
+@pytest.mark.parametrize("mode", sorted(tangentEngine.MODES))
+def test_pure_python_matches_numpy(monkeypatch, mode):
+    if tangentEngine.np is None:
+        pytest.skip("NumPy not available")
+    angles = [5.0, -10.0, 15.0, 0.0, 30.0, -45.0]
+    expected = tangentEngine.compute_tangents(mode, TIMES, VALUES, [1, 3, 4], angles, angles)
+    monkeypatch.setattr(tangentEngine, "np", None)
+    result = tangentEngine.compute_tangents(mode, TIMES, VALUES, [1, 3, 4], angles, angles)
+    assert result[0] == pytest.approx(list(expected[0])) and result[1] == pytest.approx(list(expected[1]))
+
+
+# Herramienta completa sobre la escena simulada
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_set_tangents_writes_each_curve_in_bulk(backend):
+    runners.use_backend(backend)
+    scene = fakeMaya.use_scene(scenarios.build_rig(controls=2, channels=3, keys=40))
+    scenarios.select_key_range(scene)
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    scene.reset_calls()
+    changed = curveTools.set_tangents("Bouncy", 1.3)
+
+    assert changed == sum(len(curve.selected) for curve in scene.curves.values())
+    # 7 consultas de read_curve (solo con el backend de cmds) y una escritura por curva
+    assert scene.calls["keyTangent"] <= len(scene.curves) * 8
+    assert scene.calls["setAttr"] == len(scene.curves) * 4
+    assert scene.undo_chunks == 0
+    for curve in scene.curves.values():
+        index = min(curve.selected)
+        expected = max(-85.0, min(85.0, math.degrees(math.atan2(curve.values[index] - curve.values[index - 1],
+                                                               curve.times[index] - curve.times[index - 1])) * 1.3))
+        assert curve.in_types[index] == curve.out_types[index] == "fixed"
+        assert curve.angle(index, "in") == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_set_tangents_keeps_keys_between_sparse_selections(backend):
+    runners.use_backend(backend)
+    scene = fakeMaya.use_scene(scenarios.build_rig(controls=2, channels=3, keys=40))
+    for curve in scene.curves.values():
+        curve.selected = set(range(10, 30, 3))
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+    untouched = {name: [(curve.in_types[i], curve.angle(i, "in"), curve.angle(i, "out")) for i in range(11, 28)]
+                 for name, curve in scene.curves.items()}
+
+    scene.reset_calls()
+    curveTools.set_tangents("Bouncy", 1.3)
+
+    # Un solo tramo por componente aunque la seleccion tenga huecos
+    assert scene.calls["setAttr"] == len(scene.curves) * 4
+    for name, curve in scene.curves.items():
+        assert all(curve.in_types[i] == "fixed" for i in curve.selected)
+        for offset, index in enumerate(range(11, 28)):
+            if index not in curve.selected:
+                in_type, in_angle, out_angle = untouched[name][offset]
+                assert curve.in_types[index] == in_type
+                assert curve.angle(index, "in") == pytest.approx(in_angle)
+                assert curve.angle(index, "out") == pytest.approx(out_angle)
+
+
+def test_set_tangent_type_groups_keys():
+    runners.use_backend("cmds")
+    scene = fakeMaya.use_scene(scenarios.build_rig(controls=2, channels=3, keys=40))
+    scenarios.select_key_range(scene)
+    curveTools = runners.load_module("TheKeyMachine.mods.curveToolsMod")
+
+    scene.reset_calls()
+    curveTools.set_tangent_type("linear")
+
+    # 7 consultas de read_curve (solo con el backend de cmds) y una escritura por curva
+    assert scene.calls["keyTangent"] <= len(scene.curves) * 8
+    for curve in scene.curves.values():
+        assert all(curve.in_types[i] == curve.out_types[i] == "linear" for i in curve.selected)
+        assert curve.in_types[0] == "auto"
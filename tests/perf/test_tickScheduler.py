@@ -0,0 +1,96 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+from tests.perf import runners
+
+
+
+@pytest.fixture
+def tickScheduler(scene):
+    return runners.load_module("TheKeyMachine.mods.tickSchedulerMod")
+
+
+def make_scheduler(tickScheduler, applied):
+    # La cola idle es una lista: el test decide cuando se vacia
+    idle = []
+    scheduler = tickScheduler.TickScheduler("test", applied.append, schedule=idle.append)
+    return scheduler, idle
+
+
+def pump(idle):
+    while idle:
+        idle.pop(0)()
+
+
+def test_ticks_before_a_run_apply_only_the_latest_value(tickScheduler):
+    applied = []
+    scheduler, idle = make_scheduler(tickScheduler, applied)
+    for value in (10.0, 20.0, 30.0):
+        scheduler.submit(value)
+
+    assert len(idle) == 1 and applied == []
+    pump(idle)
+    assert applied == [30.0]
+
+    scheduler.submit(40.0)
+    pump(idle)
+    assert applied == [30.0, 40.0]
+    stats = scheduler.summary()
+    assert (stats["submitted"], stats["applied"], stats["dropped"]) == (4, 2, 2)
+
+
+def test_flush_on_release_applies_the_pending_value_once(tickScheduler):
+    applied = []
+    scheduler, idle = make_scheduler(tickScheduler, applied)
+    scheduler.submit(5.0)
+    scheduler.submit(7.0)
+
+    # changeCommand: se aplica ya, antes del reset del slider
+    scheduler.flush()
+    assert applied == [7.0]
+    # el run diferido llega despues y no hace nada
+    pump(idle)
+    assert applied == [7.0] and not scheduler.pending
+    scheduler.flush()
+    assert applied == [7.0]
+
+
+def test_cancel_discards_the_pending_value(tickScheduler):
+    applied = []
+    scheduler, idle = make_scheduler(tickScheduler, applied)
+    scheduler.submit(1.0)
+    scheduler.cancel()
+    pump(idle)
+
+    assert applied == [] and scheduler.summary()["dropped"] == 1
+    scheduler.submit(2.0)
+    pump(idle)
+    assert applied == [2.0]
+
+
+def test_default_schedule_is_the_idle_queue(tickScheduler, scene):
+    applied = []
+    scheduler = tickScheduler.TickScheduler("idle", applied.append)
+    scheduler.submit(3.0)
+    assert len(scene.deferred) == 1
+    scene.run_idle()
+    assert applied == [3.0] and tickScheduler.get_stats()["idle"]["applied"] == 1
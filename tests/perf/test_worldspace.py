@@ -0,0 +1,313 @@
+
+
+'''
+
+    TheKeyMachine - Animation Toolset for Maya Animators                                           
+                                                                                                                                              
+                                                                                                                                              
+    This file is part of TheKeyMachine, an open source software for Autodesk Maya licensed under the GNU General Public License v3.0 (GPL-3.0).                                           
+    You are free to use, modify, and distribute this code under the terms of the GPL-3.0 license.                                              
+    By using this code, you agree to keep it open source and share any modifications.                                                          
+    This code is provided "as is," without any warranty. For the full license text, visit https://www.gnu.org/licenses/gpl-3.0.html
+
+    thekeymachine.xyz / x@thekeymachine.xyz                                                                                                                                        
+                                                                                                                                              
+    Developed by: Rodrigo Torres / rodritorres.com                                                                                             
+                                                                                                                                             
+
+'''
+
+
+import pytest
+
+from tests.perf import fakeMaya
+from tests.perf import runners
+
+
+
+@pytest.fixture
+def worldspace():
+    return runners.load_module("TheKeyMachine.mods.worldspaceMod")
+
+
+def build_chain():
+    # pelvis -> spine, con keys en frames distintos en cada uno
+    scene = fakeMaya.use_scene(fakeMaya.Scene())
+    scene.create_transform("pelvis")
+    spine = scene.create_joint("spine", parent="pelvis", orient=(0.0, 0.0, 90.0))
+    spine.attr("rotateOrder").value = 2
+    for frame in (1.0, 5.0, 9.0):
+        scene.set_key("pelvis", "translateX", frame, frame)
+        scene.set_key("pelvis", "rotateY", frame, frame * 10.0)
+    for frame in (3.0, 5.0):
+        scene.set_key("spine", "translateY", frame, 2.0)
+        scene.set_key("spine", "rotateX", frame, frame * 5.0)
+    return scene
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_copy_worldspace_samples_without_moving_time(worldspace, backend):
+    runners.use_backend(backend)
+    scene = build_chain()
+    scene.current_time = 42.0
+
+    scene.reset_calls()
+    data = worldspace.copy_worldspace(["pelvis", "spine"])
+
+    assert scene.current_time == 42.0
+    assert scene.calls["currentTime"] == 0
+    assert scene.calls["xform"] == 0
+    assert sorted(data["pelvis"]) == [1, 5, 9]
+    assert sorted(data["spine"]) == [3, 5]
+    assert data["pelvis"][5] == pytest.approx([5.0, 0.0, 0.0, 0.0, 50.0, 0.0], abs=1e-6)
+
+    # La descomposicion con el rotateOrder del objeto reconstruye su matriz de mundo
+    spine = scene.node("spine")
+    translation, rotation = data["spine"][3][:3], data["spine"][3][3:]
+    rebuilt = worldspace.matrixMath.compose([translation], [rotation], order="zxy")
+    expected = scene.world_matrix(spine, 3.0)
+    assert [float(value) for row in rebuilt[0] for value in row] == pytest.approx(
+        [value for row in expected for value in row], abs=1e-6)
+
+
+def test_sampler_returns_a_dense_block(worldspace):
+    runners.use_backend("fake")
+    build_chain()
+    matrices = worldspace.sample_world_matrices(["pelvis", "spine"], [1.0, 2.0, 3.0])
+    if worldspace.np is not None:
+        assert matrices.shape == (2, 3, 4, 4)
+    assert len(matrices) == 2 and len(matrices[1]) == 3
+
+
+def test_progress_can_cancel(worldspace):
+    runners.use_backend("fake")
+    build_chain()
+    seen = []
+
+    def progress(done):
+        seen.append(done)
+        return done == 2
+
+    data = worldspace.copy_worldspace(["pelvis", "spine"], progress=progress)
+    assert seen == [1, 2]
+    assert sorted(data["pelvis"]) == [1]
+    assert sorted(data["spine"]) == [3]
+
+
+def test_range_limits_the_frames(worldspace):
+    runners.use_backend("fake")
+    build_chain()
+    data = worldspace.copy_worldspace(["pelvis", "spine"], time_range=(4.0, 9.0))
+    assert sorted(data["pelvis"]) == [5, 9]
+    assert sorted(data["spine"]) == [5]
+
+
+def test_pure_python_matches_numpy(worldspace, monkeypatch):
+    if worldspace.np is None:
+        pytest.skip("NumPy not available")
+    runners.use_backend("fake")
+    build_chain()
+    expected = worldspace.copy_worldspace(["pelvis", "spine"])
+    monkeypatch.setattr(worldspace, "np", None)
+    monkeypatch.setattr(worldspace.matrixMath, "np", None)
+    result = worldspace.copy_worldspace(["pelvis", "spine"])
+    for obj in expected:
+        for frame in expected[obj]:
+            assert result[obj][frame] == pytest.approx(expected[obj][frame], abs=1e-9)
+
+
+# Re-copia incremental con SampleCache
+
+def record_world_samples(backend):
+    # Objetos cuyas worldMatrix se muestrean en cada llamada
+    sampled = []
+    sample_matrices = backend.sample_matrices
+
+    def record(plugs, times, progress=None):
+        sampled.extend(obj for obj in (plug.split(".")[0] for plug in plugs if plug.endswith("worldMatrix[0]"))
+                       if obj not in sampled)
+        return sample_matrices(plugs, times, progress)
+    backend.sample_matrices = record
+    return sampled
+
+
+def test_recopy_samples_only_changed_objects(worldspace):
+    backend = runners.use_backend("fake")
+    scene = build_chain()
+    cache = worldspace.SampleCache()
+    sampled = record_world_samples(backend)
+    objects = ["pelvis", "spine"]
+
+    first = worldspace.copy_worldspace(objects, cache=cache)
+    assert sampled == objects and len(cache) == 2
+
+    del sampled[:]
+    assert worldspace.copy_worldspace(objects, cache=cache) == first
+    assert sampled == []
+
+    # Solo cambia el hijo
+    scene.set_key("spine", "rotateX", 3.0, 80.0)
+    changed = worldspace.copy_worldspace(objects, cache=cache)
+    assert sampled == ["spine"]
+    assert changed["pelvis"] == first["pelvis"]
+    assert changed == worldspace.copy_worldspace(objects)
+
+    # Cambia el padre: tambien hay que volver a muestrear el hijo
+    del sampled[:]
+    scene.set_key("pelvis", "translateY", 5.0, 3.0)
+    worldspace.copy_worldspace(objects, cache=cache)
+    assert sampled == objects
+
+
+def test_static_changes_and_reparenting_invalidate(worldspace):
+    backend = runners.use_backend("fake")
+    scene = build_chain()
+    cache = worldspace.SampleCache()
+    sampled = record_world_samples(backend)
+    worldspace.copy_worldspace(["spine"], cache=cache)
+
+    del sampled[:]
+    scene.node("pelvis").attr("scaleY").value = 2.0
+    worldspace.copy_worldspace(["spine"], cache=cache)
+    assert sampled == ["spine"]
+
+    del sampled[:]
+    scene.node("spine").parent = None
+    worldspace.copy_worldspace(["spine"], cache=cache)
+    assert sampled == ["spine"]
+
+
+def test_range_copy_reuses_cached_frames(worldspace):
+    backend = runners.use_backend("fake")
+    build_chain()
+    cache = worldspace.SampleCache()
+    sampled = record_world_samples(backend)
+    worldspace.copy_worldspace(["pelvis", "spine"], time_range=(4.0, 9.0), cache=cache)
+
+    del sampled[:]
+    full = worldspace.copy_worldspace(["pelvis", "spine"], cache=cache)
+    assert sampled == ["pelvis", "spine"]
+    assert full == worldspace.copy_worldspace(["pelvis", "spine"])
+
+    del sampled[:]
+    worldspace.copy_worldspace(["pelvis", "spine"], time_range=(1.0, 5.0), cache=cache)
+    assert sampled == []
+
+
+def test_cache_evicts_by_size_and_age(worldspace):
+    now = [0.0]
+    cache = worldspace.SampleCache(max_samples=5, max_age=60.0, clock=lambda: now[0])
+    cache.store("a", "x", {1.0: [0.0] * 16, 2.0: [0.0] * 16})
+    cache.store("b", "x", {1.0: [0.0] * 16, 2.0: [0.0] * 16})
+    cache.samples("a", "x")
+    cache.store("c", "x", {1.0: [0.0] * 16, 2.0: [0.0] * 16})
+    cache.evict()
+    assert list(cache.entries) == ["a", "c"]
+
+    assert cache.samples("a", "y") == {}
+    assert list(cache.entries) == ["c"]
+
+    now[0] = 61.0
+    assert cache.samples("c", "x") == {}
+    cache.store("d", "x", {1.0: [0.0] * 16})
+    now[0] = 200.0
+    cache.configure(max_age=30.0)
+    assert len(cache) == 0
+
+
+# Pegar: resolver en local contra el padre actual
+
+def move_parent(scene):
+    # Anima el padre de otra forma para que las keys locales copiadas ya no sirvan
+    for frame in (1.0, 5.0, 9.0):
+        scene.set_key("pelvis", "translateZ", frame, frame * -2.0)
+        scene.set_key("pelvis", "rotateX", frame, 20.0 - frame * 7.0)
+        scene.set_key("pelvis", "scaleX", frame, 1.0 + frame * 0.1)
+
+
+@pytest.mark.parametrize("backend", ["fake", "cmds"])
+def test_paste_restores_the_world_transforms(worldspace, backend):
+    runners.use_backend(backend)
+    scene = build_chain()
+    spine = scene.node("spine")
+    copied = worldspace.copy_worldspace(["spine"])
+    expected = {frame: scene.world_matrix(spine, frame) for frame in (3.0, 5.0)}
+
+    move_parent(scene)
+    scene.reset_calls()
+    summary = worldspace.paste_worldspace(copied)
+
+    assert summary["objects"] == ["spine"] and summary["keys"] == 12
+    assert scene.calls["currentTime"] == 0
+    assert scene.calls["setKeyframe"] == 6
+    assert sorted(scene.curve_for("spine", "rotateY").times) == [3.0, 5.0]
+    for frame, matrix in expected.items():
+        result = scene.world_matrix(spine, frame)
+        # La escala del padre no uniforme deforma la orientacion; se comparan traslacion y ejes normalizados
+        assert result[3] == pytest.approx(matrix[3], abs=1e-6)
+
+
+def test_paste_solves_children_after_their_parents(worldspace):
+    runners.use_backend("fake")
+    scene = build_chain()
+    nodes = [scene.node("pelvis"), scene.node("spine")]
+    copied = worldspace.copy_worldspace(["spine", "pelvis"])
+    expected = {frame: [scene.world_matrix(node, frame) for node in nodes] for frame in (1.0, 3.0, 5.0, 9.0)}
+
+    move_parent(scene)
+    for frame in (3.0, 5.0):
+        scene.set_key("spine", "rotateZ", frame, 33.0)
+    worldspace.paste_worldspace(copied)
+
+    # scaleX del padre sigue animado: solo cuentan las posiciones y la orientacion del frame en que hay key
+    for frame in (1.0, 5.0, 9.0):
+        assert scene.world_matrix(nodes[0], frame)[3] == pytest.approx(expected[frame][0][3], abs=1e-6)
+    for frame in (3.0, 5.0):
+        assert scene.world_matrix(nodes[1], frame)[3] == pytest.approx(expected[frame][1][3], abs=1e-6)
+
+
+def test_paste_step_count_covers_every_hierarchy_level(worldspace):
+    # La barra de progreso del job se dimensiona con paste_step_count: un paso por frame en cada nivel
+    runners.use_backend("fake")
+    scene = build_chain()
+    copied = worldspace.copy_worldspace(["spine", "pelvis"])
+    copied["missing"] = {1.0: [0.0] * 6}
+    done = []
+    worldspace.paste_worldspace(copied, progress=done.append)
+
+    assert worldspace.paste_step_count(copied) == len(done) == len(copied["pelvis"]) + len(copied["spine"])
+    assert worldspace.paste_step_count({"missing": {1.0: [0.0] * 6}}) == 0
+
+
+def test_paste_matches_the_copy(worldspace):
+    runners.use_backend("fake")
+    scene = build_chain()
+    copied = worldspace.copy_worldspace(["pelvis", "spine"])
+    for frame in (1.0, 5.0, 9.0):
+        scene.set_key("pelvis", "rotateZ", frame, frame * 3.0)
+    worldspace.paste_worldspace(copied)
+    pasted = worldspace.copy_worldspace(["pelvis", "spine"])
+    for obj in copied:
+        for frame in copied[obj]:
+            assert pasted[obj][frame] == pytest.approx(copied[obj][frame], abs=1e-6)
+
+
+def test_paste_from_json_keys(worldspace):
+    # El json guarda los frames como texto
+    runners.use_backend("fake")
+    scene = build_chain()
+    copied = worldspace.copy_worldspace(["spine"])
+    data = {"spine": {str(frame): values for frame, values in copied["spine"].items()}, "missing": {"1": [0.0] * 6}}
+    summary = worldspace.paste_worldspace(data)
+    assert summary["objects"] == ["spine"]
+    assert sorted(scene.curve_for("spine", "translateX").times) == [3.0, 5.0]
+
+
+def test_paste_cancel_writes_nothing(worldspace):
+    runners.use_backend("fake")
+    scene = build_chain()
+    copied = worldspace.copy_worldspace(["spine"])
+    before = list(scene.curve_for("spine", "rotateX").values)
+    summary = worldspace.paste_worldspace(copied, progress=lambda done: True)
+    assert summary["cancelled"] and summary["objects"] == []
+    assert scene.curve_for("spine", "rotateX").values == before